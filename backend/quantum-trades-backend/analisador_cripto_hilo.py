@@ -11,13 +11,13 @@ Execução: Diária às 21h
 """
 
 import requests
-import pandas as pd
 import numpy as np
 from datetime import datetime
 import os
 from dotenv import load_dotenv
 from telethon.sync import TelegramClient
-import yfinance as yf
+from armazem_ohlcv import obter_historico
+from indicador_chilo import calcular_chilo_arrays, propagar_ultimo
 
 load_dotenv()
 
@@ -40,16 +40,15 @@ def buscar_dados(symbol, yahoo_symbol):
     """
     try:
         print(f"   📊 Buscando dados de {yahoo_symbol}...")
-        ticker = yf.Ticker(yahoo_symbol)
-        df = ticker.history(period='1y', interval='1d')
+        df = obter_historico(yahoo_symbol, '1d', period='1y')
         
-        if df.empty:
+        if df is None or df.empty:
             raise ValueError(f"Nenhum dado retornado para {yahoo_symbol}")
         
         # Renomear colunas
         df = df.reset_index()
         df.columns = [c.lower() for c in df.columns]
-        df = df.rename(columns={'date': 'time'})
+        df = df.rename(columns={'timestamp': 'time'})
         
         return df[['time', 'open', 'high', 'low', 'close', 'volume']]
         
@@ -79,41 +78,12 @@ def calcular_gann_hilo_activator(df, period, ma_type='SMA'):
     Referência: TradingView - CHiLo by Parize
     https://www.tradingview.com/script/YUqiooBi-CHiLo-Custom-HiLo-SMA-EMA-Activator-Shading-Auto-Decimals/
     """
-    # Calcular médias móveis dos highs e lows
-    if ma_type == 'SMA':
-        hima = df['high'].rolling(window=period).mean()
-        loma = df['low'].rolling(window=period).mean()
-    elif ma_type == 'EMA':
-        hima = df['high'].ewm(span=period, adjust=False).mean()
-        loma = df['low'].ewm(span=period, adjust=False).mean()
-    else:
-        raise ValueError(f"Tipo de MA não suportado: {ma_type}")
-    
-    # Inicializar arrays
-    hilo_state = pd.Series(0, index=df.index, dtype=int)
-    ghla = pd.Series(np.nan, index=df.index, dtype=float)
+    # Estado HiLot(n) e linha do Activator calculados em arrays
+    hilo, estado = calcular_chilo_arrays(df['high'], df['low'], df['close'], period, ma_type)
     
-    # Calcular HiLot(n) e GHLAt(n) conforme fórmula matemática
-    for i in range(period, len(df)):
-        close = df['close'].iloc[i]
-        hima_prev = hima.iloc[i-1]  # SMAt-1(H,n)
-        loma_prev = loma.iloc[i-1]  # SMAt-1(L,n)
-        
-        # Determinar estado HiLot(n)
-        if close > hima_prev:
-            hilo_state.iloc[i] = 1  # BULLISH
-        elif close < loma_prev:
-            hilo_state.iloc[i] = -1  # BEARISH
-        else:
-            hilo_state.iloc[i] = 0  # NEUTRO
-        
-        # Calcular GHLAt(n)
-        if hilo_state.iloc[i] == 1:
-            ghla.iloc[i] = loma_prev  # Plota SMA dos lows
-        elif hilo_state.iloc[i] == -1:
-            ghla.iloc[i] = hima_prev  # Plota SMA dos highs
-        else:
-            ghla.iloc[i] = ghla.iloc[i-1]  # Mantém valor anterior
+    # GHLAt(n) só é definido em BULLISH/BEARISH e mantém o valor anterior no NEUTRO
+    ghla = propagar_ultimo(hilo, estado != 0)
+    hilo_state = np.nan_to_num(estado, nan=0.0).astype(int)
     
     # Determinar cor/tendência baseado no estado
     df['hilo_state'] = hilo_state
@@ -8,8 +8,8 @@ Versão usando Telegram Bot (mais confiável para GitHub Actions)
 """
 
 import os
-import yfinance as yf
-import pandas as pd
+from indicador_chilo import calcular_chilo
+from armazem_ohlcv import obter_historico
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import requests
@@ -40,10 +40,9 @@ def buscar_dados_yahoo(yahoo_symbol, period='1y'):
     """
     try:
         print(f"   📊 Buscando dados de {yahoo_symbol}...")
-        ticker = yf.Ticker(yahoo_symbol)
-        df = ticker.history(period=period)
+        df = obter_historico(yahoo_symbol, '1d', period=period)
         
-        if df.empty:
+        if df is None or df.empty:
             print(f"   ❌ Sem dados para {yahoo_symbol}")
             return None
         
@@ -60,40 +59,7 @@ def calcular_gann_hilo_activator(df, period, ma_type='SMA'):
     Calcula o CHiLo (Custom HiLo) - Modo HiLo Activator
     Indicador criado por Paulo H. Parize e Tio Huli
     """
-    # Calcular médias móveis dos highs e lows
-    if ma_type == 'SMA':
-        hima = df['high'].rolling(window=period).mean()
-        loma = df['low'].rolling(window=period).mean()
-    else:  # EMA
-        hima = df['high'].ewm(span=period, adjust=False).mean()
-        loma = df['low'].ewm(span=period, adjust=False).mean()
-    
-    # Inicializar série do HiLo
-    hilo = pd.Series(index=df.index, dtype=float)
-    hilo_state = pd.Series(index=df.index, dtype=int)
-    
-    # Calcular estado e linha HiLo
-    for i in range(period, len(df)):
-        close = df['close'].iloc[i]
-        hi = hima.iloc[i-1]
-        lo = loma.iloc[i-1]
-        
-        if close > hi:
-            state = 1  # BULLISH
-            hilo.iloc[i] = lo
-        elif close < lo:
-            state = -1  # BEARISH
-            hilo.iloc[i] = hi
-        else:
-            state = 0  # NEUTRO
-            hilo.iloc[i] = hilo.iloc[i-1] if i > period else lo
-        
-        hilo_state.iloc[i] = state
-    
-    df['hilo'] = hilo
-    df['hilo_state'] = hilo_state
-    
-    return df
+    return calcular_chilo(df, period, ma_type)
 
 def detectar_mudanca_tendencia(df):
     """
@@ -11,7 +11,7 @@ Verifica os 3 critérios para execução de ordens:
 
 from datetime import datetime, time
 import pytz
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, Optional, Tuple
 from monitor_multitimeframe import MonitorMultiTimeframe
 from predicao_inversao import PreditorInversao
 import json
@@ -28,12 +28,29 @@ class AnalisadorCriterios:
     Analisa critérios para execução de ordens
     """
     
-    def __init__(self, config_file: str = CONFIG_FILE):
+    def __init__(self, config_file: str = CONFIG_FILE, monitor: Optional[MonitorMultiTimeframe] = None,
+                 preditor: Optional[PreditorInversao] = None,
+                 relogio: Optional[Callable[[], datetime]] = None):
+        """
+        Args:
+            config_file: Arquivo de configuração
+            monitor: Monitor compartilhado (padrão: um novo)
+            preditor: Preditor ML (padrão: modelos de MODEL_DIR)
+            relogio: Função que retorna o horário atual com fuso (padrão:
+                relógio do sistema; o replay usa um relógio simulado)
+        """
         self.config = self.carregar_config(config_file)
-        self.monitor = MonitorMultiTimeframe()
-        self.preditor = PreditorInversao()
+        self.monitor = monitor or MonitorMultiTimeframe()
+        self.preditor = preditor or PreditorInversao()
+        self.relogio = relogio
         self.posicoes_abertas = {}  # {cripto: {preco_entrada, preco_inicial_tendencia, ...}}
     
+    def agora(self) -> datetime:
+        """Horário atual em Brasília"""
+        if self.relogio is None:
+            return datetime.now(TZ_BRASILIA)
+        return self.relogio().astimezone(TZ_BRASILIA)
+    
     def carregar_config(self, config_file: str) -> Dict:
         """
         Carrega configurações do sistema
@@ -81,7 +98,7 @@ class AnalisadorCriterios:
             return False, "Critério 1 desativado"
         
         # Verificar horário
-        agora_brasilia = datetime.now(TZ_BRASILIA)
+        agora_brasilia = self.agora()
         hora_verificacao = self.config['horario_verificacao_diario']
         
         # Parsear horário de verificação
@@ -116,10 +133,17 @@ class AnalisadorCriterios:
         # Se chegou aqui, está no horário correto e há um estado definido
         return True, f"Inversão confirmada no candle diário às {hora_atual.strftime('%H:%M:%S')}"
     
-    def verificar_criterio_2(self, cripto: str, features: Dict) -> Tuple[bool, str, float]:
+    def verificar_criterio_2(self, cripto: str, features: Dict,
+                             predicoes: Optional[Dict] = None) -> Tuple[bool, str, float]:
         """
         Critério 2: ML Multi-Timeframe (probabilidade > 70%)
         
+        Args:
+            cripto: Nome da criptomoeda
+            features: Features dos timeframes
+            predicoes: Resultado de PreditorInversao.prever_todas já calculado
+                para o ciclo (se None, prevê apenas esta cripto)
+        
         Returns:
             (satisfeito, motivo, probabilidade)
         """
@@ -130,8 +154,11 @@ class AnalisadorCriterios:
         threshold_ml = self.config['ml']['threshold_probabilidade']
         min_alinhados = self.config['ml']['min_timeframes_alinhados']
         
-        # Fazer predição
-        resultado_ml = self.preditor.prever(cripto, features)
+        # Fazer predição (ou usar a do lote do ciclo)
+        if predicoes is not None:
+            resultado_ml = predicoes.get(cripto)
+        else:
+            resultado_ml = self.preditor.prever(cripto, features)
         
         if not resultado_ml:
             return False, "Modelo ML não disponível", 0.0
@@ -194,10 +221,17 @@ class AnalisadorCriterios:
         
         return False, f"Stop loss não ativado: perda de {perda_percentual:.2%} < {threshold_stop:.0%}"
     
-    def analisar_cripto(self, cripto: str) -> Dict:
+    def analisar_cripto(self, cripto: str, resultado_monitor: Optional[Dict] = None,
+                        predicoes: Optional[Dict] = None) -> Dict:
         """
         Analisa todos os critérios para uma criptomoeda
         
+        Args:
+            cripto: Nome da criptomoeda
+            resultado_monitor: Monitoramento já feito no ciclo (se None,
+                monitora a cripto)
+            predicoes: Predições ML do ciclo (PreditorInversao.prever_todas)
+        
         Returns:
             Dicionário com análise completa
         """
@@ -205,25 +239,25 @@ class AnalisadorCriterios:
         print(f"🔍 ANALISANDO CRITÉRIOS: {cripto}")
         print(f"{'='*80}")
         
-        # Monitorar timeframes
-        resultado_monitor = None
-        for c in self.monitor.periodos_otimizados:
-            if c == cripto:
-                # Buscar dados da cripto
-                cripto_config = next((c for c in [
-                    {'name': 'Bitcoin', 'yahoo': 'BTC-USD', 'period': 3},
-                    {'name': 'Ethereum', 'yahoo': 'ETH-USD', 'period': 45},
-                    {'name': 'Binance Coin', 'yahoo': 'BNB-USD', 'period': 70},
-                    {'name': 'Solana', 'yahoo': 'SOL-USD', 'period': 7},
-                    {'name': 'Chainlink', 'yahoo': 'LINK-USD', 'period': 40},
-                    {'name': 'Uniswap', 'yahoo': 'UNI7083-USD', 'period': 65},
-                    {'name': 'Algorand', 'yahoo': 'ALGO-USD', 'period': 40},
-                    {'name': 'VeChain', 'yahoo': 'VET-USD', 'period': 25}
-                ] if c['name'] == cripto), None)
-                
-                if cripto_config:
-                    resultado_monitor = self.monitor.monitorar_cripto(cripto_config)
-                break
+        # Monitorar timeframes (se o ciclo ainda não monitorou)
+        if resultado_monitor is None:
+            for c in self.monitor.periodos_otimizados:
+                if c == cripto:
+                    # Buscar dados da cripto
+                    cripto_config = next((c for c in [
+                        {'name': 'Bitcoin', 'yahoo': 'BTC-USD', 'period': 3},
+                        {'name': 'Ethereum', 'yahoo': 'ETH-USD', 'period': 45},
+                        {'name': 'Binance Coin', 'yahoo': 'BNB-USD', 'period': 70},
+                        {'name': 'Solana', 'yahoo': 'SOL-USD', 'period': 7},
+                        {'name': 'Chainlink', 'yahoo': 'LINK-USD', 'period': 40},
+                        {'name': 'Uniswap', 'yahoo': 'UNI7083-USD', 'period': 65},
+                        {'name': 'Algorand', 'yahoo': 'ALGO-USD', 'period': 40},
+                        {'name': 'VeChain', 'yahoo': 'VET-USD', 'period': 25}
+                    ] if c['name'] == cripto), None)
+                    
+                    if cripto_config:
+                        resultado_monitor = self.monitor.monitorar_cripto(cripto_config)
+                    break
         
         if not resultado_monitor:
             return {
@@ -247,7 +281,7 @@ class AnalisadorCriterios:
         print(f"   {'✅' if c1_satisfeito else '❌'} {c1_motivo}")
         
         # Critério 2
-        c2_satisfeito, c2_motivo, probabilidade = self.verificar_criterio_2(cripto, features)
+        c2_satisfeito, c2_motivo, probabilidade = self.verificar_criterio_2(cripto, features, predicoes)
         print(f"\n2️⃣ Critério 2 (ML Multi-Timeframe):")
         print(f"   {'✅' if c2_satisfeito else '❌'} {c2_motivo}")
         
@@ -276,7 +310,7 @@ class AnalisadorCriterios:
         
         return {
             'cripto': cripto,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': self.agora().isoformat(),
             'preco_atual': preco_atual,
             'criterio_1': {
                 'satisfeito': c1_satisfeito,
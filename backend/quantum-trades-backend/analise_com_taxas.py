@@ -4,9 +4,10 @@ Magnus Wealth - Versão 8.3.0
 Compara períodos considerando custos operacionais
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
+from indicador_chilo import calcular_chilo_tendencia
+from armazem_ohlcv import obter_historico
 from datetime import datetime, timedelta
 
 # Taxas Binance Futuros USDⓈ-M (Usuário Regular)
@@ -15,19 +16,7 @@ TAXA_ROUND_TRIP = 0.001  # 0.10% (entrada + saída)
 
 def calcular_chilo(df, period):
     """Calcula indicador CHiLo"""
-    df['hilo_high'] = df['high'].rolling(window=period).mean()
-    df['hilo_low'] = df['low'].rolling(window=period).mean()
-    
-    df['trend'] = 0
-    for i in range(period, len(df)):
-        if df['close'].iloc[i] > df['hilo_high'].iloc[i]:
-            df.loc[df.index[i], 'trend'] = 1  # Bullish
-        elif df['close'].iloc[i] < df['hilo_low'].iloc[i]:
-            df.loc[df.index[i], 'trend'] = -1  # Bearish
-        else:
-            df.loc[df.index[i], 'trend'] = df['trend'].iloc[i-1]
-    
-    return df
+    return calcular_chilo_tendencia(df, period)
 
 def analisar_periodo_com_taxas(symbol, period, days=90):
     """Analisa período com taxas reais"""
@@ -36,12 +25,11 @@ def analisar_periodo_com_taxas(symbol, period, days=90):
     print(f"{'='*60}")
     
     # Buscar dados
-    ticker = yf.Ticker(symbol)
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days+period+10)
-    df = ticker.history(start=start_date, end=end_date)
+    df = obter_historico(symbol, '1d', start=start_date, end=end_date)
     
-    if df.empty:
+    if df is None or df.empty:
         print(f"❌ Sem dados para {symbol}")
         return None
     
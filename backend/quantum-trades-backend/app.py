@@ -5,8 +5,10 @@ Fornece endpoints para integração com Telegram e análise de carteiras.
 """
 
 import os
+import json
 import asyncio
-from flask import Flask, jsonify, request
+import numpy as np
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 
@@ -15,8 +17,9 @@ from modules.carteira_parser import CarteiraParser, parse_telegram_messages, get
 from modules.magnus_learning import MagnusLearningEngine, MagnusAnalyzer
 from ml_models.sentiment_analyzer import SentimentAnalyzer
 from ml_models.price_predictor import PricePredictor
-from ml_models.portfolio_optimizer import PortfolioOptimizer
-from ml_models.backtester import Backtester
+from ml_models.portfolio_optimizer import COVARIANCE_METHODS, PortfolioOptimizer
+from ml_models.backtester import REBALANCE_MODES, SWEEP_RANK_METRICS, Backtester
+from ml_models.results_store import ORDER_METRICS
 from ml_models.model_evaluator import ModelEvaluator
 from services.historical_data_service import HistoricalDataService
 
@@ -699,6 +702,83 @@ def train_price_predictor():
         }), 500
 
 
+@app.route('/api/ml/predict/train/batch', methods=['POST'])
+def train_price_predictor_batch():
+    """
+    Treina modelos de previsão para vários tickers de uma vez.
+    
+    Os históricos são buscados em paralelo pelo HistoricalDataService e os
+    modelos são treinados em um pool de processos e gravados em um único
+    pacote consolidado.
+    
+    Body:
+        - tickers: Lista de tickers
+        - period: Período do histórico (padrão: 2y)
+        - workers: Processos de treino (opcional, padrão: número de CPUs)
+        - stream: Se true, devolve uma linha JSON por ticker assim que ele
+          termina (application/x-ndjson)
+    """
+    data = request.get_json()
+    
+    if not data or not data.get('tickers'):
+        return jsonify({
+            'error': 'Campo "tickers" é obrigatório'
+        }), 400
+    
+    # Validado antes do treino: no modo stream um erro dentro do gerador
+    # chegaria depois do 200, truncando a resposta
+    workers = data.get('workers')
+    if workers is not None:
+        try:
+            if isinstance(workers, bool):
+                raise ValueError(workers)
+            workers = max(1, min(int(workers), os.cpu_count() or 1))
+        except (TypeError, ValueError):
+            return jsonify({
+                'error': 'Campo "workers" deve ser um número inteiro'
+            }), 400
+    
+    tickers = [ticker.upper() for ticker in data['tickers']]
+    period = data.get('period', '2y')
+    
+    try:
+        prices_history = historical_data_service.get_multiple_prices(tickers, period)
+    except Exception as e:
+        return jsonify({
+            'error': 'Erro ao buscar históricos',
+            'message': str(e)
+        }), 500
+    
+    missing = [
+        {'ticker': ticker, 'status': 'error', 'message': 'Sem dados históricos'}
+        for ticker in tickers if ticker not in prices_history
+    ]
+    
+    if data.get('stream'):
+        def generate():
+            for result in missing:
+                yield json.dumps(result) + '\n'
+            for result in price_predictor.train_batch_iter(prices_history, workers=workers):
+                yield json.dumps(result) + '\n'
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    
+    try:
+        results = list(price_predictor.train_batch_iter(prices_history, workers=workers))
+        
+        return jsonify({
+            'success': True,
+            'trained': sum(1 for r in results if r['status'] == 'trained'),
+            'training': missing + results
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'error': 'Erro ao treinar modelos',
+            'message': str(e)
+        }), 500
+
+
 @app.route('/api/ml/predict/price/<ticker>', methods=['POST'])
 def predict_price(ticker: str):
     """
@@ -739,6 +819,63 @@ def predict_price(ticker: str):
         }), 500
 
 
+@app.route('/api/ml/predict/prices', methods=['POST'])
+def predict_prices_batch():
+    """
+    Prevê preços futuros de vários tickers em uma única chamada.
+    
+    Body:
+        - prices_history: Dicionário {ticker: [preços históricos recentes]}
+        - days: Número de dias a prever (padrão: 7)
+    """
+    data = request.get_json()
+    
+    if not data or 'prices_history' not in data:
+        return jsonify({
+            'error': 'Campo "prices_history" é obrigatório'
+        }), 400
+    
+    try:
+        days = data.get('days', 7)
+        
+        result = price_predictor.predict_next_days_batch(
+            prices_by_ticker=data['prices_history'],
+            days=days
+        )
+        
+        return jsonify({
+            'success': True,
+            'predictions': result
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'error': 'Erro ao prever preços',
+            'message': str(e)
+        }), 500
+
+
+def obter_otimizador_portfolio(data):
+    """
+    Otimizador novo com o estimador de covariância pedido no body
+    
+    Nunca é compartilhado entre requisições: o otimizador guarda os tickers
+    e as estatísticas da última chamada, e o servidor atende em threads. As
+    estatísticas ficam no cache do módulo, então criar um otimizador por
+    requisição não recalcula nada para um universo já visto.
+    """
+    return PortfolioOptimizer(covariance_method=data.get('covariance_method', 'sample'))
+
+
+def covariance_method_invalido(data):
+    """Resposta 400 se o estimador de covariância pedido não existir"""
+    if data.get('covariance_method', 'sample') not in COVARIANCE_METHODS:
+        return jsonify({
+            'error': f'Campo "covariance_method" deve ser um de: {", ".join(COVARIANCE_METHODS)}'
+        }), 400
+    return None
+
+
 @app.route('/api/ml/portfolio/optimize', methods=['POST'])
 def optimize_portfolio():
     """
@@ -748,6 +885,7 @@ def optimize_portfolio():
         - prices_history: Dicionário {ticker: [preços]}
         - risk_tolerance: Tolerância ao risco (conservative, moderate, aggressive)
         - optimization_type: Tipo de otimização (sharpe, min_volatility)
+        - covariance_method: Estimador de covariância (sample, ledoit_wolf, ewma)
     """
     data = request.get_json()
     
@@ -756,17 +894,22 @@ def optimize_portfolio():
             'error': 'Campo "prices_history" é obrigatório'
         }), 400
     
+    erro = covariance_method_invalido(data)
+    if erro:
+        return erro
+    
     try:
+        optimizer = obter_otimizador_portfolio(data)
         risk_tolerance = data.get('risk_tolerance', 'moderate')
         optimization_type = data.get('optimization_type', 'sharpe')
         
         if optimization_type == 'sharpe':
-            result = portfolio_optimizer.optimize_sharpe_ratio(
+            result = optimizer.optimize_sharpe_ratio(
                 prices_history=data['prices_history'],
                 risk_tolerance=risk_tolerance
             )
         else:
-            result = portfolio_optimizer.optimize_min_volatility(
+            result = optimizer.optimize_min_volatility(
                 prices_history=data['prices_history']
             )
         
@@ -782,6 +925,108 @@ def optimize_portfolio():
         }), 500
 
 
+@app.route('/api/ml/portfolio/frontier', methods=['POST'])
+def efficient_frontier():
+    """
+    Gera a fronteira eficiente do portfólio.
+    
+    Body:
+        - prices_history: Dicionário {ticker: [preços]}
+        - n_points: Número de pontos (padrão: 100, máximo: 500)
+        - method: 'qp' (Critical Line, padrão) ou 'slsqp' (warm start)
+        - include_weights: Incluir os pesos de cada ponto (padrão: false)
+        - covariance_method: Estimador de covariância (sample, ledoit_wolf, ewma)
+    """
+    data = request.get_json()
+    
+    if not data or 'prices_history' not in data:
+        return jsonify({
+            'error': 'Campo "prices_history" é obrigatório'
+        }), 400
+    
+    method = data.get('method', 'qp')
+    if method not in ('qp', 'slsqp'):
+        return jsonify({
+            'error': 'Campo "method" deve ser "qp" ou "slsqp"'
+        }), 400
+    
+    erro = covariance_method_invalido(data)
+    if erro:
+        return erro
+    
+    try:
+        optimizer = obter_otimizador_portfolio(data)
+        n_points = max(2, min(int(data.get('n_points', 100)), 500))
+        
+        # Mesmas estatísticas (do cache) que a fronteira usa a seguir
+        stats = optimizer.prepare_statistics(data['prices_history'])
+        frontier = optimizer.generate_efficient_frontier(
+            prices_history=data['prices_history'],
+            n_points=n_points,
+            method=method,
+            include_weights=bool(data.get('include_weights', False))
+        )
+        
+        return jsonify({
+            'success': True,
+            'tickers': list(stats.tickers),
+            'method': method,
+            'frontier': frontier
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'error': 'Erro ao gerar fronteira eficiente',
+            'message': str(e)
+        }), 500
+
+
+@app.route('/api/ml/portfolio/evaluate', methods=['POST'])
+def evaluate_portfolio():
+    """
+    Avalia uma alocação sobre o histórico de preços.
+    
+    Body:
+        - prices_history: Dicionário {ticker: [preços]}
+        - weights: Dicionário {ticker: peso} (normalizado para somar 1)
+        - covariance_method: Estimador de covariância (sample, ledoit_wolf, ewma)
+    """
+    data = request.get_json()
+    
+    if not data or 'prices_history' not in data or 'weights' not in data:
+        return jsonify({
+            'error': 'Campos "prices_history" e "weights" são obrigatórios'
+        }), 400
+    
+    erro = covariance_method_invalido(data)
+    if erro:
+        return erro
+    
+    try:
+        optimizer = obter_otimizador_portfolio(data)
+        result = optimizer.evaluate_portfolio(
+            prices_history=data['prices_history'],
+            weights=data['weights']
+        )
+        
+        return jsonify({
+            'success': True,
+            'portfolio': result
+        })
+    
+    except ValueError as e:
+        return jsonify({
+            'error': 'Alocação inválida',
+            'message': str(e)
+        }), 400
+    
+    except Exception as e:
+        return jsonify({
+            'error': 'Erro ao avaliar portfólio',
+            'message': str(e)
+        }), 500
+
+
 @app.route('/api/ml/models/status', methods=['GET'])
 def get_models_status():
     """
@@ -897,7 +1142,7 @@ def run_buy_and_hold_backtest():
         bt = Backtester(initial_capital=initial_capital)
         result = bt.backtest_buy_and_hold(ticker, prices, dates)
         
-        # Salvar resultado
+        # Salvar resultado (recebe result_id para consultas no histórico)
         filepath = bt.save_result(result)
         result['saved_to'] = filepath
         
@@ -922,6 +1167,9 @@ def run_portfolio_backtest():
         - allocations: Dicionário {ticker: peso}
         - period: Período (default: 1y)
         - initial_capital: Capital inicial (default: 10000)
+        - rebalance: none (buy and hold), periodic ou threshold (default: none)
+        - rebalance_every: Dias entre rebalanceamentos (default: 21)
+        - rebalance_threshold: Desvio máximo de um peso (default: 0.05)
     """
     data = request.get_json()
     
@@ -930,6 +1178,12 @@ def run_portfolio_backtest():
             'error': 'Campo "allocations" é obrigatório'
         }), 400
     
+    rebalance = data.get('rebalance', 'none')
+    if rebalance not in REBALANCE_MODES:
+        return jsonify({
+            'error': f'Campo "rebalance" deve ser um de: {", ".join(REBALANCE_MODES)}'
+        }), 400
+    
     try:
         allocations = data['allocations']
         period = data.get('period', '1y')
@@ -939,20 +1193,24 @@ def run_portfolio_backtest():
         tickers = list(allocations.keys())
         historical_data = historical_data_service.get_multiple_tickers(tickers, period)
         
-        # Extrair preços
+        # Extrair preços e datas de cada ticker (alinhados por data no backtest)
         prices_history = {}
-        dates = None
+        dates = {}
         
         for ticker, data_item in historical_data.items():
             prices_history[ticker] = [item['close'] for item in data_item['data']]
-            if dates is None:
-                dates = [item['date'] for item in data_item['data']]
+            dates[ticker] = [item['date'] for item in data_item['data']]
         
         # Executar backtest
         bt = Backtester(initial_capital=initial_capital)
-        result = bt.backtest_portfolio(allocations, prices_history, dates)
+        result = bt.backtest_portfolio(
+            allocations, prices_history, dates,
+            rebalance=rebalance,
+            rebalance_every=int(data.get('rebalance_every', 21)),
+            rebalance_threshold=float(data.get('rebalance_threshold', 0.05))
+        )
         
-        # Salvar resultado
+        # Salvar resultado (recebe result_id para consultas no histórico)
         filepath = bt.save_result(result)
         result['saved_to'] = filepath
         
@@ -961,6 +1219,12 @@ def run_portfolio_backtest():
             'backtest': result
         })
     
+    except ValueError as e:
+        return jsonify({
+            'error': 'Backtest de portfólio inválido',
+            'message': str(e)
+        }), 400
+    
     except Exception as e:
         return jsonify({
             'error': 'Erro ao executar backtest de portfólio',
@@ -968,6 +1232,203 @@ def run_portfolio_backtest():
         }), 500
 
 
+# Máximo de carteiras avaliadas por requisição na varredura
+MAX_SWEEP_CANDIDATES = 20000
+
+
+def limite_varredura_excedido():
+    """Resposta 400 para varreduras com mais de MAX_SWEEP_CANDIDATES carteiras"""
+    return jsonify({
+        'error': f'Máximo de {MAX_SWEEP_CANDIDATES} carteiras por varredura'
+    }), 400
+
+
+@app.route('/api/backtest/sweep', methods=['POST'])
+def run_allocation_sweep():
+    """
+    Varredura de alocações: backtest de muitas carteiras sobre um único
+    histórico, com a tabela de métricas ordenada.
+    
+    Body:
+        - tickers: Lista de tickers
+        - weights: Matriz de pesos [[peso por ticker], ...] (opcional)
+        - candidates: Geração das carteiras quando "weights" não é enviado:
+            {"source": "dirichlet", "n": 1000, "alpha": 1.0, "seed": 42} ou
+            {"source": "frontier", "n_points": 100}
+          No máximo MAX_SWEEP_CANDIDATES (20000) carteiras, enviadas ou
+          geradas; acima disso responde 400
+        - period: Período (default: 1y)
+        - initial_capital: Capital inicial (default: 10000)
+        - rebalance: none (buy and hold) ou periodic (default: none)
+        - rebalance_every: Dias entre rebalanceamentos (default: 21)
+        - rank_by: sharpe_ratio, total_return, max_drawdown ou volatility
+        - top_n: Quantidade de carteiras na resposta (default: 50)
+    """
+    data = request.get_json()
+    
+    if not data or not data.get('tickers'):
+        return jsonify({
+            'error': 'Campo "tickers" é obrigatório'
+        }), 400
+    
+    candidates = data.get('candidates', {'source': 'dirichlet'})
+    if 'weights' not in data and candidates.get('source') not in ('dirichlet', 'frontier'):
+        return jsonify({
+            'error': 'Envie "weights" ou "candidates.source" igual a "dirichlet" ou "frontier"'
+        }), 400
+    
+    rebalance = data.get('rebalance', 'none')
+    if rebalance not in ('none', 'periodic'):
+        return jsonify({
+            'error': 'Campo "rebalance" deve ser "none" ou "periodic" na varredura'
+        }), 400
+    
+    rank_by = data.get('rank_by', 'sharpe_ratio')
+    if rank_by not in SWEEP_RANK_METRICS:
+        return jsonify({
+            'error': f'Campo "rank_by" deve ser um de: {", ".join(SWEEP_RANK_METRICS)}'
+        }), 400
+    
+    try:
+        tickers = [ticker.upper() for ticker in data['tickers']]
+        period = data.get('period', '1y')
+        initial_capital = data.get('initial_capital', 10000)
+        
+        # Histórico buscado uma única vez para todas as carteiras
+        historical_data = historical_data_service.get_multiple_tickers(tickers, period)
+        
+        prices_history = {}
+        dates = {}
+        
+        for ticker, data_item in historical_data.items():
+            prices_history[ticker] = [item['close'] for item in data_item['data']]
+            dates[ticker] = [item['date'] for item in data_item['data']]
+        
+        missing = [ticker for ticker in tickers if ticker not in prices_history]
+        if missing:
+            return jsonify({
+                'error': 'Dados históricos não encontrados',
+                'tickers': missing
+            }), 404
+        
+        if 'weights' in data:
+            weights = np.array(data['weights'], dtype=float)
+        elif candidates['source'] == 'frontier':
+            optimizer = PortfolioOptimizer()
+            weights = optimizer.frontier_weights(
+                {ticker: prices_history[ticker] for ticker in tickers},
+                n_points=max(2, min(int(candidates.get('n_points', 100)), 500)),
+                method='qp'
+            )
+        else:
+            n = max(1, int(candidates.get('n', 1000)))
+            if n > MAX_SWEEP_CANDIDATES:
+                return limite_varredura_excedido()
+            rng = np.random.default_rng(candidates.get('seed'))
+            weights = rng.dirichlet(np.full(len(tickers), float(candidates.get('alpha', 1.0))), size=n)
+        
+        if len(weights) > MAX_SWEEP_CANDIDATES:
+            return limite_varredura_excedido()
+        
+        bt = Backtester(initial_capital=initial_capital)
+        result = bt.backtest_allocations(
+            weights, tickers, prices_history, dates,
+            rebalance=rebalance,
+            rebalance_every=int(data.get('rebalance_every', 21)),
+            rank_by=rank_by,
+            top_n=max(1, int(data.get('top_n', 50)))
+        )
+        
+        return jsonify({
+            'success': True,
+            'sweep': result
+        })
+    
+    except ValueError as e:
+        return jsonify({
+            'error': 'Carteiras inválidas',
+            'message': str(e)
+        }), 400
+    
+    except Exception as e:
+        return jsonify({
+            'error': 'Erro ao executar varredura de alocações',
+            'message': str(e)
+        }), 500
+
+
+@app.route('/api/backtest/results', methods=['GET'])
+def list_backtest_results():
+    """
+    Histórico de backtests salvos, sem as curvas de capital.
+    
+    Query params:
+        - ticker: Resultados com o ticker (sozinho ou em carteira)
+        - strategy: buy_and_hold ou portfolio
+        - days: Executados nos últimos N dias
+        - since / until: Intervalo de execução (ISO 8601)
+        - order_by: sharpe_ratio, total_return, max_drawdown, volatility ou executed_at
+        - limit: Quantidade de resultados (default: 50)
+        - offset: Resultados pulados (default: 0)
+    """
+    order_by = request.args.get('order_by', 'executed_at')
+    if order_by not in ORDER_METRICS:
+        return jsonify({
+            'error': f'Parâmetro "order_by" deve ser um de: {", ".join(ORDER_METRICS)}'
+        }), 400
+    
+    try:
+        ticker = request.args.get('ticker')
+        days = request.args.get('days')
+        results = backtester.store.query(
+            ticker=ticker.upper() if ticker else None,
+            strategy=request.args.get('strategy'),
+            since=request.args.get('since'),
+            until=request.args.get('until'),
+            days=int(days) if days else None,
+            order_by=order_by,
+            limit=max(1, min(int(request.args.get('limit', 50)), 500)),
+            offset=max(0, int(request.args.get('offset', 0)))
+        )
+        
+        return jsonify({
+            'success': True,
+            'count': len(results),
+            'results': results
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'error': 'Erro ao consultar histórico de backtests',
+            'message': str(e)
+        }), 500
+
+
+@app.route('/api/backtest/results/<int:result_id>', methods=['GET'])
+def get_backtest_result(result_id):
+    """
+    Resultado salvo com a curva de capital (carregada sob demanda).
+    """
+    try:
+        result = backtester.store.get(result_id, include_curve=True)
+        
+        if result is None:
+            return jsonify({
+                'error': 'Resultado não encontrado'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'backtest': result
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'error': 'Erro ao carregar resultado de backtest',
+            'message': str(e)
+        }), 500
+
+
 @app.route('/api/performance/evaluate-predictor', methods=['POST'])
 def evaluate_price_predictor_performance():
     """
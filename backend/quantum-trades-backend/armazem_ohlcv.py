@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+"""
+Armazém Local de Candles OHLCV
+Magnus Wealth v9.1.0
+
+Guarda os candles do Yahoo Finance em disco, em formato colunar (Parquet),
+com uma partição por (símbolo, intervalo). Cada execução baixa apenas os
+candles posteriores ao último armazenado (append_new_bars) e os scripts de
+indicadores, otimização e backtesting leem do armazém em vez da rede.
+
+Estrutura:
+    dados_mercado/<intervalo>/<símbolo>.parquet
+
+Apenas 15m e 1h são baixados. Os demais timeframes são montados localmente
+por reamostragem (15m -> 30m, 1h -> 6h/8h/12h/1d), alinhados à meia-noite
+UTC como os candles diários de cripto do Yahoo.
+
+Sem pyarrow instalado, as partições são gravadas em pickle do pandas.
+
+Os downloads passam por um limitador token bucket compartilhado e cada
+partição tem um lock, então várias threads podem pedir timeframes do mesmo
+símbolo e apenas uma baixa os candles novos.
+"""
+
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+import yfinance as yf
+
+try:
+    import pyarrow  # noqa: F401
+    FORMATO = 'parquet'
+except ImportError:
+    FORMATO = 'pickle'
+
+# Diretório das partições
+ARMAZEM_DIR = 'dados_mercado'
+
+COLUNAS = ['open', 'high', 'low', 'close', 'volume']
+
+# Histórico máximo que o Yahoo Finance serve por intervalo intradiário
+LIMITE_YAHOO = {
+    '1m': '7d',
+    '2m': '60d',
+    '5m': '60d',
+    '15m': '60d',
+    '30m': '60d',
+    '60m': '730d',
+    '90m': '60d',
+    '1h': '730d'
+}
+
+# Timeframes montados a partir de um intervalo baixado
+DERIVADOS = {
+    '30m': '15m',
+    '6h': '1h',
+    '8h': '1h',
+    '12h': '1h',
+    '1d': '1h'
+}
+
+# Regras de reamostragem do pandas por timeframe
+REGRAS = {
+    '15m': '15min',
+    '30m': '30min',
+    '1h': '1h',
+    '6h': '6h',
+    '8h': '8h',
+    '12h': '12h',
+    '1d': '24h'
+}
+
+AGREGACAO = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+
+# Segundos em que uma partição recém-atualizada não é baixada de novo
+# (vários timeframes derivados compartilham o mesmo intervalo base)
+VALIDADE_ATUALIZACAO = 60
+
+# Limite de requisições ao Yahoo Finance (média por segundo e rajada máxima)
+REQUISICOES_POR_SEGUNDO = float(os.getenv('YAHOO_REQUISICOES_POR_SEGUNDO', '2'))
+RAJADA_REQUISICOES = int(os.getenv('YAHOO_RAJADA', '4'))
+
+
+class LimitadorTaxa:
+    """
+    Limitador token bucket seguro entre threads
+
+    O balde começa cheio com `capacidade` fichas e é reabastecido a `taxa`
+    fichas por segundo. Cada requisição consome uma ficha e espera quando o
+    balde está vazio, permitindo rajadas curtas sem passar da taxa média.
+    """
+
+    def __init__(self, taxa: float, capacidade: int = 1,
+                 relogio: Callable[[], float] = time.monotonic,
+                 dormir: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            taxa: Fichas por segundo
+            capacidade: Tamanho máximo da rajada
+            relogio: Fonte de tempo monotônica (substituível em testes)
+            dormir: Função de espera (substituível em testes)
+        """
+        if taxa <= 0 or capacidade < 1:
+            raise ValueError("Taxa deve ser positiva e capacidade ao menos 1")
+
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self._relogio = relogio
+        self._dormir = dormir
+        self._fichas = float(capacidade)
+        self._ultimo = relogio()
+        self._lock = threading.Lock()
+
+    def aguardar(self) -> float:
+        """
+        Consome uma ficha, esperando o reabastecimento se necessário
+
+        Returns:
+            Segundos esperados
+        """
+        with self._lock:
+            agora = self._relogio()
+            self._fichas = min(self.capacidade, self._fichas + (agora - self._ultimo) * self.taxa)
+            self._ultimo = agora
+
+            # Reserva a ficha já; quem chegar depois espera a vez na fila
+            self._fichas -= 1
+            espera = -self._fichas / self.taxa if self._fichas < 0 else 0.0
+
+        if espera > 0:
+            self._dormir(espera)
+        return espera
+
+
+def periodo_para_timedelta(period: str) -> Optional[pd.Timedelta]:
+    """
+    Converte um período do Yahoo ('7d', '1mo', '2y', 'max') em Timedelta
+
+    Returns:
+        Timedelta correspondente, ou None para 'max'
+    """
+    if period is None or period == 'max':
+        return None
+
+    m = re.fullmatch(r'(\d+)(d|wk|mo|y)', period)
+    if not m:
+        raise ValueError(f"Período não suportado: {period}")
+
+    valor, unidade = int(m.group(1)), m.group(2)
+    dias = {'d': 1, 'wk': 7, 'mo': 30, 'y': 365}[unidade]
+    return pd.Timedelta(days=valor * dias)
+
+
+def buscar_yahoo(symbol: str, interval: str, period: Optional[str] = None,
+                 start: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Baixa candles do Yahoo Finance no formato do armazém
+
+    Args:
+        symbol: Símbolo no Yahoo Finance
+        interval: Intervalo ('15m', '1h', '1d', ...)
+        period: Período a baixar (ignorado se `start` for informado)
+        start: Baixa apenas a partir desta data
+
+    Returns:
+        DataFrame com colunas open, high, low, close e volume (pode ser vazio)
+    """
+    ticker = yf.Ticker(symbol)
+    if start is not None:
+        df = ticker.history(interval=interval, start=start)
+    else:
+        df = ticker.history(interval=interval, period=period)
+
+    if df.empty:
+        return pd.DataFrame(columns=COLUNAS)
+
+    df.columns = [c.lower() for c in df.columns]
+    return df[COLUNAS]
+
+
+def reamostrar_ohlcv(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """
+    Agrega candles em um timeframe maior
+
+    Open do primeiro candle, high máximo, low mínimo, close do último e
+    volume somado. Os candles são alinhados em UTC a partir da meia-noite
+    (6h/8h/12h/1d começam às 00:00 UTC) e rotulados pela abertura. O
+    primeiro candle é descartado se os dados começarem no meio dele; o
+    último pode estar em formação, como no Yahoo.
+
+    Args:
+        df: DataFrame OHLCV indexado por data
+        timeframe: Timeframe de destino (chave de REGRAS)
+
+    Returns:
+        DataFrame OHLCV no novo timeframe, indexado em UTC
+    """
+    if len(df) == 0:
+        return pd.DataFrame(columns=COLUNAS)
+
+    regra = REGRAS[timeframe]
+    df = df[COLUNAS]
+    if df.index.tz is None:
+        df = df.tz_localize('UTC')
+    else:
+        df = df.tz_convert('UTC')
+
+    agregado = df.resample(regra, origin='epoch', label='left', closed='left').agg(AGREGACAO)
+    # Janelas sem nenhum candle (fins de semana, falhas do Yahoo)
+    agregado = agregado[agregado['open'].notna()]
+
+    if len(agregado) > 0 and df.index[0] > agregado.index[0]:
+        agregado = agregado.iloc[1:]
+
+    agregado.index.name = 'timestamp'
+    return agregado
+
+
+def _recortar(df: pd.DataFrame, period: Optional[str], start: Optional[datetime],
+              end: Optional[datetime]) -> Optional[pd.DataFrame]:
+    """Recorta candles por período ou datas, como ticker.history()"""
+    tz = df.index.tz
+
+    def no_fuso(data):
+        data = pd.Timestamp(data)
+        if tz is not None and data.tz is None:
+            return data.tz_localize(tz)
+        if tz is None and data.tz is not None:
+            return data.tz_localize(None)
+        return data
+
+    if start is not None:
+        df = df[df.index >= no_fuso(start)]
+    elif period is not None:
+        janela = periodo_para_timedelta(period)
+        if janela is not None:
+            df = df[df.index >= pd.Timestamp.now(tz=tz) - janela]
+
+    if end is not None:
+        df = df[df.index < no_fuso(end)]
+
+    if len(df) == 0:
+        return None
+
+    return df.copy()
+
+
+class ArmazemOHLCV:
+    """
+    Armazém de candles com uma partição por (símbolo, intervalo)
+    """
+
+    def __init__(self, diretorio: str = ARMAZEM_DIR,
+                 buscar: Callable[..., pd.DataFrame] = buscar_yahoo,
+                 limitador: Optional[LimitadorTaxa] = None):
+        """
+        Args:
+            diretorio: Diretório raiz das partições
+            buscar: Função de download com a assinatura de buscar_yahoo
+            limitador: Limitador de requisições aplicado a cada download
+        """
+        self.diretorio = diretorio
+        self.buscar = buscar
+        self.limitador = limitador
+        # Partições já lidas nesta execução
+        self._cache: Dict[tuple, pd.DataFrame] = {}
+        # Momento da última atualização de cada partição
+        self._atualizado_em: Dict[tuple, float] = {}
+        # Um lock por partição para atualizações concorrentes
+        self._locks: Dict[tuple, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def _lock(self, symbol: str, interval: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault((symbol, interval), threading.Lock())
+
+    def _arquivo(self, symbol: str, interval: str) -> str:
+        extensao = 'parquet' if FORMATO == 'parquet' else 'pkl'
+        nome = symbol.replace('/', '_').replace('^', '_')
+        return os.path.join(self.diretorio, interval, f"{nome}.{extensao}")
+
+    def carregar(self, symbol: str, interval: str) -> pd.DataFrame:
+        """
+        Lê a partição do disco, sem acessar a rede
+
+        Returns:
+            DataFrame indexado por data (vazio se ainda não houver dados)
+        """
+        chave = (symbol, interval)
+        if chave in self._cache:
+            return self._cache[chave]
+
+        arquivo = self._arquivo(symbol, interval)
+        if not os.path.exists(arquivo):
+            return pd.DataFrame(columns=COLUNAS)
+
+        try:
+            if FORMATO == 'parquet':
+                df = pd.read_parquet(arquivo)
+            else:
+                df = pd.read_pickle(arquivo)
+        except Exception as e:
+            print(f"   ⚠️ Partição inválida {arquivo}: {e}")
+            return pd.DataFrame(columns=COLUNAS)
+
+        self._cache[chave] = df
+        return df
+
+    def _salvar(self, symbol: str, interval: str, df: pd.DataFrame):
+        """Grava a partição de forma atômica"""
+        arquivo = self._arquivo(symbol, interval)
+        os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+
+        temporario = arquivo + '.tmp'
+        if FORMATO == 'parquet':
+            df.to_parquet(temporario)
+        else:
+            df.to_pickle(temporario)
+        os.replace(temporario, arquivo)
+
+        self._cache[(symbol, interval)] = df
+
+    def append_new_bars(self, symbol: str, interval: str) -> int:
+        """
+        Baixa e armazena os candles posteriores ao último armazenado
+
+        O último candle armazenado é baixado de novo, pois podia estar em
+        formação quando foi salvo. Na primeira execução baixa o máximo que o
+        Yahoo serve para o intervalo. Erros de rede são reportados e o
+        armazém continua com os dados que já tinha.
+
+        Args:
+            symbol: Símbolo no Yahoo Finance
+            interval: Intervalo ('15m', '1h', '1d', ...)
+
+        Returns:
+            Quantidade de candles novos
+        """
+        with self._lock(symbol, interval):
+            return self._append_new_bars(symbol, interval)
+
+    def _append_new_bars(self, symbol: str, interval: str) -> int:
+        """append_new_bars com o lock da partição já adquirido"""
+        armazenado = self.carregar(symbol, interval)
+        limite = LIMITE_YAHOO.get(interval, 'max')
+        self._atualizado_em[(symbol, interval)] = time.time()
+
+        try:
+            if self.limitador is not None:
+                self.limitador.aguardar()
+            if len(armazenado) == 0:
+                novos = self.buscar(symbol, interval, period=limite)
+            else:
+                ultimo = armazenado.index[-1]
+                janela = periodo_para_timedelta(limite)
+                agora = pd.Timestamp.now(tz=ultimo.tz)
+
+                if janela is not None and agora - ultimo >= janela:
+                    # Fora do alcance do Yahoo: baixa o que houver (fica um buraco)
+                    novos = self.buscar(symbol, interval, period=limite)
+                else:
+                    novos = self.buscar(symbol, interval, start=ultimo.to_pydatetime())
+        except Exception as e:
+            print(f"   ⚠️ Erro ao atualizar {symbol} ({interval}): {e}")
+            return 0
+
+        if novos is None or len(novos) == 0:
+            return 0
+
+        novos = novos[COLUNAS].astype(float)
+        if len(armazenado) == 0:
+            combinado = novos
+            quantidade = len(novos)
+        else:
+            if armazenado.index.tz is not None and novos.index.tz is not None:
+                novos.index = novos.index.tz_convert(armazenado.index.tz)
+            quantidade = int((novos.index > armazenado.index[-1]).sum())
+            combinado = pd.concat([armazenado[~armazenado.index.isin(novos.index)], novos])
+
+        combinado = combinado[~combinado.index.duplicated(keep='last')].sort_index()
+        combinado.index.name = 'timestamp'
+        self._salvar(symbol, interval, combinado)
+
+        return quantidade
+
+    def obter(self, symbol: str, interval: str = '1d', period: Optional[str] = None,
+              start: Optional[datetime] = None, end: Optional[datetime] = None,
+              atualizar: bool = True) -> Optional[pd.DataFrame]:
+        """
+        Retorna candles do armazém, equivalente a ticker.history()
+
+        Args:
+            symbol: Símbolo no Yahoo Finance
+            interval: Intervalo ('15m', '1h', '1d', ...)
+            period: Janela até agora ('7d', '1y', 'max'); ignorado com `start`
+            start: Data inicial (inclusiva)
+            end: Data final (exclusiva, como no Yahoo)
+            atualizar: Se True, chama append_new_bars antes de ler (no máximo
+                uma vez a cada VALIDADE_ATUALIZACAO segundos por partição)
+
+        Returns:
+            Cópia dos candles com colunas minúsculas, ou None se não houver dados
+        """
+        if atualizar:
+            self._atualizar_se_antigo(symbol, interval)
+
+        df = self.carregar(symbol, interval)
+        if len(df) == 0:
+            return None
+
+        return _recortar(df, period, start, end)
+
+    def _atualizar_se_antigo(self, symbol: str, interval: str):
+        """Chama append_new_bars, exceto se a partição acabou de ser atualizada"""
+        with self._lock(symbol, interval):
+            ultima = self._atualizado_em.get((symbol, interval))
+            if ultima is None or time.time() - ultima >= VALIDADE_ATUALIZACAO:
+                self._append_new_bars(symbol, interval)
+
+    def obter_timeframe(self, symbol: str, timeframe: str, period: Optional[str] = None,
+                        start: Optional[datetime] = None, end: Optional[datetime] = None,
+                        atualizar: bool = True) -> Optional[pd.DataFrame]:
+        """
+        Retorna candles de qualquer timeframe, montando localmente os derivados
+
+        15m e 1h vêm direto do armazém. 30m é reamostrado do 15m e
+        6h/8h/12h/1d do 1h. No 1d, os dias anteriores ao histórico de 1h
+        vêm da partição 1d já armazenada (sem acessar a rede).
+
+        Args:
+            symbol: Símbolo no Yahoo Finance
+            timeframe: '15m', '30m', '1h', '6h', '8h', '12h' ou '1d'
+            period, start, end, atualizar: Como em obter()
+
+        Returns:
+            Cópia dos candles, ou None se não houver dados
+        """
+        base = DERIVADOS.get(timeframe)
+        if base is None:
+            return self.obter(symbol, timeframe, period=period, start=start,
+                              end=end, atualizar=atualizar)
+
+        if atualizar:
+            self._atualizar_se_antigo(symbol, base)
+
+        df = reamostrar_ohlcv(self.carregar(symbol, base), timeframe)
+
+        if timeframe == '1d':
+            diario = self.carregar(symbol, '1d')
+            if len(diario) > 0:
+                diario = diario[COLUNAS].tz_convert('UTC') if diario.index.tz is not None \
+                    else diario[COLUNAS].tz_localize('UTC')
+                if len(df) > 0:
+                    diario = diario[diario.index < df.index[0]]
+                df = pd.concat([diario, df])
+                df.index.name = 'timestamp'
+
+        if len(df) == 0:
+            return None
+
+        return _recortar(df, period, start, end)
+
+
+_armazem_padrao: Optional[ArmazemOHLCV] = None
+
+
+def obter_armazem() -> ArmazemOHLCV:
+    """Armazém compartilhado pelos scripts do processo"""
+    global _armazem_padrao
+    if _armazem_padrao is None:
+        _armazem_padrao = ArmazemOHLCV(
+            limitador=LimitadorTaxa(REQUISICOES_POR_SEGUNDO, RAJADA_REQUISICOES)
+        )
+    return _armazem_padrao
+
+
+def obter_historico(symbol: str, interval: str = '1d', period: Optional[str] = None,
+                    start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    atualizar: bool = True) -> Optional[pd.DataFrame]:
+    """Atalho para obter_armazem().obter(...)"""
+    return obter_armazem().obter(symbol, interval, period=period, start=start,
+                                 end=end, atualizar=atualizar)
+
+
+def obter_timeframe(symbol: str, timeframe: str, period: Optional[str] = None,
+                    start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    atualizar: bool = True) -> Optional[pd.DataFrame]:
+    """Atalho para obter_armazem().obter_timeframe(...)"""
+    return obter_armazem().obter_timeframe(symbol, timeframe, period=period, start=start,
+                                           end=end, atualizar=atualizar)
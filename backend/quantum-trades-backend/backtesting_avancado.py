@@ -1,15 +1,98 @@
 """
 Backtesting Avançado - Magnus Wealth v8.4.0
 Walk-forward optimization e simulação de estratégias alternativas
+
+O walk-forward calcula a matriz de tendência (períodos x candles) uma única
+vez sobre todo o histórico e recorta dela as janelas de treino e teste; as
+métricas de todos os períodos de uma janela saem de um único cálculo
+vetorizado e as janelas rodam em paralelo.
 """
 
-import yfinance as yf
+import os
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from indicador_chilo import calcular_chilo_tendencia, calcular_tendencia_arrays, calcular_tendencia_matriz
+from metricas_chilo import calcular_metricas_tendencia
+from armazem_ohlcv import obter_historico
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import json
 
+# Esquemas de janelas do walk-forward
+# - rolling: treino de tamanho fixo que avança `testing_days` por janela
+# - anchored: treino sempre a partir do início do histórico (cresce)
+# - purged: rolling com um intervalo descartado entre treino e teste
+ESQUEMAS_WALK_FORWARD = ('rolling', 'anchored', 'purged')
+
+# Threads para avaliar as janelas
+WORKERS_WALK_FORWARD = int(os.getenv('WALK_FORWARD_WORKERS', str(os.cpu_count() or 1)))
+
+
+def linha_metricas(metricas: Dict[str, np.ndarray], linha: int) -> Dict:
+    """Métricas de um período no formato de backtest_simples (percentuais)"""
+    return {
+        'retorno_bruto': float(metricas['retorno_bruto'][linha] * 100),
+        'retorno_liquido': float(metricas['retorno_liquido'][linha] * 100),
+        'num_trades': int(metricas['num_trades'][linha]),
+        'custo_total': float(metricas['custo_total'][linha] * 100),
+        'max_drawdown': float(metricas['max_drawdown'][linha] * 100),
+        'sharpe': float(metricas['sharpe'][linha]),
+        'win_rate': float(metricas['win_rate'][linha] * 100),
+        'volatilidade': float(metricas['volatilidade'][linha] * 100)
+    }
+
+
+def score_walk_forward(metricas: Dict[str, np.ndarray]) -> np.ndarray:
+    """Score de otimização: retorno líquido / |max drawdown| (retorno se drawdown 0)"""
+    retorno = metricas['retorno_liquido'] * 100
+    drawdown = metricas['max_drawdown'] * 100
+    with np.errstate(divide='ignore', invalid='ignore'):
+        score = np.where(drawdown != 0, retorno / np.abs(drawdown), retorno)
+    return np.where(np.isnan(score), -np.inf, score)
+
+
+def gerar_janelas(n: int, training_days: int, testing_days: int, esquema: str = 'rolling',
+                  num_windows: Optional[int] = None, purga: int = 0) -> List[Tuple[int, int, int, int]]:
+    """
+    Índices (treino_inicio, treino_fim, teste_inicio, teste_fim) das janelas
+
+    As janelas de teste são consecutivas e avançam `testing_days` candles;
+    fins são exclusivos. Janelas que não cabem em `n` candles são omitidas.
+
+    Args:
+        n: Candles do histórico
+        training_days: Candles de treino (tamanho inicial no anchored)
+        testing_days: Candles de teste
+        esquema: 'rolling', 'anchored' ou 'purged'
+        num_windows: Máximo de janelas (None: todas que couberem)
+        purga: Candles descartados entre treino e teste (esquema purged)
+
+    Raises:
+        ValueError: Esquema inválido ou janelas vazias
+    """
+    if esquema not in ESQUEMAS_WALK_FORWARD:
+        raise ValueError(f"Esquema inválido: {esquema} (use {', '.join(ESQUEMAS_WALK_FORWARD)})")
+    if training_days < 1 or testing_days < 1:
+        raise ValueError("Treino e teste precisam de ao menos 1 candle")
+
+    intervalo = purga if esquema == 'purged' else 0
+    janelas = []
+    i = 0
+    while num_windows is None or i < num_windows:
+        train_start = 0 if esquema == 'anchored' else i * testing_days
+        train_end = i * testing_days + training_days
+        test_start = train_end + intervalo
+        test_end = test_start + testing_days
+
+        if test_end > n:
+            break
+
+        janelas.append((train_start, train_end, test_start, test_end))
+        i += 1
+
+    return janelas
+
 class BacktestingAvancado:
     """
     Sistema de backtesting com walk-forward optimization
@@ -20,150 +103,122 @@ class BacktestingAvancado:
     
     def calcular_chilo(self, df: pd.DataFrame, period: int) -> pd.DataFrame:
         """Calcula CHiLo"""
-        df['hilo_high'] = df['high'].rolling(window=period).mean()
-        df['hilo_low'] = df['low'].rolling(window=period).mean()
-        
-        df['trend'] = 0
-        for i in range(period, len(df)):
-            if df['close'].iloc[i] > df['hilo_high'].iloc[i]:
-                df.loc[df.index[i], 'trend'] = 1
-            elif df['close'].iloc[i] < df['hilo_low'].iloc[i]:
-                df.loc[df.index[i], 'trend'] = -1
-            else:
-                df.loc[df.index[i], 'trend'] = df['trend'].iloc[i-1]
-        
-        return df
+        return calcular_chilo_tendencia(df, period)
     
     def backtest_simples(self, df: pd.DataFrame, period: int) -> Dict:
         """
         Backtest simples de um período
+        
+        O CHiLo é calculado só com os candles de `df` e os `period` primeiros
+        (aquecimento) ficam de fora das métricas.
         """
-        df = df.copy()
-        df = self.calcular_chilo(df, period)
-        df = df.iloc[period:].copy()
-        
-        # Calcular retornos
-        df['returns'] = df['close'].pct_change()
-        df['strategy_returns'] = df['returns'] * df['trend'].shift(1)
-        
-        # Contar trades
-        df['signal_change'] = df['trend'].diff()
-        num_trades = (df['signal_change'] != 0).sum()
-        
-        # Calcular métricas
-        retorno_total = (1 + df['strategy_returns']).prod() - 1
-        custo_total = num_trades * self.TAXA_TAKER
-        retorno_liquido = retorno_total - custo_total
-        
-        # Drawdown
-        cumulative = (1 + df['strategy_returns']).cumprod()
-        running_max = cumulative.cummax()
-        drawdown = (cumulative / running_max) - 1
-        max_drawdown = drawdown.min()
-        
-        # Sharpe
-        volatilidade = df['strategy_returns'].std() * np.sqrt(252)
-        sharpe = (retorno_liquido * (252/len(df))) / volatilidade if volatilidade > 0 else 0
-        
-        # Win rate
-        trades_df = df[df['signal_change'] != 0].copy()
-        if len(trades_df) > 0:
-            trades_df['price_entry'] = trades_df['close']
-            trades_df['price_exit'] = trades_df['close'].shift(-1)
-            trades_df['trade_return'] = (trades_df['price_exit'] - trades_df['price_entry']) / trades_df['price_entry']
-            trades_df['win'] = trades_df['trade_return'] > 0
-            win_rate = trades_df['win'].sum() / len(trades_df) * 100
-        else:
-            win_rate = 0
+        _, _, trend = calcular_tendencia_arrays(df['high'], df['low'], df['close'], period)
+        close = df['close'].to_numpy(dtype=float)[period:]
+        metricas = calcular_metricas_tendencia(close, trend[period:], self.TAXA_TAKER)
+        return linha_metricas(metricas, 0)
+    
+    def _avaliar_janela(self, close: np.ndarray, tendencias: np.ndarray, periodos: List[int],
+                        janela: Tuple[int, int, int, int]) -> Optional[Dict]:
+        """
+        Otimiza o período no treino e avalia o escolhido no teste
+        
+        As métricas de todos os períodos do treino saem de um único cálculo
+        sobre o recorte da matriz de tendência.
+        """
+        train_start, train_end, test_start, test_end = janela
+        
+        metricas_train = calcular_metricas_tendencia(
+            close[train_start:train_end], tendencias[:, train_start:train_end], self.TAXA_TAKER
+        )
+        scores = score_walk_forward(metricas_train)
+        if not np.isfinite(scores).any():
+            return None
+        
+        # Primeiro período com o maior score
+        melhor = int(np.argmax(scores))
+        metricas_test = calcular_metricas_tendencia(
+            close[test_start:test_end], tendencias[melhor, test_start:test_end], self.TAXA_TAKER
+        )
         
         return {
-            'retorno_bruto': retorno_total * 100,
-            'retorno_liquido': retorno_liquido * 100,
-            'num_trades': num_trades,
-            'custo_total': custo_total * 100,
-            'max_drawdown': max_drawdown * 100,
-            'sharpe': sharpe,
-            'win_rate': win_rate,
-            'volatilidade': volatilidade * 100
+            'periodo_otimo': periodos[melhor],
+            'score_train': float(scores[melhor]),
+            'resultado_train': linha_metricas(metricas_train, melhor),
+            'resultado_test': linha_metricas(metricas_test, 0)
         }
     
-    def walk_forward_optimization(self, yahoo_symbol: str, periodos: List[int], 
-                                  training_days: int = 180, testing_days: int = 90,
-                                  num_windows: int = 4) -> Dict:
+    def walk_forward_historico(self, df: pd.DataFrame, periodos: List[int],
+                               training_days: int = 180, testing_days: int = 90,
+                               num_windows: Optional[int] = 4, esquema: str = 'rolling',
+                               purga: Optional[int] = None, workers: Optional[int] = None,
+                               yahoo_symbol: str = '') -> Optional[Dict]:
         """
-        Walk-forward optimization
-        
-        Divide dados em múltiplas janelas:
-        - Treina em N dias
-        - Testa nos próximos M dias
-        - Repete processo avançando no tempo
+        Walk-forward optimization sobre um histórico já carregado
+        
+        A tendência de todos os períodos é calculada uma vez sobre o histórico
+        inteiro; cada janela recorta seu treino e teste dessa matriz (a
+        tendência de um candle só usa candles anteriores, então o histórico
+        antes da janela serve de aquecimento sem olhar o futuro).
+        
+        Args:
+            df: Candles com colunas high, low e close
+            periodos: Períodos candidatos
+            training_days: Candles de treino
+            testing_days: Candles de teste
+            num_windows: Máximo de janelas (None: todas que couberem)
+            esquema: 'rolling', 'anchored' ou 'purged'
+            purga: Candles entre treino e teste no esquema purged (padrão: o
+                maior período, para o teste não reutilizar candles do treino)
+            workers: Threads para as janelas (padrão WORKERS_WALK_FORWARD)
+            yahoo_symbol: Símbolo informado no resultado
+        
+        Returns:
+            Resultado consolidado, ou None se nenhuma janela couber
+        
+        Raises:
+            ValueError: Esquema inválido ou janelas vazias
         """
+        if purga is None:
+            purga = max(periodos)
+        janelas = gerar_janelas(len(df), training_days, testing_days, esquema, num_windows, purga)
+        
         print(f"\n🔄 Walk-Forward Optimization: {yahoo_symbol}")
-        print(f"   Janelas: {num_windows}")
+        print(f"   Janelas: {len(janelas)} ({esquema})")
         print(f"   Treino: {training_days} dias | Teste: {testing_days} dias")
         
-        # Buscar dados
-        total_days = (training_days + testing_days) * num_windows + 100
-        ticker = yf.Ticker(yahoo_symbol)
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=total_days)
-        df = ticker.history(start=start_date, end=end_date)
-        
-        if df.empty:
+        if not janelas:
             return None
         
-        df.columns = df.columns.str.lower()
-        df = df[['open', 'high', 'low', 'close', 'volume']].copy()
-        df = df.dropna()
+        close = df['close'].to_numpy(dtype=float)
+        tendencias = calcular_tendencia_matriz(df['high'], df['low'], close, periodos)
         
-        resultados_windows = []
+        workers = WORKERS_WALK_FORWARD if workers is None else workers
+        if workers <= 1 or len(janelas) <= 1:
+            avaliadas = [self._avaliar_janela(close, tendencias, periodos, janela) for janela in janelas]
+        else:
+            with ThreadPoolExecutor(max_workers=min(workers, len(janelas))) as pool:
+                avaliadas = list(pool.map(lambda janela: self._avaliar_janela(close, tendencias, periodos, janela),
+                                          janelas))
         
-        # Para cada janela
-        for i in range(num_windows):
-            # Definir período de treino e teste
-            train_start = i * testing_days
-            train_end = train_start + training_days
-            test_start = train_end
-            test_end = test_start + testing_days
-            
-            if test_end > len(df):
-                break
-            
-            df_train = df.iloc[train_start:train_end].copy()
-            df_test = df.iloc[test_start:test_end].copy()
-            
-            print(f"\n   Janela {i+1}/{num_windows}:")
-            print(f"      Treino: {len(df_train)} dias")
-            print(f"      Teste: {len(df_test)} dias")
-            
-            # Otimizar no período de treino
-            melhor_periodo = None
-            melhor_score = -999999
-            
-            for periodo in periodos:
-                resultado_train = self.backtest_simples(df_train, periodo)
-                if resultado_train:
-                    # Score = Retorno líquido / Max Drawdown
-                    score = resultado_train['retorno_liquido'] / abs(resultado_train['max_drawdown']) if resultado_train['max_drawdown'] != 0 else resultado_train['retorno_liquido']
-                    
-                    if score > melhor_score:
-                        melhor_score = score
-                        melhor_periodo = periodo
-            
-            print(f"      Melhor período (treino): {melhor_periodo}")
+        datas = df.index
+        resultados_windows = []
+        for i, (janela, avaliada) in enumerate(zip(janelas, avaliadas)):
+            if avaliada is None:
+                continue
             
-            # Testar no período de teste
-            resultado_test = self.backtest_simples(df_test, melhor_periodo)
+            train_start, train_end, test_start, test_end = janela
+            print(f"\n   Janela {i+1}/{len(janelas)}:")
+            print(f"      Melhor período (treino): {avaliada['periodo_otimo']}")
+            print(f"      Retorno teste: {avaliada['resultado_test']['retorno_liquido']:+.2f}%")
             
-            if resultado_test:
-                print(f"      Retorno teste: {resultado_test['retorno_liquido']:+.2f}%")
-                
-                resultados_windows.append({
-                    'janela': i + 1,
-                    'periodo_otimo': melhor_periodo,
-                    'resultado_train': self.backtest_simples(df_train, melhor_periodo),
-                    'resultado_test': resultado_test
-                })
+            resultados_windows.append({
+                'janela': i + 1,
+                'treino': {'inicio': str(datas[train_start]), 'fim': str(datas[train_end - 1]),
+                           'dias': train_end - train_start},
+                'teste': {'inicio': str(datas[test_start]), 'fim': str(datas[test_end - 1]),
+                          'dias': test_end - test_start},
+                **avaliada
+            })
         
         # Consolidar resultados
         if not resultados_windows:
@@ -184,6 +239,8 @@ class BacktestingAvancado:
         
         return {
             'yahoo_symbol': yahoo_symbol,
+            'esquema': esquema,
+            'purga': purga if esquema == 'purged' else 0,
             'num_windows': len(resultados_windows),
             'resultados_windows': resultados_windows,
             'retorno_medio_test': retorno_medio,
@@ -193,6 +250,37 @@ class BacktestingAvancado:
             'periodos_escolhidos': periodos_escolhidos
         }
     
+    def walk_forward_optimization(self, yahoo_symbol: str, periodos: List[int], 
+                                  training_days: int = 180, testing_days: int = 90,
+                                  num_windows: int = 4, esquema: str = 'rolling',
+                                  purga: Optional[int] = None, workers: Optional[int] = None) -> Dict:
+        """
+        Walk-forward optimization
+        
+        Divide dados em múltiplas janelas:
+        - Treina em N dias
+        - Testa nos próximos M dias
+        - Repete processo avançando no tempo
+        
+        Os candles diários vêm do armazém local; ver walk_forward_historico.
+        """
+        # Buscar dados
+        total_days = (training_days + testing_days) * num_windows + 100
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=total_days)
+        df = obter_historico(yahoo_symbol, '1d', start=start_date, end=end_date)
+        
+        if df is None or df.empty:
+            return None
+        
+        df.columns = df.columns.str.lower()
+        df = df[['open', 'high', 'low', 'close', 'volume']].copy()
+        df = df.dropna()
+        
+        return self.walk_forward_historico(df, periodos, training_days, testing_days, num_windows,
+                                           esquema=esquema, purga=purga, workers=workers,
+                                           yahoo_symbol=yahoo_symbol)
+    
     def comparar_estrategias(self, yahoo_symbol: str, days: int = 365) -> Dict:
         """
         Compara diferentes estratégias de trading
@@ -200,12 +288,11 @@ class BacktestingAvancado:
         print(f"\n📊 Comparando Estratégias: {yahoo_symbol}")
         
         # Buscar dados
-        ticker = yf.Ticker(yahoo_symbol)
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days+100)
-        df = ticker.history(start=start_date, end=end_date)
+        df = obter_historico(yahoo_symbol, '1d', start=start_date, end=end_date)
         
-        if df.empty:
+        if df is None or df.empty:
             return None
         
         df.columns = df.columns.str.lower()
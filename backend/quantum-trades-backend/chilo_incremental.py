@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+CHiLo Incremental para Monitores em Tempo Real
+Magnus Wealth v9.1.0
+
+Mantém o estado do CHiLo (Modo Activator, SMA) por (símbolo, timeframe,
+período) e o atualiza candle a candle em O(1): somas das janelas de highs
+e lows, último estado, linha HiLo e sequência de candles virados.
+
+O estado é salvo em disco (um JSON por chave) para que um reinício do
+monitor retome de onde parou, baixando apenas os candles novos.
+"""
+
+import json
+import math
+import os
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+# Diretório dos snapshots de estado
+ESTADO_DIR = 'estado_chilo'
+
+# A cada N candles as somas são recalculadas da janela para evitar
+# acúmulo de erro de arredondamento nas somas móveis
+RESSINCRONIZAR_A_CADA = 5000
+
+
+def _incluir(valor: float, soma: float, faltantes: int) -> Tuple[float, int]:
+    """Adiciona um valor à soma da janela (NaN só incrementa as falhas)"""
+    if math.isnan(valor):
+        return soma, faltantes + 1
+    return soma + valor, faltantes
+
+
+def _retirar(valor: float, soma: float, faltantes: int) -> Tuple[float, int]:
+    """Remove da soma da janela o valor que saiu"""
+    if math.isnan(valor):
+        return soma, faltantes - 1
+    return soma - valor, faltantes
+
+
+class ChiloIncremental:
+    """
+    Estado do CHiLo de um (símbolo, timeframe, período)
+
+    Reproduz calcular_chilo_arrays: o fechamento do candle i é comparado com
+    as médias dos `period` candles anteriores.
+    """
+
+    def __init__(self, symbol: str, timeframe: str, period: int):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.period = period
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Descarta todo o histórico acumulado"""
+        self.highs = deque(maxlen=self.period)
+        self.lows = deque(maxlen=self.period)
+        self.soma_high = 0.0
+        self.soma_low = 0.0
+        # Quantidade de highs/lows NaN dentro da janela
+        self.faltantes_high = 0
+        self.faltantes_low = 0
+
+        self.candles = 0
+        self.ultimo_timestamp: Optional[pd.Timestamp] = None
+        self.hilo = math.nan
+        self.hilo_state = math.nan
+        self.candles_virados = 0
+        self._sequencia = 0
+        self._desde_ressincronizacao = 0
+
+    # ------------------------------------------------------------------
+    # Cálculo
+    # ------------------------------------------------------------------
+
+    def _medias(self) -> Tuple[float, float]:
+        """Médias da janela atual (NaN se incompleta ou com falhas)"""
+        if len(self.highs) < self.period:
+            return math.nan, math.nan
+        hi = math.nan if self.faltantes_high else self.soma_high / self.period
+        lo = math.nan if self.faltantes_low else self.soma_low / self.period
+        return hi, lo
+
+    def _avaliar(self, close: float) -> Tuple[float, float, int]:
+        """Estado, linha HiLo e sequência do próximo candle, sem alterar o estado"""
+        if self.candles < self.period:
+            return math.nan, math.nan, 0
+
+        hi, lo = self._medias()
+
+        # Comparações com NaN são False -> NEUTRO
+        if close > hi:
+            estado, hilo = 1, lo
+        elif close < lo:
+            estado, hilo = -1, hi
+        else:
+            estado = 0
+            hilo = self.hilo if self.candles > self.period else lo
+
+        sequencia = self._sequencia + 1 if estado == self.hilo_state else 1
+        return estado, hilo, sequencia
+
+    def prever(self, close: float) -> Tuple[int, int]:
+        """
+        Estado de um candle ainda em formação, sem registrá-lo
+
+        Args:
+            close: Preço atual do candle em formação
+
+        Returns:
+            (estado, candles_virados); estado NaN vira 0
+        """
+        estado, _, sequencia = self._avaliar(close)
+        if estado != estado:  # NaN
+            return 0, 0
+        return int(estado), (sequencia if estado != 0 else 0)
+
+    def atualizar(self, timestamp, high: float, low: float, close: float) -> float:
+        """
+        Registra um candle fechado
+
+        Args:
+            timestamp: Abertura do candle
+            high, low, close: Preços do candle
+
+        Returns:
+            hilo_state do candle (NaN durante o aquecimento)
+        """
+        estado, hilo, sequencia = self._avaliar(close)
+
+        self.hilo = hilo
+        self.hilo_state = estado
+        self._sequencia = sequencia
+        self.candles_virados = sequencia if estado == estado and estado != 0 else 0
+
+        # Desloca a janela em O(1)
+        if len(self.highs) == self.period:
+            self.soma_high, self.faltantes_high = _retirar(self.highs[0], self.soma_high, self.faltantes_high)
+            self.soma_low, self.faltantes_low = _retirar(self.lows[0], self.soma_low, self.faltantes_low)
+
+        self.highs.append(float(high))
+        self.lows.append(float(low))
+        self.soma_high, self.faltantes_high = _incluir(float(high), self.soma_high, self.faltantes_high)
+        self.soma_low, self.faltantes_low = _incluir(float(low), self.soma_low, self.faltantes_low)
+
+        self._desde_ressincronizacao += 1
+        if self._desde_ressincronizacao >= RESSINCRONIZAR_A_CADA:
+            self._ressincronizar()
+
+        self.candles += 1
+        self.ultimo_timestamp = pd.Timestamp(timestamp)
+        return estado
+
+    def _ressincronizar(self):
+        """Recalcula as somas a partir da janela"""
+        self.soma_high = math.fsum(h for h in self.highs if not math.isnan(h))
+        self.soma_low = math.fsum(l for l in self.lows if not math.isnan(l))
+        self.faltantes_high = sum(1 for h in self.highs if math.isnan(h))
+        self.faltantes_low = sum(1 for l in self.lows if math.isnan(l))
+        self._desde_ressincronizacao = 0
+
+    def ingerir_df(self, df: pd.DataFrame) -> bool:
+        """
+        Registra os candles fechados de um DataFrame posteriores ao último visto
+
+        Args:
+            df: DataFrame com colunas high, low e close indexado por data
+
+        Returns:
+            False se houver um buraco entre o último candle registrado e os
+            novos dados (o chamador deve reconstruir a partir do histórico)
+        """
+        if self.ultimo_timestamp is not None and len(df) > 0:
+            # Os dados novos precisam começar no último candle já registrado
+            if df.index[0] > self.ultimo_timestamp:
+                return False
+            df = df[df.index > self.ultimo_timestamp]
+
+        for timestamp, high, low, close in zip(df.index, df['high'].to_numpy(),
+                                               df['low'].to_numpy(), df['close'].to_numpy()):
+            self.atualizar(timestamp, high, low, close)
+
+        return True
+
+    def processar_ao_vivo(self, df: pd.DataFrame) -> Optional[Tuple[int, int]]:
+        """
+        Registra os candles fechados e avalia o candle em formação
+
+        O último candle retornado pelo Yahoo ainda está aberto: ele é avaliado
+        com prever() mas não entra no estado persistido.
+
+        Args:
+            df: DataFrame com colunas high, low e close indexado por data
+
+        Returns:
+            (estado, candles_virados), ou None se houver buraco nos dados
+        """
+        # Os dados precisam começar no último candle já registrado
+        if self.ultimo_timestamp is not None and df.index[0] > self.ultimo_timestamp:
+            return None
+
+        self.ingerir_df(df.iloc[:-1])
+
+        # Nenhum candle novo em formação: vale o último estado registrado
+        if self.ultimo_timestamp is not None and df.index[-1] <= self.ultimo_timestamp:
+            if self.hilo_state != self.hilo_state:
+                return 0, 0
+            return int(self.hilo_state), self.candles_virados
+
+        return self.prever(float(df['close'].iloc[-1]))
+
+    # ------------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------------
+
+    def para_dict(self) -> Dict:
+        """Serializa o estado para JSON"""
+        def limpo(valor):
+            return None if valor != valor else valor
+
+        return {
+            'symbol': self.symbol,
+            'timeframe': self.timeframe,
+            'period': self.period,
+            'highs': [limpo(h) for h in self.highs],
+            'lows': [limpo(l) for l in self.lows],
+            'candles': self.candles,
+            'ultimo_timestamp': self.ultimo_timestamp.isoformat() if self.ultimo_timestamp is not None else None,
+            'hilo': limpo(self.hilo),
+            'hilo_state': limpo(self.hilo_state),
+            'sequencia': self._sequencia
+        }
+
+    @classmethod
+    def de_dict(cls, dados: Dict) -> 'ChiloIncremental':
+        """Restaura um estado salvo por para_dict"""
+        def valor(v):
+            return math.nan if v is None else v
+
+        chilo = cls(dados['symbol'], dados['timeframe'], dados['period'])
+        chilo.highs.extend(valor(h) for h in dados['highs'])
+        chilo.lows.extend(valor(l) for l in dados['lows'])
+        chilo._ressincronizar()
+
+        chilo.candles = dados['candles']
+        if dados['ultimo_timestamp']:
+            chilo.ultimo_timestamp = pd.Timestamp(dados['ultimo_timestamp'])
+        chilo.hilo = valor(dados['hilo'])
+        chilo.hilo_state = valor(dados['hilo_state'])
+        chilo._sequencia = dados['sequencia']
+        estado = chilo.hilo_state
+        chilo.candles_virados = chilo._sequencia if estado == estado and estado != 0 else 0
+        return chilo
+
+
+class GerenciadorChiloIncremental:
+    """
+    Coleção de estados CHiLo incrementais com snapshots em disco
+    """
+
+    def __init__(self, diretorio: str = ESTADO_DIR):
+        self.diretorio = diretorio
+        self.estados: Dict[Tuple[str, str, int], ChiloIncremental] = {}
+
+    def _arquivo(self, symbol: str, timeframe: str, period: int) -> str:
+        nome = f"{symbol}_{timeframe}_{period}.json".replace('/', '_')
+        return os.path.join(self.diretorio, nome)
+
+    def obter(self, symbol: str, timeframe: str, period: int) -> ChiloIncremental:
+        """
+        Retorna o estado da chave, carregando o snapshot do disco se existir
+        """
+        chave = (symbol, timeframe, period)
+        if chave in self.estados:
+            return self.estados[chave]
+
+        chilo = None
+        arquivo = self._arquivo(symbol, timeframe, period)
+        if os.path.exists(arquivo):
+            try:
+                with open(arquivo, 'r') as f:
+                    chilo = ChiloIncremental.de_dict(json.load(f))
+            except Exception as e:
+                print(f"⚠️ Snapshot inválido {arquivo}: {e}")
+
+        if chilo is None:
+            chilo = ChiloIncremental(symbol, timeframe, period)
+
+        self.estados[chave] = chilo
+        return chilo
+
+    def salvar(self, symbol: Optional[str] = None):
+        """
+        Salva o snapshot dos estados carregados
+
+        Args:
+            symbol: Se informado, salva apenas os estados desse símbolo
+        """
+        os.makedirs(self.diretorio, exist_ok=True)
+
+        for (simbolo, timeframe, period), chilo in self.estados.items():
+            if chilo.ultimo_timestamp is None or (symbol and simbolo != symbol):
+                continue
+
+            arquivo = self._arquivo(simbolo, timeframe, period)
+            temporario = arquivo + '.tmp'
+            with open(temporario, 'w') as f:
+                json.dump(chilo.para_dict(), f)
+            os.replace(temporario, arquivo)
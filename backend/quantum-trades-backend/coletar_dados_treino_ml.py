@@ -7,13 +7,15 @@ para criar dataset de treinamento do modelo de ML
 """
 
 import os
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import json
 from typing import Dict, List
 import time
+import indicador_chilo
+from armazem_ohlcv import obter_historico
+from metricas_chilo import calcular_metricas_vetor
 
 # Configuração das criptomoedas
 CRIPTOS = [
@@ -38,10 +40,9 @@ def buscar_dados_historicos(yahoo_symbol: str, years: int = 5) -> pd.DataFrame:
     Busca dados históricos do Yahoo Finance
     """
     try:
-        ticker = yf.Ticker(yahoo_symbol)
-        df = ticker.history(period=f'{years}y')
+        df = obter_historico(yahoo_symbol, '1d', period=f'{years}y')
         
-        if df.empty:
+        if df is None or df.empty:
             print(f"   ❌ Sem dados para {yahoo_symbol}")
             return None
         
@@ -57,78 +58,22 @@ def calcular_chilo(df: pd.DataFrame, period: int) -> pd.DataFrame:
     """
     Calcula o CHiLo (Custom HiLo) - Modo Activator
     """
-    df = df.copy()
-    
-    # Calcular médias móveis dos highs e lows
-    hima = df['high'].rolling(window=period).mean()
-    loma = df['low'].rolling(window=period).mean()
-    
-    # Inicializar série do HiLo
-    hilo = pd.Series(index=df.index, dtype=float)
-    hilo_state = pd.Series(index=df.index, dtype=int)
-    
-    # Calcular estado e linha HiLo
-    for i in range(period, len(df)):
-        close = df['close'].iloc[i]
-        hi = hima.iloc[i-1]
-        lo = loma.iloc[i-1]
-        
-        if close > hi:
-            state = 1  # BULLISH
-            hilo.iloc[i] = lo
-        elif close < lo:
-            state = -1  # BEARISH
-            hilo.iloc[i] = hi
-        else:
-            state = 0  # NEUTRO
-            hilo.iloc[i] = hilo.iloc[i-1] if i > period else lo
-        
-        hilo_state.iloc[i] = state
-    
-    df['hilo'] = hilo
-    df['hilo_state'] = hilo_state
-    
-    return df
+    return indicador_chilo.calcular_chilo(df.copy(), period)
 
 def calcular_score_periodo(df: pd.DataFrame, period: int) -> float:
     """
     Calcula score de um período específico
     """
-    df_teste = calcular_chilo(df.copy(), period)
-    df_teste = df_teste.dropna(subset=['hilo_state']).copy()
+    _, hilo_state = indicador_chilo.calcular_chilo_arrays(df['high'], df['low'], df['close'], period)
+    metricas = calcular_metricas_vetor(df['close'].to_numpy(), hilo_state)
     
-    if len(df_teste) < 10:
+    if metricas is None:
         return 0
     
-    # Calcular retornos
-    df_teste.loc[:, 'retorno_diario'] = df_teste['close'].pct_change()
-    df_teste.loc[:, 'sinal'] = df_teste['hilo_state'].shift(1)
-    df_teste.loc[:, 'estrategia_retorno'] = df_teste['sinal'] * df_teste['retorno_diario']
-    df_teste = df_teste.dropna(subset=['estrategia_retorno'])
-    
-    if len(df_teste) < 10:
-        return 0
-    
-    # Taxa de acerto
-    acertos = (df_teste['estrategia_retorno'] > 0).sum()
-    total = len(df_teste[df_teste['estrategia_retorno'] != 0])
-    taxa_acerto = (acertos / total * 100) if total > 0 else 0
-    
-    # Sharpe
-    retorno_medio = df_teste['estrategia_retorno'].mean()
-    std_retorno = df_teste['estrategia_retorno'].std()
-    sharpe = (retorno_medio / std_retorno * np.sqrt(252)) if std_retorno > 0 else 0
-    
-    # Retorno total
-    retorno_total = (1 + df_teste['estrategia_retorno']).prod() - 1
-    retorno_pct = retorno_total * 100
-    retorno_bh = (df_teste['close'].iloc[-1] / df_teste['close'].iloc[0] - 1) * 100
-    superacao = retorno_pct - retorno_bh
-    
     # Score ponderado
-    score_acerto = min(taxa_acerto / 70 * 100, 100)
-    score_sharpe = min(sharpe / 1.5 * 100, 100)
-    score_retorno = min(max(superacao / 20 * 100, 0), 100)
+    score_acerto = min(metricas['taxa_acerto'] / 70 * 100, 100)
+    score_sharpe = min(metricas['sharpe'] / 1.5 * 100, 100)
+    score_retorno = min(max(metricas['superacao_bh'] / 20 * 100, 0), 100)
     
     score = (score_acerto * 0.40 + score_sharpe * 0.30 + score_retorno * 0.30)
     
@@ -7,15 +7,20 @@ Coleta dados históricos de 8 anos em múltiplos timeframes para treinamento do
 """
 
 import os
-import yfinance as yf
+import sys
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import json
-from typing import Dict, List, Tuple
-import time
+from typing import Dict, List, Optional, Tuple
+import indicador_chilo
+from metricas_chilo import calcular_taxa_acerto_matriz
+from armazem_ohlcv import obter_armazem, obter_timeframe
 
 # Timeframes a serem analisados
+# Apenas 15m e 1h são baixados; 30m e 6h/8h/12h/1d são reamostrados
+# localmente pelo armazém (armazem_ohlcv.obter_timeframe)
 TIMEFRAMES = {
     '15m': '15m',
     '30m': '30m',
@@ -54,6 +59,10 @@ PERIODOS_TESTE = list(range(3, 71))  # 3 a 70
 DATA_DIR = 'ml_data_8anos'
 os.makedirs(DATA_DIR, exist_ok=True)
 
+# Pares (cripto, timeframe) coletados em paralelo. Os downloads passam pelo
+# limitador de requisições do armazém (YAHOO_REQUISICOES_POR_SEGUNDO)
+WORKERS_COLETA = int(os.getenv('COLETOR_WORKERS', '4'))
+
 
 def buscar_dados_timeframe(yahoo_symbol: str, interval: str) -> pd.DataFrame:
     """
@@ -69,22 +78,12 @@ def buscar_dados_timeframe(yahoo_symbol: str, interval: str) -> pd.DataFrame:
     try:
         print(f"   📊 Buscando {yahoo_symbol} ({interval})...")
         
-        ticker = yf.Ticker(yahoo_symbol)
-        
-        # Yahoo Finance tem limites por intervalo
-        if interval in ['15m', '30m']:
-            # Máximo 60 dias para intervalos curtos
-            period = '60d'
-        elif interval in ['1h']:
-            # Máximo 730 dias para 1h
-            period = '730d'
-        else:
-            # Máximo disponível para intervalos maiores (geralmente 8-10 anos)
-            period = 'max'
-        
-        df = ticker.history(interval=interval, period=period)
+        # Todo o histórico do armazém: o download já respeita os limites do
+        # Yahoo por intervalo (60 dias no 15m, 730 no 1h) e os candles de
+        # execuções anteriores se acumulam. 30m vem do 15m e 6h/8h/12h/1d do 1h.
+        df = obter_timeframe(yahoo_symbol, interval, period='max')
         
-        if df.empty:
+        if df is None or df.empty:
             print(f"   ⚠️ Sem dados para {yahoo_symbol} ({interval})")
             return None
         
@@ -117,36 +116,7 @@ def calcular_chilo(df: pd.DataFrame, period: int) -> pd.DataFrame:
     if len(df) < period:
         return df
     
-    # Calcular médias móveis
-    hima = df['high'].rolling(window=period).mean()
-    loma = df['low'].rolling(window=period).mean()
-    
-    # Inicializar séries
-    hilo = pd.Series(index=df.index, dtype=float)
-    hilo_state = pd.Series(index=df.index, dtype=int)
-    
-    # Calcular estado e linha HiLo
-    for i in range(period, len(df)):
-        close = df['close'].iloc[i]
-        hi = hima.iloc[i-1]
-        lo = loma.iloc[i-1]
-        
-        if close > hi:
-            state = 1  # BULLISH (verde)
-            hilo.iloc[i] = lo
-        elif close < lo:
-            state = -1  # BEARISH (vermelho)
-            hilo.iloc[i] = hi
-        else:
-            state = 0  # NEUTRO
-            hilo.iloc[i] = hilo.iloc[i-1] if i > period else lo
-        
-        hilo_state.iloc[i] = state
-    
-    df['hilo'] = hilo
-    df['hilo_state'] = hilo_state
-    
-    return df
+    return indicador_chilo.calcular_chilo(df, period)
 
 
 def contar_candles_virados(df: pd.DataFrame) -> List[int]:
@@ -162,35 +132,19 @@ def contar_candles_virados(df: pd.DataFrame) -> List[int]:
     if 'hilo_state' not in df.columns:
         return []
     
-    contagem = []
-    
-    for i in range(len(df)):
-        estado_atual = df['hilo_state'].iloc[i]
-        
-        if estado_atual == 0:
-            contagem.append(0)
-            continue
-        
-        # Contar quantos candles anteriores têm o mesmo estado
-        count = 1
-        for j in range(i-1, -1, -1):
-            if df['hilo_state'].iloc[j] == estado_atual:
-                count += 1
-            else:
-                break
-        
-        contagem.append(count)
-    
-    return contagem
+    # Run-length em uma passada (antes era um laço para trás a partir de cada candle)
+    return indicador_chilo.contar_candles_virados_array(df['hilo_state']).tolist()
 
 
-def otimizar_periodo_timeframe(yahoo_symbol: str, interval: str) -> Tuple[int, float]:
+def otimizar_periodo_timeframe(yahoo_symbol: str, interval: str,
+                               df: pd.DataFrame = None) -> Tuple[int, float]:
     """
     Encontra o período CHiLo mais vencedor para um timeframe
     
     Args:
         yahoo_symbol: Símbolo no Yahoo Finance
         interval: Intervalo (15m, 30m, 1h, etc)
+        df: Candles já baixados (se None, busca no armazém)
     
     Returns:
         (melhor_periodo, taxa_acerto)
@@ -198,53 +152,26 @@ def otimizar_periodo_timeframe(yahoo_symbol: str, interval: str) -> Tuple[int, f
     print(f"\n🔍 Otimizando período para {yahoo_symbol} ({interval})...")
     
     # Buscar dados
-    df = buscar_dados_timeframe(yahoo_symbol, interval)
+    if df is None:
+        df = buscar_dados_timeframe(yahoo_symbol, interval)
     if df is None or len(df) < 100:
         return None, None
     
     melhor_periodo = None
     melhor_taxa = 0
     
-    for periodo in PERIODOS_TESTE:
-        if len(df) < periodo * 2:
-            continue
-        
-        # Calcular CHiLo
-        df_test = df.copy()
-        df_test = calcular_chilo(df_test, periodo)
-        
-        # Calcular taxa de acerto
-        estados = df_test['hilo_state'].dropna()
-        
-        if len(estados) < 10:
-            continue
-        
-        # Contar acertos (quando estado prevê corretamente o próximo movimento)
-        acertos = 0
-        total = 0
-        
-        for i in range(len(estados) - 1):
-            if estados.iloc[i] == 0:
-                continue
-            
-            preco_atual = df_test['close'].iloc[i]
-            preco_proximo = df_test['close'].iloc[i+1]
-            
-            # Se estado é 1 (verde), espera-se que preço suba
-            # Se estado é -1 (vermelho), espera-se que preço caia
-            if estados.iloc[i] == 1 and preco_proximo > preco_atual:
-                acertos += 1
-            elif estados.iloc[i] == -1 and preco_proximo < preco_atual:
-                acertos += 1
-            
-            total += 1
-        
-        if total > 0:
-            taxa = acertos / total
-            
-            if taxa > melhor_taxa:
-                melhor_taxa = taxa
-                melhor_periodo = periodo
+    # Períodos com histórico suficiente (2x o período e 10 candles com estado)
+    periodos = [p for p in PERIODOS_TESTE if len(df) >= p * 2 and len(df) - p >= 10]
+    
+    # Calcular CHiLo e taxa de acerto de todos os períodos em uma única passada
+    estados = indicador_chilo.calcular_chilo_matriz(df['high'], df['low'], df['close'], periodos)
+    taxas = calcular_taxa_acerto_matriz(df['close'], estados)
+    
+    for periodo, taxa in zip(periodos, taxas):
+        # Taxa NaN (sem sinais) nunca é maior que a melhor
+        if taxa > melhor_taxa:
+            melhor_taxa = float(taxa)
+            melhor_periodo = periodo
     
     if melhor_periodo:
         print(f"   ✓ Melhor período: {melhor_periodo} (taxa: {melhor_taxa:.2%})")
@@ -254,6 +181,175 @@ def otimizar_periodo_timeframe(yahoo_symbol: str, interval: str) -> Tuple[int, f
     return melhor_periodo, melhor_taxa
 
 
+def arquivo_checkpoint(cripto: Dict, tf_name: str) -> str:
+    """Caminho do checkpoint de um par (cripto, timeframe)"""
+    return f"{DATA_DIR}/checkpoints/{cripto['name']}_{tf_name}.json"
+
+
+def carregar_checkpoint(cripto: Dict, tf_name: str) -> Optional[Dict]:
+    """
+    Resumo de um par já coletado em uma execução interrompida
+
+    Returns:
+        Resumo do timeframe, ou None se o par ainda não foi concluído
+    """
+    arquivo = arquivo_checkpoint(cripto, tf_name)
+    if not os.path.exists(arquivo) or not os.path.exists(f"{DATA_DIR}/{cripto['name']}_{tf_name}.csv"):
+        return None
+
+    try:
+        with open(arquivo, 'r') as f:
+            checkpoint = json.load(f)
+    except Exception as e:
+        print(f"   ⚠️ Checkpoint inválido {arquivo}: {e}")
+        return None
+
+    if checkpoint.get('yahoo') != cripto['yahoo']:
+        return None
+    return checkpoint['resumo']
+
+
+def salvar_checkpoint(cripto: Dict, tf_name: str, resumo: Dict):
+    """Grava o checkpoint de um par de forma atômica"""
+    arquivo = arquivo_checkpoint(cripto, tf_name)
+    os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+
+    temporario = arquivo + '.tmp'
+    with open(temporario, 'w') as f:
+        json.dump({
+            'cripto': cripto['name'],
+            'yahoo': cripto['yahoo'],
+            'timeframe': tf_name,
+            'concluido_em': datetime.now().isoformat(),
+            'resumo': resumo
+        }, f, indent=2)
+    os.replace(temporario, arquivo)
+
+
+def limpar_checkpoints():
+    """Remove os checkpoints após uma coleta completa"""
+    diretorio = f"{DATA_DIR}/checkpoints"
+    if not os.path.isdir(diretorio):
+        return
+    for nome in os.listdir(diretorio):
+        os.remove(os.path.join(diretorio, nome))
+
+
+def coletar_par(cripto: Dict, tf_name: str) -> Optional[Dict]:
+    """
+    Coleta um timeframe de uma criptomoeda com um único download
+
+    Os mesmos candles são usados para otimizar o período e para gerar o CSV
+    com o CHiLo. Ao terminar, grava o checkpoint do par.
+
+    Args:
+        cripto: Dicionário com informações da cripto
+        tf_name: Timeframe (chave de TIMEFRAMES)
+
+    Returns:
+        Resumo do timeframe, ou None se não houver dados suficientes
+    """
+    tf_interval = TIMEFRAMES[tf_name]
+    print(f"\n⏱️ {cripto['name']} - Timeframe: {tf_name}")
+
+    # Diário do Yahoo só para os anos anteriores ao histórico de 1h
+    if tf_name == '1d':
+        obter_armazem().append_new_bars(cripto['yahoo'], '1d')
+
+    df = buscar_dados_timeframe(cripto['yahoo'], tf_interval)
+    if df is None:
+        return None
+
+    # Otimizar período
+    melhor_periodo, taxa_acerto = otimizar_periodo_timeframe(cripto['yahoo'], tf_interval, df)
+    if melhor_periodo is None:
+        return None
+
+    # Calcular CHiLo com período otimizado
+    df = calcular_chilo(df, melhor_periodo)
+
+    # Contar candles virados
+    df['candles_virados'] = contar_candles_virados(df)
+
+    # Calcular período de dados
+    dias = (df.index[-1] - df.index[0]).days
+    anos = dias / 365.25
+
+    resumo = {
+        'periodo_otimizado': melhor_periodo,
+        'taxa_acerto': taxa_acerto,
+        'total_candles': len(df),
+        'data_inicio': df.index[0].isoformat(),
+        'data_fim': df.index[-1].isoformat(),
+        'dias_dados': dias,
+        'anos_dados': round(anos, 2)
+    }
+
+    # Salvar DataFrame
+    filename = f"{DATA_DIR}/{cripto['name']}_{tf_name}.csv"
+    df.to_csv(filename)
+    print(f"   💾 Salvo: {filename}")
+
+    salvar_checkpoint(cripto, tf_name, resumo)
+    return resumo
+
+
+def _coletar_ou_retomar(tarefa: Tuple[Dict, str, bool]) -> Optional[Dict]:
+    """Executa um par, ou devolve o checkpoint se já foi concluído"""
+    cripto, tf_name, retomar = tarefa
+    if retomar:
+        resumo = carregar_checkpoint(cripto, tf_name)
+        if resumo is not None:
+            print(f"   ⏭️ {cripto['name']} ({tf_name}) já coletado, retomando")
+            return resumo
+
+    try:
+        return coletar_par(cripto, tf_name)
+    except Exception as e:
+        print(f"   ❌ Erro em {cripto['name']} ({tf_name}): {e}")
+        return None
+
+
+def coletar_portfolio(criptos: List[Dict], workers: int = None, retomar: bool = True) -> List[Dict]:
+    """
+    Coleta todos os pares (cripto, timeframe) com um pool limitado de threads
+
+    A taxa de requisições ao Yahoo é controlada pelo limitador do armazém,
+    e timeframes do mesmo símbolo compartilham o download do intervalo base.
+
+    Args:
+        criptos: Lista de criptos
+        workers: Threads simultâneas (padrão WORKERS_COLETA)
+        retomar: Se True, pula os pares com checkpoint de uma execução
+            interrompida
+
+    Returns:
+        Um resultado por cripto, na ordem de entrada, com os timeframes na
+        ordem de TIMEFRAMES
+    """
+    workers = workers or WORKERS_COLETA
+    tarefas = [(cripto, tf_name, retomar) for cripto in criptos for tf_name in TIMEFRAMES]
+
+    if workers <= 1:
+        resumos = [_coletar_ou_retomar(t) for t in tarefas]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            resumos = list(executor.map(_coletar_ou_retomar, tarefas))
+
+    resultados = [{
+        'cripto': cripto['name'],
+        'yahoo': cripto['yahoo'],
+        'timestamp': datetime.now().isoformat(),
+        'timeframes': {}
+    } for cripto in criptos]
+
+    for k, ((_, tf_name, _), resumo) in enumerate(zip(tarefas, resumos)):
+        if resumo is not None:
+            resultados[k // len(TIMEFRAMES)]['timeframes'][tf_name] = resumo
+
+    return resultados
+
+
 def coletar_dados_cripto(cripto: Dict) -> Dict:
     """
     Coleta dados de todos os timeframes para uma criptomoeda
@@ -268,62 +364,109 @@ def coletar_dados_cripto(cripto: Dict) -> Dict:
     print(f"📊 COLETANDO DADOS: {cripto['name']}")
     print(f"{'='*80}")
     
-    resultado = {
-        'cripto': cripto['name'],
-        'yahoo': cripto['yahoo'],
-        'timestamp': datetime.now().isoformat(),
-        'timeframes': {}
-    }
-    
-    # Para cada timeframe
-    for tf_name, tf_interval in TIMEFRAMES.items():
-        print(f"\n⏱️ Timeframe: {tf_name}")
-        
-        # Otimizar período
-        melhor_periodo, taxa_acerto = otimizar_periodo_timeframe(
-            cripto['yahoo'], 
-            tf_interval
-        )
-        
-        if melhor_periodo is None:
+    return coletar_portfolio([cripto])[0]
+
+
+# Timeframes menores que o diário usados como features
+TIMEFRAMES_FEATURES = ['15m', '30m', '1h', '6h', '8h', '12h']
+
+
+def alinhar_timeframe(datas: pd.DatetimeIndex, df_tf: pd.DataFrame) -> pd.DataFrame:
+    """
+    Alinha um timeframe menor ao índice diário com um merge as-of
+
+    Para cada data pega o último candle com índice <= data, como o antigo
+    filtro df_tf[df_tf.index <= data].iloc[-1], mas em uma única passada
+    ordenada sobre os dois índices.
+
+    Args:
+        datas: Índice diário (ordenado)
+        df_tf: DataFrame do timeframe com hilo_state e candles_virados
+
+    Returns:
+        DataFrame indexado como `datas` com estado, candles_virados (0 quando
+        o último candle não tem estado) e presente (existe candle <= data)
+    """
+    direita = pd.DataFrame({
+        'data': pd.DatetimeIndex(df_tf.index).as_unit('ns'),
+        'estado': df_tf['hilo_state'].to_numpy(dtype=float),
+        'candles_virados': df_tf['candles_virados'].to_numpy(dtype=float),
+        'presente': True
+    }).sort_values('data', kind='stable')
+
+    alinhado = pd.merge_asof(
+        pd.DataFrame({'data': datas.as_unit('ns')}), direita,
+        on='data', direction='backward', allow_exact_matches=True
+    )
+
+    presente = alinhado['presente'].eq(True).to_numpy()
+    com_estado = presente & alinhado[['estado', 'candles_virados']].notna().all(axis=1).to_numpy()
+
+    return pd.DataFrame({
+        'estado': np.where(com_estado, alinhado['estado'], 0.0),
+        'candles_virados': np.where(com_estado, alinhado['candles_virados'], 0.0),
+        'presente': presente
+    }, index=datas)
+
+
+def montar_features_cripto(nome: str) -> pd.DataFrame:
+    """
+    Monta as amostras de uma cripto lendo cada CSV de timeframe uma única vez
+
+    Args:
+        nome: Nome da cripto (prefixo dos arquivos em DATA_DIR)
+
+    Returns:
+        DataFrame com cripto, data, virou_diario e, por timeframe, estado e
+        candles_virados (NaN antes do primeiro candle do timeframe), ou None
+        sem dados diários
+    """
+    try:
+        df_diario = pd.read_csv(f"{DATA_DIR}/{nome}_1d.csv", index_col=0, parse_dates=True)
+    except:
+        print(f"   ⚠️ Dados diários não encontrados")
+        return None
+
+    # Inversão do diário entre candles consecutivos (neutros são ignorados)
+    estados = df_diario['hilo_state'].to_numpy(dtype=float)
+    anterior, atual = estados[:-1], estados[1:]
+    manter = (anterior != 0) & (atual != 0)
+    datas = df_diario.index[1:][manter]
+
+    amostras = pd.DataFrame({
+        'cripto': nome,
+        'data': [d.isoformat() for d in datas],
+        'virou_diario': (anterior != atual)[manter]
+    })
+
+    colunas = []
+    for ordem, tf_name in enumerate(TIMEFRAMES_FEATURES):
+        estado_col = f'{tf_name}_estado'
+        virados_col = f'{tf_name}_candles_virados'
+        try:
+            df_tf = pd.read_csv(f"{DATA_DIR}/{nome}_{tf_name}.csv", index_col=0, parse_dates=True)
+            alinhado = alinhar_timeframe(datas, df_tf)
+        except:
+            amostras[estado_col] = 0
+            amostras[virados_col] = 0
+            colunas.append((0, ordem, estado_col, virados_col))
             continue
-        
-        # Buscar dados com período otimizado
-        df = buscar_dados_timeframe(cripto['yahoo'], tf_interval)
-        if df is None:
+
+        presente = alinhado['presente'].to_numpy()
+        if not presente.any():
             continue
-        
-        # Calcular CHiLo com período otimizado
-        df = calcular_chilo(df, melhor_periodo)
-        
-        # Contar candles virados
-        candles_virados = contar_candles_virados(df)
-        df['candles_virados'] = candles_virados
-        
-        # Calcular período de dados
-        dias = (df.index[-1] - df.index[0]).days
-        anos = dias / 365.25
-        
-        # Salvar dados do timeframe
-        resultado['timeframes'][tf_name] = {
-            'periodo_otimizado': melhor_periodo,
-            'taxa_acerto': taxa_acerto,
-            'total_candles': len(df),
-            'data_inicio': df.index[0].isoformat(),
-            'data_fim': df.index[-1].isoformat(),
-            'dias_dados': dias,
-            'anos_dados': round(anos, 2)
-        }
-        
-        # Salvar DataFrame
-        filename = f"{DATA_DIR}/{cripto['name']}_{tf_name}.csv"
-        df.to_csv(filename)
-        print(f"   💾 Salvo: {filename}")
-        
-        # Aguardar para não sobrecarregar API
-        time.sleep(2)
-    
-    return resultado
+
+        amostras[estado_col] = np.where(presente, alinhado['estado'], np.nan)
+        amostras[virados_col] = np.where(presente, alinhado['candles_virados'], np.nan)
+        colunas.append((int(presente.argmax()), ordem, estado_col, virados_col))
+
+    # Colunas na ordem em que apareceriam amostra a amostra
+    colunas.sort()
+    ordem_colunas = ['cripto', 'data', 'virou_diario']
+    for _, _, estado_col, virados_col in colunas:
+        ordem_colunas += [estado_col, virados_col]
+
+    return amostras[ordem_colunas]
 
 
 def gerar_dataset_ml():
@@ -331,73 +474,31 @@ def gerar_dataset_ml():
     Gera dataset para treinamento do modelo ML
     Combina dados de todos os timeframes para prever inversão do diário
     
-    Dataset com 8 anos de dados históricos para treinamento robusto
+    Dataset com 8 anos de dados históricos para treinamento robusto.
+    Cada CSV é lido uma vez e os timeframes menores são alinhados ao
+    diário com merge as-of (último candle <= data de cada amostra).
     """
     print(f"\n{'='*80}")
     print("🤖 GERANDO DATASET PARA ML (8 ANOS DE DADOS)")
     print(f"{'='*80}")
     
-    dataset = []
+    partes = []
     
     for cripto in CRIPTOS:
         print(f"\n📊 Processando {cripto['name']}...")
         
-        # Carregar dados do diário
-        try:
-            df_diario = pd.read_csv(f"{DATA_DIR}/{cripto['name']}_1d.csv", index_col=0, parse_dates=True)
-        except:
-            print(f"   ⚠️ Dados diários não encontrados")
-            continue
-        
-        # Para cada dia
-        for i in range(1, len(df_diario)):
-            data_atual = df_diario.index[i]
-            
-            # Verificar se houve inversão no diário
-            estado_anterior = df_diario['hilo_state'].iloc[i-1]
-            estado_atual = df_diario['hilo_state'].iloc[i]
-            
-            if estado_anterior == 0 or estado_atual == 0:
-                continue
-            
-            virou = (estado_anterior != estado_atual)
-            
-            # Coletar features de todos os timeframes
-            features = {
-                'cripto': cripto['name'],
-                'data': data_atual.isoformat(),
-                'virou_diario': virou
-            }
-            
-            # Para cada timeframe menor que diário
-            for tf_name in ['15m', '30m', '1h', '6h', '8h', '12h']:
-                try:
-                    df_tf = pd.read_csv(
-                        f"{DATA_DIR}/{cripto['name']}_{tf_name}.csv", 
-                        index_col=0, 
-                        parse_dates=True
-                    )
-                    
-                    # Pegar dados até a data atual
-                    df_tf_ate_data = df_tf[df_tf.index <= data_atual]
-                    
-                    if len(df_tf_ate_data) == 0:
-                        continue
-                    
-                    # Última linha
-                    ultima = df_tf_ate_data.iloc[-1]
-                    
-                    features[f'{tf_name}_estado'] = int(ultima['hilo_state'])
-                    features[f'{tf_name}_candles_virados'] = int(ultima['candles_virados'])
-                    
-                except:
-                    features[f'{tf_name}_estado'] = 0
-                    features[f'{tf_name}_candles_virados'] = 0
-            
-            dataset.append(features)
+        amostras = montar_features_cripto(cripto['name'])
+        if amostras is not None and len(amostras) > 0:
+            partes.append(amostras)
+    
+    df_dataset = pd.concat(partes, ignore_index=True, sort=False) if partes else pd.DataFrame()
+    
+    # Colunas completas voltam a ser inteiras (como na montagem linha a linha)
+    for coluna in df_dataset.columns[3:]:
+        if df_dataset[coluna].notna().all():
+            df_dataset[coluna] = df_dataset[coluna].astype(np.int64)
     
     # Salvar dataset
-    df_dataset = pd.DataFrame(dataset)
     filename = f"{DATA_DIR}/dataset_ml_inversao_8anos.csv"
     df_dataset.to_csv(filename, index=False)
     
@@ -435,15 +536,10 @@ def main():
     print("   Coletando máximo de dados históricos disponíveis (8+ anos)")
     print("=" * 80)
     
-    resultados = []
-    
-    # Coletar dados de cada cripto
-    for cripto in CRIPTOS:
-        resultado = coletar_dados_cripto(cripto)
-        resultados.append(resultado)
-        
-        # Aguardar entre criptos
-        time.sleep(5)
+    # Pares já concluídos em uma execução interrompida são retomados
+    # (use --reiniciar para coletar tudo de novo)
+    retomar = '--reiniciar' not in sys.argv
+    resultados = coletar_portfolio(CRIPTOS, retomar=retomar)
     
     # Salvar resumo
     resumo_file = f"{DATA_DIR}/resumo_coleta_8anos.json"
@@ -452,6 +548,9 @@ def main():
     
     print(f"\n✓ Resumo salvo: {resumo_file}")
     
+    # Coleta completa: a próxima execução começa do zero
+    limpar_checkpoints()
+    
     # Gerar dataset para ML
     dataset = gerar_dataset_ml()
     
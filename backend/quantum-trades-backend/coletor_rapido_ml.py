@@ -18,6 +18,7 @@ import time
 
 # Importar portfolio manager
 from portfolio_manager import PortfolioManager
+from indicador_chilo import calcular_medias, calcular_chilo_arrays, propagar_ultimo, contar_sequencias
 
 # Configurações
 TIMEFRAMES = {
@@ -34,24 +35,14 @@ def calcular_chilo(df, period):
     """
     Calcula CHiLo (Custom HiLo)
     """
-    # Médias móveis
-    hima = df['High'].rolling(window=period).mean()
-    loma = df['Low'].rolling(window=period).mean()
-    
-    # CHiLo
-    chilo = pd.Series(index=df.index, dtype=float)
-    trend = pd.Series(index=df.index, dtype=int)
-    
-    for i in range(period, len(df)):
-        if df['Close'].iloc[i] > hima.iloc[i-1]:
-            chilo.iloc[i] = loma.iloc[i]
-            trend.iloc[i] = 1  # Verde
-        elif df['Close'].iloc[i] < loma.iloc[i-1]:
-            chilo.iloc[i] = hima.iloc[i]
-            trend.iloc[i] = 0  # Vermelho
-        else:
-            chilo.iloc[i] = chilo.iloc[i-1]
-            trend.iloc[i] = trend.iloc[i-1]
+    # Médias móveis e estado Activator (fechamento vs médias do candle anterior)
+    hima, loma = calcular_medias(df['High'], df['Low'], period)
+    _, estado = calcular_chilo_arrays(df['High'], df['Low'], df['Close'], period)
+    
+    # CHiLo e tendência só mudam em verde/vermelho; no neutro mantêm o anterior
+    virou = (estado == 1) | (estado == -1)
+    chilo = pd.Series(propagar_ultimo(np.where(estado == 1, loma, hima), virou), index=df.index)
+    trend = pd.Series(propagar_ultimo(np.where(estado == 1, 1.0, 0.0), virou), index=df.index)  # 1 = Verde, 0 = Vermelho
     
     return chilo, trend
 
@@ -62,18 +53,7 @@ def contar_candles_virados(trend):
     if len(trend) == 0 or pd.isna(trend.iloc[-1]):
         return 0
     
-    estado_atual = trend.iloc[-1]
-    count = 0
-    
-    for i in range(len(trend)-1, -1, -1):
-        if pd.isna(trend.iloc[i]):
-            break
-        if trend.iloc[i] == estado_atual:
-            count += 1
-        else:
-            break
-    
-    return count
+    return int(contar_sequencias(trend)[-1])
 
 def coletar_dados_cripto(cripto, timeframes_config):
     """
@@ -101,6 +81,9 @@ def coletar_dados_cripto(cripto, timeframes_config):
         # Calcular CHiLo diário
         chilo_daily, trend_daily = calcular_chilo(df_daily, period_chilo)
         
+        # Candles virados de todos os dias em uma passada
+        virados_daily = contar_sequencias(trend_daily)
+        
     except Exception as e:
         print(f"❌ Erro ao coletar dados diários: {e}")
         return []
@@ -168,7 +151,7 @@ def coletar_dados_cripto(cripto, timeframes_config):
                     amostra[f'{tf}_candles_virados'] = dados_timeframes[tf]['candles_virados']
                 else:
                     amostra[f'{tf}_estado'] = int(trend_hoje)
-                    amostra[f'{tf}_candles_virados'] = contar_candles_virados(trend_daily.iloc[:i+1])
+                    amostra[f'{tf}_candles_virados'] = int(virados_daily[i])
             
             dados_cripto.append(amostra)
     
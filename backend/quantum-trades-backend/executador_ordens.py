@@ -7,7 +7,7 @@ Executa ordens de compra/venda e gerencia stop loss
 """
 
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
 import json
 import os
 from notificador_usuario import NotificadorUsuario
@@ -22,11 +22,22 @@ class ExecutadorOrdens:
     Executa ordens e gerencia posições
     """
     
-    def __init__(self):
+    def __init__(self, persistir: bool = True, notificador: Optional[NotificadorUsuario] = None,
+                 relogio: Optional[Callable[[], datetime]] = None):
+        """
+        Args:
+            persistir: Se False, começa sem posições nem histórico e não
+                grava os arquivos (usado pelo replay)
+            notificador: Notificador das ordens (padrão: Telegram)
+            relogio: Função que retorna o horário das ordens (padrão:
+                relógio do sistema)
+        """
+        self.persistir = persistir
+        self.relogio = relogio or datetime.now
         self.config = self.carregar_config()
-        self.posicoes = self.carregar_posicoes()
-        self.historico = self.carregar_historico()
-        self.notificador = NotificadorUsuario()
+        self.posicoes = self.carregar_posicoes() if persistir else {}
+        self.historico = self.carregar_historico() if persistir else []
+        self.notificador = notificador or NotificadorUsuario()
     
     def carregar_config(self) -> Dict:
         """Carrega configurações"""
@@ -54,6 +65,8 @@ class ExecutadorOrdens:
     
     def salvar_posicoes(self):
         """Salva posições abertas"""
+        if not self.persistir:
+            return
         with open(POSICOES_FILE, 'w') as f:
             json.dump(self.posicoes, f, indent=2)
     
@@ -66,6 +79,8 @@ class ExecutadorOrdens:
     
     def salvar_historico(self):
         """Salva histórico de ordens"""
+        if not self.persistir:
+            return
         with open(HISTORICO_FILE, 'w') as f:
             json.dump(self.historico, f, indent=2)
     
@@ -89,7 +104,7 @@ class ExecutadorOrdens:
         Returns:
             Dicionário com resultado da ordem
         """
-        timestamp = datetime.now().isoformat()
+        timestamp = self.relogio().isoformat()
         
         # Verificar se já há posição aberta
         if cripto in self.posicoes:
@@ -176,7 +191,7 @@ class ExecutadorOrdens:
         Returns:
             Dicionário com resultado da ordem
         """
-        timestamp = datetime.now().isoformat()
+        timestamp = self.relogio().isoformat()
         
         # Verificar se há posição aberta
         if cripto not in self.posicoes:
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Indicador CHiLo (Custom HiLo) - Motor Vetorizado
+Magnus Wealth v9.1.0
+
+Implementação única do CHiLo / Gann HiLo Activator usada por todos os
+scripts (otimizador, monitores, coletores, analisadores e backtesting).
+Substitui os loops linha a linha com .iloc/.loc por operações em arrays
+NumPy, produzindo exatamente as mesmas colunas das versões anteriores.
+
+Dois modos são suportados:
+
+- Activator (hilo / hilo_state): o fechamento do candle atual é comparado
+  com as médias do candle ANTERIOR. Estado 1 (verde), -1 (vermelho) ou
+  0 (neutro); a linha HiLo mantém o valor anterior enquanto neutro.
+- Tendência (hilo_high / hilo_low / trend): o fechamento é comparado com
+  as médias do PRÓPRIO candle e a tendência anterior é mantida na zona
+  neutra (usado pelo backtesting e pelos monitores de performance).
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Tuple
+
+
+def propagar_ultimo(valores: np.ndarray, mascara: np.ndarray) -> np.ndarray:
+    """
+    Propaga para frente o último valor marcado em `mascara`
+
+    Equivale a `x[i] = valores[i] if mascara[i] else x[i-1]`, mas sem loop.
+    Posições anteriores à primeira marcação ficam NaN. Um valor NaN marcado
+    é propagado como NaN (diferente de ffill, que o ignoraria).
+
+    Args:
+        valores: Array de valores candidatos
+        mascara: Array booleano indicando onde o valor é (re)definido
+
+    Returns:
+        Array float com os valores propagados
+    """
+    valores = np.asarray(valores, dtype=float)
+    n = len(valores)
+    idx = np.where(mascara, np.arange(n), -1)
+    np.maximum.accumulate(idx, out=idx)
+
+    resultado = np.full(n, np.nan)
+    definido = idx >= 0
+    resultado[definido] = valores[idx[definido]]
+    return resultado
+
+
+def contar_sequencias(estados) -> np.ndarray:
+    """
+    Tamanho da sequência de valores iguais que termina em cada posição
+
+    Codificação run-length em uma passada: a posição i recebe quantos valores
+    consecutivos, terminando em i, são iguais a estados[i]. Como NaN nunca é
+    igual a nada, cada NaN forma uma sequência de tamanho 1 (mesmo resultado
+    das comparações com == dos loops anteriores).
+
+    Args:
+        estados: Série ou array de estados
+
+    Returns:
+        Array int com a contagem de cada posição
+    """
+    estados = np.asarray(estados, dtype=float)
+    n = len(estados)
+    posicoes = np.arange(n)
+
+    inicio = np.ones(n, dtype=bool)
+    inicio[1:] = estados[1:] != estados[:-1]
+
+    idx = np.where(inicio, posicoes, 0)
+    np.maximum.accumulate(idx, out=idx)
+    return posicoes - idx + 1
+
+
+def contar_candles_virados_array(estados) -> np.ndarray:
+    """
+    Candles consecutivos virados na mesma direção para cada candle
+
+    Igual a contar_sequencias, mas candles neutros (0) contam 0.
+
+    Args:
+        estados: Série ou array de hilo_state
+
+    Returns:
+        Array int com a contagem de cada candle
+    """
+    estados = np.asarray(estados, dtype=float)
+    return np.where(estados == 0, 0, contar_sequencias(estados))
+
+
+def calcular_medias(high, low, period: int, ma_type: str = 'SMA') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula as médias móveis dos highs e lows (HiMA / LoMA)
+
+    Usa o mesmo rolling/ewm do pandas das versões anteriores, garantindo
+    resultados idênticos bit a bit.
+
+    Args:
+        high: Série ou array de máximas
+        low: Série ou array de mínimas
+        period: Período do CHiLo
+        ma_type: 'SMA' ou 'EMA'
+
+    Returns:
+        (hima, loma) como arrays float
+    """
+    high = pd.Series(np.asarray(high, dtype=float))
+    low = pd.Series(np.asarray(low, dtype=float))
+
+    if ma_type == 'SMA':
+        hima = high.rolling(window=period).mean()
+        loma = low.rolling(window=period).mean()
+    elif ma_type == 'EMA':
+        hima = high.ewm(span=period, adjust=False).mean()
+        loma = low.ewm(span=period, adjust=False).mean()
+    else:
+        raise ValueError(f"Tipo de MA não suportado: {ma_type}")
+
+    return hima.to_numpy(), loma.to_numpy()
+
+
+def calcular_chilo_arrays(high, low, close, period: int,
+                          ma_type: str = 'SMA') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula o CHiLo - Modo Activator sobre arrays
+
+    Para i >= period:
+        BULLISH (1)  se close[i] > HiMA[i-1]  -> hilo = LoMA[i-1]
+        BEARISH (-1) se close[i] < LoMA[i-1]  -> hilo = HiMA[i-1]
+        NEUTRO (0)   caso contrário           -> hilo = hilo[i-1]
+                                                 (LoMA[i-1] no primeiro candle)
+
+    Args:
+        high: Série ou array de máximas
+        low: Série ou array de mínimas
+        close: Série ou array de fechamentos
+        period: Período do CHiLo
+        ma_type: 'SMA' ou 'EMA'
+
+    Returns:
+        (hilo, hilo_state) como arrays float, NaN nos primeiros `period` candles
+    """
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+
+    hilo = np.full(n, np.nan)
+    hilo_state = np.full(n, np.nan)
+
+    hima, loma = calcular_medias(high, low, period, ma_type)
+
+    if n <= period:
+        return hilo, hilo_state
+
+    # Médias do candle anterior alinhadas com o candle atual
+    c = close[period:]
+    hi = hima[period - 1:-1]
+    lo = loma[period - 1:-1]
+
+    # Comparações com NaN resultam em False -> NEUTRO, como no loop original
+    estado = np.where(c > hi, 1.0, np.where(c < lo, -1.0, 0.0))
+    linha = np.where(estado == -1.0, hi, lo)
+
+    # Linha é redefinida em BULLISH/BEARISH e no primeiro candle calculado
+    redefine = estado != 0.0
+    redefine[0] = True
+
+    hilo[period:] = propagar_ultimo(linha, redefine)
+    hilo_state[period:] = estado
+
+    return hilo, hilo_state
+
+
+def calcular_chilo(df: pd.DataFrame, period: int, ma_type: str = 'SMA') -> pd.DataFrame:
+    """
+    Calcula o CHiLo (Custom HiLo) - Modo Activator
+
+    Args:
+        df: DataFrame com colunas high, low e close
+        period: Período do CHiLo
+        ma_type: 'SMA' ou 'EMA'
+
+    Returns:
+        O mesmo DataFrame com as colunas hilo e hilo_state adicionadas
+    """
+    hilo, hilo_state = calcular_chilo_arrays(
+        df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(),
+        period, ma_type
+    )
+
+    df['hilo'] = hilo
+    df['hilo_state'] = hilo_state
+
+    return df
+
+
+def calcular_tendencia_arrays(high, low, close, period: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calcula o CHiLo - Modo Tendência sobre arrays
+
+    Para i >= period:
+        1  se close[i] > HiMA[i]
+        -1 se close[i] < LoMA[i]
+        tendência anterior caso contrário (0 antes do primeiro sinal)
+
+    Args:
+        high: Série ou array de máximas
+        low: Série ou array de mínimas
+        close: Série ou array de fechamentos
+        period: Período do CHiLo
+
+    Returns:
+        (hilo_high, hilo_low, trend) com trend como array int
+    """
+    close = np.asarray(close, dtype=float)
+
+    hilo_high, hilo_low = calcular_medias(high, low, period)
+
+    sinal = np.where(close > hilo_high, 1.0, np.where(close < hilo_low, -1.0, 0.0))
+    sinal[:period] = 0.0
+
+    # Antes de `period` a tendência é 0; depois só muda em sinais não neutros
+    redefine = sinal != 0.0
+    redefine[:period] = True
+
+    trend = propagar_ultimo(sinal, redefine).astype(np.int64)
+
+    return hilo_high, hilo_low, trend
+
+
+def calcular_chilo_tendencia(df: pd.DataFrame, period: int, coluna: str = 'trend') -> pd.DataFrame:
+    """
+    Calcula o CHiLo - Modo Tendência
+
+    Args:
+        df: DataFrame com colunas high, low e close
+        period: Período do CHiLo
+        coluna: Nome da coluna de tendência ('trend' ou 'chilo_trend')
+
+    Returns:
+        O mesmo DataFrame com hilo_high, hilo_low e a coluna de tendência
+    """
+    hilo_high, hilo_low, trend = calcular_tendencia_arrays(
+        df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(), period
+    )
+
+    df['hilo_high'] = hilo_high
+    df['hilo_low'] = hilo_low
+    df[coluna] = trend
+
+    return df
+
+
+def medias_moveis_matriz(valores, periodos) -> np.ndarray:
+    """
+    Calcula médias móveis simples para vários períodos de uma só vez
+
+    Todas as janelas saem da mesma soma acumulada, então varrer N períodos
+    custa uma cumsum mais N subtrações vetorizadas. Janelas com NaN resultam
+    em NaN, como no rolling().mean() do pandas.
+
+    Args:
+        valores: Série ou array de preços
+        periodos: Lista de períodos
+
+    Returns:
+        Matriz (len(periodos) x len(valores)) com as médias
+    """
+    valores = np.asarray(valores, dtype=float)
+    n = len(valores)
+    medias = np.full((len(periodos), n), np.nan)
+
+    if n == 0:
+        return medias
+
+    # Centralizar reduz o erro de arredondamento da soma acumulada em séries longas
+    faltante = np.isnan(valores)
+    base = np.nanmean(valores) if not faltante.all() else 0.0
+    soma = np.concatenate(([0.0], np.cumsum(np.where(faltante, 0.0, valores - base))))
+    faltantes = np.concatenate(([0], np.cumsum(faltante)))
+
+    for k, period in enumerate(periodos):
+        if period > n:
+            continue
+        janela = (soma[period:] - soma[:-period]) / period + base
+        completa = (faltantes[period:] - faltantes[:-period]) == 0
+        medias[k, period - 1:] = np.where(completa, janela, np.nan)
+
+    return medias
+
+
+def calcular_chilo_matriz(high, low, close, periodos) -> np.ndarray:
+    """
+    Calcula o estado do CHiLo (Modo Activator, SMA) para vários períodos
+
+    Mesma regra de calcular_chilo_arrays, mas com as médias vindas de
+    medias_moveis_matriz. Pode diferir da versão de um período apenas por
+    arredondamento (~1e-12) em empates exatos entre fechamento e média.
+
+    Args:
+        high: Série ou array de máximas
+        low: Série ou array de mínimas
+        close: Série ou array de fechamentos
+        periodos: Lista de períodos
+
+    Returns:
+        Matriz (len(periodos) x len(close)) de hilo_state, NaN no aquecimento
+    """
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+    estados = np.full((len(periodos), n), np.nan)
+
+    if n < 2:
+        return estados
+
+    hima = medias_moveis_matriz(high, periodos)
+    loma = medias_moveis_matriz(low, periodos)
+
+    c = close[1:]
+    estados[:, 1:] = np.where(c > hima[:, :-1], 1.0, np.where(c < loma[:, :-1], -1.0, 0.0))
+
+    # Candles antes de `period` não têm estado
+    colunas = np.arange(n)
+    estados[colunas[None, :] < np.asarray(periodos)[:, None]] = np.nan
+
+    return estados
+
+
+def calcular_tendencia_matriz(high, low, close, periodos) -> np.ndarray:
+    """
+    Calcula o CHiLo - Modo Tendência para vários períodos
+
+    Mesma regra de calcular_tendencia_arrays, com as médias vindas de
+    medias_moveis_matriz (pode diferir apenas por arredondamento em empates
+    exatos entre fechamento e média).
+
+    Args:
+        high: Série ou array de máximas
+        low: Série ou array de mínimas
+        close: Série ou array de fechamentos
+        periodos: Lista de períodos
+
+    Returns:
+        Matriz int8 (len(periodos) x len(close)) de tendência, 0 no aquecimento
+    """
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+
+    hima = medias_moveis_matriz(high, periodos)
+    loma = medias_moveis_matriz(low, periodos)
+
+    sinal = np.where(close[None, :] > hima, 1, np.where(close[None, :] < loma, -1, 0)).astype(np.int8)
+    aquecimento = np.arange(n)[None, :] < np.asarray(periodos)[:, None]
+    sinal[aquecimento] = 0
+
+    # propagar_ultimo linha a linha: a tendência só muda em sinais não neutros
+    idx = np.where((sinal != 0) | aquecimento, np.arange(n)[None, :], 0)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+
+    return np.take_along_axis(sinal, idx, axis=1)
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Métricas da Estratégia CHiLo em Lote
+Magnus Wealth v9.1.0
+
+Varredura de períodos do CHiLo sem cópias de DataFrame: uma única matriz
+de estados (períodos x candles) e uma tabela de métricas por período.
+Usado pelo otimizador quinzenal, pelo coletor de dados de ML e pelo
+walk-forward do backtesting avançado, que compartilham os mesmos núcleos
+(retorno da estratégia, trocas de estado e drawdown).
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+from indicador_chilo import calcular_chilo_matriz
+
+# Taxas Binance Futuros USDⓈ-M (Usuário Regular)
+TAXA_TAKER = 0.0005  # 0.05% por operação
+
+# Mínimo de candles exigido em cada etapa (mesmo critério de calcular_metricas)
+MIN_CANDLES = 10
+
+
+def _retorno_estrategia(close: np.ndarray, estados: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Retorno de cada candle contra o anterior e o da estratégia
+
+    A estratégia aplica o estado do candle anterior ao retorno do candle
+    atual, então as duas saídas têm um candle a menos que a entrada.
+
+    Args:
+        close: Array de fechamentos (n)
+        estados: Matriz (períodos x n) de estados
+
+    Returns:
+        (retorno, estrategia): arrays (n - 1) e (períodos x n - 1)
+    """
+    retorno = close[1:] / close[:-1] - 1
+    return retorno, estados[:, :-1] * retorno[None, :]
+
+
+def _mudancas_estado(estados: np.ndarray, valido: np.ndarray) -> np.ndarray:
+    """
+    Candles válidos cujo estado difere do candle válido anterior da linha
+
+    Candles inválidos são pulados: a comparação é sempre com o último
+    candle válido antes dele. O primeiro candle válido não conta.
+
+    Args:
+        estados: Matriz (períodos x n) de estados
+        valido: Máscara (períodos x n) dos candles considerados
+
+    Returns:
+        Máscara (períodos x n) das trocas de estado
+    """
+    n = estados.shape[1]
+    posicoes = np.where(valido, np.arange(n)[None, :], -1)
+    anterior = np.full(estados.shape, -1)
+    anterior[:, 1:] = np.maximum.accumulate(posicoes, axis=1)[:, :-1]
+    tem_anterior = anterior >= 0
+    estado_anterior = np.take_along_axis(estados, np.where(tem_anterior, anterior, 0), axis=1)
+    return valido & tem_anterior & (estados != estado_anterior)
+
+
+def _max_drawdown(estrategia: np.ndarray) -> np.ndarray:
+    """Maior queda (fração negativa) do patrimônio composto de cada linha"""
+    acumulado = np.cumprod(1 + estrategia, axis=1)
+    return (acumulado / np.maximum.accumulate(acumulado, axis=1) - 1).min(axis=1)
+
+
+def calcular_metricas_matriz(close, estados: np.ndarray, periodos: List[int]) -> pd.DataFrame:
+    """
+    Calcula as métricas de calcular_metricas para cada linha da matriz de estados
+
+    A estratégia fica comprada no verde (1) e vendida no vermelho (-1) usando o
+    sinal do candle anterior. Os estados devem ter NaN apenas no aquecimento.
+
+    Args:
+        close: Série ou array de fechamentos
+        estados: Matriz (períodos x candles) de hilo_state
+        periodos: Períodos correspondentes às linhas da matriz
+
+    Returns:
+        DataFrame indexado por período com taxa_acerto, sharpe, retorno,
+        retorno_bh, superacao_bh, num_trades, custo_total, retorno_liquido e
+        custo_anual. Períodos sem dados suficientes são omitidos.
+    """
+    close = np.asarray(close, dtype=float)
+    estados = np.asarray(estados, dtype=float)
+    n = len(close)
+
+    colunas = ['taxa_acerto', 'sharpe', 'retorno', 'retorno_bh', 'superacao_bh',
+               'num_trades', 'custo_total', 'retorno_liquido', 'custo_anual']
+    if n < MIN_CANDLES or n < 2:
+        return pd.DataFrame(columns=colunas, index=pd.Index([], name='periodo'))
+
+    # Sinal do candle anterior aplicado ao retorno do candle atual (o
+    # primeiro candle não tem anterior e nunca é válido)
+    _, bruto = _retorno_estrategia(close, estados)
+    valido = np.zeros(estados.shape, dtype=bool)
+    valido[:, 1:] = np.isfinite(bruto) & np.isfinite(estados[:, 1:])
+    estrategia = np.zeros(estados.shape)
+    estrategia[:, 1:] = np.where(valido[:, 1:], bruto, 0.0)
+
+    dias = valido.sum(axis=1)
+    com_estado = np.isfinite(estados).sum(axis=1)
+    ok = (com_estado >= MIN_CANDLES) & (dias >= MIN_CANDLES)
+    dias_seguro = np.maximum(dias, 2)
+
+    # Taxa de acerto
+    acertos = (valido & (estrategia > 0)).sum(axis=1)
+    total_trades = (valido & (estrategia != 0)).sum(axis=1)
+    taxa_acerto = np.where(total_trades > 0, acertos / np.maximum(total_trades, 1) * 100, 0.0)
+
+    # Sharpe Ratio (anualizado, desvio amostral como no pandas)
+    media = estrategia.sum(axis=1) / dias_seguro
+    desvio = np.sqrt((np.where(valido, estrategia - media[:, None], 0.0) ** 2).sum(axis=1) / (dias_seguro - 1))
+    sharpe = np.where(desvio > 0, media / np.where(desvio > 0, desvio, 1.0) * np.sqrt(252), 0.0)
+
+    # Retorno total
+    retorno_total = np.prod(np.where(valido, 1 + estrategia, 1.0), axis=1) - 1
+
+    # Buy & Hold entre o primeiro e o último candle válidos
+    primeiro = valido.argmax(axis=1)
+    ultimo = n - 1 - valido[:, ::-1].argmax(axis=1)
+    retorno_bh = (close[ultimo] / close[primeiro] - 1) * 100
+
+    # Trades: mudança de estado entre candles válidos consecutivos
+    num_trades = _mudancas_estado(estados, valido).sum(axis=1)
+
+    # Custos operacionais
+    custo_total = num_trades * TAXA_TAKER
+    retorno_liquido = retorno_total - custo_total
+    custo_anual = num_trades / dias_seguro * 365 * TAXA_TAKER * 100
+
+    tabela = pd.DataFrame({
+        'taxa_acerto': taxa_acerto,
+        'sharpe': sharpe,
+        'retorno': retorno_total * 100,
+        'retorno_bh': retorno_bh,
+        'superacao_bh': retorno_total * 100 - retorno_bh,
+        'num_trades': num_trades.astype(np.int64),
+        'custo_total': custo_total * 100,
+        'retorno_liquido': retorno_liquido * 100,
+        'custo_anual': custo_anual
+    }, index=pd.Index(list(periodos), name='periodo'))
+
+    return tabela[ok]
+
+
+def calcular_metricas_vetor(close, estados) -> Optional[Dict]:
+    """
+    Métricas de calcular_metricas para um único vetor de estados
+
+    Descarta os candles sem estado e calcula a linha única com
+    calcular_metricas_matriz, para que os dois caminhos não divirjam.
+
+    Args:
+        close: Série ou array de fechamentos
+        estados: Série ou array de hilo_state (NaN no aquecimento)
+
+    Returns:
+        Dicionário com taxa_acerto, sharpe, retorno, retorno_bh,
+        superacao_bh, num_trades, custo_total, retorno_liquido e custo_anual,
+        ou None sem dados suficientes
+    """
+    close = np.asarray(close, dtype=float)
+    estados = np.asarray(estados, dtype=float)
+
+    # Sem os candles de aquecimento o retorno de cada candle é contra o
+    # candle anterior com estado, como no cálculo com DataFrame
+    com_estado = ~np.isnan(estados)
+    tabela = calcular_metricas_matriz(close[com_estado], estados[com_estado][None, :], [0])
+    if tabela.empty:
+        return None
+
+    metricas = tabela.iloc[0]
+    return {
+        chave: int(valor) if chave == 'num_trades' else float(valor)
+        for chave, valor in metricas.items()
+    }
+
+
+def calcular_metricas_tendencia(close, tendencias, taxa: float = TAXA_TAKER) -> Dict[str, np.ndarray]:
+    """
+    Métricas de backtest_simples para cada linha de uma matriz de tendência
+
+    A estratégia aplica a tendência do candle anterior ao retorno do candle
+    atual. Mesmas convenções do cálculo com pandas: a primeira linha conta
+    como troca de sinal e a última troca não tem saída (não é vitória).
+
+    Args:
+        close: Array de fechamentos da janela (m)
+        tendencias: Matriz (períodos x m) de tendência (1, -1 ou 0)
+        taxa: Custo por troca de sinal
+
+    Returns:
+        Dicionário de arrays (um valor por período) com as chaves de
+        backtest_simples, em fração (não percentual)
+    """
+    close = np.asarray(close, dtype=float)
+    tendencias = np.atleast_2d(np.asarray(tendencias, dtype=float))
+    k, m = tendencias.shape
+
+    _, estrategia = _retorno_estrategia(close, tendencias)
+
+    # Todos os candles valem; o primeiro também conta como troca
+    mudanca = _mudancas_estado(tendencias, np.ones((k, m), dtype=bool))
+    mudanca[:, 0] = True
+    num_trades = mudanca.sum(axis=1)
+
+    retorno_bruto = np.prod(1 + estrategia, axis=1) - 1
+    custo_total = num_trades * taxa
+    retorno_liquido = retorno_bruto - custo_total
+
+    max_drawdown = _max_drawdown(estrategia) if m >= 2 else np.full(k, np.nan)
+
+    # Volatilidade anualizada (desvio amostral) e Sharpe
+    if m >= 3:
+        volatilidade = estrategia.std(axis=1, ddof=1) * np.sqrt(252)
+    else:
+        volatilidade = np.full(k, np.nan)
+    positiva = volatilidade > 0
+    sharpe = np.where(positiva, retorno_liquido * (252 / max(m, 1)) / np.where(positiva, volatilidade, 1.0), 0.0)
+
+    # Win rate: cada troca vai do seu fechamento até o da troca seguinte
+    colunas = np.arange(m)
+    proxima = np.where(mudanca, colunas[None, :], m)
+    proxima = np.minimum.accumulate(proxima[:, ::-1], axis=1)[:, ::-1]
+    seguinte = np.full((k, m), m)
+    seguinte[:, :-1] = proxima[:, 1:]
+    tem_saida = seguinte < m
+    saida = close[np.where(tem_saida, seguinte, 0)]
+    vitorias = (mudanca & tem_saida & (saida > close[None, :])).sum(axis=1)
+    win_rate = np.where(num_trades > 0, vitorias / np.maximum(num_trades, 1), 0.0)
+
+    return {
+        'retorno_bruto': retorno_bruto,
+        'retorno_liquido': retorno_liquido,
+        'num_trades': num_trades,
+        'custo_total': custo_total,
+        'max_drawdown': max_drawdown,
+        'sharpe': sharpe,
+        'win_rate': win_rate,
+        'volatilidade': volatilidade
+    }
+
+
+def calcular_taxa_acerto_matriz(close, estados: np.ndarray) -> np.ndarray:
+    """
+    Taxa de acerto direcional de cada período
+
+    Um candle verde (1) acerta se o próximo fechamento for maior; um vermelho
+    (-1) acerta se for menor. Candles neutros são ignorados.
+
+    Args:
+        close: Série ou array de fechamentos
+        estados: Matriz (períodos x candles) de hilo_state
+
+    Returns:
+        Array com a taxa (0-1) por período, NaN quando não há sinais
+    """
+    close = np.asarray(close, dtype=float)
+    estados = np.asarray(estados, dtype=float)
+
+    subiu = close[1:] > close[:-1]
+    caiu = close[1:] < close[:-1]
+    estado = estados[:, :-1]
+
+    acertos = ((estado == 1) & subiu) | ((estado == -1) & caiu)
+    total = ((estado == 1) | (estado == -1)).sum(axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(total > 0, acertos.sum(axis=1) / total, np.nan)
+
+
+def varrer_periodos(df: pd.DataFrame, periodos: List[int]) -> Tuple[np.ndarray, pd.DataFrame]:
+    """
+    Calcula o CHiLo e as métricas de todos os períodos em uma única passada
+
+    Args:
+        df: DataFrame com colunas high, low e close
+        periodos: Lista de períodos a testar
+
+    Returns:
+        (estados, metricas): matriz (períodos x candles) de hilo_state e
+        tabela de métricas indexada por período
+    """
+    close = df['close'].to_numpy(dtype=float)
+    estados = calcular_chilo_matriz(df['high'].to_numpy(), df['low'].to_numpy(), close, periodos)
+    metricas = calcular_metricas_matriz(close, estados, periodos)
+    return estados, metricas
@@ -0,0 +1,15 @@
+"""
+Magnus Wealth - Machine Learning Models
+Módulo de modelos de IA e ML
+"""
+
+from .sentiment_analyzer import SentimentAnalyzer
+from .price_predictor import PricePredictor
+from .portfolio_optimizer import PortfolioOptimizer
+
+__all__ = [
+    'SentimentAnalyzer',
+    'PricePredictor',
+    'PortfolioOptimizer'
+]
+
@@ -0,0 +1,728 @@
+#!/usr/bin/env python3
+"""
+Magnus Wealth - Backtester
+Sistema de backtesting para validação de estratégias
+"""
+
+import os
+import json
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
+
+from .results_store import ResultsStore
+
+# Modos de rebalanceamento de backtest_portfolio
+REBALANCE_MODES = ('none', 'periodic', 'threshold')
+
+# Dias examinados por vez na busca do próximo rebalanceamento por desvio
+THRESHOLD_SCAN_WINDOW = 256
+
+# Métricas para ordenar a varredura de alocações (True = maior é melhor)
+SWEEP_RANK_METRICS = {
+    'sharpe_ratio': True,
+    'total_return': True,
+    'max_drawdown': True,  # Drawdown negativo: mais perto de zero é melhor
+    'volatility': False
+}
+
+# Carteiras candidatas avaliadas por vez (limita a memória das curvas)
+SWEEP_CHUNK_SIZE = 1024
+
+class Backtester:
+    """
+    Sistema de backtesting para estratégias de trading
+    """
+    
+    def __init__(self, initial_capital: float = 10000.0, results_dir='data/backtests'):
+        """
+        Inicializa o backtester
+        
+        Args:
+            initial_capital: Capital inicial
+            results_dir: Diretório para salvar resultados
+        """
+        self.initial_capital = initial_capital
+        self.results_dir = results_dir
+        self._store = None
+        
+        # Criar diretório de resultados
+        os.makedirs(results_dir, exist_ok=True)
+    
+    @property
+    def store(self) -> ResultsStore:
+        """Armazenamento dos resultados (aberto no primeiro uso)"""
+        if self._store is None:
+            self._store = ResultsStore(os.path.join(self.results_dir, 'results.db'))
+        return self._store
+    
+    def calculate_returns(self, prices: List[float]) -> List[float]:
+        """
+        Calcula retornos diários
+        
+        Args:
+            prices: Lista de preços
+            
+        Returns:
+            Lista de retornos
+        """
+        prices_array = np.asarray(prices, dtype=float)
+        return (np.diff(prices_array) / prices_array[:-1]).tolist()
+    
+    def calculate_sharpe_ratio(
+        self,
+        returns: List[float],
+        risk_free_rate: float = 0.0
+    ) -> float:
+        """
+        Calcula Sharpe Ratio
+        
+        Args:
+            returns: Lista de retornos
+            risk_free_rate: Taxa livre de risco
+            
+        Returns:
+            Sharpe Ratio
+        """
+        if returns is None or len(returns) < 2:
+            return 0.0
+        
+        returns_array = np.array(returns)
+        
+        # Retorno médio
+        mean_return = np.mean(returns_array)
+        
+        # Volatilidade
+        std_return = np.std(returns_array)
+        
+        if std_return == 0:
+            return 0.0
+        
+        # Sharpe Ratio (anualizado)
+        sharpe = (mean_return - risk_free_rate) / std_return * np.sqrt(252)
+        
+        return float(sharpe)
+    
+    def calculate_max_drawdown(self, equity_curve: List[float]) -> Tuple[float, int, int]:
+        """
+        Calcula Maximum Drawdown
+        
+        Args:
+            equity_curve: Curva de capital
+            
+        Returns:
+            Tupla (max_drawdown, start_idx, end_idx)
+        """
+        if equity_curve is None or len(equity_curve) == 0:
+            return 0.0, 0, 0
+        
+        equity_array = np.array(equity_curve)
+        
+        # Calcular peak (máximo acumulado)
+        peak = np.maximum.accumulate(equity_array)
+        
+        # Calcular drawdown
+        drawdown = (equity_array - peak) / peak
+        
+        # Encontrar máximo drawdown
+        max_dd_idx = np.argmin(drawdown)
+        max_dd = drawdown[max_dd_idx]
+        
+        # Encontrar início do drawdown
+        start_idx = np.argmax(peak[:max_dd_idx+1])
+        
+        return float(max_dd * 100), int(start_idx), int(max_dd_idx)
+    
+    def backtest_buy_and_hold(
+        self,
+        ticker: str,
+        prices: List[float],
+        dates: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Backtesting de estratégia Buy and Hold
+        
+        Args:
+            ticker: Ticker do ativo
+            prices: Lista de preços
+            dates: Lista de datas (opcional)
+            
+        Returns:
+            Resultados do backtest
+        """
+        if not prices or len(prices) < 2:
+            raise ValueError("Necessário pelo menos 2 preços")
+        
+        # Calcular número de ações que podem ser compradas
+        shares = self.initial_capital / prices[0]
+        
+        # Calcular valor do portfólio ao longo do tempo
+        equity_curve = [price * shares for price in prices]
+        
+        # Calcular retornos
+        returns = self.calculate_returns(equity_curve)
+        
+        # Calcular métricas
+        final_capital = equity_curve[-1]
+        total_return = ((final_capital - self.initial_capital) / self.initial_capital) * 100
+        
+        sharpe_ratio = self.calculate_sharpe_ratio(returns)
+        max_dd, dd_start, dd_end = self.calculate_max_drawdown(equity_curve)
+        
+        # Preparar resultado
+        result = {
+            'strategy': 'buy_and_hold',
+            'ticker': ticker,
+            'period': {
+                'start': dates[0] if dates else 'N/A',
+                'end': dates[-1] if dates else 'N/A',
+                'days': len(prices)
+            },
+            'capital': {
+                'initial': round(self.initial_capital, 2),
+                'final': round(final_capital, 2),
+                'peak': round(max(equity_curve), 2)
+            },
+            'metrics': {
+                'total_return': round(total_return, 2),
+                'sharpe_ratio': round(sharpe_ratio, 2),
+                'max_drawdown': round(max_dd, 2),
+                'volatility': round(np.std(returns) * np.sqrt(252) * 100, 2) if returns else 0
+            },
+            'equity_curve': [round(e, 2) for e in equity_curve],
+            'executed_at': datetime.now().isoformat()
+        }
+        
+        return result
+    
+    def align_prices(
+        self,
+        prices_history: Dict[str, List[float]],
+        dates: Optional[Union[List[str], Dict[str, List[str]]]] = None
+    ) -> Tuple[Optional[List[str]], np.ndarray]:
+        """
+        Alinha os preços em uma matriz (dias x ativos)
+        
+        Com datas por ticker ({ticker: [datas ISO]}), o índice é a união das
+        datas no período em que todos os ativos têm histórico, e cada ativo
+        repete o último preço conhecido nos dias em que não negociou. Sem
+        datas por ticker, as séries são tratadas como do mesmo calendário a
+        partir do primeiro dia e cortadas no tamanho da menor.
+        
+        Args:
+            prices_history: Dicionário {ticker: [preços]}
+            dates: Lista de datas comum ou dicionário {ticker: [datas]}
+            
+        Returns:
+            Tupla (datas do índice ou None, matriz de preços)
+        """
+        tickers = list(prices_history)
+        
+        if not isinstance(dates, dict):
+            min_length = min(len(prices_history[ticker]) for ticker in tickers)
+            prices = np.column_stack([
+                np.asarray(prices_history[ticker][:min_length], dtype=float) for ticker in tickers
+            ])
+            return (list(dates[:min_length]) if dates else None), prices
+        
+        missing = [ticker for ticker in tickers if ticker not in dates]
+        if missing:
+            raise ValueError(f"Datas ausentes para: {', '.join(missing)}")
+        
+        # Calendários distintos: (datas originais, datas ordenadas, ordem);
+        # ativos do mesmo mercado costumam compartilhar o mesmo
+        calendars = []
+        calendar_of = []
+        for ticker in tickers:
+            ticker_dates = dates[ticker]
+            if len(ticker_dates) != len(prices_history[ticker]):
+                raise ValueError(f"{ticker}: {len(prices_history[ticker])} preços para {len(ticker_dates)} datas")
+            for k, calendar in enumerate(calendars):
+                if calendar[0] == ticker_dates:
+                    break
+            else:
+                sorted_dates = np.asarray(ticker_dates)
+                order = np.argsort(sorted_dates, kind='stable')
+                calendars.append((ticker_dates, sorted_dates[order], order))
+                k = len(calendars) - 1
+            calendar_of.append(k)
+        
+        # Período em que todos os ativos têm histórico
+        start = max(calendar[1][0] for calendar in calendars)
+        end = min(calendar[1][-1] for calendar in calendars)
+        if start > end:
+            raise ValueError("Os ativos não têm período em comum")
+        
+        if len(calendars) == 1:
+            index = np.unique(calendars[0][1])
+        else:
+            index = np.unique(np.concatenate([calendar[1] for calendar in calendars]))
+        index = index[(index >= start) & (index <= end)]
+        
+        # Posição do último preço conhecido de cada calendário em cada data
+        positions = [calendar[2][np.searchsorted(calendar[1], index, side='right') - 1]
+                     for calendar in calendars]
+        
+        prices = np.empty((len(index), len(tickers)))
+        for j, ticker in enumerate(tickers):
+            prices[:, j] = np.asarray(prices_history[ticker], dtype=float)[positions[calendar_of[j]]]
+        
+        return index.tolist(), prices
+    
+    def _threshold_rebalance_points(
+        self,
+        prices: np.ndarray,
+        weights: np.ndarray,
+        threshold: float
+    ) -> np.ndarray:
+        """
+        Dias em que algum peso se afasta do alvo mais que `threshold`
+        
+        A partir de cada rebalanceamento, os pesos de todos os dias seguintes
+        são calculados de uma vez (em janelas) até o primeiro desvio.
+        """
+        n_days = len(prices)
+        points = [0]
+        start = 0
+        scan_from = 1
+        while scan_from < n_days:
+            stop = min(scan_from + THRESHOLD_SCAN_WINDOW, n_days)
+            holdings = weights * (prices[scan_from:stop] / prices[start])
+            drift = np.abs(holdings / holdings.sum(axis=1, keepdims=True) - weights).max(axis=1)
+            breached = np.flatnonzero(drift > threshold)
+            if len(breached):
+                start = scan_from + int(breached[0])
+                points.append(start)
+                scan_from = start + 1
+            else:
+                scan_from = stop
+        return np.array(points)
+    
+    def portfolio_equity_curve(
+        self,
+        prices: np.ndarray,
+        weights: np.ndarray,
+        rebalance: str = 'none',
+        rebalance_every: int = 21,
+        rebalance_threshold: float = 0.05
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Curva de capital de um portfólio sobre a matriz de preços
+        
+        Entre dois rebalanceamentos as quantidades ficam fixas, então o valor
+        de cada dia é o crescimento dos preços desde o último rebalanceamento
+        ponderado pelos pesos alvo: um único produto matricial para a série
+        inteira.
+        
+        Args:
+            prices: Matriz de preços (dias x ativos)
+            weights: Pesos alvo, na ordem das colunas
+            rebalance: 'none' (buy and hold), 'periodic' ou 'threshold'
+            rebalance_every: Dias entre rebalanceamentos ('periodic')
+            rebalance_threshold: Desvio máximo de um peso ('threshold')
+            
+        Returns:
+            Tupla (curva de capital, índices dos dias de rebalanceamento)
+        """
+        if rebalance not in REBALANCE_MODES:
+            raise ValueError(f"Modo de rebalanceamento inválido: {rebalance}")
+        
+        n_days = len(prices)
+        if rebalance == 'periodic':
+            if rebalance_every < 1:
+                raise ValueError("rebalance_every deve ser ao menos 1")
+            points = np.arange(0, n_days, rebalance_every)
+        elif rebalance == 'threshold':
+            points = self._threshold_rebalance_points(prices, weights, rebalance_threshold)
+        else:
+            points = np.array([0])
+        
+        return self._segment_equity(prices, weights, points), points
+    
+    def _segment_equity(self, prices: np.ndarray, weights: np.ndarray, points: np.ndarray) -> np.ndarray:
+        """
+        Curvas de capital com rebalanceamento nos dias `points`
+        
+        `weights` pode ser um vetor (uma carteira) ou uma matriz carteiras x
+        ativos, que gera uma curva por linha (carteiras x dias).
+        """
+        # Último rebalanceamento antes de cada dia
+        segment = np.searchsorted(points, np.arange(len(prices)), side='right') - 1
+        growth = weights @ (prices / prices[points[segment]]).T
+        
+        # Capital em cada rebalanceamento
+        segment_growth = weights @ (prices[points[1:]] / prices[points[:-1]]).T
+        capital = self.initial_capital * np.concatenate(
+            (np.ones(segment_growth.shape[:-1] + (1,)), np.cumprod(segment_growth, axis=-1)), axis=-1
+        )
+        
+        # Capital repetido em cada dia do seu segmento
+        lengths = np.diff(np.append(points, len(prices)))
+        return np.repeat(capital, lengths, axis=-1) * growth
+    
+    def _curve_metrics(self, equity_curves: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Métricas de cada linha de uma matriz de curvas (carteiras x dias),
+        nas mesmas definições de backtest_portfolio
+        """
+        n_curves, n_days = equity_curves.shape
+        returns = np.diff(equity_curves, axis=1) / equity_curves[:, :-1]
+        
+        std = returns.std(axis=1) if n_days > 1 else np.zeros(n_curves)
+        if n_days > 2:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                sharpe = np.where(std > 0, returns.mean(axis=1) / std * np.sqrt(252), 0.0)
+        else:
+            sharpe = np.zeros(n_curves)
+        
+        peak = np.maximum.accumulate(equity_curves, axis=1)
+        
+        return {
+            'final_capital': equity_curves[:, -1],
+            'total_return': (equity_curves[:, -1] - self.initial_capital) / self.initial_capital * 100,
+            'sharpe_ratio': sharpe,
+            'max_drawdown': ((equity_curves - peak) / peak).min(axis=1) * 100,
+            'volatility': std * np.sqrt(252) * 100
+        }
+    
+    def backtest_allocations(
+        self,
+        weights: np.ndarray,
+        tickers: List[str],
+        prices_history: Dict[str, List[float]],
+        dates: Optional[Union[List[str], Dict[str, List[str]]]] = None,
+        rebalance: str = 'none',
+        rebalance_every: int = 21,
+        rank_by: str = 'sharpe_ratio',
+        top_n: Optional[int] = None
+    ) -> Dict:
+        """
+        Varredura de alocações: backtest de várias carteiras de uma vez
+        
+        Todas as carteiras usam a mesma matriz de preços alinhada; as curvas
+        saem de um produto matricial por bloco de SWEEP_CHUNK_SIZE carteiras
+        e as métricas são calculadas por linha.
+        
+        Args:
+            weights: Matriz carteiras x ativos (cada linha soma 1)
+            tickers: Ativos das colunas de `weights`
+            prices_history: Dicionário {ticker: [preços]}
+            dates: Lista de datas comum ou dicionário {ticker: [datas]}
+            rebalance: 'none' (buy and hold) ou 'periodic'; o modo
+                'threshold' depende da trajetória de cada carteira e não
+                é suportado na varredura
+            rebalance_every: Dias entre rebalanceamentos ('periodic')
+            rank_by: Métrica de ordenação (ver SWEEP_RANK_METRICS)
+            top_n: Devolver apenas as N melhores (padrão: todas)
+            
+        Returns:
+            Tabela de métricas ordenada
+        """
+        if rank_by not in SWEEP_RANK_METRICS:
+            raise ValueError(f"Métrica de ordenação inválida: {rank_by}")
+        if rebalance not in ('none', 'periodic'):
+            raise ValueError(f"Modo de rebalanceamento inválido na varredura: {rebalance}")
+        
+        weights = np.atleast_2d(np.asarray(weights, dtype=float))
+        if weights.shape[1] != len(tickers):
+            raise ValueError(f"Matriz de pesos com {weights.shape[1]} colunas para {len(tickers)} tickers")
+        
+        invalid = np.flatnonzero(np.abs(weights.sum(axis=1) - 1.0) > 0.01)
+        if len(invalid):
+            raise ValueError(f"{len(invalid)} carteira(s) com soma dos pesos diferente de 1.0 "
+                             f"(primeira: linha {invalid[0]})")
+        
+        missing = [ticker for ticker in tickers if ticker not in prices_history]
+        if missing:
+            raise ValueError(f"Histórico ausente para: {', '.join(missing)}")
+        
+        index, prices = self.align_prices(
+            {ticker: prices_history[ticker] for ticker in tickers},
+            {ticker: dates[ticker] for ticker in tickers if ticker in dates} if isinstance(dates, dict) else dates
+        )
+        
+        if rebalance == 'periodic':
+            if rebalance_every < 1:
+                raise ValueError("rebalance_every deve ser ao menos 1")
+            points = np.arange(0, len(prices), rebalance_every)
+        else:
+            points = np.array([0])
+        
+        chunks = [
+            self._curve_metrics(self._segment_equity(prices, weights[start:start + SWEEP_CHUNK_SIZE], points))
+            for start in range(0, len(weights), SWEEP_CHUNK_SIZE)
+        ]
+        metrics = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+        
+        # Ordenação estável: empates mantêm a ordem das carteiras
+        key = metrics[rank_by] if not SWEEP_RANK_METRICS[rank_by] else -metrics[rank_by]
+        ranking = np.argsort(key, kind='stable')
+        if top_n is not None:
+            ranking = ranking[:top_n]
+        
+        results = []
+        for rank, i in enumerate(ranking, start=1):
+            results.append({
+                'rank': rank,
+                'candidate': int(i),
+                'weights': {
+                    ticker: round(float(weight * 100), 2)
+                    for ticker, weight in zip(tickers, weights[i]) if weight > 0.0001
+                },
+                'final_capital': round(float(metrics['final_capital'][i]), 2),
+                'metrics': {
+                    'total_return': round(float(metrics['total_return'][i]), 2),
+                    'sharpe_ratio': round(float(metrics['sharpe_ratio'][i]), 2),
+                    'max_drawdown': round(float(metrics['max_drawdown'][i]), 2),
+                    'volatility': round(float(metrics['volatility'][i]), 2)
+                }
+            })
+        
+        return {
+            'strategy': 'allocation_sweep',
+            'tickers': list(tickers),
+            'rebalance': {'mode': rebalance, 'every': rebalance_every} if rebalance == 'periodic' else {'mode': rebalance},
+            'period': {
+                'start': index[0] if index else 'N/A',
+                'end': index[-1] if index else 'N/A',
+                'days': len(prices)
+            },
+            'n_candidates': len(weights),
+            'rank_by': rank_by,
+            'results': results,
+            'executed_at': datetime.now().isoformat()
+        }
+    
+    def backtest_portfolio(
+        self,
+        allocations: Dict[str, float],
+        prices_history: Dict[str, List[float]],
+        dates: Optional[Union[List[str], Dict[str, List[str]]]] = None,
+        rebalance: str = 'none',
+        rebalance_every: int = 21,
+        rebalance_threshold: float = 0.05
+    ) -> Dict:
+        """
+        Backtesting de portfólio com múltiplos ativos
+        
+        Args:
+            allocations: Dicionário {ticker: peso}
+            prices_history: Dicionário {ticker: [preços]}
+            dates: Lista de datas comum ou dicionário {ticker: [datas]}
+                para alinhar os ativos por data (opcional)
+            rebalance: 'none' (buy and hold), 'periodic' ou 'threshold'
+            rebalance_every: Dias entre rebalanceamentos ('periodic')
+            rebalance_threshold: Desvio máximo de um peso ('threshold')
+            
+        Returns:
+            Resultados do backtest
+        """
+        # Validar alocações
+        total_weight = sum(allocations.values())
+        if abs(total_weight - 1.0) > 0.01:
+            raise ValueError(f"Soma dos pesos deve ser 1.0, obtido: {total_weight}")
+        
+        missing = [ticker for ticker in allocations if ticker not in prices_history]
+        if missing:
+            raise ValueError(f"Histórico ausente para: {', '.join(missing)}")
+        
+        tickers = list(allocations)
+        index, prices = self.align_prices(
+            {ticker: prices_history[ticker] for ticker in tickers},
+            {ticker: dates[ticker] for ticker in tickers if ticker in dates} if isinstance(dates, dict) else dates
+        )
+        weights = np.array([allocations[ticker] for ticker in tickers], dtype=float)
+        
+        equity_curve, points = self.portfolio_equity_curve(
+            prices, weights, rebalance, rebalance_every, rebalance_threshold
+        )
+        
+        # Calcular retornos
+        returns = np.diff(equity_curve) / equity_curve[:-1]
+        
+        # Calcular métricas
+        final_capital = float(equity_curve[-1])
+        total_return = ((final_capital - self.initial_capital) / self.initial_capital) * 100
+        
+        sharpe_ratio = self.calculate_sharpe_ratio(returns)
+        max_dd, dd_start, dd_end = self.calculate_max_drawdown(equity_curve)
+        
+        rebalance_info = {'mode': rebalance, 'count': len(points) - 1}
+        if rebalance == 'periodic':
+            rebalance_info['every'] = rebalance_every
+        elif rebalance == 'threshold':
+            rebalance_info['threshold'] = rebalance_threshold
+        if index is not None and rebalance != 'none':
+            rebalance_info['dates'] = [index[i] for i in points[1:]]
+        
+        # Preparar resultado
+        result = {
+            'strategy': 'portfolio',
+            'allocations': allocations,
+            'rebalance': rebalance_info,
+            'period': {
+                'start': index[0] if index else 'N/A',
+                'end': index[-1] if index else 'N/A',
+                'days': len(equity_curve)
+            },
+            'capital': {
+                'initial': round(self.initial_capital, 2),
+                'final': round(final_capital, 2),
+                'peak': round(float(equity_curve.max()), 2)
+            },
+            'metrics': {
+                'total_return': round(total_return, 2),
+                'sharpe_ratio': round(sharpe_ratio, 2),
+                'max_drawdown': round(max_dd, 2),
+                'volatility': round(float(np.std(returns)) * np.sqrt(252) * 100, 2) if len(returns) else 0
+            },
+            'equity_curve': np.round(equity_curve, 2).tolist(),
+            'executed_at': datetime.now().isoformat()
+        }
+        
+        return result
+    
+    def compare_with_benchmark(
+        self,
+        strategy_result: Dict,
+        benchmark_prices: List[float],
+        benchmark_name: str = 'Benchmark'
+    ) -> Dict:
+        """
+        Compara estratégia com benchmark
+        
+        Args:
+            strategy_result: Resultado da estratégia
+            benchmark_prices: Preços do benchmark
+            benchmark_name: Nome do benchmark
+            
+        Returns:
+            Comparação
+        """
+        # Backtest do benchmark
+        benchmark_shares = self.initial_capital / benchmark_prices[0]
+        benchmark_curve = [price * benchmark_shares for price in benchmark_prices]
+        
+        benchmark_returns = self.calculate_returns(benchmark_curve)
+        benchmark_final = benchmark_curve[-1]
+        benchmark_return = ((benchmark_final - self.initial_capital) / self.initial_capital) * 100
+        
+        # Comparação
+        comparison = {
+            'strategy': {
+                'name': strategy_result['strategy'],
+                'return': strategy_result['metrics']['total_return'],
+                'sharpe': strategy_result['metrics']['sharpe_ratio'],
+                'max_dd': strategy_result['metrics']['max_drawdown']
+            },
+            'benchmark': {
+                'name': benchmark_name,
+                'return': round(benchmark_return, 2),
+                'sharpe': round(self.calculate_sharpe_ratio(benchmark_returns), 2),
+                'max_dd': round(self.calculate_max_drawdown(benchmark_curve)[0], 2)
+            },
+            'outperformance': {
+                'return': round(strategy_result['metrics']['total_return'] - benchmark_return, 2),
+                'sharpe': round(strategy_result['metrics']['sharpe_ratio'] - self.calculate_sharpe_ratio(benchmark_returns), 2)
+            }
+        }
+        
+        return comparison
+    
+    def save_result(self, result: Dict, filename: Optional[str] = None) -> str:
+        """
+        Salva resultado do backtest
+        
+        Sem `filename` o resultado vai para o ResultsStore (métricas
+        indexadas e curva em float32 comprimido) e recebe `result_id`; com
+        `filename` é exportado em JSON como antes.
+        
+        Args:
+            result: Resultado do backtest
+            filename: Nome do arquivo JSON (opcional)
+            
+        Returns:
+            Caminho do arquivo salvo
+        """
+        if not filename:
+            result['result_id'] = self.store.save(result)
+            return self.store.db_path
+        
+        filepath = os.path.join(self.results_dir, filename)
+        
+        with open(filepath, 'w') as f:
+            json.dump(result, f, indent=2)
+        
+        return filepath
+
+
+# ============================================================================
+# TESTES
+# ============================================================================
+
+if __name__ == '__main__':
+    """Testes do backtester"""
+    
+    backtester = Backtester(initial_capital=10000)
+    
+    print("=" * 60)
+    print("TESTE DO SISTEMA DE BACKTESTING")
+    print("=" * 60)
+    
+    # Gerar dados sintéticos
+    np.random.seed(42)
+    
+    # Ativo 1: Tendência de alta
+    prices1 = [30 + i * 0.1 + np.random.normal(0, 0.5) for i in range(252)]
+    
+    # Ativo 2: Lateral
+    prices2 = [50 + np.random.normal(0, 1) for i in range(252)]
+    
+    # Teste 1: Buy and Hold
+    print("\n1. Backtesting Buy and Hold (Ativo 1):")
+    result = backtester.backtest_buy_and_hold('TEST1', prices1)
+    
+    print(f"   Capital inicial: R$ {result['capital']['initial']:.2f}")
+    print(f"   Capital final: R$ {result['capital']['final']:.2f}")
+    print(f"   Retorno total: {result['metrics']['total_return']:.2f}%")
+    print(f"   Sharpe Ratio: {result['metrics']['sharpe_ratio']:.2f}")
+    print(f"   Max Drawdown: {result['metrics']['max_drawdown']:.2f}%")
+    print(f"   Volatilidade: {result['metrics']['volatility']:.2f}%")
+    
+    # Teste 2: Portfólio
+    print("\n2. Backtesting de Portfólio:")
+    allocations = {
+        'TEST1': 0.6,
+        'TEST2': 0.4
+    }
+    prices_history = {
+        'TEST1': prices1,
+        'TEST2': prices2
+    }
+    
+    result_portfolio = backtester.backtest_portfolio(allocations, prices_history)
+    
+    print(f"   Alocação: TEST1 60%, TEST2 40%")
+    print(f"   Capital inicial: R$ {result_portfolio['capital']['initial']:.2f}")
+    print(f"   Capital final: R$ {result_portfolio['capital']['final']:.2f}")
+    print(f"   Retorno total: {result_portfolio['metrics']['total_return']:.2f}%")
+    print(f"   Sharpe Ratio: {result_portfolio['metrics']['sharpe_ratio']:.2f}")
+    
+    # Teste 3: Comparação com benchmark
+    print("\n3. Comparação com Benchmark:")
+    comparison = backtester.compare_with_benchmark(result, prices2, 'Benchmark')
+    
+    print(f"   Estratégia: {comparison['strategy']['return']:.2f}%")
+    print(f"   Benchmark: {comparison['benchmark']['return']:.2f}%")
+    print(f"   Outperformance: {comparison['outperformance']['return']:.2f}%")
+    
+    # Teste 4: Salvar resultado
+    print("\n4. Salvando resultado:")
+    filepath = backtester.save_result(result)
+    print(f"   ✅ Salvo em: {filepath} (id {result['result_id']})")
+    print(f"   Tamanho: {os.path.getsize(filepath) / 1024:.1f} KB")
+    
+    print("\n" + "=" * 60)
+    print("TESTES CONCLUÍDOS")
+    print("=" * 60)
+
@@ -0,0 +1,921 @@
+#!/usr/bin/env python3
+"""
+Magnus Wealth - Portfolio Optimizer
+Otimizador de portfólio usando Teoria Moderna de Portfólio (Markowitz)
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+
+import numpy as np
+from scipy.optimize import minimize
+from sklearn.covariance import ledoit_wolf
+
+# Dias úteis usados na anualização
+TRADING_DAYS = 252
+
+# Estimadores de covariância disponíveis
+COVARIANCE_METHODS = ('sample', 'ledoit_wolf', 'ewma')
+
+# Decaimento padrão do EWMA (RiskMetrics)
+EWMA_DECAY = 0.94
+
+# Universos com estatísticas mantidas em memória ao mesmo tempo
+STATS_CACHE_SIZE = int(os.getenv('PORTFOLIO_STATS_CACHE', '64'))
+
+
+@dataclass(frozen=True)
+class PortfolioStatistics:
+    """
+    Estatísticas de um universo de ativos, na ordem de `tickers`
+    
+    Os arrays são somente leitura: a mesma instância é compartilhada por
+    todas as chamadas que usam o mesmo histórico.
+    """
+    tickers: Tuple[str, ...]
+    returns_matrix: np.ndarray  # Retornos diários alinhados pelo fim (dias x ativos)
+    expected_returns: np.ndarray  # Retorno médio anualizado (histórico completo de cada ativo)
+    volatilities: np.ndarray  # Volatilidade anualizada
+    covariance: np.ndarray  # Covariância anualizada
+    covariance_method: str
+    shrinkage: Optional[float] = None  # Intensidade do Ledoit-Wolf
+
+
+_stats_cache: 'OrderedDict[Tuple, PortfolioStatistics]' = OrderedDict()
+_stats_lock = threading.Lock()
+
+
+def price_history_fingerprint(prices_history: Dict[str, List[float]]) -> str:
+    """
+    Impressão digital de um histórico de preços
+    
+    Cobre os tickers, a ordem, o tamanho de cada série (período) e os
+    próprios preços (versão dos dados): qualquer alteração gera outra chave.
+    """
+    digest = hashlib.sha1()
+    for ticker, prices in prices_history.items():
+        prices_array = np.asarray(prices, dtype=np.float64)
+        digest.update(str(ticker).encode('utf-8'))
+        digest.update(len(prices_array).to_bytes(8, 'little'))
+        digest.update(prices_array.tobytes())
+    return digest.hexdigest()
+
+
+def get_statistics(
+    prices_history: Dict[str, List[float]],
+    covariance_method: str = 'sample',
+    ewma_decay: float = EWMA_DECAY
+) -> PortfolioStatistics:
+    """
+    Estatísticas do histórico, reaproveitadas entre chamadas (cache LRU)
+    
+    Args:
+        prices_history: Dicionário {ticker: [preços]}
+        covariance_method: 'sample', 'ledoit_wolf' ou 'ewma'
+        ewma_decay: Fator de decaimento do EWMA
+        
+    Returns:
+        PortfolioStatistics
+    """
+    if covariance_method not in COVARIANCE_METHODS:
+        raise ValueError(f"Estimador de covariância inválido: {covariance_method}")
+    
+    key = (price_history_fingerprint(prices_history), covariance_method,
+           ewma_decay if covariance_method == 'ewma' else None)
+    
+    with _stats_lock:
+        stats = _stats_cache.get(key)
+        if stats is not None:
+            _stats_cache.move_to_end(key)
+            return stats
+    
+    stats = compute_statistics(prices_history, covariance_method, ewma_decay)
+    
+    with _stats_lock:
+        _stats_cache[key] = stats
+        _stats_cache.move_to_end(key)
+        while len(_stats_cache) > STATS_CACHE_SIZE:
+            _stats_cache.popitem(last=False)
+    
+    return stats
+
+
+def clear_statistics_cache():
+    """Remove todas as estatísticas do cache"""
+    with _stats_lock:
+        _stats_cache.clear()
+
+
+def compute_statistics(
+    prices_history: Dict[str, List[float]],
+    covariance_method: str = 'sample',
+    ewma_decay: float = EWMA_DECAY
+) -> PortfolioStatistics:
+    """
+    Calcula as estatísticas do histórico (sem cache)
+    
+    Retorno e volatilidade de cada ativo usam o histórico completo dele; a
+    covariância usa os últimos dias em comum a todos. Ativos com menos de
+    dois preços têm retorno e volatilidade zero.
+    """
+    tickers = tuple(prices_history.keys())
+    series = [np.asarray(prices_history[ticker], dtype=np.float64) for ticker in tickers]
+    lengths = {len(prices) for prices in series}
+    
+    if len(lengths) == 1:
+        # Mesmo tamanho: uma única operação sobre a matriz de preços
+        prices_matrix = np.array(series).reshape(len(series), -1)
+        daily_returns = list(np.diff(prices_matrix, axis=1) / prices_matrix[:, :-1])
+    else:
+        daily_returns = [np.diff(prices) / prices[:-1] for prices in series]
+    
+    expected_returns = np.array([r.mean() * TRADING_DAYS if len(r) else 0.0 for r in daily_returns])
+    volatilities = np.array([r.std() * np.sqrt(TRADING_DAYS) if len(r) else 0.0 for r in daily_returns])
+    
+    # Garantir que todos tenham o mesmo tamanho (alinhados pelo fim)
+    min_length = min(len(r) for r in daily_returns)
+    returns_matrix = np.array([r[len(r) - min_length:] for r in daily_returns]).T
+    
+    shrinkage = None
+    if covariance_method == 'ledoit_wolf':
+        covariance, shrinkage = ledoit_wolf(returns_matrix)
+        shrinkage = float(shrinkage)
+    elif covariance_method == 'ewma':
+        # Peso λ^k para o retorno de k dias atrás
+        weights = ewma_decay ** np.arange(min_length - 1, -1, -1, dtype=float)
+        covariance = np.cov(returns_matrix, rowvar=False, aweights=weights)
+    else:
+        covariance = np.cov(returns_matrix, rowvar=False)
+    
+    covariance = np.atleast_2d(covariance) * TRADING_DAYS  # Anualizar (2D mesmo com um ativo)
+    
+    if covariance_method != 'sample':
+        # Volatilidades coerentes com o estimador de risco
+        volatilities = np.sqrt(np.diag(covariance))
+    
+    for array in (returns_matrix, expected_returns, volatilities, covariance):
+        array.setflags(write=False)
+    
+    return PortfolioStatistics(
+        tickers=tickers,
+        returns_matrix=returns_matrix,
+        expected_returns=expected_returns,
+        volatilities=volatilities,
+        covariance=covariance,
+        covariance_method=covariance_method,
+        shrinkage=shrinkage
+    )
+
+
+class PortfolioOptimizer:
+    """
+    Otimizador de portfólio usando Modern Portfolio Theory (MPT)
+    """
+    
+    def __init__(self, covariance_method: str = 'sample', ewma_decay: float = EWMA_DECAY):
+        """
+        Inicializa o otimizador
+        
+        Args:
+            covariance_method: Estimador de covariância ('sample',
+                'ledoit_wolf' ou 'ewma')
+            ewma_decay: Fator de decaimento do EWMA
+        """
+        if covariance_method not in COVARIANCE_METHODS:
+            raise ValueError(f"Estimador de covariância inválido: {covariance_method}")
+        
+        self.covariance_method = covariance_method
+        self.ewma_decay = ewma_decay
+        self.statistics = None
+        self.returns = {}
+        self.volatilities = {}
+        self.covariance_matrix = None
+        self.tickers = []
+        # Retornos esperados em vetor, na ordem de self.tickers
+        self.expected_returns = None
+    
+    def _statistics(self, prices_history: Dict[str, List[float]]) -> PortfolioStatistics:
+        return get_statistics(prices_history, self.covariance_method, self.ewma_decay)
+    
+    def calculate_returns(self, prices_history: Dict[str, List[float]]) -> Dict[str, float]:
+        """
+        Calcula retornos esperados de cada ativo
+        
+        Args:
+            prices_history: Dicionário {ticker: [preços]}
+            
+        Returns:
+            Dicionário {ticker: retorno_esperado}
+        """
+        stats = self._statistics(prices_history)
+        
+        # Retorno médio diário anualizado (252 dias úteis)
+        self.returns = dict(zip(stats.tickers, stats.expected_returns.tolist()))
+        self.expected_returns = stats.expected_returns
+        return self.returns
+    
+    def calculate_volatility(self, prices_history: Dict[str, List[float]]) -> Dict[str, float]:
+        """
+        Calcula volatilidade (risco) de cada ativo
+        
+        Args:
+            prices_history: Dicionário {ticker: [preços]}
+            
+        Returns:
+            Dicionário {ticker: volatilidade}
+        """
+        stats = self._statistics(prices_history)
+        
+        # Desvio padrão anualizado
+        self.volatilities = dict(zip(stats.tickers, stats.volatilities.tolist()))
+        return self.volatilities
+    
+    def calculate_covariance_matrix(self, prices_history: Dict[str, List[float]]) -> np.ndarray:
+        """
+        Calcula matriz de covariância entre ativos
+        
+        Args:
+            prices_history: Dicionário {ticker: [preços]}
+            
+        Returns:
+            Matriz de covariância
+        """
+        stats = self._statistics(prices_history)
+        
+        self.tickers = list(stats.tickers)
+        self.covariance_matrix = stats.covariance
+        return stats.covariance
+    
+    def prepare_statistics(self, prices_history: Dict[str, List[float]]) -> PortfolioStatistics:
+        """
+        Carrega retornos, volatilidades e covariância do histórico
+        
+        As estatísticas vêm do cache compartilhado: chamadas repetidas sobre
+        o mesmo universo (otimização, mínima volatilidade, fronteira,
+        avaliação) reaproveitam o mesmo cálculo.
+        
+        Args:
+            prices_history: Dicionário {ticker: [preços]}
+            
+        Returns:
+            PortfolioStatistics
+        """
+        stats = self._statistics(prices_history)
+        
+        self.statistics = stats
+        self.tickers = list(stats.tickers)
+        self.returns = dict(zip(stats.tickers, stats.expected_returns.tolist()))
+        self.volatilities = dict(zip(stats.tickers, stats.volatilities.tolist()))
+        self.expected_returns = stats.expected_returns
+        self.covariance_matrix = stats.covariance
+        return stats
+    
+    def evaluate_portfolio(
+        self,
+        prices_history: Dict[str, List[float]],
+        weights: Dict[str, float]
+    ) -> Dict:
+        """
+        Avalia uma alocação sobre o histórico
+        
+        Args:
+            prices_history: Dicionário {ticker: [preços]}
+            weights: Dicionário {ticker: peso}; ausentes valem zero e os
+                pesos são normalizados para somar 1
+            
+        Returns:
+            Métricas do portfólio
+        """
+        self.prepare_statistics(prices_history)
+        
+        unknown = set(weights) - set(self.tickers)
+        if unknown:
+            raise ValueError(f"Tickers sem histórico: {', '.join(sorted(unknown))}")
+        
+        w = np.array([weights.get(ticker, 0.0) for ticker in self.tickers], dtype=float)
+        if w.sum() <= 0:
+            raise ValueError("A soma dos pesos deve ser positiva")
+        w = w / w.sum()
+        
+        portfolio_return, portfolio_volatility, sharpe_ratio = self.calculate_portfolio_metrics(w)
+        
+        return {
+            'weights': {ticker: round(float(weight * 100), 2) for ticker, weight in zip(self.tickers, w)},
+            'portfolio_metrics': {
+                'expected_return': round(portfolio_return * 100, 2),
+                'volatility': round(portfolio_volatility * 100, 2),
+                'sharpe_ratio': round(sharpe_ratio, 2)
+            },
+            'covariance_method': self.covariance_method,
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    def calculate_portfolio_metrics(self, weights: np.ndarray) -> Tuple[float, float, float]:
+        """
+        Calcula métricas do portfólio
+        
+        Args:
+            weights: Pesos dos ativos
+            
+        Returns:
+            Tupla (retorno, volatilidade, sharpe_ratio)
+        """
+        weights = np.asarray(weights, dtype=float)
+        
+        # Retorno e variância do portfólio: w·μ e wᵀΣw
+        portfolio_return = float(weights @ self.expected_returns)
+        portfolio_variance = float(weights @ self.covariance_matrix @ weights)
+        portfolio_volatility = np.sqrt(max(portfolio_variance, 0.0))
+        
+        # Sharpe Ratio (assumindo taxa livre de risco = 0)
+        sharpe_ratio = portfolio_return / portfolio_volatility if portfolio_volatility > 0 else 0
+        
+        return portfolio_return, portfolio_volatility, sharpe_ratio
+    
+    def _negative_sharpe(self, weights: np.ndarray) -> Tuple[float, np.ndarray]:
+        """
+        -Sharpe do portfólio e seu gradiente analítico
+        
+        ∇S = μ/σ - r·Σw/σ³, com r = w·μ e σ = √(wᵀΣw)
+        """
+        cov_w = self.covariance_matrix @ weights
+        portfolio_return = weights @ self.expected_returns
+        volatility = np.sqrt(max(weights @ cov_w, 0.0))
+        
+        if volatility == 0:
+            return 0.0, np.zeros_like(weights)
+        
+        sharpe = portfolio_return / volatility
+        gradient = self.expected_returns / volatility - portfolio_return * cov_w / volatility ** 3
+        return -sharpe, -gradient
+    
+    def _portfolio_volatility(self, weights: np.ndarray) -> Tuple[float, np.ndarray]:
+        """
+        Volatilidade do portfólio e seu gradiente analítico (Σw/σ)
+        """
+        cov_w = self.covariance_matrix @ weights
+        volatility = np.sqrt(max(weights @ cov_w, 0.0))
+        
+        if volatility == 0:
+            return 0.0, np.zeros_like(weights)
+        
+        return volatility, cov_w / volatility
+    
+    def _solve_min_volatility(self, initial_weights: np.ndarray, target_return: Optional[float] = None):
+        """
+        Carteira de mínima volatilidade (pesos entre 0 e 1), com retorno
+        mínimo opcional, sobre as estatísticas já calculadas
+        
+        Args:
+            initial_weights: Ponto de partida do SLSQP
+            target_return: Retorno alvo (opcional)
+            
+        Returns:
+            Resultado do scipy.optimize.minimize
+        """
+        n_assets = len(initial_weights)
+        
+        # Restrições
+        constraints = [self._budget_constraint(n_assets)]  # Soma = 100%
+        
+        # Se houver retorno alvo, adicionar restrição (w·μ >= alvo)
+        if target_return is not None:
+            mu = self.expected_returns
+            constraints.append({
+                'type': 'ineq',
+                'fun': lambda w: w @ mu - target_return,
+                'jac': lambda w: mu
+            })
+        
+        # Otimizar: minimizar volatilidade, com gradiente analítico
+        return minimize(
+            self._portfolio_volatility,
+            initial_weights,
+            jac=True,
+            method='SLSQP',
+            bounds=[(0, 1)] * n_assets,
+            constraints=constraints,
+            options={'maxiter': 1000}
+        )
+    
+    @staticmethod
+    def _budget_constraint(n_assets: int) -> Dict:
+        """Restrição soma dos pesos = 100%, com jacobiano constante"""
+        ones = np.ones(n_assets)
+        return {'type': 'eq', 'fun': lambda w: ones @ w - 1, 'jac': lambda w: ones}
+    
+    def optimize_sharpe_ratio(
+        self,
+        prices_history: Dict[str, List[float]],
+        risk_tolerance: str = 'moderate',
+        min_weight: float = 0.0,
+        max_weight: float = 1.0
+    ) -> Dict:
+        """
+        Otimiza portfólio para maximizar Sharpe Ratio
+        
+        Args:
+            prices_history: Dicionário {ticker: [preços]}
+            risk_tolerance: Tolerância ao risco ('conservative', 'moderate', 'aggressive')
+            min_weight: Peso mínimo por ativo
+            max_weight: Peso máximo por ativo
+            
+        Returns:
+            Dicionário com portfólio otimizado
+        """
+        # Calcular métricas
+        self.prepare_statistics(prices_history)
+        
+        n_assets = len(self.tickers)
+        
+        # Ajustar limites baseado na tolerância ao risco
+        if risk_tolerance == 'conservative':
+            # Portfólio mais diversificado
+            max_weight = min(max_weight, 0.30)  # Máximo 30% em um ativo
+        elif risk_tolerance == 'aggressive':
+            # Permite concentração maior
+            max_weight = min(max_weight, 0.60)  # Máximo 60% em um ativo
+        else:  # moderate
+            max_weight = min(max_weight, 0.40)  # Máximo 40% em um ativo
+        
+        # Restrições
+        constraints = [self._budget_constraint(n_assets)]  # Soma dos pesos = 100%
+        
+        # Limites
+        bounds = [(min_weight, max_weight) for _ in range(n_assets)]
+        
+        # Chute inicial (pesos iguais)
+        initial_weights = np.full(n_assets, 1 / n_assets)
+        
+        # Otimizar: maximizar Sharpe Ratio (minimizar negativo), com gradiente analítico
+        result = minimize(
+            self._negative_sharpe,
+            initial_weights,
+            jac=True,
+            method='SLSQP',
+            bounds=bounds,
+            constraints=constraints,
+            options={'maxiter': 1000}
+        )
+        
+        if not result.success:
+            # Se falhar, usar pesos iguais
+            optimal_weights = initial_weights
+        else:
+            optimal_weights = result.x
+        
+        # Calcular métricas do portfólio otimizado
+        portfolio_return, portfolio_volatility, sharpe_ratio = \
+            self.calculate_portfolio_metrics(optimal_weights)
+        
+        # Preparar resultado
+        allocations = []
+        for i, ticker in enumerate(self.tickers):
+            weight = optimal_weights[i]
+            if weight > 0.01:  # Só incluir se > 1%
+                allocations.append({
+                    'ticker': ticker,
+                    'weight': round(float(weight * 100), 2),  # Percentual
+                    'expected_return': round(self.returns[ticker] * 100, 2),  # Percentual
+                    'volatility': round(self.volatilities[ticker] * 100, 2)  # Percentual
+                })
+        
+        # Ordenar por peso (maior primeiro)
+        allocations.sort(key=lambda x: x['weight'], reverse=True)
+        
+        return {
+            'tickers': self.tickers,
+            'allocations': allocations,
+            'portfolio_metrics': {
+                'expected_return': round(portfolio_return * 100, 2),  # Percentual anual
+                'volatility': round(portfolio_volatility * 100, 2),  # Percentual anual
+                'sharpe_ratio': round(sharpe_ratio, 2)
+            },
+            'risk_tolerance': risk_tolerance,
+            'optimization_status': 'success' if result.success else 'fallback',
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    def optimize_min_volatility(
+        self,
+        prices_history: Dict[str, List[float]],
+        target_return: Optional[float] = None
+    ) -> Dict:
+        """
+        Otimiza portfólio para minimizar volatilidade
+        
+        Args:
+            prices_history: Dicionário {ticker: [preços]}
+            target_return: Retorno alvo (opcional)
+            
+        Returns:
+            Dicionário com portfólio otimizado
+        """
+        # Calcular métricas
+        self.prepare_statistics(prices_history)
+        
+        n_assets = len(self.tickers)
+        
+        # Chute inicial
+        initial_weights = np.full(n_assets, 1 / n_assets)
+        
+        result = self._solve_min_volatility(initial_weights, target_return)
+        
+        if not result.success:
+            optimal_weights = initial_weights
+        else:
+            optimal_weights = result.x
+        
+        # Calcular métricas
+        portfolio_return, portfolio_volatility, sharpe_ratio = \
+            self.calculate_portfolio_metrics(optimal_weights)
+        
+        # Preparar resultado
+        allocations = []
+        for i, ticker in enumerate(self.tickers):
+            weight = optimal_weights[i]
+            if weight > 0.01:
+                allocations.append({
+                    'ticker': ticker,
+                    'weight': round(float(weight * 100), 2),
+                    'expected_return': round(self.returns[ticker] * 100, 2),
+                    'volatility': round(self.volatilities[ticker] * 100, 2)
+                })
+        
+        allocations.sort(key=lambda x: x['weight'], reverse=True)
+        
+        return {
+            'tickers': self.tickers,
+            'allocations': allocations,
+            'portfolio_metrics': {
+                'expected_return': round(portfolio_return * 100, 2),
+                'volatility': round(portfolio_volatility * 100, 2),
+                'sharpe_ratio': round(sharpe_ratio, 2)
+            },
+            'optimization_type': 'minimum_volatility',
+            'target_return': target_return,
+            'optimization_status': 'success' if result.success else 'fallback',
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    def generate_efficient_frontier(
+        self,
+        prices_history: Dict[str, List[float]],
+        n_points: int = 20,
+        method: str = 'slsqp',
+        include_weights: bool = False
+    ) -> List[Dict]:
+        """
+        Gera fronteira eficiente
+        
+        As estatísticas são calculadas uma única vez. Com method='slsqp',
+        cada ponto parte da solução do ponto anterior (warm start); com
+        method='qp', a fronteira inteira vem do problema quadrático
+        paramétrico (Critical Line Algorithm): os pontos são interpolações
+        exatas entre as carteiras de virada, sem otimização por ponto.
+        
+        Args:
+            prices_history: Dicionário {ticker: [preços]}
+            n_points: Número de pontos na fronteira
+            method: 'slsqp' ou 'qp'
+            include_weights: Incluir os pesos de cada ponto
+            
+        Returns:
+            Lista de portfólios na fronteira eficiente
+        """
+        frontier = []
+        for w in self.frontier_weights(prices_history, n_points, method):
+            portfolio_return, portfolio_volatility, sharpe_ratio = self.calculate_portfolio_metrics(w)
+            point = {
+                'return': round(portfolio_return * 100, 2),
+                'volatility': round(portfolio_volatility * 100, 2),
+                'sharpe_ratio': round(sharpe_ratio, 2)
+            }
+            if include_weights:
+                point['weights'] = {
+                    ticker: round(float(weight * 100), 2)
+                    for ticker, weight in zip(self.tickers, w) if weight > 0.0001
+                }
+            frontier.append(point)
+        
+        return frontier
+    
+    def frontier_weights(
+        self,
+        prices_history: Dict[str, List[float]],
+        n_points: int = 20,
+        method: str = 'slsqp'
+    ) -> np.ndarray:
+        """
+        Pesos dos portfólios da fronteira eficiente, do menor para o maior
+        retorno alvo
+        
+        Args:
+            prices_history: Dicionário {ticker: [preços]}
+            n_points: Número de pontos na fronteira
+            method: 'slsqp' ou 'qp'
+            
+        Returns:
+            Matriz pontos x ativos (na ordem de self.tickers), sem os pontos
+            em que a otimização falhou
+        """
+        # Calcular métricas
+        self.prepare_statistics(prices_history)
+        
+        # Determinar range de retornos
+        target_returns = np.linspace(self.expected_returns.min(), self.expected_returns.max(), n_points)
+        
+        weights = None
+        if method == 'qp':
+            try:
+                weights = self._frontier_critical_line(target_returns)
+            except np.linalg.LinAlgError:
+                # Covariância singular (ex: menos dias que ativos): usar SLSQP
+                weights = None
+        
+        if weights is None:
+            weights = self._frontier_warm_start(target_returns)
+        
+        weights = [w for w in weights if w is not None]
+        return np.array(weights).reshape(len(weights), len(self.tickers))
+    
+    def _frontier_warm_start(self, target_returns: np.ndarray) -> List[Optional[np.ndarray]]:
+        """
+        Pesos de mínima volatilidade para cada retorno alvo, partindo sempre
+        da solução anterior (None nos pontos em que o SLSQP não convergiu)
+        """
+        n_assets = len(self.tickers)
+        weights = np.full(n_assets, 1 / n_assets)
+        
+        frontier = []
+        for target_return in target_returns:
+            result = self._solve_min_volatility(weights, target_return)
+            if result.success:
+                weights = result.x
+                frontier.append(weights)
+            else:
+                frontier.append(None)
+        
+        return frontier
+    
+    def _frontier_critical_line(self, target_returns: np.ndarray) -> List[np.ndarray]:
+        """
+        Pesos de mínima volatilidade para cada retorno alvo pelo Critical
+        Line Algorithm
+        
+        Entre duas carteiras de virada consecutivas os pesos variam
+        linearmente com o retorno, então cada alvo é uma interpolação exata.
+        Alvos abaixo do retorno da carteira de mínima variância recebem a
+        própria carteira de mínima variância (restrição w·μ >= alvo).
+        """
+        turning_points = critical_line(self.expected_returns, self.covariance_matrix)
+        
+        # Do menor para o maior retorno
+        turning_points = turning_points[::-1]
+        returns = np.array([w @ self.expected_returns for w in turning_points])
+        
+        frontier = []
+        for target_return in target_returns:
+            k = int(np.searchsorted(returns, target_return))
+            if k == 0:
+                frontier.append(turning_points[0])
+            elif k == len(returns):
+                frontier.append(turning_points[-1])
+            else:
+                a = (target_return - returns[k - 1]) / (returns[k] - returns[k - 1])
+                frontier.append((1 - a) * turning_points[k - 1] + a * turning_points[k])
+        
+        return frontier
+
+
+def critical_line(mean: np.ndarray, covariance: np.ndarray,
+                  lower: Optional[np.ndarray] = None, upper: Optional[np.ndarray] = None,
+                  tolerance: float = 1e-10) -> List[np.ndarray]:
+    """
+    Carteiras de virada da fronteira eficiente (Critical Line Algorithm de
+    Markowitz), com soma dos pesos = 1 e limites por ativo
+    
+    Resolve o QP paramétrico min ½wᵀΣw - λ·w·μ para todo λ >= 0: a cada
+    virada um ativo entra ou sai do limite, e entre viradas os pesos são
+    lineares em λ.
+    
+    Args:
+        mean: Retornos esperados (n)
+        covariance: Matriz de covariância (n x n)
+        lower: Pesos mínimos (padrão 0)
+        upper: Pesos máximos (padrão 1)
+        tolerance: Tolerância numérica dos limites e da soma
+        
+    Returns:
+        Carteiras de virada, da de maior retorno até a de mínima variância
+        
+    Raises:
+        numpy.linalg.LinAlgError: Se a covariância dos ativos livres for singular
+    """
+    mean = np.asarray(mean, dtype=float)
+    covariance = np.asarray(covariance, dtype=float)
+    n = len(mean)
+    lower = np.zeros(n) if lower is None else np.asarray(lower, dtype=float)
+    upper = np.ones(n) if upper is None else np.asarray(upper, dtype=float)
+    
+    # Início: preencher os ativos de maior retorno até somar 1
+    weights = lower.copy()
+    order = np.argsort(mean, kind='stable')[::-1]
+    for i in order:
+        weights[i] = min(upper[i], weights[i] + 1 - weights.sum())
+        if weights.sum() >= 1 - tolerance:
+            break
+    free = [int(i)]
+    
+    def below(lam: np.ndarray) -> np.ndarray:
+        """
+        λ válidos e estritamente abaixo da última virada, com folga para
+        arredondamento (o ativo que acabou de atingir o limite não pode
+        voltar no mesmo λ)
+        """
+        if last_lambda is None:
+            return ~np.isnan(lam)
+        return ~np.isnan(lam) & (lam < last_lambda - tolerance * max(1.0, abs(last_lambda)))
+    
+    cov_inv = np.linalg.inv(covariance[np.ix_(free, free)])
+    turning_points = [weights.copy()]
+    last_lambda = None
+    while True:
+        bounded = [j for j in range(n) if j not in free]
+        cov_fb = covariance[np.ix_(free, bounded)]
+        w_b = weights[bounded]
+        mean_f = mean[free]
+        ones = np.ones(len(free))
+        c4 = cov_inv @ ones
+        c2 = cov_inv @ mean_f
+        c1 = ones @ c4
+        c3 = ones @ c2
+        h = cov_fb @ w_b
+        
+        # a) Um ativo livre vai para o limite (inferior ou superior,
+        # conforme a direção em que o peso se move quando λ diminui)
+        lambda_in, i_in, bound_in = None, None, None
+        if len(free) > 1:
+            c = -c1 * c2 + c3 * c4
+            bound = np.where(c > 0, upper[free], lower[free])
+            l3 = cov_inv @ h
+            with np.errstate(divide='ignore', invalid='ignore'):
+                lam = ((1 - w_b.sum() + ones @ l3) * c4 - c1 * (bound + l3)) / c
+            lam = np.where(c != 0, lam, np.nan)
+            
+            candidates = np.flatnonzero(below(lam))
+            if len(candidates):
+                k = candidates[np.argmax(lam[candidates])]
+                lambda_in, i_in, bound_in = float(lam[k]), free[k], float(bound[k])
+        
+        # b) Um ativo no limite fica livre. O λ de cada candidato i vem da
+        # inversa de free + [i] pelo complemento de Schur, para todos os
+        # candidatos de uma vez
+        lambda_out, i_out = None, None
+        if bounded:
+            diag_b = covariance[bounded, bounded]
+            u = cov_inv @ cov_fb
+            schur = diag_b - np.einsum('fi,fi->i', cov_fb, u)
+            u_ones = ones @ u
+            u_mean = mean_f @ u
+            
+            with np.errstate(divide='ignore', invalid='ignore'):
+                c4_i = (1 - u_ones) / schur
+                c2_i = (mean[bounded] - u_mean) / schur
+                c1_i = c1 + (1 - u_ones) ** 2 / schur
+                c3_i = c3 + (1 - u_ones) * (mean[bounded] - u_mean) / schur
+                c = -c1_i * c2_i + c3_i * c4_i
+                
+                # Demais ativos no limite, sem o candidato
+                u_v = u.T @ h - (diag_b - schur) * w_b
+                e = covariance[np.ix_(bounded, bounded)] @ w_b - diag_b * w_b
+                l3_i = (e - u_v) / schur
+                ones_l3 = ones @ cov_inv @ h - u_ones * w_b + (1 - u_ones) * l3_i
+                lam = ((1 - (w_b.sum() - w_b) + ones_l3) * c4_i - c1_i * (w_b + l3_i)) / c
+            lam = np.where((schur > 0) & (c != 0), lam, np.nan)
+            
+            candidates = np.flatnonzero(below(lam))
+            if len(candidates):
+                k = candidates[np.argmax(lam[candidates])]
+                lambda_out, i_out = float(lam[k]), bounded[k]
+        
+        if (lambda_in is None or lambda_in < 0) and (lambda_out is None or lambda_out < 0):
+            # c) Carteira de mínima variância (λ = 0)
+            last_lambda = 0.0
+        elif lambda_out is None or (lambda_in is not None and lambda_in > lambda_out):
+            last_lambda = lambda_in
+            free.remove(i_in)
+            weights[i_in] = bound_in
+        else:
+            last_lambda = lambda_out
+            free.append(i_out)
+        
+        # Pesos dos ativos livres no novo λ
+        bounded = [j for j in range(n) if j not in free]
+        cov_inv = np.linalg.inv(covariance[np.ix_(free, free)])
+        ones = np.ones(len(free))
+        w_b = weights[bounded]
+        w1 = cov_inv @ (covariance[np.ix_(free, bounded)] @ w_b)
+        gamma = (-last_lambda * (ones @ cov_inv @ mean[free]) + 1 - w_b.sum() + ones @ w1) / (ones @ cov_inv @ ones)
+        weights[free] = -w1 + gamma * (cov_inv @ ones) + last_lambda * (cov_inv @ mean[free])
+        turning_points.append(weights.copy())
+        
+        if last_lambda == 0:
+            break
+    
+    # Descartar viradas com erro numérico e as que não reduzem o retorno
+    valid = [w for w in turning_points
+             if abs(w.sum() - 1) <= tolerance * 1e3
+             and np.all(w >= lower - tolerance * 1e3) and np.all(w <= upper + tolerance * 1e3)]
+    efficient = []
+    for w in valid:
+        if not efficient or w @ mean < efficient[-1] @ mean - tolerance:
+            efficient.append(w)
+    
+    return efficient
+
+
+# ============================================================================
+# TESTES
+# ============================================================================
+
+if __name__ == '__main__':
+    """Testes do otimizador de portfólio"""
+    
+    optimizer = PortfolioOptimizer()
+    
+    print("=" * 60)
+    print("TESTE DO OTIMIZADOR DE PORTFÓLIO")
+    print("=" * 60)
+    
+    # Gerar dados sintéticos para 3 ativos
+    np.random.seed(42)
+    
+    # Ativo 1: Alto retorno, alta volatilidade
+    prices1 = [30 + i * 0.1 + np.random.normal(0, 1) for i in range(60)]
+    
+    # Ativo 2: Médio retorno, média volatilidade
+    prices2 = [50 + i * 0.05 + np.random.normal(0, 0.5) for i in range(60)]
+    
+    # Ativo 3: Baixo retorno, baixa volatilidade
+    prices3 = [25 + i * 0.02 + np.random.normal(0, 0.2) for i in range(60)]
+    
+    prices_history = {
+        'PETR4': prices1,
+        'VALE3': prices2,
+        'ITUB4': prices3
+    }
+    
+    print("\n1. Dados Sintéticos:")
+    for ticker, prices in prices_history.items():
+        variation = ((prices[-1] - prices[0]) / prices[0]) * 100
+        print(f"   {ticker}: R$ {prices[0]:.2f} → R$ {prices[-1]:.2f} ({variation:+.2f}%)")
+    
+    # Calcular métricas individuais
+    print("\n2. Métricas Individuais:")
+    returns = optimizer.calculate_returns(prices_history)
+    volatilities = optimizer.calculate_volatility(prices_history)
+    
+    for ticker in prices_history.keys():
+        print(f"   {ticker}:")
+        print(f"     Retorno esperado: {returns[ticker]*100:.2f}% ao ano")
+        print(f"     Volatilidade: {volatilities[ticker]*100:.2f}% ao ano")
+    
+    # Otimizar portfólio (Sharpe Ratio)
+    print("\n3. Portfólio Otimizado (Máximo Sharpe Ratio):")
+    result = optimizer.optimize_sharpe_ratio(prices_history, risk_tolerance='moderate')
+    
+    print(f"   Status: {result['optimization_status']}")
+    print(f"   Alocação:")
+    for allocation in result['allocations']:
+        print(f"     {allocation['ticker']}: {allocation['weight']:.2f}%")
+    
+    print(f"\n   Métricas do Portfólio:")
+    metrics = result['portfolio_metrics']
+    print(f"     Retorno esperado: {metrics['expected_return']:.2f}% ao ano")
+    print(f"     Volatilidade: {metrics['volatility']:.2f}% ao ano")
+    print(f"     Sharpe Ratio: {metrics['sharpe_ratio']:.2f}")
+    
+    # Otimizar para mínima volatilidade
+    print("\n4. Portfólio de Mínima Volatilidade:")
+    result_min_vol = optimizer.optimize_min_volatility(prices_history)
+    
+    print(f"   Alocação:")
+    for allocation in result_min_vol['allocations']:
+        print(f"     {allocation['ticker']}: {allocation['weight']:.2f}%")
+    
+    print(f"\n   Métricas do Portfólio:")
+    metrics = result_min_vol['portfolio_metrics']
+    print(f"     Retorno esperado: {metrics['expected_return']:.2f}% ao ano")
+    print(f"     Volatilidade: {metrics['volatility']:.2f}% ao ano")
+    print(f"     Sharpe Ratio: {metrics['sharpe_ratio']:.2f}")
+    
+    print("\n" + "=" * 60)
+    print("TESTES CONCLUÍDOS")
+    print("=" * 60)
+
@@ -0,0 +1,643 @@
+#!/usr/bin/env python3
+"""
+Magnus Wealth - Price Predictor
+Preditor de preços usando modelos de Machine Learning
+"""
+
+import os
+import json
+import pickle
+import joblib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, Iterator, List, Optional, Tuple
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+from sklearn.metrics import mean_squared_error, r2_score
+
+from registro_modelos import RegistroModelos, obter_registro
+
+# Pacote com modelos, scalers e metadata de todos os tickers do treino em lote
+BUNDLE_FILE = 'price_models_bundle.pkl'
+
+
+def _media_janela(valores: np.ndarray, janela: int) -> np.ndarray:
+    """
+    Média dos últimos `janela` + 1 valores (incluindo o atual)
+
+    Antes de haver histórico suficiente a média é o próprio valor.
+    """
+    medias = valores.copy()
+    if len(valores) > janela:
+        medias[janela:] = sliding_window_view(valores, janela + 1).mean(axis=1)
+    return medias
+
+
+class PricePredictor:
+    """
+    Preditor de preços usando Regressão Linear e features técnicas
+    """
+    
+    def __init__(self, models_dir='data/models', registry: Optional[RegistroModelos] = None):
+        """
+        Inicializa o preditor
+        
+        Modelos, scalers e metadata ficam no registro compartilhado
+        (registro_modelos): são lidos do disco no primeiro uso, descartados
+        por LRU e relidos quando o arquivo muda.
+        
+        Args:
+            models_dir: Diretório para salvar modelos treinados
+            registry: Registro de modelos (padrão: o compartilhado do processo)
+        """
+        self.models_dir = models_dir
+        self.registry = registry if registry is not None else obter_registro()
+        
+        # Criar diretório se não existir
+        os.makedirs(models_dir, exist_ok=True)
+    
+    def calculate_technical_features(self, prices: List[float]) -> np.ndarray:
+        """
+        Calcula features técnicas a partir dos preços
+        
+        Todas as janelas têm tamanho fixo, então cada coluna sai de uma
+        visão deslizante (sliding_window_view) sobre o array de preços, em
+        O(n), sem laço por índice.
+        
+        Args:
+            prices: Lista de preços históricos
+            
+        Returns:
+            Array numpy (n x 9) com preço, MA5, MA10, MA20, retorno,
+            volatilidade, momentum, RSI e índice temporal
+        """
+        prices_array = np.asarray(prices, dtype=float)
+        n = len(prices_array)
+        
+        if n == 0:
+            return np.array([])
+        
+        # Médias móveis (janela inclui o preço atual e os N anteriores)
+        ma5 = _media_janela(prices_array, 5)
+        ma10 = _media_janela(prices_array, 10)
+        ma20 = _media_janela(prices_array, 20)
+        
+        # Retorno (variação percentual)
+        returns = np.zeros(n)
+        returns[1:] = (prices_array[1:] - prices_array[:-1]) / prices_array[:-1]
+        
+        # Volatilidade (desvio padrão dos últimos 5 dias)
+        volatility = np.zeros(n)
+        if n > 5:
+            volatility[5:] = sliding_window_view(prices_array, 6).std(axis=1)
+        
+        # Momentum (diferença entre MA5 e MA20)
+        momentum = ma5 - ma20
+        
+        # RSI simplificado (últimos 14 dias)
+        rsi = np.full(n, 50.0)  # Neutro
+        if n > 14:
+            changes = sliding_window_view(np.diff(prices_array), 14)
+            alta = changes > 0
+            n_gains = alta.sum(axis=1)
+            n_losses = 14 - n_gains
+            
+            avg_gain = np.where(alta, changes, 0.0).sum(axis=1) / np.maximum(n_gains, 1)
+            avg_loss = np.where(alta, 0.0, -changes).sum(axis=1) / np.maximum(n_losses, 1)
+            
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rs = avg_gain / avg_loss
+                rsi[14:] = np.where(avg_loss == 0, 100.0, 100 - (100 / (1 + rs)))
+        
+        return np.column_stack([
+            prices_array,
+            ma5,
+            ma10,
+            ma20,
+            returns,
+            volatility,
+            momentum,
+            rsi,
+            np.arange(n)  # Índice temporal
+        ])
+    
+    def prepare_data(self, prices: List[float], lookback: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Prepara dados para treinamento
+        
+        Args:
+            prices: Lista de preços históricos
+            lookback: Número de dias anteriores para usar como features
+            
+        Returns:
+            Tupla (X, y) com features e targets
+        """
+        # Calcular features técnicas
+        features = self.calculate_technical_features(prices)
+        n = len(features)
+        
+        if n <= lookback:
+            return np.array([]), np.array([])
+        
+        # Janelas deslizantes: visão (n-lookback+1, lookback, 9) sem cópia;
+        # a última janela não tem próximo dia e fica de fora
+        janelas = sliding_window_view(features, lookback, axis=0)[:n - lookback]
+        X = janelas.transpose(0, 2, 1).reshape(n - lookback, -1)
+        
+        # Target: preço do próximo dia
+        y = np.asarray(prices, dtype=float)[lookback:]
+        
+        return X, y
+    
+    def train_model(self, ticker: str, prices: List[float], dates: Optional[List[str]] = None) -> Dict:
+        """
+        Treina modelo de previsão para um ticker
+        
+        Args:
+            ticker: Ticker do ativo
+            prices: Lista de preços históricos
+            dates: Lista de datas correspondentes (opcional)
+            
+        Returns:
+            Dicionário com métricas de treinamento
+        """
+        ticker = ticker.upper()
+        
+        model, scaler, metadata, result = self._fit(ticker, prices)
+        
+        # Salvar em disco
+        self._save_model(ticker, model, scaler, metadata)
+        
+        return result
+    
+    def _fit(self, ticker: str, prices: List[float]) -> Tuple[LinearRegression, StandardScaler, Dict, Dict]:
+        """
+        Treina e avalia o modelo de um ticker, sem guardar nem salvar
+        
+        Returns:
+            Tupla (modelo, scaler, metadata, métricas de treinamento)
+        """
+        if len(prices) < 30:
+            raise ValueError(f"Necessário pelo menos 30 dias de histórico. Fornecido: {len(prices)}")
+        
+        # Preparar dados
+        X, y = self.prepare_data(prices, lookback=5)
+        
+        # Dividir em treino e teste (80/20)
+        split_idx = int(len(X) * 0.8)
+        X_train, X_test = X[:split_idx], X[split_idx:]
+        y_train, y_test = y[:split_idx], y[split_idx:]
+        
+        # Normalizar features
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
+        
+        # Treinar modelo
+        model = LinearRegression()
+        model.fit(X_train_scaled, y_train)
+        
+        # Avaliar
+        y_pred_train = model.predict(X_train_scaled)
+        y_pred_test = model.predict(X_test_scaled)
+        
+        train_r2 = r2_score(y_train, y_pred_train)
+        test_r2 = r2_score(y_test, y_pred_test)
+        train_rmse = np.sqrt(mean_squared_error(y_train, y_pred_train))
+        test_rmse = np.sqrt(mean_squared_error(y_test, y_pred_test))
+        
+        metadata = {
+            'ticker': ticker,
+            'trained_at': datetime.now().isoformat(),
+            'n_samples': len(prices),
+            'train_r2': float(train_r2),
+            'test_r2': float(test_r2),
+            'train_rmse': float(train_rmse),
+            'test_rmse': float(test_rmse),
+            'last_price': float(prices[-1]),
+            'lookback': 5
+        }
+        
+        result = {
+            'ticker': ticker,
+            'model_type': 'linear_regression',
+            'train_r2': round(train_r2, 4),
+            'test_r2': round(test_r2, 4),
+            'train_rmse': round(train_rmse, 4),
+            'test_rmse': round(test_rmse, 4),
+            'n_samples': len(prices),
+            'status': 'trained'
+        }
+        
+        return model, scaler, metadata, result
+    
+    def train_batch_iter(self, prices_by_ticker: Dict[str, List[float]],
+                         workers: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Treina vários tickers em um pool de processos
+        
+        As métricas de cada ticker são devolvidas assim que ele termina (ordem
+        de conclusão). Ao final, todos os modelos treinados são gravados
+        juntos no pacote consolidado (BUNDLE_FILE), em vez de um pickle por
+        ticker.
+        
+        Args:
+            prices_by_ticker: Dicionário {ticker: preços históricos}
+            workers: Processos simultâneos (padrão: número de CPUs;
+                1 treina no próprio processo)
+            
+        Yields:
+            Métricas no formato de train_model, ou {'ticker', 'status':
+            'error', 'message'} para tickers que falharam
+        """
+        tasks = [(ticker.upper(), list(prices)) for ticker, prices in prices_by_ticker.items()]
+        workers = workers or os.cpu_count() or 1
+        trained = {}
+        
+        def register(ticker, fitted):
+            model, scaler, metadata, result = fitted
+            trained[ticker] = {'model': model, 'scaler': scaler, 'metadata': metadata}
+            return result
+        
+        try:
+            if workers <= 1 or len(tasks) <= 1:
+                for ticker, prices in tasks:
+                    try:
+                        yield register(ticker, self._fit(ticker, prices))
+                    except Exception as e:
+                        yield {'ticker': ticker, 'status': 'error', 'message': str(e)}
+            else:
+                with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+                    futures = {
+                        executor.submit(_fit_worker, (self.models_dir, ticker, prices)): ticker
+                        for ticker, prices in tasks
+                    }
+                    for future in as_completed(futures):
+                        ticker = futures[future]
+                        try:
+                            yield register(ticker, future.result())
+                        except Exception as e:
+                            yield {'ticker': ticker, 'status': 'error', 'message': str(e)}
+        finally:
+            if trained:
+                self._save_bundle(trained)
+    
+    def train_batch(self, prices_by_ticker: Dict[str, List[float]],
+                    workers: Optional[int] = None) -> Dict[str, Dict]:
+        """
+        Treina vários tickers e devolve todas as métricas
+        
+        Returns:
+            Dicionário {ticker: métricas}, na ordem de entrada
+        """
+        results = {r['ticker']: r for r in self.train_batch_iter(prices_by_ticker, workers)}
+        return {ticker.upper(): results[ticker.upper()] for ticker in prices_by_ticker}
+    
+    def predict_next_days(self, ticker: str, prices: List[float], days: int = 7) -> Dict:
+        """
+        Prevê preços para os próximos N dias
+        
+        Args:
+            ticker: Ticker do ativo
+            prices: Lista de preços históricos recentes (não é modificada)
+            days: Número de dias a prever
+            
+        Returns:
+            Dicionário com previsões
+        """
+        ticker = ticker.upper()
+        return self.predict_next_days_batch({ticker: prices}, days=days)[ticker]
+    
+    def predict_next_days_batch(self, prices_by_ticker: Dict[str, List[float]], days: int = 7) -> Dict[str, Dict]:
+        """
+        Prevê os próximos N dias de vários tickers ao mesmo tempo
+        
+        Cada ticker mantém um RollingFeatures, que calcula só a linha de
+        features do preço previsto a cada passo. Os modelos são regressões
+        lineares, então os scalers e coeficientes de todos os tickers são
+        empilhados e cada dia é previsto para todos com uma única operação
+        matricial, em vez de um predict por ticker.
+        
+        Args:
+            prices_by_ticker: Dicionário {ticker: preços históricos recentes}
+            days: Número de dias a prever
+            
+        Returns:
+            Dicionário {ticker: previsões no formato de predict_next_days}
+        """
+        tickers = [ticker.upper() for ticker in prices_by_ticker]
+        
+        # Modelo, scaler e metadata de cada ticker (via registro)
+        loaded = {}
+        for ticker in tickers:
+            loaded[ticker] = self._get_model(ticker)
+            
+            if loaded[ticker] is None:
+                raise ValueError(f"Modelo não treinado para {ticker}")
+        
+        # Últimos 30 dias de cada ticker (cópia: a lista do chamador não muda)
+        states = {
+            ticker: RollingFeatures(self, prices[-30:])
+            for ticker, prices in zip(tickers, prices_by_ticker.values())
+        }
+        predicted = {ticker: [] for ticker in tickers}
+        
+        # Tickers com o mesmo lookback compartilham a mesma matriz
+        groups: Dict[int, List[str]] = {}
+        for ticker in tickers:
+            groups.setdefault(loaded[ticker]['metadata']['lookback'], []).append(ticker)
+        
+        for lookback, group in groups.items():
+            for ticker in group:
+                if len(states[ticker].rows) < lookback:
+                    raise ValueError(f"Necessário pelo menos {lookback} preços para {ticker}")
+            
+            mean = np.vstack([loaded[t]['scaler'].mean_ for t in group])
+            scale = np.vstack([loaded[t]['scaler'].scale_ for t in group])
+            coef = np.vstack([loaded[t]['model'].coef_ for t in group])
+            intercept = np.array([loaded[t]['model'].intercept_ for t in group])
+            
+            # Fazer previsões iterativas
+            for day in range(days):
+                X = np.vstack([states[t].window(lookback) for t in group])
+                
+                # Normalizar e prever todos os tickers de uma vez
+                predicted_prices = np.einsum('ij,ij->i', (X - mean) / scale, coef) + intercept
+                
+                # Adicionar previsão ao histórico para próxima iteração
+                for ticker, predicted_price in zip(group, predicted_prices):
+                    predicted[ticker].append(predicted_price)
+                    states[ticker].push(predicted_price)
+        
+        return {
+            ticker: self._format_prediction(ticker, prices[-1], predicted[ticker], loaded[ticker]['metadata'])
+            for ticker, prices in zip(tickers, prices_by_ticker.values())
+        }
+    
+    def _format_prediction(self, ticker: str, current_price: float, predicted: List[float],
+                           metadata: Dict) -> Dict:
+        """Monta a resposta de previsão com a tendência do período"""
+        predictions = [
+            {
+                'day': day + 1,
+                'predicted_price': round(float(predicted_price), 2)
+            }
+            for day, predicted_price in enumerate(predicted)
+        ]
+        
+        # Calcular tendência
+        last_pred = predictions[-1]['predicted_price']
+        
+        trend_change = ((last_pred - current_price) / current_price) * 100
+        
+        if trend_change > 2:
+            trend = 'bullish'
+            emoji = '📈'
+        elif trend_change < -2:
+            trend = 'bearish'
+            emoji = '📉'
+        else:
+            trend = 'neutral'
+            emoji = '➡️'
+        
+        return {
+            'ticker': ticker,
+            'current_price': round(float(current_price), 2),
+            'predictions': predictions,
+            'trend': trend,
+            'trend_emoji': emoji,
+            'trend_change_percent': round(trend_change, 2),
+            'model_metadata': metadata
+        }
+    
+    def _paths(self, ticker: str) -> Tuple[str, str, str]:
+        """Arquivos de modelo, scaler e metadata de um ticker"""
+        return (
+            os.path.join(self.models_dir, f'{ticker}_model.pkl'),
+            os.path.join(self.models_dir, f'{ticker}_scaler.pkl'),
+            os.path.join(self.models_dir, f'{ticker}_metadata.json')
+        )
+    
+    def _save_model(self, ticker: str, model: LinearRegression, scaler: StandardScaler, metadata: Dict):
+        """Salva modelo em disco e o deixa no registro"""
+        ticker = ticker.upper()
+        model_path, scaler_path, metadata_path = self._paths(ticker)
+        
+        # Salvar modelo
+        with open(model_path, 'wb') as f:
+            pickle.dump(model, f)
+        
+        # Salvar scaler
+        with open(scaler_path, 'wb') as f:
+            pickle.dump(scaler, f)
+        
+        # Salvar metadata
+        with open(metadata_path, 'w') as f:
+            json.dump(metadata, f, indent=2)
+        
+        self.registry.registrar(model_path, model)
+        self.registry.registrar(scaler_path, scaler)
+        self.registry.registrar(metadata_path, metadata)
+    
+    def _save_bundle(self, trained: Dict[str, Dict]):
+        """
+        Grava modelos, scalers e metadata no pacote consolidado
+        
+        Tickers já presentes no pacote e não retreinados são mantidos. A
+        escrita é atômica (arquivo temporário + os.replace) e usa joblib,
+        para que os arrays possam ser mapeados em memória na leitura.
+        """
+        bundle = dict(self._read_bundle())
+        bundle.update(trained)
+        
+        bundle_path = os.path.join(self.models_dir, BUNDLE_FILE)
+        tmp_path = bundle_path + '.tmp'
+        joblib.dump(bundle, tmp_path)
+        os.replace(tmp_path, bundle_path)
+        
+        self.registry.registrar(bundle_path, bundle)
+    
+    def _read_bundle(self) -> Dict[str, Dict]:
+        """Pacote consolidado do treino em lote (vazio se não existir)"""
+        bundle_path = os.path.join(self.models_dir, BUNDLE_FILE)
+        try:
+            return self.registry.obter(bundle_path)
+        except FileNotFoundError:
+            return {}
+    
+    def _get_model(self, ticker: str) -> Optional[Dict]:
+        """
+        Modelo, scaler e metadata de um ticker
+        
+        Procura os arquivos do ticker e o pacote consolidado do treino em
+        lote; se existirem os dois, usa o treinado mais recentemente.
+        
+        Returns:
+            {'model', 'scaler', 'metadata'} ou None se não houver modelo
+        """
+        ticker = ticker.upper()
+        model_path, scaler_path, metadata_path = self._paths(ticker)
+        
+        bundled = self._read_bundle().get(ticker)
+        
+        if not os.path.exists(model_path):
+            return bundled
+        
+        metadata = {}
+        if os.path.exists(metadata_path):
+            metadata = self.registry.obter(metadata_path, carregar=_load_json)
+        
+        if bundled and bundled['metadata'].get('trained_at', '') > metadata.get('trained_at', ''):
+            return bundled
+        
+        return {
+            'model': self.registry.obter(model_path),
+            'scaler': self.registry.obter(scaler_path),
+            'metadata': metadata
+        }
+    
+    def get_model_info(self, ticker: str) -> Optional[Dict]:
+        """Retorna informações sobre um modelo treinado"""
+        loaded = self._get_model(ticker)
+        
+        return loaded['metadata'] if loaded else None
+    
+    def list_trained_models(self) -> List[str]:
+        """Lista todos os modelos treinados"""
+        models = []
+        
+        if not os.path.exists(self.models_dir):
+            return models
+        
+        for filename in os.listdir(self.models_dir):
+            if filename.endswith('_model.pkl'):
+                ticker = filename.replace('_model.pkl', '')
+                models.append(ticker)
+        
+        # Modelos do treino em lote
+        models.extend(self._read_bundle())
+        
+        return sorted(set(models))
+
+
+def _load_json(path: str) -> Dict:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _fit_worker(task: Tuple[str, str, List[float]]) -> Tuple:
+    """Treina um ticker em um processo do pool (ver train_batch_iter)"""
+    models_dir, ticker, prices = task
+    return PricePredictor(models_dir)._fit(ticker, prices)
+
+
+class RollingFeatures:
+    """
+    Estado das features técnicas para previsão recursiva
+    
+    Guarda os últimos preços e as últimas linhas de features. Cada preço
+    novo calcula apenas a sua linha (a maior janela usa 21 preços), com o
+    mesmo resultado de recalcular calculate_technical_features na janela
+    inteira.
+    """
+    
+    # Maior janela das features (MA20 usa o preço atual e os 20 anteriores)
+    HISTORY = 21
+    
+    def __init__(self, predictor: PricePredictor, prices: List[float], max_rows: int = 30):
+        """
+        Args:
+            predictor: PricePredictor usado para calcular as features
+            prices: Janela inicial de preços (copiada)
+            max_rows: Linhas de features mantidas (>= lookback)
+        """
+        self.predictor = predictor
+        self.max_rows = max_rows
+        self.count = len(prices)
+        self.prices = [float(p) for p in prices[-self.HISTORY:]]
+        self.rows = list(predictor.calculate_technical_features(list(prices))[-max_rows:])
+    
+    def window(self, lookback: int) -> np.ndarray:
+        """Features dos últimos `lookback` dias achatadas em uma linha"""
+        return np.concatenate(self.rows[-lookback:])
+    
+    def push(self, price: float):
+        """Adiciona um preço e calcula só a linha de features dele"""
+        self.prices.append(float(price))
+        self.prices = self.prices[-self.HISTORY:]
+        
+        # Com a janela cheia, as features não dependem de preços mais antigos;
+        # só o índice temporal precisa da posição absoluta
+        row = self.predictor.calculate_technical_features(self.prices)[-1].copy()
+        row[8] = self.count
+        self.count += 1
+        
+        self.rows.append(row)
+        self.rows = self.rows[-self.max_rows:]
+
+
+# ============================================================================
+# TESTES
+# ============================================================================
+
+if __name__ == '__main__':
+    """Testes do preditor de preços"""
+    
+    predictor = PricePredictor()
+    
+    print("=" * 60)
+    print("TESTE DO PREDITOR DE PREÇOS")
+    print("=" * 60)
+    
+    # Gerar dados sintéticos (tendência de alta com ruído)
+    np.random.seed(42)
+    base_price = 30.0
+    trend = 0.05  # 5% de crescimento
+    noise = 0.5
+    
+    prices = []
+    for i in range(60):
+        price = base_price * (1 + trend * i / 60) + np.random.normal(0, noise)
+        prices.append(price)
+    
+    print(f"\n1. Dados Sintéticos Gerados:")
+    print(f"   Total de dias: {len(prices)}")
+    print(f"   Preço inicial: R$ {prices[0]:.2f}")
+    print(f"   Preço final: R$ {prices[-1]:.2f}")
+    print(f"   Variação: {((prices[-1] - prices[0]) / prices[0] * 100):.2f}%")
+    
+    # Treinar modelo
+    print(f"\n2. Treinando Modelo:")
+    result = predictor.train_model('TEST4', prices)
+    print(f"   Ticker: {result['ticker']}")
+    print(f"   Modelo: {result['model_type']}")
+    print(f"   R² (treino): {result['train_r2']:.4f}")
+    print(f"   R² (teste): {result['test_r2']:.4f}")
+    print(f"   RMSE (treino): R$ {result['train_rmse']:.4f}")
+    print(f"   RMSE (teste): R$ {result['test_rmse']:.4f}")
+    
+    # Fazer previsões
+    print(f"\n3. Previsões para os Próximos 7 Dias:")
+    predictions = predictor.predict_next_days('TEST4', prices, days=7)
+    print(f"   Preço atual: R$ {predictions['current_price']:.2f}")
+    print(f"   Tendência: {predictions['trend']} {predictions['trend_emoji']}")
+    print(f"   Variação esperada: {predictions['trend_change_percent']:.2f}%")
+    print(f"\n   Previsões:")
+    for pred in predictions['predictions']:
+        print(f"     Dia {pred['day']}: R$ {pred['predicted_price']:.2f}")
+    
+    # Listar modelos
+    print(f"\n4. Modelos Treinados:")
+    models = predictor.list_trained_models()
+    print(f"   Total: {len(models)}")
+    for model in models:
+        info = predictor.get_model_info(model)
+        if info:
+            print(f"   - {model}: R² = {info.get('test_r2', 0):.4f}")
+    
+    print("\n" + "=" * 60)
+    print("TESTES CONCLUÍDOS")
+    print("=" * 60)
+
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Magnus Wealth - Results Store
+Armazenamento compacto dos resultados de backtest com índice de consulta
+"""
+
+import glob
+import json
+import os
+import sqlite3
+import zlib
+from contextlib import closing
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+# Colunas de métricas que podem ordenar uma consulta (True = maior é melhor)
+ORDER_METRICS = {
+    'sharpe_ratio': True,
+    'total_return': True,
+    'max_drawdown': True,  # Drawdown negativo: mais perto de zero é melhor
+    'volatility': False,
+    'executed_at': True
+}
+
+# Chaves do resultado guardadas em colunas próprias (o resto vai em `details`)
+INDEXED_KEYS = ('strategy', 'ticker', 'period', 'capital', 'metrics', 'equity_curve', 'executed_at')
+
+# Chaves acrescentadas ao resultado depois de salvo (não são persistidas)
+TRANSIENT_KEYS = ('result_id', 'saved_to')
+
+# Tipo das curvas de capital gravadas (little-endian para portabilidade)
+CURVE_DTYPE = np.dtype('<f4')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    strategy TEXT NOT NULL,
+    executed_at TEXT NOT NULL,
+    period_start TEXT,
+    period_end TEXT,
+    days INTEGER,
+    initial_capital REAL,
+    final_capital REAL,
+    peak_capital REAL,
+    total_return REAL,
+    sharpe_ratio REAL,
+    max_drawdown REAL,
+    volatility REAL,
+    curve_length INTEGER NOT NULL DEFAULT 0,
+    details TEXT NOT NULL DEFAULT '{}',
+    source TEXT UNIQUE
+);
+CREATE TABLE IF NOT EXISTS result_tickers (
+    result_id INTEGER NOT NULL REFERENCES results(id) ON DELETE CASCADE,
+    ticker TEXT NOT NULL,
+    weight REAL NOT NULL,
+    PRIMARY KEY (result_id, ticker)
+);
+CREATE TABLE IF NOT EXISTS curves (
+    result_id INTEGER PRIMARY KEY REFERENCES results(id) ON DELETE CASCADE,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_executed ON results(executed_at);
+CREATE INDEX IF NOT EXISTS idx_results_strategy ON results(strategy, executed_at);
+CREATE INDEX IF NOT EXISTS idx_tickers_ticker ON result_tickers(ticker, result_id);
+"""
+
+RESULT_COLUMNS = (
+    'id, strategy, executed_at, period_start, period_end, days, initial_capital, final_capital, '
+    'peak_capital, total_return, sharpe_ratio, max_drawdown, volatility, curve_length, details'
+)
+
+
+def encode_curve(equity_curve: Union[List[float], np.ndarray]) -> bytes:
+    """
+    Curva de capital em float32 comprimida
+
+    Os bytes são agrupados por posição antes do zlib (byte shuffle): os
+    bytes de sinal/expoente de uma curva mudam pouco e comprimem melhor
+    juntos do que intercalados com a mantissa.
+
+    Args:
+        equity_curve: Valores da curva
+
+    Returns:
+        Bytes comprimidos
+    """
+    values = np.ascontiguousarray(equity_curve, dtype=CURVE_DTYPE)
+    return zlib.compress(values.view(np.uint8).reshape(-1, CURVE_DTYPE.itemsize).T.tobytes())
+
+
+def decode_curve(data: bytes) -> np.ndarray:
+    """
+    Inverso de encode_curve
+
+    Args:
+        data: Bytes gravados
+
+    Returns:
+        Array float32 da curva
+    """
+    planes = np.frombuffer(zlib.decompress(data), dtype=np.uint8).reshape(CURVE_DTYPE.itemsize, -1)
+    return np.ascontiguousarray(planes.T).view(CURVE_DTYPE).ravel()
+
+
+class ResultsStore:
+    """
+    Resultados de backtest em SQLite
+
+    As métricas ficam em uma tabela indexada por data de execução,
+    estratégia e ticker; as curvas de capital ficam em outra tabela, em
+    float32 comprimido, e só são lidas quando pedidas. Listar o histórico
+    não abre nenhum arquivo por resultado.
+    """
+
+    def __init__(self, db_path: str = 'data/backtests/results.db'):
+        """
+        Inicializa o armazenamento
+
+        Args:
+            db_path: Caminho do banco SQLite
+        """
+        self.db_path = db_path
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(self._connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Conexão por operação: segura entre threads do servidor"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA foreign_keys=ON')
+        return conn
+
+    def save(self, result: Dict, source: Optional[str] = None) -> int:
+        """
+        Salva um resultado de backtest
+
+        Args:
+            result: Resultado de Backtester (buy and hold, portfólio...)
+            source: Origem única do resultado (ex.: arquivo JSON importado)
+
+        Returns:
+            Id do resultado
+        """
+        period = result.get('period', {})
+        capital = result.get('capital', {})
+        metrics = result.get('metrics', {})
+        equity_curve = result.get('equity_curve')
+        if equity_curve is None:
+            equity_curve = []
+        details = {
+            key: value for key, value in result.items()
+            if key not in INDEXED_KEYS and key not in TRANSIENT_KEYS
+        }
+
+        if 'ticker' in result:
+            weights = {result['ticker']: 1.0}
+        else:
+            weights = result.get('allocations') or {}
+
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                'INSERT INTO results (strategy, executed_at, period_start, period_end, days, '
+                'initial_capital, final_capital, peak_capital, total_return, sharpe_ratio, '
+                'max_drawdown, volatility, curve_length, details, source) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    result.get('strategy', 'unknown'),
+                    result.get('executed_at') or datetime.now().isoformat(),
+                    period.get('start'), period.get('end'), period.get('days'),
+                    capital.get('initial'), capital.get('final'), capital.get('peak'),
+                    metrics.get('total_return'), metrics.get('sharpe_ratio'),
+                    metrics.get('max_drawdown'), metrics.get('volatility'),
+                    len(equity_curve), json.dumps(details), source
+                )
+            )
+            result_id = cursor.lastrowid
+
+            conn.executemany(
+                'INSERT INTO result_tickers (result_id, ticker, weight) VALUES (?, ?, ?)',
+                [(result_id, ticker, float(weight)) for ticker, weight in weights.items()]
+            )
+            if len(equity_curve):
+                conn.execute(
+                    'INSERT INTO curves (result_id, data) VALUES (?, ?)',
+                    (result_id, encode_curve(equity_curve))
+                )
+
+        return result_id
+
+    def query(
+        self,
+        ticker: Optional[str] = None,
+        strategy: Optional[str] = None,
+        since: Optional[Union[str, datetime]] = None,
+        until: Optional[Union[str, datetime]] = None,
+        days: Optional[int] = None,
+        order_by: str = 'executed_at',
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[Dict]:
+        """
+        Consulta resultados sem carregar as curvas
+
+        Ex.: os 10 melhores Sharpe de PETR4 no último mês
+        query(ticker='PETR4', days=30, order_by='sharpe_ratio', limit=10)
+
+        Args:
+            ticker: Resultados que incluem o ticker (sozinho ou em carteira)
+            strategy: 'buy_and_hold', 'portfolio'...
+            since: Executados a partir desta data
+            until: Executados até esta data
+            days: Atalho para since = agora - days
+            order_by: Métrica de ordenação (ver ORDER_METRICS)
+            limit: Quantidade máxima de resultados
+            offset: Resultados pulados (paginação)
+
+        Returns:
+            Lista de resultados, do melhor para o pior em `order_by`
+        """
+        if order_by not in ORDER_METRICS:
+            raise ValueError(f"order_by deve ser um de: {', '.join(ORDER_METRICS)}")
+
+        if days is not None:
+            since = datetime.now() - timedelta(days=days)
+
+        conditions, params = [], []
+        if ticker:
+            conditions.append('id IN (SELECT result_id FROM result_tickers WHERE ticker = ?)')
+            params.append(ticker)
+        if strategy:
+            conditions.append('strategy = ?')
+            params.append(strategy)
+        if since is not None:
+            conditions.append('executed_at >= ?')
+            params.append(since.isoformat() if isinstance(since, datetime) else since)
+        if until is not None:
+            conditions.append('executed_at <= ?')
+            params.append(until.isoformat() if isinstance(until, datetime) else until)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        direction = 'DESC' if ORDER_METRICS[order_by] else 'ASC'
+        sql = (
+            f'SELECT {RESULT_COLUMNS} FROM results {where} '
+            f'ORDER BY {order_by} IS NULL, {order_by} {direction}, id DESC LIMIT ? OFFSET ?'
+        )
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, params + [int(limit), int(offset)]).fetchall()
+            return self._rows_to_results(conn, rows)
+
+    def get(self, result_id: int, include_curve: bool = False) -> Optional[Dict]:
+        """
+        Resultado pelo id
+
+        Args:
+            result_id: Id do resultado
+            include_curve: Incluir a curva de capital
+
+        Returns:
+            Resultado no formato do Backtester ou None
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(f'SELECT {RESULT_COLUMNS} FROM results WHERE id = ?', (result_id,)).fetchall()
+            if not rows:
+                return None
+            result = self._rows_to_results(conn, rows)[0]
+
+        if include_curve:
+            curve = self.load_curve(result_id)
+            result['equity_curve'] = [] if curve is None else np.round(curve.astype(float), 2).tolist()
+
+        return result
+
+    def load_curve(self, result_id: int) -> Optional[np.ndarray]:
+        """
+        Carrega sob demanda a curva de capital de um resultado
+
+        Args:
+            result_id: Id do resultado
+
+        Returns:
+            Array float32 da curva (None se não houver)
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute('SELECT data FROM curves WHERE result_id = ?', (result_id,)).fetchone()
+
+        return decode_curve(row['data']) if row else None
+
+    def delete(self, result_id: int) -> bool:
+        """
+        Remove um resultado, seus tickers e sua curva
+
+        Args:
+            result_id: Id do resultado
+
+        Returns:
+            True se o resultado existia
+        """
+        with closing(self._connect()) as conn, conn:
+            return conn.execute('DELETE FROM results WHERE id = ?', (result_id,)).rowcount > 0
+
+    def count(self, ticker: Optional[str] = None, strategy: Optional[str] = None) -> int:
+        """
+        Quantidade de resultados armazenados
+
+        Args:
+            ticker: Apenas resultados com o ticker
+            strategy: Apenas resultados da estratégia
+
+        Returns:
+            Número de resultados
+        """
+        conditions, params = [], []
+        if ticker:
+            conditions.append('id IN (SELECT result_id FROM result_tickers WHERE ticker = ?)')
+            params.append(ticker)
+        if strategy:
+            conditions.append('strategy = ?')
+            params.append(strategy)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        with closing(self._connect()) as conn:
+            return conn.execute(f'SELECT COUNT(*) FROM results {where}', params).fetchone()[0]
+
+    def import_json_dir(self, directory: str) -> int:
+        """
+        Importa os resultados salvos em JSON (formato antigo do Backtester)
+
+        Cada arquivo é importado uma única vez: reexecutar não duplica.
+
+        Args:
+            directory: Diretório com os arquivos *.json
+
+        Returns:
+            Quantidade de resultados importados
+        """
+        imported = 0
+        for filepath in sorted(glob.glob(os.path.join(directory, '*.json'))):
+            source = os.path.abspath(filepath)
+            with closing(self._connect()) as conn:
+                exists = conn.execute('SELECT 1 FROM results WHERE source = ?', (source,)).fetchone()
+            if exists:
+                continue
+
+            try:
+                with open(filepath) as f:
+                    result = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            if isinstance(result, dict) and 'strategy' in result:
+                self.save(result, source=source)
+                imported += 1
+
+        return imported
+
+    def _rows_to_results(self, conn: sqlite3.Connection, rows: List[sqlite3.Row]) -> List[Dict]:
+        """Monta os resultados no formato do Backtester (sem a curva)"""
+        if not rows:
+            return []
+
+        ids = [row['id'] for row in rows]
+        placeholders = ', '.join('?' * len(ids))
+        tickers = {result_id: {} for result_id in ids}
+        for row in conn.execute(
+            f'SELECT result_id, ticker, weight FROM result_tickers '
+            f'WHERE result_id IN ({placeholders}) ORDER BY rowid', ids
+        ):
+            tickers[row['result_id']][row['ticker']] = row['weight']
+
+        results = []
+        for row in rows:
+            result = {
+                'id': row['id'],
+                'strategy': row['strategy'],
+                'tickers': list(tickers[row['id']]),
+                'period': {
+                    'start': row['period_start'],
+                    'end': row['period_end'],
+                    'days': row['days']
+                },
+                'capital': {
+                    'initial': row['initial_capital'],
+                    'final': row['final_capital'],
+                    'peak': row['peak_capital']
+                },
+                'metrics': {
+                    'total_return': row['total_return'],
+                    'sharpe_ratio': row['sharpe_ratio'],
+                    'max_drawdown': row['max_drawdown'],
+                    'volatility': row['volatility']
+                },
+                'curve_length': row['curve_length'],
+                'executed_at': row['executed_at']
+            }
+            if row['strategy'] == 'buy_and_hold' and result['tickers']:
+                result['ticker'] = result['tickers'][0]
+            result.update(json.loads(row['details']))
+            results.append(result)
+
+        return results
@@ -6,14 +6,18 @@ Magnus Wealth v9.0.0
 Monitora múltiplos timeframes e calcula CHiLo em tempo real
 """
 
-import yfinance as yf
 import pandas as pd
+from indicador_chilo import calcular_chilo, contar_sequencias
+from chilo_incremental import GerenciadorChiloIncremental, ESTADO_DIR
+from armazem_ohlcv import obter_timeframe
 from datetime import datetime, timedelta
 from typing import Dict, List
 import json
 import os
 
 # Configurações
+# Apenas 15m e 1h são baixados; 30m e 6h/8h/12h/1d são reamostrados
+# localmente pelo armazém (armazem_ohlcv.obter_timeframe)
 TIMEFRAMES = {
     '15m': '15m',
     '30m': '30m',
@@ -54,8 +58,11 @@ class MonitorMultiTimeframe:
     Monitora múltiplos timeframes em tempo real
     """
     
-    def __init__(self):
+    def __init__(self, diretorio_estado: str = ESTADO_DIR):
         self.periodos_otimizados = self.carregar_periodos_otimizados()
+        
+        # Estado CHiLo incremental por (cripto, timeframe, período)
+        self.estado_chilo = GerenciadorChiloIncremental(diretorio_estado)
     
     def carregar_periodos_otimizados(self) -> Dict:
         """
@@ -84,15 +91,17 @@ class MonitorMultiTimeframe:
         print(f"⚠️ Usando períodos padrão")
         return {}
     
-    def buscar_dados_timeframe(self, yahoo_symbol: str, interval: str, period: str = '7d') -> pd.DataFrame:
+    def buscar_dados_timeframe(self, yahoo_symbol: str, interval: str, period: str = '7d',
+                               inicio: datetime = None) -> pd.DataFrame:
         """
         Busca dados de um timeframe específico
+        
+        Se `inicio` for informado, busca apenas os candles a partir dessa data
         """
         try:
-            ticker = yf.Ticker(yahoo_symbol)
-            df = ticker.history(interval=interval, period=period)
+            df = obter_timeframe(yahoo_symbol, interval, period=period, start=inicio)
             
-            if df.empty:
+            if df is None or df.empty:
                 return None
             
             df.columns = [c.lower() for c in df.columns]
@@ -109,36 +118,7 @@ class MonitorMultiTimeframe:
         if len(df) < period:
             return df
         
-        # Calcular médias móveis
-        hima = df['high'].rolling(window=period).mean()
-        loma = df['low'].rolling(window=period).mean()
-        
-        # Inicializar séries
-        hilo = pd.Series(index=df.index, dtype=float)
-        hilo_state = pd.Series(index=df.index, dtype=int)
-        
-        # Calcular estado e linha HiLo
-        for i in range(period, len(df)):
-            close = df['close'].iloc[i]
-            hi = hima.iloc[i-1]
-            lo = loma.iloc[i-1]
-            
-            if close > hi:
-                state = 1  # BULLISH (verde)
-                hilo.iloc[i] = lo
-            elif close < lo:
-                state = -1  # BEARISH (vermelho)
-                hilo.iloc[i] = hi
-            else:
-                state = 0  # NEUTRO
-                hilo.iloc[i] = hilo.iloc[i-1] if i > period else lo
-            
-            hilo_state.iloc[i] = state
-        
-        df['hilo'] = hilo
-        df['hilo_state'] = hilo_state
-        
-        return df
+        return calcular_chilo(df, period)
     
     def contar_candles_virados(self, df: pd.DataFrame) -> int:
         """
@@ -152,15 +132,16 @@ class MonitorMultiTimeframe:
         if estado_atual == 0:
             return 0
         
-        # Contar quantos candles anteriores têm o mesmo estado
-        count = 1
-        for i in range(len(df)-2, -1, -1):
-            if df['hilo_state'].iloc[i] == estado_atual:
-                count += 1
-            else:
-                break
-        
-        return count
+        return int(contar_sequencias(df['hilo_state'])[-1])
+    
+    def periodo_timeframe(self, cripto: Dict, tf_name: str) -> int:
+        """
+        Período otimizado do timeframe, ou o período padrão do diário
+        """
+        nome = cripto['name']
+        if nome in self.periodos_otimizados and tf_name in self.periodos_otimizados[nome]:
+            return self.periodos_otimizados[nome][tf_name]
+        return cripto['period']
     
     def monitorar_cripto(self, cripto: Dict) -> Dict:
         """
@@ -180,29 +161,30 @@ class MonitorMultiTimeframe:
         
         # Para cada timeframe
         for tf_name, tf_interval in TIMEFRAMES.items():
-            # Obter período otimizado ou usar padrão
-            if nome in self.periodos_otimizados and tf_name in self.periodos_otimizados[nome]:
-                period = self.periodos_otimizados[nome][tf_name]
-            else:
-                period = cripto['period']  # Período padrão do diário
+            period = self.periodo_timeframe(cripto, tf_name)
             
-            # Buscar dados
-            df = self.buscar_dados_timeframe(yahoo, tf_interval)
+            # Com estado salvo, basta buscar a partir do último candle registrado
+            chilo = self.estado_chilo.obter(yahoo, tf_name, period)
+            inicio = chilo.ultimo_timestamp
+            df = self.buscar_dados_timeframe(yahoo, tf_interval, inicio=inicio)
             
-            if df is None or len(df) < period:
+            # Atualizar CHiLo apenas com os candles novos
+            atual = chilo.processar_ao_vivo(df) if df is not None and len(df) > 0 else None
+            
+            if atual is None and inicio is not None:
+                # Buraco desde o último snapshot: reconstruir com o histórico
+                chilo.reiniciar()
+                df = self.buscar_dados_timeframe(yahoo, tf_interval)
+                atual = chilo.processar_ao_vivo(df) if df is not None and len(df) > 0 else None
+            
+            if atual is None or chilo.candles < period:
                 print(f"   ⚠️ {tf_name}: Dados insuficientes")
                 continue
             
-            # Calcular CHiLo
-            df = self.calcular_chilo(df, period)
-            
-            # Estado atual
-            estado = int(df['hilo_state'].iloc[-1])
+            # Estado atual e candles virados
+            estado, candles_virados = atual
             preco = float(df['close'].iloc[-1])
             
-            # Contar candles virados
-            candles_virados = self.contar_candles_virados(df)
-            
             # Salvar resultado
             resultado['timeframes'][tf_name] = {
                 'periodo': period,
@@ -214,6 +196,9 @@ class MonitorMultiTimeframe:
             
             print(f"   ✓ {tf_name}: {resultado['timeframes'][tf_name]['tendencia']} ({candles_virados} candles)")
         
+        # Snapshot para retomar sem reconstruir após reinício
+        self.estado_chilo.salvar(yahoo)
+        
         return resultado
     
     def monitorar_todas(self) -> Dict:
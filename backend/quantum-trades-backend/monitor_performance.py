@@ -3,9 +3,10 @@ Monitor de Performance - Magnus Wealth v8.3.0
 Monitora performance real vs esperada e detecta necessidade de reversão
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
+from indicador_chilo import calcular_chilo_tendencia
+from armazem_ohlcv import obter_historico
 from datetime import datetime, timedelta
 from typing import Dict, List
 import json
@@ -55,29 +56,16 @@ class MonitorPerformance:
     
     def calcular_chilo(self, df: pd.DataFrame, period: int) -> pd.DataFrame:
         """Calcula indicador CHiLo"""
-        df['hilo_high'] = df['high'].rolling(window=period).mean()
-        df['hilo_low'] = df['low'].rolling(window=period).mean()
-        
-        df['trend'] = 0
-        for i in range(period, len(df)):
-            if df['close'].iloc[i] > df['hilo_high'].iloc[i]:
-                df.loc[df.index[i], 'trend'] = 1  # Bullish
-            elif df['close'].iloc[i] < df['hilo_low'].iloc[i]:
-                df.loc[df.index[i], 'trend'] = -1  # Bearish
-            else:
-                df.loc[df.index[i], 'trend'] = df['trend'].iloc[i-1]
-        
-        return df
+        return calcular_chilo_tendencia(df, period)
     
     def calcular_performance(self, yahoo_symbol: str, period: int, days: int) -> Dict:
         """Calcula performance de um período específico"""
         try:
-            ticker = yf.Ticker(yahoo_symbol)
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days+period+10)
-            df = ticker.history(start=start_date, end=end_date)
+            df = obter_historico(yahoo_symbol, '1d', start=start_date, end=end_date)
             
-            if df.empty:
+            if df is None or df.empty:
                 return None
             
             df.columns = df.columns.str.lower()
@@ -4,9 +4,10 @@ Combina CHiLo com RSI, MACD e Bollinger Bands
 Sistema de votação para sinais mais robustos
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
+from indicador_chilo import calcular_chilo_tendencia
+from armazem_ohlcv import obter_historico
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
 
@@ -26,19 +27,7 @@ class MultiIndicadores:
     
     def calcular_chilo(self, df: pd.DataFrame, period: int) -> pd.DataFrame:
         """Calcula CHiLo (Custom HiLo)"""
-        df['hilo_high'] = df['high'].rolling(window=period).mean()
-        df['hilo_low'] = df['low'].rolling(window=period).mean()
-        
-        df['chilo_trend'] = 0
-        for i in range(period, len(df)):
-            if df['close'].iloc[i] > df['hilo_high'].iloc[i]:
-                df.loc[df.index[i], 'chilo_trend'] = 1  # Bullish
-            elif df['close'].iloc[i] < df['hilo_low'].iloc[i]:
-                df.loc[df.index[i], 'chilo_trend'] = -1  # Bearish
-            else:
-                df.loc[df.index[i], 'chilo_trend'] = df['chilo_trend'].iloc[i-1]
-        
-        return df
+        return calcular_chilo_tendencia(df, period, coluna='chilo_trend')
     
     def calcular_rsi(self, df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
         """
@@ -135,12 +124,11 @@ class MultiIndicadores:
         """
         try:
             # Buscar dados
-            ticker = yf.Ticker(yahoo_symbol)
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days+60)  # +60 para warmup
-            df = ticker.history(start=start_date, end=end_date)
+            df = obter_historico(yahoo_symbol, '1d', start=start_date, end=end_date)
             
-            if df.empty:
+            if df is None or df.empty:
                 return None
             
             df.columns = df.columns.str.lower()
@@ -233,10 +221,9 @@ class MultiIndicadores:
         
         # Analisar com CHiLo apenas
         try:
-            ticker = yf.Ticker(yahoo_symbol)
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days+chilo_period+10)
-            df = ticker.history(start=start_date, end=end_date)
+            df = obter_historico(yahoo_symbol, '1d', start=start_date, end=end_date)
             
             df.columns = df.columns.str.lower()
             df = df[['open', 'high', 'low', 'close', 'volume']].copy()
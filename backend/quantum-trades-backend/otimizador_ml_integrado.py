@@ -6,7 +6,9 @@ Usa Machine Learning para acelerar otimização de períodos
 import os
 import sys
 from otimizador_quinzenal import *
-from predicao_ml import PreditorPeriodo
+from predicao_ml import get_preditor
+from indicador_chilo import calcular_chilo_arrays
+from metricas_chilo import calcular_metricas_vetor
 
 # Adicionar flag para usar ML
 USE_ML = os.getenv('USE_ML', 'false').lower() == 'true'
@@ -25,18 +27,16 @@ def otimizar_periodo_ml(cripto: Dict) -> Dict:
     
     # Tentar usar ML primeiro
     if USE_ML:
-        preditor = PreditorPeriodo()
+        # Preditor compartilhado: modelo e cache de features carregados uma vez
+        preditor = get_preditor()
         if preditor.modelo_disponivel:
             print(f"   🤖 Usando Machine Learning...")
             
-            # Extrair features
-            features = extrair_features_ml(df)
-            if features:
-                # Predizer top 5 períodos
-                periodos_sugeridos, confianca = preditor.prever_periodo(features, top_n=5)
-                
+            # Predizer top 5 períodos (features extraídas uma vez por candle)
+            _, confianca, periodos_sugeridos = preditor.prever_periodo(df, simbolo=cripto['yahoo'], top_n=5)
+            if periodos_sugeridos:
                 print(f"   🎯 ML sugere testar: {periodos_sugeridos}")
-                print(f"   📊 Confiança: {confianca:.1f}%")
+                print(f"   📊 Confiança: {confianca:.0%}")
                 
                 # Testar apenas períodos sugeridos + período atual
                 periodos_teste = list(set(periodos_sugeridos + [cripto['period']]))
@@ -56,9 +56,8 @@ def otimizar_periodo_ml(cripto: Dict) -> Dict:
     resultados = []
     
     for periodo in periodos_teste:
-        df_teste = df.copy()
-        df_teste = calcular_chilo(df_teste, periodo)
-        metricas = calcular_metricas(df_teste)
+        _, hilo_state = calcular_chilo_arrays(df['high'], df['low'], df['close'], periodo)
+        metricas = calcular_metricas_vetor(df['close'].to_numpy(), hilo_state)
         
         if metricas:
             score = calcular_score(metricas)
@@ -104,38 +103,6 @@ def otimizar_periodo_ml(cripto: Dict) -> Dict:
         'ml_usado': USE_ML and preditor.modelo_disponivel
     }
 
-def extrair_features_ml(df: pd.DataFrame) -> Dict:
-    """
-    Extrai features para ML (últimos 90 dias)
-    """
-    try:
-        # Usar últimos 90 dias
-        df_90d = df.tail(90).copy()
-        
-        if len(df_90d) < 30:
-            return None
-        
-        # Calcular features
-        returns = df_90d['close'].pct_change().dropna()
-        
-        features = {
-            'volatilidade': returns.std() * np.sqrt(252) * 100,
-            'retorno_medio': returns.mean() * 252 * 100,
-            'sharpe': (returns.mean() / returns.std() * np.sqrt(252)) if returns.std() > 0 else 0,
-            'max_drawdown': ((df_90d['close'] / df_90d['close'].cummax()) - 1).min() * 100,
-            'volume_medio': df_90d['volume'].mean(),
-            'tendencia': (df_90d['close'].iloc[-1] / df_90d['close'].iloc[0] - 1) * 100,
-            'momentum_7d': (df_90d['close'].iloc[-1] / df_90d['close'].iloc[-7] - 1) * 100 if len(df_90d) >= 7 else 0,
-            'momentum_30d': (df_90d['close'].iloc[-1] / df_90d['close'].iloc[-30] - 1) * 100 if len(df_90d) >= 30 else 0,
-            'range_preco': (df_90d['high'].max() / df_90d['low'].min() - 1) * 100,
-            'dias_alta': (df_90d['close'] > df_90d['close'].shift(1)).sum() / len(df_90d) * 100
-        }
-        
-        return features
-    except Exception as e:
-        print(f"   ❌ Erro ao extrair features: {str(e)[:100]}")
-        return None
-
 if __name__ == "__main__":
     print("\n" + "="*60)
     print("OTIMIZADOR QUINZENAL COM ML - Magnus Wealth v8.4.0")
@@ -144,7 +111,7 @@ if __name__ == "__main__":
     # Verificar se ML está habilitado
     if USE_ML:
         print("\n🤖 Machine Learning: HABILITADO")
-        preditor = PreditorPeriodo()
+        preditor = get_preditor()
         if preditor.modelo_disponivel:
             print("✅ Modelo ML carregado com sucesso")
         else:
@@ -7,14 +7,16 @@ Executa a cada 15 dias às 22:00 BR
 """
 
 import os
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import requests
 import json
-from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from armazem_ohlcv import obter_historico
+from metricas_chilo import calcular_metricas_vetor, varrer_periodos
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -53,6 +55,11 @@ CANDIDATAS = [
 # Períodos para testar (3-60)
 PERIODOS_TESTE = [3, 5, 7, 10, 12, 15, 18, 20, 22, 25, 28, 30, 33, 35, 38, 40, 45, 50, 55, 60]
 
+# Paralelismo (1 = execução sequencial)
+# Downloads são limitados por rede (threads); varreduras de períodos, por CPU (processos)
+WORKERS_DOWNLOAD = int(os.getenv('OTIMIZADOR_WORKERS_DOWNLOAD', '8'))
+WORKERS_CPU = int(os.getenv('OTIMIZADOR_WORKERS', str(os.cpu_count() or 1)))
+
 # Pesos das métricas (sem drawdown)
 PESOS = {
     'taxa_acerto': 0.40,
@@ -71,10 +78,9 @@ def buscar_dados_yahoo(yahoo_symbol: str, period: str = '1y') -> pd.DataFrame:
     - Mínimo 300 dias de dados
     """
     try:
-        ticker = yf.Ticker(yahoo_symbol)
-        df = ticker.history(period=period)
+        df = obter_historico(yahoo_symbol, '1d', period=period)
         
-        if df.empty:
+        if df is None or df.empty:
             print(f"   ⚠️ {yahoo_symbol}: Sem dados disponíveis")
             return None
         
@@ -117,41 +123,6 @@ def buscar_dados_yahoo(yahoo_symbol: str, period: str = '1y') -> pd.DataFrame:
         print(f"   ❌ Erro ao buscar {yahoo_symbol}: {str(e)[:100]}")
         return None
 
-def calcular_chilo(df: pd.DataFrame, period: int) -> pd.DataFrame:
-    """
-    Calcula o CHiLo (Custom HiLo) - Modo Activator
-    """
-    # Calcular médias móveis dos highs e lows
-    hima = df['high'].rolling(window=period).mean()
-    loma = df['low'].rolling(window=period).mean()
-    
-    # Inicializar série do HiLo
-    hilo = pd.Series(index=df.index, dtype=float)
-    hilo_state = pd.Series(index=df.index, dtype=int)
-    
-    # Calcular estado e linha HiLo
-    for i in range(period, len(df)):
-        close = df['close'].iloc[i]
-        hi = hima.iloc[i-1]
-        lo = loma.iloc[i-1]
-        
-        if close > hi:
-            state = 1  # BULLISH
-            hilo.iloc[i] = lo
-        elif close < lo:
-            state = -1  # BEARISH
-            hilo.iloc[i] = hi
-        else:
-            state = 0  # NEUTRO
-            hilo.iloc[i] = hilo.iloc[i-1] if i > period else lo
-        
-        hilo_state.iloc[i] = state
-    
-    df['hilo'] = hilo
-    df['hilo_state'] = hilo_state
-    
-    return df
-
 def calcular_metricas(df: pd.DataFrame) -> Dict:
     """
     Calcula métricas de performance do indicador
@@ -163,76 +134,11 @@ def calcular_metricas(df: pd.DataFrame) -> Dict:
     - num_trades: Número de trades
     - custo_total: Custo total em taxas
     - retorno_liquido: Retorno após taxas
-    """
-    # Taxas Binance Futuros USDⓈ-M (Usuário Regular)
-    TAXA_TAKER = 0.0005  # 0.05% por operação
-    if len(df) < 10:
-        return None
-    
-    # Remover NaN
-    df = df.dropna(subset=['hilo_state']).copy()  # .copy() evita SettingWithCopyWarning
-    
-    if len(df) < 10:
-        return None
-    
-    # Calcular retornos diários
-    df.loc[:, 'retorno_diario'] = df['close'].pct_change()
-    
-    # Simular estratégia: comprado quando verde (1), vendido quando vermelho (-1)
-    df.loc[:, 'sinal'] = df['hilo_state'].shift(1)  # Usar sinal do dia anterior
-    df.loc[:, 'estrategia_retorno'] = df['sinal'] * df['retorno_diario']
     
-    # Remover NaN
-    df = df.dropna(subset=['estrategia_retorno'])
-    
-    if len(df) < 10:
-        return None
-    
-    # Taxa de acerto
-    acertos = (df['estrategia_retorno'] > 0).sum()
-    total_trades = len(df[df['estrategia_retorno'] != 0])
-    taxa_acerto = (acertos / total_trades * 100) if total_trades > 0 else 0
-    
-    # Sharpe Ratio (anualizado)
-    retorno_medio = df['estrategia_retorno'].mean()
-    std_retorno = df['estrategia_retorno'].std()
-    sharpe = (retorno_medio / std_retorno * np.sqrt(252)) if std_retorno > 0 else 0
-    
-    # Retorno total
-    retorno_total = (1 + df['estrategia_retorno']).prod() - 1
-    retorno_pct = retorno_total * 100
-    
-    # Buy & Hold para comparação
-    retorno_bh = (df['close'].iloc[-1] / df['close'].iloc[0] - 1) * 100
-    
-    # NOVO: Calcular custos operacionais
-    # Detectar mudanças de tendência (trades)
-    df.loc[:, 'mudanca_sinal'] = df['hilo_state'].diff().abs()
-    num_trades = (df['mudanca_sinal'] > 0).sum()
-    
-    # Calcular custos
-    custo_total = num_trades * TAXA_TAKER
-    custo_pct = custo_total * 100
-    
-    # Retorno líquido (após taxas)
-    retorno_liquido = retorno_total - custo_total
-    retorno_liquido_pct = retorno_liquido * 100
-    
-    # Custo anual estimado
-    dias_total = len(df)
-    custo_anual = (num_trades / dias_total) * 365 * TAXA_TAKER * 100 if dias_total > 0 else 0
-    
-    return {
-        'taxa_acerto': taxa_acerto,
-        'sharpe': sharpe,
-        'retorno': retorno_pct,
-        'retorno_bh': retorno_bh,
-        'superacao_bh': retorno_pct - retorno_bh,
-        'num_trades': num_trades,
-        'custo_total': custo_pct,
-        'retorno_liquido': retorno_liquido_pct,
-        'custo_anual': custo_anual
-    }
+    Taxas Binance Futuros USDⓈ-M (taker 0.05% por operação). O cálculo é
+    feito direto nos arrays por metricas_chilo.calcular_metricas_vetor.
+    """
+    return calcular_metricas_vetor(df['close'].to_numpy(), df['hilo_state'].to_numpy())
 
 def calcular_score(metricas: Dict) -> float:
     """
@@ -260,14 +166,19 @@ def calcular_score(metricas: Dict) -> float:
     
     return round(score, 1)
 
-def otimizar_periodo(cripto: Dict) -> Dict:
+def otimizar_periodo(cripto: Dict, df: pd.DataFrame = None) -> Dict:
     """
     Encontra o melhor período para uma criptomoeda
+    
+    Args:
+        cripto: Cripto do portfólio (name, yahoo, period, emoji)
+        df: Dados já baixados; se None, busca no Yahoo
     """
     print(f"\n🔍 Otimizando {cripto['name']}...")
     
     # Buscar dados
-    df = buscar_dados_yahoo(cripto['yahoo'])
+    if df is None:
+        df = buscar_dados_yahoo(cripto['yahoo'])
     if df is None:
         print(f"   ❌ Sem dados para {cripto['name']}")
         return None
@@ -278,24 +189,21 @@ def otimizar_periodo(cripto: Dict) -> Dict:
     
     resultados = []
     
-    # Testar cada período
-    for periodo in PERIODOS_TESTE:
-        df_teste = df.copy()
-        df_teste = calcular_chilo(df_teste, periodo)
-        metricas = calcular_metricas(df_teste)
+    # Testar todos os períodos em uma única passada
+    _, tabela = varrer_periodos(df, PERIODOS_TESTE)
+    
+    for periodo, metricas in tabela.to_dict('index').items():
+        score = calcular_score(metricas)
+        resultados.append({
+            'periodo': periodo,
+            'score': score,
+            'metricas': metricas
+        })
         
-        if metricas:
-            score = calcular_score(metricas)
-            resultados.append({
-                'periodo': periodo,
-                'score': score,
-                'metricas': metricas
-            })
-            
-            if score > melhor_score:
-                melhor_score = score
-                melhor_periodo = periodo
-                melhor_metricas = metricas
+        if score > melhor_score:
+            melhor_score = score
+            melhor_periodo = periodo
+            melhor_metricas = metricas
     
     # Ordenar por score
     resultados.sort(key=lambda x: x['score'], reverse=True)
@@ -322,14 +230,19 @@ def otimizar_periodo(cripto: Dict) -> Dict:
         'recomendar_atualizacao': melhoria_pct > 5.0  # >5% de melhoria
     }
 
-def avaliar_candidata(candidata: Dict) -> Dict:
+def avaliar_candidata(candidata: Dict, df: pd.DataFrame = None) -> Dict:
     """
     Avalia uma criptomoeda candidata
+    
+    Args:
+        candidata: Candidata (name, yahoo, emoji)
+        df: Dados já baixados; se None, busca no Yahoo
     """
     print(f"\n🔍 Avaliando {candidata['name']}...")
     
     # Buscar dados
-    df = buscar_dados_yahoo(candidata['yahoo'])
+    if df is None:
+        df = buscar_dados_yahoo(candidata['yahoo'])
     if df is None:
         print(f"   ❌ Sem dados para {candidata['name']}")
         return None
@@ -344,18 +257,15 @@ def avaliar_candidata(candidata: Dict) -> Dict:
     melhor_score = 0
     melhor_metricas = None
     
-    for periodo in PERIODOS_TESTE:
-        df_teste = df.copy()
-        df_teste = calcular_chilo(df_teste, periodo)
-        metricas = calcular_metricas(df_teste)
+    _, tabela = varrer_periodos(df, PERIODOS_TESTE)
+    
+    for periodo, metricas in tabela.to_dict('index').items():
+        score = calcular_score(metricas)
         
-        if metricas:
-            score = calcular_score(metricas)
-            
-            if score > melhor_score:
-                melhor_score = score
-                melhor_periodo = periodo
-                melhor_metricas = metricas
+        if score > melhor_score:
+            melhor_score = score
+            melhor_periodo = periodo
+            melhor_metricas = metricas
     
     if melhor_metricas is None:
         print(f"   ❌ Não foi possível calcular métricas")
@@ -384,6 +294,73 @@ def avaliar_candidata(candidata: Dict) -> Dict:
         'metricas': melhor_metricas
     }
 
+def _mapear(funcao, tarefas: List[tuple], workers: int, executor) -> List:
+    """
+    Aplica `funcao` a cada tupla de argumentos, mantendo a ordem das tarefas
+    
+    Com workers <= 1 (ou uma única tarefa) executa em sequência no processo atual.
+    """
+    if workers <= 1 or len(tarefas) <= 1:
+        return [funcao(*args) for args in tarefas]
+    
+    with executor(max_workers=min(workers, len(tarefas))) as pool:
+        return list(pool.map(funcao, *zip(*tarefas)))
+
+def buscar_dados_lote(yahoo_symbols: List[str], workers: int = None) -> List[Optional[pd.DataFrame]]:
+    """
+    Busca os dados de vários símbolos em paralelo (thread pool)
+    
+    Returns:
+        DataFrames na mesma ordem dos símbolos (None onde a busca falhou)
+    """
+    workers = WORKERS_DOWNLOAD if workers is None else workers
+    return _mapear(buscar_dados_yahoo, [(s,) for s in yahoo_symbols], workers, ThreadPoolExecutor)
+
+def _executar_lote(funcao, itens: List[Dict], workers: int, workers_download: int) -> List[Optional[Dict]]:
+    """
+    Baixa os dados de todos os itens e roda `funcao(item, df)` em um process pool
+    
+    Returns:
+        Resultados na mesma ordem de `itens` (None onde não houve dados)
+    """
+    workers = WORKERS_CPU if workers is None else workers
+    dfs = buscar_dados_lote([item['yahoo'] for item in itens], workers_download)
+    
+    tarefas = []
+    for item, df in zip(itens, dfs):
+        if df is None:
+            print(f"\n🔍 {item['name']}: ❌ Sem dados")
+        else:
+            tarefas.append((item, df))
+    
+    resultados = iter(_mapear(funcao, tarefas, workers, ProcessPoolExecutor))
+    return [next(resultados) if df is not None else None for df in dfs]
+
+def otimizar_portfolio(criptos: List[Dict], workers: int = None,
+                       workers_download: int = None) -> List[Optional[Dict]]:
+    """
+    Executa otimizar_periodo para várias criptos em paralelo
+    
+    Args:
+        criptos: Criptos do portfólio
+        workers: Processos para as varreduras (padrão WORKERS_CPU)
+        workers_download: Threads para os downloads (padrão WORKERS_DOWNLOAD)
+    
+    Returns:
+        Resultados na mesma ordem das criptos, como na execução sequencial
+    """
+    return _executar_lote(otimizar_periodo, criptos, workers, workers_download)
+
+def avaliar_candidatas(candidatas: List[Dict], workers: int = None,
+                       workers_download: int = None) -> List[Optional[Dict]]:
+    """
+    Executa avaliar_candidata para várias candidatas em paralelo
+    
+    Returns:
+        Resultados na mesma ordem das candidatas (None nas reprovadas)
+    """
+    return _executar_lote(avaliar_candidata, candidatas, workers, workers_download)
+
 def formatar_relatorio(otimizacoes: List[Dict], candidatas: List[Dict]) -> str:
     """
     Formata relatório em Markdown para Telegram
@@ -557,21 +534,13 @@ if __name__ == '__main__':
     
     # Etapa 1: Otimizar períodos do portfólio atual
     print("📊 ETAPA 1: Otimização de Períodos\n")
-    otimizacoes = []
-    for cripto in PORTFOLIO_ATUAL:
-        resultado = otimizar_periodo(cripto)
-        if resultado:
-            otimizacoes.append(resultado)
+    otimizacoes = [r for r in otimizar_portfolio(PORTFOLIO_ATUAL) if r]
     
     print(f"\n✓ {len(otimizacoes)}/{len(PORTFOLIO_ATUAL)} criptos otimizadas")
     
     # Etapa 2: Avaliar candidatas
     print("\n\n🔍 ETAPA 2: Avaliação de Candidatas\n")
-    candidatas_avaliadas = []
-    for candidata in CANDIDATAS:
-        resultado = avaliar_candidata(candidata)
-        if resultado:
-            candidatas_avaliadas.append(resultado)
+    candidatas_avaliadas = [r for r in avaliar_candidatas(CANDIDATAS) if r]
     
     print(f"\n✓ {len(candidatas_avaliadas)}/{len(CANDIDATAS)} candidatas válidas")
     
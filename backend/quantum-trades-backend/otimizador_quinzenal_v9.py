@@ -17,13 +17,13 @@ import json
 import subprocess
 from datetime import datetime, timedelta
 from portfolio_manager import PortfolioManager
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 # Importar funções do otimizador original
 sys.path.insert(0, os.path.dirname(__file__))
 from otimizador_quinzenal import (
-    otimizar_periodo,
-    avaliar_candidata,
+    otimizar_portfolio,
+    avaliar_candidatas,
     formatar_relatorio,
     enviar_telegram_bot,
     CANDIDATAS
@@ -34,8 +34,17 @@ class OtimizadorQuinzenalV9:
     Otimizador integrado com sistema dinâmico de portfólio
     """
     
-    def __init__(self):
+    def __init__(self, workers: Optional[int] = None, workers_download: Optional[int] = None):
+        """
+        Args:
+            workers: Processos para as varreduras de períodos (1 = sequencial;
+                padrão OTIMIZADOR_WORKERS ou número de CPUs)
+            workers_download: Threads para os downloads (padrão
+                OTIMIZADOR_WORKERS_DOWNLOAD ou 8)
+        """
         self.portfolio = PortfolioManager()
+        self.workers = workers
+        self.workers_download = workers_download
         self.mudancas_realizadas = {
             'periodos_atualizados': [],
             'criptos_adicionadas': [],
@@ -100,16 +109,18 @@ class OtimizadorQuinzenalV9:
         otimizacoes = []
         criptos_ativas = self.portfolio.obter_criptos_ativas()
         
-        for cripto in criptos_ativas:
-            # Converter para formato esperado pelo otimizador original
-            cripto_formato = {
-                'name': cripto['name'],
-                'yahoo': cripto['yahoo'],
-                'period': cripto['period_chilo'],
-                'emoji': cripto.get('emoji', '💎')
-            }
-            
-            resultado = otimizar_periodo(cripto_formato)
+        # Converter para formato esperado pelo otimizador original
+        criptos_formato = [{
+            'name': cripto['name'],
+            'yahoo': cripto['yahoo'],
+            'period': cripto['period_chilo'],
+            'emoji': cripto.get('emoji', '💎')
+        } for cripto in criptos_ativas]
+        
+        # Downloads e varreduras em paralelo; resultados na ordem do portfólio
+        resultados = otimizar_portfolio(criptos_formato, self.workers, self.workers_download)
+        
+        for resultado in resultados:
             if resultado:
                 otimizacoes.append(resultado)
                 
@@ -131,18 +142,14 @@ class OtimizadorQuinzenalV9:
         """
         Avalia criptomoedas candidatas
         """
-        candidatas_aprovadas = []
-        
         # Filtrar candidatas que já estão no portfólio
         criptos_atuais = [c['name'] for c in self.portfolio.obter_criptos_ativas()]
         candidatas_filtradas = [c for c in CANDIDATAS if c['name'] not in criptos_atuais]
         
         print(f"Avaliando {len(candidatas_filtradas)} candidatas...")
         
-        for candidata in candidatas_filtradas:
-            resultado = avaliar_candidata(candidata)
-            if resultado:
-                candidatas_aprovadas.append(resultado)
+        resultados = avaliar_candidatas(candidatas_filtradas, self.workers, self.workers_download)
+        candidatas_aprovadas = [r for r in resultados if r]
         
         # Ordenar por score
         candidatas_aprovadas.sort(key=lambda x: x['score'], reverse=True)
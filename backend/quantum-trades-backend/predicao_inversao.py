@@ -6,44 +6,118 @@ Magnus Wealth v9.0.0
 Usa modelos treinados para prever inversão de tendência
 """
 
-import joblib
+import numpy as np
 import pandas as pd
 import os
-from typing import Dict, Optional
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional
+
+from registro_modelos import RegistroModelos, obter_registro
 
 MODEL_DIR = 'ml_models'
 
+# Ordem das 12 features usada no treino
+FEATURE_COLS = [f'{tf}_{campo}' for tf in ['15m', '30m', '1h', '6h', '8h', '12h']
+                for campo in ('estado', 'candles_virados')]
+
+def montar_predicao(cripto: str, predicao, probabilidade: np.ndarray, features: Dict) -> Dict:
+    """
+    Resultado de uma predição a partir da classe e da linha de predict_proba
+    """
+    return {
+        'cripto': cripto,
+        'vai_virar': bool(predicao),
+        'probabilidade_nao_virar': float(probabilidade[0]),
+        'probabilidade_virar': float(probabilidade[1]),
+        'sinal_execucao': probabilidade[1] > 0.70,
+        'features': features
+    }
+
+
+class ModelosSobDemanda(Mapping):
+    """
+    Visão {cripto: modelo} que só carrega um modelo quando ele é acessado
+    """
+    
+    def __init__(self, preditor: 'PreditorInversao'):
+        self.preditor = preditor
+    
+    def __getitem__(self, cripto: str):
+        modelo = self.preditor.obter_modelo(cripto)
+        if modelo is None:
+            raise KeyError(cripto)
+        return modelo
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.preditor.arquivos)
+    
+    def __len__(self) -> int:
+        return len(self.preditor.arquivos)
+    
+    def __contains__(self, cripto) -> bool:
+        return cripto in self.preditor.arquivos
+
+
 class PreditorInversao:
     """
     Classe para fazer predições de inversão usando modelos treinados
+    
+    Os modelos não são lidos na inicialização: cada um é carregado pelo
+    registro compartilhado (registro_modelos) no primeiro uso, mantido em um
+    LRU limitado e relido se o arquivo mudar.
     """
     
-    def __init__(self):
-        self.modelos = {}
+    def __init__(self, model_dir: str = MODEL_DIR, registro: Optional[RegistroModelos] = None):
+        self.model_dir = model_dir
+        self.registro = registro if registro is not None else obter_registro()
+        self.arquivos = {}  # {cripto: caminho do modelo}
         self.carregar_modelos()
     
+    @property
+    def modelos(self) -> ModelosSobDemanda:
+        """Modelos disponíveis, carregados sob demanda"""
+        return ModelosSobDemanda(self)
+    
     def carregar_modelos(self):
         """
-        Carrega todos os modelos treinados
+        Indexa os modelos treinados disponíveis (sem carregá-los)
         """
-        if not os.path.exists(MODEL_DIR):
-            print(f"⚠️ Diretório de modelos não encontrado: {MODEL_DIR}")
+        if not os.path.exists(self.model_dir):
+            print(f"⚠️ Diretório de modelos não encontrado: {self.model_dir}")
             return
         
         # Procurar por arquivos de modelo
-        for arquivo in os.listdir(MODEL_DIR):
+        for arquivo in os.listdir(self.model_dir):
             if arquivo.endswith('_inversao.pkl'):
                 cripto = arquivo.replace('_inversao.pkl', '').replace('_', ' ').title()
-                model_path = os.path.join(MODEL_DIR, arquivo)
-                
-                try:
-                    modelo = joblib.load(model_path)
-                    self.modelos[cripto] = modelo
-                    print(f"✓ Modelo carregado: {cripto}")
-                except Exception as e:
-                    print(f"❌ Erro ao carregar modelo {cripto}: {e}")
+                self.arquivos[cripto] = os.path.join(self.model_dir, arquivo)
+        
+        print(f"\n📊 Total de modelos disponíveis: {len(self.arquivos)}")
+    
+    def obter_modelo(self, cripto: str):
+        """
+        Modelo de uma criptomoeda, carregado no primeiro uso
+        
+        Returns:
+            Modelo treinado, ou None se não existir ou falhar ao carregar
+        """
+        caminho = self.arquivos.get(cripto)
+        if caminho is None:
+            # Modelo treinado depois da inicialização
+            arquivo = cripto.lower().replace(' ', '_') + '_inversao.pkl'
+            caminho = os.path.join(self.model_dir, arquivo)
+            if not os.path.exists(caminho):
+                return None
+            self.arquivos[cripto] = caminho
         
-        print(f"\n📊 Total de modelos carregados: {len(self.modelos)}")
+        try:
+            return self.registro.obter(caminho)
+        except FileNotFoundError:
+            self.arquivos.pop(cripto, None)
+            return None
+        except Exception as e:
+            print(f"❌ Erro ao carregar modelo {cripto}: {e}")
+            return None
     
     def prever(self, cripto: str, features: Dict) -> Optional[Dict]:
         """
@@ -63,45 +137,15 @@ class PreditorInversao:
         Returns:
             Dicionário com predição e probabilidade
         """
-        if cripto not in self.modelos:
-            print(f"⚠️ Modelo não encontrado para {cripto}")
-            return None
-        
-        modelo = self.modelos[cripto]
-        
-        # Preparar features
-        feature_cols = []
-        for tf in ['15m', '30m', '1h', '6h', '8h', '12h']:
-            feature_cols.append(f'{tf}_estado')
-            feature_cols.append(f'{tf}_candles_virados')
-        
-        # Verificar se todas as features estão presentes
-        missing = [col for col in feature_cols if col not in features]
-        if missing:
-            print(f"⚠️ Features faltando: {missing}")
-            return None
-        
-        # Criar DataFrame
-        X = pd.DataFrame([{col: features[col] for col in feature_cols}])
-        
-        # Predizer
-        predicao = modelo.predict(X)[0]
-        probabilidade = modelo.predict_proba(X)[0]
-        
-        resultado = {
-            'cripto': cripto,
-            'vai_virar': bool(predicao),
-            'probabilidade_nao_virar': float(probabilidade[0]),
-            'probabilidade_virar': float(probabilidade[1]),
-            'sinal_execucao': probabilidade[1] > 0.70,
-            'features': features
-        }
-        
-        return resultado
+        return self.prever_todas({cripto: features}).get(cripto)
     
     def prever_todas(self, features_por_cripto: Dict[str, Dict]) -> Dict:
         """
-        Faz predição para múltiplas criptomoedas
+        Faz predição para múltiplas criptomoedas em lote
+        
+        As features de todas as criptos são empilhadas em uma matriz e as
+        criptos que compartilham o mesmo modelo são previstas juntas, com uma
+        única chamada a predict_proba por modelo.
         
         Args:
             features_por_cripto: {
@@ -113,14 +157,39 @@ class PreditorInversao:
         Returns:
             Dicionário com predições de todas as criptos
         """
-        resultados = {}
-        
+        # Agrupar criptos por modelo (o registro devolve o mesmo objeto
+        # para o mesmo arquivo)
+        grupos = {}  # id(modelo) -> (modelo, [criptos])
         for cripto, features in features_por_cripto.items():
-            resultado = self.prever(cripto, features)
-            if resultado:
-                resultados[cripto] = resultado
+            modelo = self.obter_modelo(cripto)
+            if modelo is None:
+                print(f"⚠️ Modelo não encontrado para {cripto}")
+                continue
+            
+            # Verificar se todas as features estão presentes
+            missing = [col for col in FEATURE_COLS if col not in features]
+            if missing:
+                print(f"⚠️ Features faltando: {missing}")
+                continue
+            
+            grupos.setdefault(id(modelo), (modelo, []))[1].append(cripto)
+        
+        predicoes = {}
+        for modelo, criptos in grupos.values():
+            X = pd.DataFrame(
+                np.array([[features_por_cripto[c][col] for col in FEATURE_COLS] for c in criptos]),
+                columns=FEATURE_COLS
+            )
+            # predict equivale ao argmax de predict_proba
+            probabilidades = modelo.predict_proba(X)
+            classes = modelo.classes_[probabilidades.argmax(axis=1)]
+            
+            for cripto, predicao, probabilidade in zip(criptos, classes, probabilidades):
+                predicoes[cripto] = montar_predicao(cripto, predicao, probabilidade,
+                                                    features_por_cripto[cripto])
         
-        return resultados
+        # Mesma ordem da entrada
+        return {cripto: predicoes[cripto] for cripto in features_por_cripto if cripto in predicoes}
     
     def verificar_criterio_ml(self, cripto: str, features: Dict, threshold: float = 0.70) -> bool:
         """
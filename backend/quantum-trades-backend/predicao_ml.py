@@ -10,9 +10,13 @@ import numpy as np
 import pandas as pd
 import joblib
 import json
-from typing import Dict, Tuple, List
+from collections import OrderedDict
+from typing import Dict, Hashable, Tuple, List, Optional
 from datetime import datetime
 
+# Features extraídas mantidas em cache, por (símbolo, último candle)
+CACHE_FEATURES = 256
+
 class PreditorPeriodo:
     """
     Preditor de período ótimo usando Machine Learning
@@ -33,6 +37,8 @@ class PreditorPeriodo:
         self.scaler_path = scaler_path or os.path.join(base_dir, 'scaler_ml.pkl')
         self.metadata_path = metadata_path or os.path.join(base_dir, 'modelo_metadata.json')
         
+        self.metricas = {}
+        
         # Verificar se modelo existe
         self.modelo_disponivel = os.path.exists(self.modelo_path) and os.path.exists(self.scaler_path)
         
@@ -43,6 +49,8 @@ class PreditorPeriodo:
             self.modelo = None
             self.scaler = None
             self.feature_cols = None
+        
+        self._cache_features = OrderedDict()
     
     def carregar_modelo(self):
         """
@@ -74,16 +82,37 @@ class PreditorPeriodo:
             self.modelo = None
             self.scaler = None
     
-    def extrair_features(self, df: pd.DataFrame) -> Dict:
+    def extrair_features(self, df: pd.DataFrame, simbolo: Optional[Hashable] = None) -> Dict:
         """
         Extrai features do mercado para ML
         
+        Com `simbolo`, o resultado fica em cache por (símbolo, timestamp do
+        último candle): prever_periodo e classificar_padrao sobre os mesmos
+        dados calculam ATR, RSI, MA50 e autocorrelações uma única vez.
+        
         Args:
             df: DataFrame com dados OHLCV
+            simbolo: Identificador do ativo (ex: 'BTC-USD') para o cache
             
         Returns:
             Dict com features extraídas
         """
+        if simbolo is None or len(df) == 0:
+            return self._calcular_features(df)
+        
+        chave = (simbolo, df.index[-1])
+        if chave in self._cache_features:
+            self._cache_features.move_to_end(chave)
+        else:
+            self._cache_features[chave] = self._calcular_features(df)
+            if len(self._cache_features) > CACHE_FEATURES:
+                self._cache_features.popitem(last=False)
+        
+        features = self._cache_features[chave]
+        return dict(features) if features is not None else None
+    
+    def _calcular_features(self, df: pd.DataFrame) -> Dict:
+        """Calcula as features de extrair_features (sem cache)"""
         # Garantir que temos dados suficientes
         if len(df) < 60:
             return None
@@ -153,12 +182,15 @@ class PreditorPeriodo:
             print(f"   ❌ Erro ao extrair features: {e}")
             return None
     
-    def prever_periodo(self, df: pd.DataFrame) -> Tuple[int, float, List[int]]:
+    def prever_periodo(self, df: pd.DataFrame, simbolo: Optional[Hashable] = None,
+                       top_n: int = 3) -> Tuple[int, float, List[int]]:
         """
         Prevê período ótimo e confiança
         
         Args:
             df: DataFrame com dados OHLCV
+            simbolo: Identificador do ativo (ativa o cache de features)
+            top_n: Quantidade de períodos sugeridos
             
         Returns:
             Tuple com (periodo_previsto, confianca, top3_periodos)
@@ -167,51 +199,111 @@ class PreditorPeriodo:
             return None, 0, []
         
         # Extrair features
-        features = self.extrair_features(df)
+        features = self.extrair_features(df, simbolo)
         if features is None:
             return None, 0, []
         
         try:
-            # Preparar features na ordem correta
-            X = np.array([[features[col] for col in self.feature_cols]])
-            X_scaled = self.scaler.transform(X)
-            
-            # Predição
-            periodo_previsto = int(self.modelo.predict(X_scaled)[0])
-            
-            # Calcular confiança baseado em variância do ensemble
-            predicoes_arvores = [tree.predict(X_scaled)[0] for tree in self.modelo.estimators_[:10]]  # Usar 10 árvores
-            std_predicoes = np.std(predicoes_arvores)
-            mean_predicoes = np.mean(predicoes_arvores)
-            
-            # Confiança: quanto menor a variância, maior a confiança
-            confianca = max(0, min(1, 1 - (std_predicoes / max(mean_predicoes, 1))))
-            
-            # Top 3 períodos (baseado em predições das árvores)
-            periodos_unicos = sorted(set([int(p) for p in predicoes_arvores]))
-            top3 = periodos_unicos[:3] if len(periodos_unicos) >= 3 else periodos_unicos
-            
-            # Garantir que período previsto está no top3
-            if periodo_previsto not in top3:
-                top3 = [periodo_previsto] + top3[:2]
-            
-            return periodo_previsto, confianca, top3
-            
+            return self._prever_lote([features], top_n)[0]
         except Exception as e:
             print(f"   ❌ Erro na predição: {e}")
             return None, 0, []
     
-    def classificar_padrao(self, df: pd.DataFrame) -> str:
+    def prever_periodos(self, dados: Dict[Hashable, pd.DataFrame],
+                        top_n: int = 3) -> Dict[Hashable, Tuple[int, float, List[int]]]:
+        """
+        Prevê período ótimo de vários ativos de uma vez
+        
+        Cada ativo custa uma extração de features (reaproveitada pelo cache);
+        as features são empilhadas e passam pelo scaler e pelas árvores
+        uma única vez.
+        
+        Args:
+            dados: {simbolo: DataFrame OHLCV}
+            top_n: Quantidade de períodos sugeridos por ativo
+            
+        Returns:
+            {simbolo: (periodo_previsto, confianca, top_periodos)}
+        """
+        resultados = {simbolo: (None, 0, []) for simbolo in dados}
+        if not self.modelo_disponivel:
+            return resultados
+        
+        features = {}
+        for simbolo, df in dados.items():
+            extraidas = self.extrair_features(df, simbolo)
+            if extraidas is not None:
+                features[simbolo] = extraidas
+        
+        if not features:
+            return resultados
+        
+        try:
+            previsoes = self._prever_lote(list(features.values()), top_n)
+        except Exception as e:
+            print(f"   ❌ Erro na predição: {e}")
+            return resultados
+        
+        resultados.update(zip(features, previsoes))
+        return resultados
+    
+    def _prever_lote(self, lista_features: List[Dict], top_n: int) -> List[Tuple[int, float, List[int]]]:
+        """
+        Período, confiança e períodos mais votados a partir de todas as árvores
+        
+        As previsões de cada árvore são empilhadas em uma matriz
+        (árvores x amostras) e a média, a confiança e a votação são
+        calculadas sobre ela de forma vetorizada.
+        """
+        # Preparar features na ordem correta
+        X = np.array([[features[col] for col in self.feature_cols] for features in lista_features])
+        X_scaled = np.ascontiguousarray(self.scaler.transform(X), dtype=np.float32)
+        
+        predicoes_arvores = np.stack([
+            arvore.predict(X_scaled, check_input=False) for arvore in self.modelo.estimators_
+        ])
+        n_arvores = len(predicoes_arvores)
+        
+        # Mesma soma sequencial do RandomForestRegressor.predict
+        media_floresta = np.cumsum(predicoes_arvores, axis=0)[-1] / n_arvores
+        
+        # Confiança: quanto menor a variância, maior a confiança
+        std_predicoes = predicoes_arvores.std(axis=0)
+        mean_predicoes = predicoes_arvores.mean(axis=0)
+        confiancas = np.clip(1 - std_predicoes / np.maximum(mean_predicoes, 1), 0, 1)
+        
+        # Top períodos: os mais votados pelas árvores (empate: menor período)
+        votos_periodos = predicoes_arvores.astype(int)
+        menor = votos_periodos.min()
+        contagens = np.zeros((votos_periodos.shape[1], votos_periodos.max() - menor + 1), dtype=int)
+        np.add.at(contagens, (np.arange(votos_periodos.shape[1]), votos_periodos - menor), 1)
+        ordem = np.argsort(-contagens, axis=1, kind='stable')[:, :top_n]
+        
+        resultados = []
+        for i, periodo in enumerate(media_floresta):
+            periodo_previsto = int(periodo)
+            top = [int(p) + menor for p in ordem[i] if contagens[i, p] > 0]
+            
+            # Garantir que período previsto está no top
+            if periodo_previsto not in top:
+                top = [periodo_previsto] + top[:top_n - 1]
+            
+            resultados.append((periodo_previsto, float(confiancas[i]), top))
+        
+        return resultados
+    
+    def classificar_padrao(self, df: pd.DataFrame, simbolo: Optional[Hashable] = None) -> str:
         """
         Classifica padrão de mercado (heurística simples)
         
         Args:
             df: DataFrame com dados OHLCV
+            simbolo: Identificador do ativo (reaproveita as features em cache)
             
         Returns:
             String com padrão: 'tendencia_forte', 'lateralizacao', 'alta_volatilidade', 'reversao'
         """
-        features = self.extrair_features(df)
+        features = self.extrair_features(df, simbolo)
         if features is None:
             return 'desconhecido'
         
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Registro de Modelos Treinados
+Magnus Wealth v9.1.0
+
+Cache compartilhado dos modelos em disco usado pelo PreditorInversao e
+pelo PricePredictor:
+
+- Carrega cada arquivo só no primeiro uso (a inicialização não lê nada)
+- Usa joblib com memory-mapping (mmap_mode='r'): arrays numpy guardados
+  diretamente no objeto (coeficientes, scalers, pacotes consolidados) ficam
+  no page cache do sistema e são compartilhados entre processos; as árvores
+  do scikit-learn copiam seus nós ao desserializar e ocupam memória normal
+- Mantém no máximo `capacidade` arquivos em memória (LRU)
+- Recarrega automaticamente quando o mtime do arquivo muda (retreino)
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import joblib
+
+# Arquivos mantidos em memória ao mesmo tempo
+CAPACIDADE_PADRAO = int(os.getenv('MODELOS_EM_MEMORIA', '32'))
+
+
+def carregar_joblib(caminho: str) -> Any:
+    """
+    Carrega um arquivo com joblib, mapeando os arrays em memória
+
+    Funciona também com pickles comuns; arquivos comprimidos são carregados
+    sem mmap.
+    """
+    return joblib.load(caminho, mmap_mode='r')
+
+
+class RegistroModelos:
+    """
+    Cache LRU de modelos em disco, indexado pelo caminho do arquivo
+    """
+
+    def __init__(self, capacidade: int = CAPACIDADE_PADRAO,
+                 carregar: Callable[[str], Any] = carregar_joblib):
+        """
+        Args:
+            capacidade: Máximo de arquivos em memória
+            carregar: Função padrão de carga de um arquivo
+        """
+        if capacidade < 1:
+            raise ValueError("Capacidade deve ser ao menos 1")
+
+        self.capacidade = capacidade
+        self.carregar = carregar
+        # caminho -> (mtime, objeto), do menos para o mais recente
+        self._itens: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.RLock()
+        self.cargas = 0
+
+    def obter(self, caminho: str, carregar: Optional[Callable[[str], Any]] = None) -> Any:
+        """
+        Retorna o objeto do arquivo, carregando-o se necessário
+
+        Args:
+            caminho: Arquivo do modelo
+            carregar: Função de carga (padrão: a do registro)
+
+        Returns:
+            Objeto carregado
+
+        Raises:
+            FileNotFoundError: Se o arquivo não existir
+        """
+        caminho = os.path.abspath(caminho)
+        try:
+            mtime = os.stat(caminho).st_mtime_ns
+        except FileNotFoundError:
+            self.descartar(caminho)
+            raise
+
+        with self._lock:
+            item = self._itens.get(caminho)
+            if item is not None and item[0] == mtime:
+                self._itens.move_to_end(caminho)
+                return item[1]
+
+            objeto = (carregar or self.carregar)(caminho)
+            self.cargas += 1
+            self._guardar(caminho, mtime, objeto)
+            return objeto
+
+    def registrar(self, caminho: str, objeto: Any):
+        """
+        Coloca no cache um objeto que acabou de ser salvo em `caminho`
+
+        Evita reler do disco um modelo recém-treinado.
+        """
+        caminho = os.path.abspath(caminho)
+        with self._lock:
+            self._guardar(caminho, os.stat(caminho).st_mtime_ns, objeto)
+
+    def descartar(self, caminho: str):
+        """Remove um arquivo do cache"""
+        with self._lock:
+            self._itens.pop(os.path.abspath(caminho), None)
+
+    def limpar(self):
+        """Remove todos os arquivos do cache"""
+        with self._lock:
+            self._itens.clear()
+
+    def _guardar(self, caminho: str, mtime: int, objeto: Any):
+        self._itens[caminho] = (mtime, objeto)
+        self._itens.move_to_end(caminho)
+        while len(self._itens) > self.capacidade:
+            self._itens.popitem(last=False)
+
+    def __contains__(self, caminho: str) -> bool:
+        with self._lock:
+            return os.path.abspath(caminho) in self._itens
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._itens)
+
+
+_registro_padrao: Optional[RegistroModelos] = None
+
+
+def obter_registro() -> RegistroModelos:
+    """Registro compartilhado pelos preditores do processo"""
+    global _registro_padrao
+    if _registro_padrao is None:
+        _registro_padrao = RegistroModelos()
+    return _registro_padrao
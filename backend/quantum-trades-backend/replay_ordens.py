@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+"""
+Replay Histórico do Sistema de Ordens
+Magnus Wealth v9.1.0
+
+Reexecuta o SistemaOrdensMagnus sobre o histórico do armazém local, com um
+relógio simulado e sem acessar a rede:
+
+- O relógio avança de 15 em 15 minutos (fechamento de cada candle de 15m)
+- MonitorReplay entrega, a cada passo, o mesmo resultado que o monitor ao
+  vivo veria naquele instante: candles fechados entram no ChiloIncremental e
+  o candle em formação é avaliado com prever() no último preço
+- Critérios, stop loss e execução passam pelo mesmo fluxo
+  (verificar_e_executar_ordens) com o executor sem persistência e sem
+  notificações
+- As predições ML são feitas antes do laço, uma chamada a predict_proba por
+  cripto sobre as combinações distintas de features
+
+Resultado: diário de ordens e curva de patrimônio (caixa + posições a
+mercado) em cada passo.
+
+Uso:
+    python3 replay_ordens.py [inicio] [fim]
+"""
+
+import copy
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from analisador_criterios import CONFIG_FILE, AnalisadorCriterios
+from armazem_ohlcv import REGRAS, ArmazemOHLCV
+from chilo_incremental import ChiloIncremental
+from executador_ordens import ExecutadorOrdens
+from monitor_multitimeframe import CRIPTOS, TIMEFRAMES, MonitorMultiTimeframe
+from predicao_inversao import FEATURE_COLS, MODEL_DIR, PreditorInversao, montar_predicao
+from sistema_ordens_magnus import SistemaOrdensMagnus, config_padrao
+
+# Diretório dos resultados salvos
+REPLAY_DIR = 'data/replays'
+
+# Passo do relógio simulado
+PASSO = pd.Timedelta('15min')
+
+
+def sem_rede(*args, **kwargs):
+    """Função de download do armazém do replay: nunca acessa a rede"""
+    raise RuntimeError("Replay não acessa a rede: use apenas o armazém local")
+
+
+def em_utc(data) -> pd.Timestamp:
+    """Data (str, datetime ou Timestamp) em UTC; datas sem fuso são UTC"""
+    data = pd.Timestamp(data)
+    return data.tz_localize('UTC') if data.tz is None else data.tz_convert('UTC')
+
+
+class RelogioSimulado:
+    """
+    Relógio do replay, chamado no lugar de datetime.now
+    """
+
+    def __init__(self, inicio: Optional[datetime] = None):
+        self.atual = inicio
+
+    def __call__(self) -> datetime:
+        return self.atual
+
+
+class NotificadorSilencioso:
+    """
+    Notificador do replay: não envia mensagens
+    """
+
+    def notificar_ordem_executada(self, **kwargs) -> bool:
+        return False
+
+    def notificar_erro_usuario(self, **kwargs) -> bool:
+        return False
+
+
+class MonitorReplay(MonitorMultiTimeframe):
+    """
+    Monitor multi-timeframe que lê o armazém local em um instante simulado
+
+    preparar() percorre os candles uma única vez e guarda, para cada passo do
+    relógio, o estado e os candles virados de cada timeframe; monitorar_cripto()
+    apenas monta o resultado do passo atual.
+    """
+
+    def __init__(self, criptos: List[Dict], relogio: RelogioSimulado,
+                 armazem: Optional[ArmazemOHLCV] = None, periodos: Optional[Dict] = None):
+        """
+        Args:
+            criptos: Criptos no formato de CRIPTOS ({'name', 'yahoo', 'period'})
+            relogio: Relógio simulado, avançado por posicionar()
+            armazem: Armazém local (padrão: ARMAZEM_DIR, sem rede)
+            periodos: Períodos por {cripto: {timeframe: período}} (padrão:
+                os otimizados pelo coletor)
+        """
+        super().__init__()
+        if periodos is not None:
+            self.periodos_otimizados = periodos
+
+        self.criptos = criptos
+        self.relogio = relogio
+        self.armazem = armazem or ArmazemOHLCV(buscar=sem_rede)
+
+        self.passos = pd.DatetimeIndex([], tz='UTC')
+        self._instantes = np.array([], dtype=object)
+        self.indice = 0
+        # {cripto: array de preços por passo (NaN antes do primeiro candle)}
+        self.precos: Dict[str, np.ndarray] = {}
+        # {cripto: {timeframe: (período, estados, candles_virados, válidos)}}
+        self.series: Dict[str, Dict[str, tuple]] = {}
+
+    def carregar_timeframe(self, yahoo: str, tf_name: str) -> Optional[pd.DataFrame]:
+        """Candles de um timeframe lidos do armazém, sem atualizar"""
+        df = self.armazem.obter_timeframe(yahoo, tf_name, atualizar=False)
+        if df is None or len(df) == 0:
+            return None
+        indice = df.index.tz_convert('UTC') if df.index.tz is not None else df.index.tz_localize('UTC')
+        df.index = indice.as_unit('ns')
+        return df
+
+    def preparar(self, inicio: Optional[datetime] = None, fim: Optional[datetime] = None) -> pd.DatetimeIndex:
+        """
+        Define os passos do replay e calcula os timeframes em cada um deles
+
+        Os passos são os fechamentos dos candles de 15m de todas as criptos
+        entre `inicio` e `fim`. O histórico anterior a `inicio` aquece o
+        CHiLo.
+
+        Returns:
+            Passos do relógio simulado
+        """
+        quinze = {}
+        for cripto in self.criptos:
+            df = self.carregar_timeframe(cripto['yahoo'], '15m')
+            if df is not None:
+                quinze[cripto['name']] = df
+
+        if not quinze:
+            raise ValueError("Sem candles de 15m no armazém para as criptos do replay")
+
+        fechamentos = pd.DatetimeIndex(np.unique(np.concatenate(
+            [(df.index + PASSO).asi8 for df in quinze.values()]
+        ))).tz_localize('UTC')
+        if inicio is not None:
+            fechamentos = fechamentos[fechamentos >= em_utc(inicio)]
+        if fim is not None:
+            fechamentos = fechamentos[fechamentos <= em_utc(fim)]
+        self.passos = fechamentos
+        self._instantes = fechamentos.to_pydatetime()
+
+        for cripto in self.criptos:
+            nome = cripto['name']
+            self.precos[nome] = np.full(len(self.passos), np.nan)
+            self.series[nome] = {}
+
+            df = quinze.get(nome)
+            if df is None:
+                continue
+
+            # Último fechamento de 15m conhecido em cada passo
+            posicao = np.searchsorted((df.index + PASSO).asi8, self.passos.asi8, side='right') - 1
+            conhecido = posicao >= 0
+            self.precos[nome][conhecido] = df['close'].to_numpy(dtype=float)[posicao[conhecido]]
+
+            for tf_name in TIMEFRAMES:
+                serie = self._serie_timeframe(cripto, tf_name, self.precos[nome])
+                if serie is not None:
+                    self.series[nome][tf_name] = serie
+
+        self.posicionar(0)
+        return self.passos
+
+    def _serie_timeframe(self, cripto: Dict, tf_name: str, precos: np.ndarray) -> Optional[tuple]:
+        """
+        Estado do timeframe em cada passo, como o monitor ao vivo o veria
+
+        Um candle entra no CHiLo quando fecha (abertura + duração <= relógio);
+        o candle em formação é avaliado com o último preço. Sem candle em
+        formação no armazém, vale o último estado registrado.
+        """
+        df = self.carregar_timeframe(cripto['yahoo'], tf_name)
+        if df is None:
+            return None
+
+        period = self.periodo_timeframe(cripto, tf_name)
+        chilo = ChiloIncremental(cripto['yahoo'], tf_name, period)
+
+        aberturas = df.index.to_list()
+        fechamentos = (df.index + pd.Timedelta(REGRAS[tf_name])).asi8
+        highs = df['high'].to_numpy(dtype=float)
+        lows = df['low'].to_numpy(dtype=float)
+        closes = df['close'].to_numpy(dtype=float)
+        n = len(df)
+
+        estados = np.zeros(len(self.passos), dtype=np.int8)
+        virados = np.zeros(len(self.passos), dtype=np.int32)
+        validos = np.zeros(len(self.passos), dtype=bool)
+
+        j = 0
+        for k, passo in enumerate(self.passos.asi8):
+            while j < n and fechamentos[j] <= passo:
+                chilo.atualizar(aberturas[j], highs[j], lows[j], closes[j])
+                j += 1
+
+            if chilo.candles < period or precos[k] != precos[k]:
+                continue
+
+            if j < n:
+                estados[k], virados[k] = chilo.prever(precos[k])
+            elif chilo.hilo_state == chilo.hilo_state:
+                estados[k], virados[k] = int(chilo.hilo_state), chilo.candles_virados
+            validos[k] = True
+
+        return period, estados, virados, validos
+
+    def posicionar(self, indice: int):
+        """Move o relógio simulado para o passo `indice`"""
+        self.indice = indice
+        if len(self._instantes):
+            self.relogio.atual = self._instantes[indice]
+
+    def preco(self, nome: str) -> float:
+        """Último preço da cripto no passo atual (NaN se ainda não houver)"""
+        return float(self.precos[nome][self.indice])
+
+    def monitorar_cripto(self, cripto: Dict) -> Dict:
+        """
+        Resultado do monitor no passo atual, no formato do monitor ao vivo
+        """
+        nome = cripto['name']
+        k = self.indice
+        preco = self.preco(nome)
+
+        resultado = {
+            'cripto': nome,
+            'yahoo': cripto['yahoo'],
+            'timestamp': self.relogio().isoformat(),
+            'timeframes': {}
+        }
+
+        for tf_name, (period, estados, virados, validos) in self.series.get(nome, {}).items():
+            if not validos[k]:
+                continue
+
+            estado = int(estados[k])
+            resultado['timeframes'][tf_name] = {
+                'periodo': period,
+                'estado': estado,
+                'preco': preco,
+                'candles_virados': int(virados[k]),
+                'tendencia': 'Verde' if estado == 1 else ('Vermelho' if estado == -1 else 'Neutro')
+            }
+
+        return resultado
+
+    def monitorar_todas(self) -> Dict:
+        """Monitora as criptos do replay no passo atual"""
+        return {cripto['name']: self.monitorar_cripto(cripto) for cripto in self.criptos}
+
+    def matriz_features(self, nome: str) -> np.ndarray:
+        """
+        Features de gerar_features_ml em todos os passos, na ordem de FEATURE_COLS
+
+        Returns:
+            Array (passos x 12)
+        """
+        X = np.zeros((len(self.passos), len(FEATURE_COLS)), dtype=np.int64)
+        series = self.series.get(nome, {})
+        for coluna, nome_coluna in enumerate(FEATURE_COLS):
+            tf_name, campo = nome_coluna.split('_', 1)
+            if tf_name not in series:
+                continue
+            _, estados, virados, validos = series[tf_name]
+            valores = estados if campo == 'estado' else virados
+            X[:, coluna] = np.where(validos, valores, 0)
+        return X
+
+
+class PreditorReplay(PreditorInversao):
+    """
+    Preditor com as predições do replay calculadas antes do laço
+
+    preparar() chama predict_proba uma vez por cripto sobre as combinações
+    distintas de features; prever_todas() consulta essas predições e só
+    recorre ao modelo para combinações não preparadas.
+    """
+
+    def __init__(self, model_dir: str = MODEL_DIR, registro=None):
+        super().__init__(model_dir, registro)
+        # (cripto, features) -> (classe, probabilidades)
+        self._preparadas: Dict[tuple, tuple] = {}
+        self._sem_modelo = set()
+
+    def preparar(self, cripto: str, X: np.ndarray):
+        """
+        Prevê todas as linhas distintas de X (ordem de FEATURE_COLS)
+        """
+        modelo = self.obter_modelo(cripto)
+        if modelo is None:
+            self._sem_modelo.add(cripto)
+            return
+        if len(X) == 0:
+            return
+
+        unicas = np.unique(X, axis=0)
+        probabilidades = modelo.predict_proba(pd.DataFrame(unicas, columns=FEATURE_COLS))
+        classes = modelo.classes_[probabilidades.argmax(axis=1)]
+        for linha, classe, probabilidade in zip(unicas.tolist(), classes, probabilidades):
+            self._preparadas[(cripto, tuple(linha))] = (classe, probabilidade)
+
+    def prever_todas(self, features_por_cripto: Dict[str, Dict]) -> Dict:
+        predicoes = {}
+        faltantes = {}
+        for cripto, features in features_por_cripto.items():
+            if cripto in self._sem_modelo:
+                continue
+            preparada = self._preparadas.get((cripto, tuple(features.get(col) for col in FEATURE_COLS)))
+            if preparada is None:
+                faltantes[cripto] = features
+                continue
+            predicoes[cripto] = montar_predicao(cripto, preparada[0], preparada[1], features)
+
+        if faltantes:
+            predicoes.update(super().prever_todas(faltantes))
+
+        return {cripto: predicoes[cripto] for cripto in features_por_cripto if cripto in predicoes}
+
+
+def carregar_config_replay(config: Optional[Dict] = None, config_file: str = CONFIG_FILE) -> Dict:
+    """
+    Configuração do replay: padrão, sobreposta por config_file e por `config`
+
+    Dicionários aninhados (criterios, ml, stop_loss) são mesclados chave a
+    chave.
+    """
+    resultado = config_padrao()
+    camadas = []
+    if os.path.exists(config_file):
+        with open(config_file, 'r') as f:
+            camadas.append(json.load(f))
+    if config:
+        camadas.append(config)
+
+    for camada in camadas:
+        for chave, valor in camada.items():
+            if isinstance(valor, dict) and isinstance(resultado.get(chave), dict):
+                resultado[chave] = {**resultado[chave], **valor}
+            else:
+                resultado[chave] = copy.deepcopy(valor)
+    return resultado
+
+
+class ReplayOrdensMagnus:
+    """
+    Replay do SistemaOrdensMagnus sobre o histórico local
+    """
+
+    def __init__(self, criptos: Optional[List[Dict]] = None, config: Optional[Dict] = None,
+                 armazem: Optional[ArmazemOHLCV] = None, model_dir: str = MODEL_DIR,
+                 periodos: Optional[Dict] = None, config_file: str = CONFIG_FILE,
+                 verbose: bool = False):
+        """
+        Args:
+            criptos: Criptos do replay (padrão: CRIPTOS do portfólio)
+            config: Sobreposições da configuração de ordens (threshold,
+                stop loss, capital...)
+            armazem: Armazém local (padrão: ARMAZEM_DIR, sem rede)
+            model_dir: Diretório dos modelos de inversão
+            periodos: Períodos CHiLo por cripto e timeframe
+            config_file: Configuração base (config_ordens.json)
+            verbose: Se True, mantém as mensagens do sistema a cada passo
+        """
+        self.criptos = list(criptos or CRIPTOS)
+        self.config = carregar_config_replay(config, config_file)
+        self.verbose = verbose
+
+        with self._saida():
+            self.relogio = RelogioSimulado()
+            self.monitor = MonitorReplay(self.criptos, self.relogio, armazem, periodos)
+            self.preditor = PreditorReplay(model_dir)
+            analisador = AnalisadorCriterios(config_file=config_file, monitor=self.monitor,
+                                             preditor=self.preditor, relogio=self.relogio)
+            executador = ExecutadorOrdens(persistir=False, notificador=NotificadorSilencioso(),
+                                          relogio=self.relogio)
+            analisador.config = executador.config = self.config
+
+            self.sistema = SistemaOrdensMagnus(monitor=self.monitor, analisador=analisador,
+                                               executador=executador,
+                                               notificador=NotificadorSilencioso())
+
+    @contextmanager
+    def _saida(self):
+        """Contexto que descarta as mensagens do sistema (exceto em verbose)"""
+        if self.verbose:
+            yield
+            return
+        with open(os.devnull, 'w') as descarte, redirect_stdout(descarte):
+            yield
+
+    def executar(self, inicio: Optional[datetime] = None, fim: Optional[datetime] = None) -> Dict:
+        """
+        Executa o replay entre `inicio` e `fim`
+
+        Returns:
+            Dicionário com o diário de ordens, a curva de patrimônio
+            (pd.Series indexada pelos passos) e a performance do executor
+        """
+        executado_em = time.time()
+
+        with self._saida():
+            passos = self.monitor.preparar(inicio, fim)
+            for cripto in self.criptos:
+                self.preditor.preparar(cripto['name'], self.monitor.matriz_features(cripto['name']))
+
+            executador = self.sistema.executador
+            capital_inicial = float(self.config['capital_inicial'])
+            caixa = capital_inicial
+            patrimonio = np.empty(len(passos))
+            registradas = len(executador.historico)
+
+            for k in range(len(passos)):
+                self.monitor.posicionar(k)
+                self.sistema.verificar_e_executar_ordens()
+
+                # Caixa pelas ordens do passo
+                for ordem in executador.historico[registradas:]:
+                    caixa += ordem['valor_total'] if ordem['tipo'] == 'VENDA' else -ordem['valor_total']
+                registradas = len(executador.historico)
+
+                patrimonio[k] = caixa + sum(
+                    posicao['quantidade'] * self.monitor.preco(cripto)
+                    for cripto, posicao in executador.posicoes.items()
+                )
+
+        curva = pd.Series(patrimonio, index=passos, name='patrimonio')
+        picos = np.maximum.accumulate(patrimonio) if len(patrimonio) else patrimonio
+        drawdown = float(((picos - patrimonio) / picos).max()) if len(patrimonio) else 0.0
+        capital_final = float(patrimonio[-1]) if len(patrimonio) else capital_inicial
+
+        return {
+            'inicio': passos[0].isoformat() if len(passos) else None,
+            'fim': passos[-1].isoformat() if len(passos) else None,
+            'criptos': [cripto['name'] for cripto in self.criptos],
+            'passos': len(passos),
+            'config': self.config,
+            'ordens': list(executador.historico),
+            'posicoes_abertas': dict(executador.posicoes),
+            'curva_capital': curva,
+            'capital_inicial': capital_inicial,
+            'capital_final': capital_final,
+            'retorno_total': (capital_final / capital_inicial - 1) * 100,
+            'max_drawdown': drawdown * 100,
+            'performance': executador.calcular_performance(),
+            'duracao_segundos': time.time() - executado_em
+        }
+
+
+def salvar_resultado(resultado: Dict, diretorio: str = REPLAY_DIR) -> Dict[str, str]:
+    """
+    Salva o diário de ordens (JSON) e a curva de patrimônio (CSV)
+
+    Returns:
+        {'ordens': caminho, 'curva_capital': caminho}
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    prefixo = os.path.join(diretorio, f"replay_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
+    resumo = {chave: valor for chave, valor in resultado.items() if chave != 'curva_capital'}
+    with open(prefixo + '_ordens.json', 'w') as f:
+        json.dump(resumo, f, indent=2, default=str)
+
+    resultado['curva_capital'].to_csv(prefixo + '_curva.csv', header=True)
+
+    return {'ordens': prefixo + '_ordens.json', 'curva_capital': prefixo + '_curva.csv'}
+
+
+def main():
+    """
+    Função principal
+    """
+    inicio = sys.argv[1] if len(sys.argv) > 1 else None
+    fim = sys.argv[2] if len(sys.argv) > 2 else None
+
+    print("=" * 80)
+    print("REPLAY DO SISTEMA DE ORDENS MAGNUS WEALTH")
+    print("=" * 80)
+
+    replay = ReplayOrdensMagnus()
+    resultado = replay.executar(inicio, fim)
+    arquivos = salvar_resultado(resultado)
+
+    perf = resultado['performance']
+    print(f"\n⏱️  {resultado['passos']} passos de 15m em {resultado['duracao_segundos']:.1f}s")
+    print(f"📅 {resultado['inicio']} → {resultado['fim']}")
+    print(f"📋 Ordens: {len(resultado['ordens'])} (taxa de acerto {perf['taxa_acerto']:.2f}%)")
+    print(f"💰 Capital: ${resultado['capital_inicial']:,.2f} → ${resultado['capital_final']:,.2f} "
+          f"({resultado['retorno_total']:+.2f}%)")
+    print(f"📉 Drawdown máximo: {resultado['max_drawdown']:.2f}%")
+    print(f"\n💾 Diário: {arquivos['ordens']}")
+    print(f"💾 Curva: {arquivos['curva_capital']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,7 @@ Serviço para coleta e cache de dados históricos de ações
 import os
 import json
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
@@ -215,25 +216,57 @@ class HistoricalDataService:
         self,
         tickers: List[str],
         period: str = '1y',
-        use_cache: bool = True
+        use_cache: bool = True,
+        max_workers: int = 8
     ) -> Dict[str, Dict]:
         """
         Busca dados de múltiplos tickers
         
+        As requisições são feitas em paralelo (I/O de rede), mantendo a
+        ordem dos tickers no resultado.
+        
         Args:
             tickers: Lista de tickers
             period: Período
             use_cache: Se deve usar cache
+            max_workers: Requisições simultâneas
             
         Returns:
             Dicionário {ticker: dados}
         """
         results = {}
         
-        for ticker in tickers:
-            data = self.get_historical_data(ticker, period, use_cache)
-            if data:
-                results[ticker.upper()] = data
+        if not tickers:
+            return results
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickers)))) as executor:
+            fetched = executor.map(lambda t: self.get_historical_data(t, period, use_cache), tickers)
+            for ticker, data in zip(tickers, fetched):
+                if data:
+                    results[ticker.upper()] = data
+        
+        return results
+    
+    def get_multiple_prices(
+        self,
+        tickers: List[str],
+        period: str = '1y',
+        use_cache: bool = True,
+        max_workers: int = 8
+    ) -> Dict[str, List[float]]:
+        """
+        Retorna os preços de fechamento de vários tickers, buscados em paralelo
+        
+        Returns:
+            Dicionário {ticker: preços}; tickers sem dados ficam de fora
+        """
+        data = self.get_multiple_tickers(tickers, period, use_cache, max_workers)
+        
+        results = {}
+        for ticker, ticker_data in data.items():
+            prices = [item['close'] for item in ticker_data.get('data', []) if item['close'] is not None]
+            if prices:
+                results[ticker] = prices
         
         return results
     
@@ -11,7 +11,7 @@ Orquestra todo o sistema:
 
 from datetime import datetime
 import time
-from typing import Dict, List
+from typing import Dict, List, Optional
 from monitor_multitimeframe import MonitorMultiTimeframe
 from analisador_criterios import AnalisadorCriterios
 from executador_ordens import ExecutadorOrdens
@@ -23,15 +23,23 @@ class SistemaOrdensMagnus:
     Sistema principal que orquestra todas as operações
     """
     
-    def __init__(self):
+    def __init__(self, monitor: Optional[MonitorMultiTimeframe] = None,
+                 analisador: Optional[AnalisadorCriterios] = None,
+                 executador: Optional[ExecutadorOrdens] = None,
+                 notificador: Optional[NotificadorUsuario] = None):
+        """
+        Os módulos podem ser injetados (o replay histórico usa monitor,
+        relógio e executor simulados no mesmo fluxo de decisão)
+        """
         print("=" * 80)
         print("SISTEMA DE ORDENS MAGNUS WEALTH v9.0.0")
         print("=" * 80)
         
-        self.monitor = MonitorMultiTimeframe()
-        self.analisador = AnalisadorCriterios()
-        self.executador = ExecutadorOrdens()
-        self.notificador = NotificadorUsuario()
+        self.monitor = monitor or MonitorMultiTimeframe()
+        # Analisador compartilha o monitor (e o estado CHiLo incremental)
+        self.analisador = analisador or AnalisadorCriterios(monitor=self.monitor)
+        self.executador = executador or ExecutadorOrdens()
+        self.notificador = notificador or NotificadorUsuario()
         
         print("\n✅ Todos os módulos inicializados")
     
@@ -48,15 +56,19 @@ class SistemaOrdensMagnus:
         print("\n📊 Monitorando timeframes...")
         resultados_monitor = self.monitor.monitorar_todas()
         
+        # Predição ML de todas as criptos de uma vez (uma chamada por modelo)
+        features_por_cripto = {
+            cripto: self.monitor.gerar_features_ml(resultado_monitor)
+            for cripto, resultado_monitor in resultados_monitor.items()
+        }
+        predicoes = self.analisador.preditor.prever_todas(features_por_cripto)
+        
         # Para cada cripto, verificar critérios
         for cripto, resultado_monitor in resultados_monitor.items():
             print(f"\n{'='*80}")
             print(f"🪙 {cripto}")
             print(f"{'='*80}")
             
-            # Gerar features para ML
-            features = self.monitor.gerar_features_ml(resultado_monitor)
-            
             # Preço atual
             preco_atual = resultado_monitor['timeframes'].get('1d', {}).get('preco', 0)
             
@@ -96,7 +108,7 @@ class SistemaOrdensMagnus:
                 print(f"📍 Sem posição aberta")
                 
                 # Analisar critérios para compra
-                analise = self.analisador.analisar_cripto(cripto)
+                analise = self.analisador.analisar_cripto(cripto, resultado_monitor, predicoes)
                 
                 if analise.get('executar_ordem', False):
                     print(f"\n✅ CRITÉRIOS SATISFEITOS - Executando compra...")
@@ -186,11 +198,11 @@ class SistemaOrdensMagnus:
             )
 
 
-def criar_config_padrao():
+def config_padrao() -> Dict:
     """
-    Cria arquivo de configuração padrão
+    Configuração padrão do sistema de ordens
     """
-    config = {
+    return {
         'execucao_ativa': False,
         'modo_teste': True,
         'capital_inicial': 1000.0,
@@ -211,6 +223,13 @@ def criar_config_padrao():
         'horario_verificacao_diario': '21:00:01',
         'intervalo_verificacao_minutos': 15
     }
+
+
+def criar_config_padrao():
+    """
+    Cria arquivo de configuração padrão
+    """
+    config = config_padrao()
     
     with open('config_ordens.json', 'w') as f:
         json.dump(config, f, indent=2)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste dos Endpoints de Portfólio
+Magnus Wealth - Versão 9.1.0
+
+Requisições simultâneas de fronteira eficiente não podem misturar os
+tickers de universos diferentes: cada requisição usa o seu otimizador.
+Erros de entrada nos backtests de carteira respondem 400, não 500, e a
+varredura recusa mais carteiras que o limite em vez de cortá-las.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+import app as servidor
+
+
+def gerar_historico(tickers, seed, n_dias=250):
+    rng = np.random.default_rng(seed)
+    return {
+        ticker: list(50 * np.cumprod(1 + rng.normal(0.0005, 0.015, n_dias)))
+        for ticker in tickers
+    }
+
+
+def test_otimizador_novo_por_requisicao():
+    primeiro = servidor.obter_otimizador_portfolio({})
+    segundo = servidor.obter_otimizador_portfolio({})
+    assert primeiro is not segundo and primeiro is not servidor.portfolio_optimizer
+    assert servidor.obter_otimizador_portfolio({'covariance_method': 'ewma'}).covariance_method == 'ewma'
+
+
+def test_fronteiras_simultaneas_mantem_os_proprios_tickers():
+    universos = [
+        gerar_historico(['PETR4', 'VALE3', 'ITUB4'], seed=1),
+        gerar_historico(['BBAS3', 'WEGE3', 'ABEV3', 'RENT3', 'SUZB3'], seed=2),
+    ]
+    servidor.app.config['TESTING'] = True
+
+    def fronteira(k):
+        historico = universos[k % 2]
+        with servidor.app.test_client() as cliente:
+            resposta = cliente.post('/api/ml/portfolio/frontier', json={
+                'prices_history': historico, 'n_points': 50, 'include_weights': True
+            })
+        return historico, resposta.status_code, resposta.get_json()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        respostas = list(executor.map(fronteira, range(40)))
+
+    for historico, status, dados in respostas:
+        assert status == 200
+        assert sorted(dados['tickers']) == sorted(historico)
+        for ponto in dados['frontier']:
+            assert set(ponto['weights']) <= set(historico)
+
+
+@contextmanager
+def cliente_com_historico(tickers):
+    """Cliente Flask com históricos sintéticos no formato de get_multiple_tickers"""
+    datas = list(pd.bdate_range('2024-01-02', periods=250).strftime('%Y-%m-%d'))
+    historicos = {
+        ticker: {'data': [{'date': data, 'close': preco} for data, preco in zip(datas, precos)]}
+        for ticker, precos in gerar_historico(tickers, seed=3).items()
+    }
+
+    def buscar(tickers, period='1y'):
+        return {ticker: historicos[ticker] for ticker in tickers if ticker in historicos}
+
+    servidor.historical_data_service.get_multiple_tickers = buscar
+    servidor.app.config['TESTING'] = True
+    try:
+        yield servidor.app.test_client()
+    finally:
+        del servidor.historical_data_service.get_multiple_tickers
+
+
+def test_backtest_de_portfolio_com_entrada_invalida_responde_400():
+    invalidos = [
+        {'allocations': {'PETR4': 0.5, 'VALE3': 0.5}, 'rebalance': 'periodic', 'rebalance_every': 0},
+        {'allocations': {'PETR4': 0.5, 'VALE3': 0.5}, 'rebalance': 'periodic', 'rebalance_every': 'mensal'},
+        {'allocations': {'PETR4': 0.5, 'XXXX3': 0.5}},
+    ]
+    with cliente_com_historico(['PETR4', 'VALE3']) as cliente:
+        for corpo in invalidos:
+            resposta = cliente.post('/api/backtest/portfolio', json=corpo)
+            assert resposta.status_code == 400
+            assert resposta.get_json()['message']
+
+
+def test_varredura_acima_do_limite_responde_400():
+    limite = servidor.MAX_SWEEP_CANDIDATES
+    with cliente_com_historico(['PETR4', 'VALE3']) as cliente:
+        resposta = cliente.post('/api/backtest/sweep', json={
+            'tickers': ['PETR4', 'VALE3'], 'candidates': {'source': 'dirichlet', 'n': 200, 'seed': 1}, 'top_n': 5
+        })
+        assert resposta.status_code == 200
+        assert resposta.get_json()['sweep']['n_candidates'] == 200
+
+        for corpo in ({'candidates': {'source': 'dirichlet', 'n': limite + 1}},
+                      {'weights': [[0.5, 0.5]] * (limite + 1)}):
+            resposta = cliente.post('/api/backtest/sweep', json={'tickers': ['PETR4', 'VALE3'], **corpo})
+            assert resposta.status_code == 400
+            assert str(limite) in resposta.get_json()['error']
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("TESTE: Endpoints de portfólio")
+    print("=" * 60)
+
+    test_otimizador_novo_por_requisicao()
+    print("✓ Otimizador novo a cada requisição")
+
+    test_fronteiras_simultaneas_mantem_os_proprios_tickers()
+    print("✓ Fronteiras simultâneas mantêm os próprios tickers")
+
+    test_backtest_de_portfolio_com_entrada_invalida_responde_400()
+    print("✓ Backtest de portfólio com entrada inválida responde 400")
+
+    test_varredura_acima_do_limite_responde_400()
+    print("✓ Varredura acima do limite de carteiras responde 400")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do Endpoint de Treino em Lote
+Magnus Wealth - Versão 9.1.0
+
+/api/ml/predict/train/batch deve validar "workers" antes de começar a
+responder (também no modo stream) e devolver as métricas de cada ticker,
+com os sem histórico marcados como erro.
+"""
+
+import json
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+
+import app as servidor
+from ml_models.price_predictor import PricePredictor
+
+ROTA = '/api/ml/predict/train/batch'
+
+
+def gerar_precos(n, seed):
+    rng = np.random.default_rng(seed)
+    return list(30 + np.cumsum(rng.normal(0.05, 0.5, n)))
+
+
+@contextmanager
+def cliente_de_teste():
+    """Cliente Flask com históricos sintéticos e modelos em diretório temporário"""
+    historicos = {'PETR4': gerar_precos(200, 1), 'VALE3': gerar_precos(150, 2)}
+
+    def buscar(tickers, period='1y'):
+        return {ticker: historicos[ticker] for ticker in tickers if ticker in historicos}
+
+    preditor_original = servidor.price_predictor
+    servidor.historical_data_service.get_multiple_prices = buscar
+    servidor.price_predictor = PricePredictor(models_dir=tempfile.mkdtemp())
+    servidor.app.config['TESTING'] = True
+    try:
+        yield servidor.app.test_client()
+    finally:
+        del servidor.historical_data_service.get_multiple_prices
+        servidor.price_predictor = preditor_original
+
+
+def test_treino_em_lote_sem_stream():
+    with cliente_de_teste() as cliente:
+        resposta = cliente.post(ROTA, json={'tickers': ['petr4', 'VALE3', 'XXXX3'], 'workers': '1'})
+        dados = resposta.get_json()
+
+    assert resposta.status_code == 200
+    assert dados['success'] is True
+    assert dados['trained'] == 2
+    status = {r['ticker']: r['status'] for r in dados['training']}
+    assert status == {'PETR4': 'trained', 'VALE3': 'trained', 'XXXX3': 'error'}
+
+
+def test_treino_em_lote_com_stream():
+    with cliente_de_teste() as cliente:
+        resposta = cliente.post(ROTA, json={'tickers': ['PETR4', 'VALE3', 'XXXX3'], 'workers': 64, 'stream': True})
+        # O corpo é gerado sob demanda: consumir antes de restaurar o preditor
+        linhas = [json.loads(linha) for linha in resposta.get_data(as_text=True).splitlines()]
+
+    assert resposta.status_code == 200
+    assert resposta.mimetype == 'application/x-ndjson'
+    assert linhas[0] == {'ticker': 'XXXX3', 'status': 'error', 'message': 'Sem dados históricos'}
+    assert sorted(r['ticker'] for r in linhas[1:] if r['status'] == 'trained') == ['PETR4', 'VALE3']
+
+
+def test_workers_invalido_responde_400_antes_do_stream():
+    with cliente_de_teste() as cliente:
+        for workers in ('quatro', [4], {'n': 4}, True):
+            for stream in (False, True):
+                resposta = cliente.post(ROTA, json={'tickers': ['PETR4'], 'workers': workers, 'stream': stream})
+                assert resposta.status_code == 400
+                assert 'workers' in resposta.get_json()['error']
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("TESTE: Endpoint de treino em lote")
+    print("=" * 60)
+
+    test_treino_em_lote_sem_stream()
+    print("✓ Treino em lote com JSON único")
+
+    test_treino_em_lote_com_stream()
+    print("✓ Treino em lote em stream NDJSON")
+
+    test_workers_invalido_responde_400_antes_do_stream()
+    print("✓ workers inválido responde 400 antes de iniciar o stream")
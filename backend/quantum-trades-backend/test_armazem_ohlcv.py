@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do Armazém Local de Candles
+Magnus Wealth - Versão 9.1.0
+
+Usa uma fonte falsa no lugar do Yahoo Finance para validar que cada
+execução baixa apenas os candles novos e que as leituras vêm do disco.
+"""
+
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from armazem_ohlcv import COLUNAS, ArmazemOHLCV, LimitadorTaxa, reamostrar_ohlcv
+
+
+class FonteFalsa:
+    """Simula o Yahoo: serve candles até `agora` e registra as chamadas"""
+
+    def __init__(self, n=500):
+        # Candles recentes, dentro do limite de 60 dias do Yahoo para 15m
+        fim = pd.Timestamp.now(tz='UTC').floor('15min')
+        index = pd.date_range(end=fim, periods=n, freq='15min')
+        rng = np.random.default_rng(3)
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+        self.dados = pd.DataFrame({
+            'open': close, 'high': close * 1.01, 'low': close * 0.99,
+            'close': close, 'volume': rng.uniform(1e5, 1e6, n)
+        }, index=index)
+        self.agora = 300
+        self.chamadas = []
+        self._lock = threading.Lock()
+
+    def __call__(self, symbol, interval, period=None, start=None):
+        with self._lock:
+            self.chamadas.append({'interval': interval, 'period': period, 'start': start})
+        disponivel = self.dados.iloc[:self.agora]
+        if interval != '15m':
+            disponivel = reamostrar_ohlcv(disponivel, interval)
+        if start is not None:
+            disponivel = disponivel[disponivel.index >= pd.Timestamp(start)]
+        return disponivel[COLUNAS]
+
+
+def test_primeira_execucao_baixa_historico_completo():
+    fonte = FonteFalsa()
+    with tempfile.TemporaryDirectory() as diretorio:
+        armazem = ArmazemOHLCV(diretorio, buscar=fonte)
+
+        assert armazem.append_new_bars('BTC-USD', '15m') == 300
+        assert fonte.chamadas[-1]['period'] == '60d'
+
+        df = ArmazemOHLCV(diretorio, buscar=fonte).carregar('BTC-USD', '15m')
+        pd.testing.assert_frame_equal(df, fonte.dados.iloc[:300], check_names=False, check_freq=False)
+
+
+def test_append_baixa_apenas_candles_novos():
+    fonte = FonteFalsa()
+    with tempfile.TemporaryDirectory() as diretorio:
+        armazem = ArmazemOHLCV(diretorio, buscar=fonte)
+        armazem.append_new_bars('BTC-USD', '15m')
+
+        # Último candle salvo estava em formação: o Yahoo o devolve corrigido
+        fonte.dados.iloc[299, fonte.dados.columns.get_loc('close')] *= 1.05
+        fonte.agora = 320
+
+        assert armazem.append_new_bars('BTC-USD', '15m') == 20
+        assert fonte.chamadas[-1]['start'] == fonte.dados.index[299]
+
+        df = ArmazemOHLCV(diretorio, buscar=fonte).carregar('BTC-USD', '15m')
+        assert len(df) == 320
+        assert df['close'].iloc[299] == fonte.dados['close'].iloc[299]
+
+
+def test_obter_recorta_como_o_yahoo():
+    fonte = FonteFalsa()
+    with tempfile.TemporaryDirectory() as diretorio:
+        armazem = ArmazemOHLCV(diretorio, buscar=fonte)
+
+        inicio = fonte.dados.index[100].tz_localize(None)
+        fim = fonte.dados.index[150].tz_localize(None)
+        df = armazem.obter('BTC-USD', '15m', start=inicio, end=fim)
+
+        assert len(df) == 50
+        assert df.index[0] == fonte.dados.index[100]
+
+        # Sem atualizar, a leitura não toca a fonte
+        chamadas = len(fonte.chamadas)
+        armazem.obter('BTC-USD', '15m', atualizar=False)
+        assert len(fonte.chamadas) == chamadas
+
+
+def test_erro_de_rede_mantem_dados_armazenados():
+    fonte = FonteFalsa()
+    with tempfile.TemporaryDirectory() as diretorio:
+        armazem = ArmazemOHLCV(diretorio, buscar=fonte)
+        armazem.append_new_bars('ETH-USD', '15m')
+
+        def sem_rede(*args, **kwargs):
+            raise ConnectionError('offline')
+
+        armazem.buscar = sem_rede
+        assert armazem.append_new_bars('ETH-USD', '15m') == 0
+        assert len(armazem.obter('ETH-USD', '15m')) == 300
+
+
+def test_reamostragem_agrega_ohlcv_alinhado_em_utc():
+    # Começa às 03:15 UTC: o primeiro candle de 8h (00:00) fica incompleto
+    index = pd.date_range('2024-03-01 03:15', periods=200, freq='15min', tz='UTC')
+    rng = np.random.default_rng(5)
+    close = 50 + rng.normal(0, 1, 200).cumsum()
+    df = pd.DataFrame({
+        'open': close + 0.1, 'high': close + 1, 'low': close - 1,
+        'close': close, 'volume': rng.uniform(1, 10, 200)
+    }, index=index)
+    df = df.drop(df.index[60:64])  # falha de dados no meio de um candle
+
+    oito = reamostrar_ohlcv(df, '8h')
+    assert oito.index[0] == pd.Timestamp('2024-03-01 08:00', tz='UTC')
+    assert all(t.hour in (0, 8, 16) and t.minute == 0 for t in oito.index)
+
+    for inicio in oito.index:
+        janela = df[(df.index >= inicio) & (df.index < inicio + pd.Timedelta(hours=8))]
+        linha = oito.loc[inicio]
+        assert linha['open'] == janela['open'].iloc[0]
+        assert linha['high'] == janela['high'].max()
+        assert linha['low'] == janela['low'].min()
+        assert linha['close'] == janela['close'].iloc[-1]
+        assert np.isclose(linha['volume'], janela['volume'].sum())
+
+    # Fuso de origem não muda o alinhamento em UTC
+    local = df.tz_convert('America/Sao_Paulo')
+    pd.testing.assert_frame_equal(reamostrar_ohlcv(local, '1d'), reamostrar_ohlcv(df, '1d'))
+
+
+def test_timeframes_derivados_usam_dois_downloads():
+    fonte = FonteFalsa(n=3000)
+    fonte.agora = 3000
+    with tempfile.TemporaryDirectory() as diretorio:
+        armazem = ArmazemOHLCV(diretorio, buscar=fonte)
+
+        for timeframe in ('15m', '30m', '1h', '6h', '8h', '12h', '1d'):
+            df = armazem.obter_timeframe('BTC-USD', timeframe)
+            assert df is not None and len(df) > 0
+
+        assert sorted(c['interval'] for c in fonte.chamadas) == ['15m', '1h']
+
+        # 30m do 15m e 1d do 1h são consistentes entre si
+        trinta = armazem.obter_timeframe('BTC-USD', '30m', atualizar=False)
+        pd.testing.assert_frame_equal(trinta, reamostrar_ohlcv(fonte.dados, '30m'))
+
+
+def test_diario_completa_com_historico_armazenado():
+    fonte = FonteFalsa(n=3000)
+    fonte.agora = 3000
+    with tempfile.TemporaryDirectory() as diretorio:
+        armazem = ArmazemOHLCV(diretorio, buscar=fonte)
+        armazem.append_new_bars('BTC-USD', '1d')
+
+        # Histórico de 1h só cobre a segunda metade
+        fonte.dados = fonte.dados.iloc[1500:]
+        diario = armazem.obter_timeframe('BTC-USD', '1d')
+
+        esperado = reamostrar_ohlcv(fonte.dados, '1d')
+        assert diario.index.is_monotonic_increasing and diario.index.is_unique
+        assert diario.index[0] < esperado.index[0]
+        pd.testing.assert_frame_equal(diario.loc[esperado.index[0]:], reamostrar_ohlcv(
+            reamostrar_ohlcv(fonte.dados, '1h'), '1d'))
+
+
+class RelogioFalso:
+    """Tempo simulado: dormir avança o relógio"""
+
+    def __init__(self):
+        self.agora = 0.0
+        self.esperas = []
+
+    def __call__(self):
+        return self.agora
+
+    def dormir(self, segundos):
+        self.esperas.append(segundos)
+        self.agora += segundos
+
+
+def test_limitador_token_bucket():
+    relogio = RelogioFalso()
+    limitador = LimitadorTaxa(2, capacidade=3, relogio=relogio, dormir=relogio.dormir)
+
+    # Rajada inicial sem espera, depois uma ficha a cada 0,5 s
+    esperas = [limitador.aguardar() for _ in range(5)]
+    assert esperas == [0.0, 0.0, 0.0, 0.5, 0.5]
+    assert relogio.agora == 1.0
+
+    # Parado por muito tempo, o balde enche só até a capacidade
+    relogio.agora += 60
+    esperas = [limitador.aguardar() for _ in range(4)]
+    assert esperas == [0.0, 0.0, 0.0, 0.5]
+
+
+def test_threads_do_mesmo_simbolo_baixam_uma_vez():
+    fonte = FonteFalsa(n=3000)
+    fonte.agora = 3000
+    with tempfile.TemporaryDirectory() as diretorio:
+        armazem = ArmazemOHLCV(diretorio, buscar=fonte, limitador=LimitadorTaxa(1000, 10))
+
+        timeframes = ['15m', '30m', '1h', '6h', '8h', '12h'] * 3
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            dfs = list(executor.map(lambda tf: armazem.obter_timeframe('BTC-USD', tf), timeframes))
+
+        assert all(df is not None and len(df) > 0 for df in dfs)
+        assert sorted(c['interval'] for c in fonte.chamadas) == ['15m', '1h']
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("TESTE: Armazém local de candles")
+    print("=" * 60)
+
+    test_primeira_execucao_baixa_historico_completo()
+    print("✓ Primeira execução baixa o histórico completo")
+
+    test_append_baixa_apenas_candles_novos()
+    print("✓ append_new_bars baixa apenas candles novos")
+
+    test_obter_recorta_como_o_yahoo()
+    print("✓ Recorte por data equivalente ao Yahoo")
+
+    test_erro_de_rede_mantem_dados_armazenados()
+    print("✓ Erro de rede mantém os dados armazenados")
+
+    test_reamostragem_agrega_ohlcv_alinhado_em_utc()
+    print("✓ Reamostragem OHLCV alinhada em UTC")
+
+    test_timeframes_derivados_usam_dois_downloads()
+    test_diario_completa_com_historico_armazenado()
+    print("✓ Timeframes derivados com apenas 15m e 1h baixados")
+
+    test_limitador_token_bucket()
+    print("✓ Limitador token bucket respeita taxa e rajada")
+
+    test_threads_do_mesmo_simbolo_baixam_uma_vez()
+    print("✓ Threads do mesmo símbolo compartilham um download")
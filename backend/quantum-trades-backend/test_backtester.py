@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do Backtester de Portfólio Vetorizado
+Magnus Wealth - Versão 9.1.0
+
+A curva de capital em forma matricial deve reproduzir a simulação dia a
+dia (buy and hold, rebalanceamento periódico e por desvio) e os preços
+devem ser alinhados pela data, não pela posição na lista. A varredura de
+alocações deve dar, para cada carteira, as métricas do backtest individual.
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from ml_models import backtester as modulo_backtester
+from ml_models.backtester import Backtester
+from ml_models.portfolio_optimizer import PortfolioOptimizer
+
+# Limites de tempo só com MAGNUS_BENCHMARK=1; por padrão os testes grandes
+# conferem o resultado contra a simulação dia a dia
+BENCHMARK = os.environ.get('MAGNUS_BENCHMARK') == '1'
+
+
+def gerar_precos(n_ativos, n_dias, seed=0):
+    rng = np.random.default_rng(seed)
+    retornos = rng.normal(0.0004, 0.015, (n_dias, n_ativos)) + rng.normal(0, 0.01, (n_dias, 1))
+    return 40 * np.cumprod(1 + retornos, axis=0)
+
+
+def simulacao_referencia(precos, pesos, capital, rebalance='none', every=21, threshold=0.05):
+    """Simulação dia a dia: quantidades fixas até o próximo rebalanceamento"""
+    quantidades = capital * pesos / precos[0]
+    curva, rebalanceamentos = [], []
+    for dia in range(len(precos)):
+        valores = quantidades * precos[dia]
+        total = valores.sum()
+        if dia > 0:
+            if rebalance == 'periodic' and dia % every == 0:
+                rebalancear = True
+            elif rebalance == 'threshold':
+                rebalancear = np.abs(valores / total - pesos).max() > threshold
+            else:
+                rebalancear = False
+            if rebalancear:
+                quantidades = total * pesos / precos[dia]
+                rebalanceamentos.append(dia)
+        curva.append(total)
+    return np.array(curva), rebalanceamentos
+
+
+def test_buy_and_hold_igual_ao_laco_original():
+    backtester = Backtester(initial_capital=10000, results_dir=tempfile.mkdtemp())
+    precos = gerar_precos(3, 300, seed=1)
+    alocacoes = {'PETR4': 0.5, 'VALE3': 0.3, 'ITUB4': 0.2}
+    historico = {ticker: list(precos[:, j]) for j, ticker in enumerate(alocacoes)}
+    # Séries de tamanhos diferentes sem datas: cortadas na menor
+    historico['ITUB4'] = historico['ITUB4'][:250]
+
+    resultado = backtester.backtest_portfolio(alocacoes, historico)
+
+    # Laço original por dia e por ticker
+    esperado = []
+    for i in range(250):
+        total = 0
+        for ticker, peso in alocacoes.items():
+            total += 10000 * peso / historico[ticker][0] * historico[ticker][i]
+        esperado.append(total)
+
+    assert resultado['period']['days'] == 250
+    assert resultado['rebalance'] == {'mode': 'none', 'count': 0}
+    assert np.allclose(resultado['equity_curve'], np.round(esperado, 2), atol=0.011)
+    assert resultado['capital']['final'] == round(esperado[-1], 2)
+
+
+def test_rebalanceamentos_iguais_a_simulacao_dia_a_dia():
+    backtester = Backtester(initial_capital=25000, results_dir=tempfile.mkdtemp())
+    precos = gerar_precos(6, 800, seed=2)
+    pesos = np.array([0.3, 0.2, 0.2, 0.1, 0.1, 0.1])
+
+    for rebalance, kwargs in (('none', {}), ('periodic', {'every': 21}), ('periodic', {'every': 1}),
+                              ('threshold', {'threshold': 0.03}), ('threshold', {'threshold': 0.2})):
+        curva, pontos = backtester.portfolio_equity_curve(
+            precos, pesos, rebalance,
+            rebalance_every=kwargs.get('every', 21),
+            rebalance_threshold=kwargs.get('threshold', 0.05)
+        )
+        esperado, rebalanceamentos = simulacao_referencia(precos, pesos, 25000, rebalance, **kwargs)
+        assert np.allclose(curva, esperado, rtol=1e-10)
+        assert list(pontos[1:]) == rebalanceamentos
+
+    # Desvio de 3% exige muitos rebalanceamentos além da janela de busca
+    assert len(simulacao_referencia(precos, pesos, 1, 'threshold', threshold=0.03)[1]) > 10
+
+
+def test_precos_alinhados_pela_data():
+    backtester = Backtester(initial_capital=10000, results_dir=tempfile.mkdtemp())
+    dias = pd.date_range('2023-01-02', periods=60, freq='D').strftime('%Y-%m-%d')
+    precos = gerar_precos(3, 60, seed=3)
+
+    # BTC negocia todo dia; PETR4 pula fins de semana e começa depois;
+    # VALE3 termina antes e tem um feriado a mais
+    uteis = pd.to_datetime(dias).dayofweek < 5
+    datas = {
+        'BTC': list(dias),
+        'PETR4': [d for d, u in zip(dias[5:], uteis[5:]) if u],
+        'VALE3': [d for d, u in zip(dias[:50], uteis[:50]) if u and d != '2023-01-25'],
+    }
+    historico = {
+        'BTC': list(precos[:, 0]),
+        'PETR4': [p for p, u in zip(precos[5:, 1], uteis[5:]) if u],
+        'VALE3': [p for d, p, u in zip(dias[:50], precos[:50, 2], uteis[:50]) if u and d != '2023-01-25'],
+    }
+    alocacoes = {'BTC': 0.4, 'PETR4': 0.4, 'VALE3': 0.2}
+
+    resultado = backtester.backtest_portfolio(alocacoes, historico, datas, rebalance='periodic', rebalance_every=5)
+
+    # Referência: junção por data com o último preço conhecido
+    tabela = pd.DataFrame({t: pd.Series(historico[t], index=datas[t]) for t in alocacoes}).sort_index()
+    inicio = max(d[0] for d in datas.values())
+    fim = min(d[-1] for d in datas.values())
+    tabela = tabela.ffill().loc[inicio:fim]
+    esperado, rebalanceamentos = simulacao_referencia(
+        tabela.to_numpy(), np.array(list(alocacoes.values())), 10000, 'periodic', every=5
+    )
+
+    assert resultado['period'] == {'start': inicio, 'end': fim, 'days': len(tabela)}
+    assert resultado['rebalance']['dates'] == [tabela.index[d] for d in rebalanceamentos]
+    assert np.allclose(resultado['equity_curve'], np.round(esperado, 2), atol=0.011)
+
+    # Datas fora de ordem são ordenadas antes de alinhar
+    invertido = {t: (datas[t][::-1], historico[t][::-1]) for t in alocacoes}
+    outro = backtester.backtest_portfolio(
+        alocacoes, {t: p for t, (_, p) in invertido.items()}, {t: d for t, (d, _) in invertido.items()},
+        rebalance='periodic', rebalance_every=5
+    )
+    assert outro['equity_curve'] == resultado['equity_curve']
+
+
+def test_validacoes():
+    backtester = Backtester(results_dir=tempfile.mkdtemp())
+    historico = {'A': [1.0, 2.0, 3.0], 'B': [1.0, 1.0, 1.0]}
+    for alocacoes, kwargs in (({'A': 0.5, 'C': 0.5}, {}), ({'A': 0.7, 'B': 0.7}, {}),
+                              ({'A': 0.5, 'B': 0.5}, {'rebalance': 'mensal'})):
+        try:
+            backtester.backtest_portfolio(alocacoes, historico, **kwargs)
+            assert False
+        except ValueError:
+            pass
+
+
+def test_dez_anos_cinquenta_ativos_em_milissegundos():
+    backtester = Backtester(initial_capital=100000, results_dir=tempfile.mkdtemp())
+    n_dias = 2520
+    precos = gerar_precos(50, n_dias, seed=4)
+    dias = list(pd.bdate_range('2014-01-01', periods=n_dias).strftime('%Y-%m-%d'))
+    historico = {f'ATIVO{j:02d}': list(precos[:, j]) for j in range(50)}
+    datas = {ticker: dias for ticker in historico}
+    alocacoes = {ticker: 1 / 50 for ticker in historico}
+
+    for rebalance in ('none', 'periodic', 'threshold'):
+        inicio = time.perf_counter()
+        resultado = backtester.backtest_portfolio(alocacoes, historico, datas, rebalance=rebalance)
+        decorrido = time.perf_counter() - inicio
+
+        esperado, rebalanceamentos = simulacao_referencia(precos, np.full(50, 1 / 50), 100000, rebalance)
+        assert resultado['period']['days'] == n_dias
+        assert resultado['rebalance']['count'] == len(rebalanceamentos)
+        assert np.allclose(resultado['equity_curve'], np.round(esperado, 2), atol=0.011)
+        if BENCHMARK:
+            assert decorrido < 0.2, f'{rebalance}: {decorrido:.3f}s'
+
+
+
+def test_varredura_igual_aos_backtests_individuais():
+    backtester = Backtester(initial_capital=10000, results_dir=tempfile.mkdtemp())
+    precos = gerar_precos(5, 300, seed=5)
+    tickers = ['A', 'B', 'C', 'D', 'E']
+    historico = {t: list(precos[:, j]) for j, t in enumerate(tickers)}
+    datas = {t: list(pd.bdate_range('2023-01-02', periods=300).strftime('%Y-%m-%d')) for t in tickers}
+    pesos = np.random.default_rng(6).dirichlet(np.ones(5), size=37)
+    pesos[3] = [1, 0, 0, 0, 0]
+
+    original = modulo_backtester.SWEEP_CHUNK_SIZE
+    modulo_backtester.SWEEP_CHUNK_SIZE = 8  # vários blocos
+    try:
+        for rebalance in ('none', 'periodic'):
+            for rank_by in ('sharpe_ratio', 'volatility'):
+                varredura = backtester.backtest_allocations(
+                    pesos, tickers, historico, datas, rebalance=rebalance, rebalance_every=10, rank_by=rank_by
+                )
+                assert varredura['n_candidates'] == 37 and len(varredura['results']) == 37
+                assert varredura['period']['days'] == 300
+
+                valores = []
+                for linha in varredura['results']:
+                    individual = backtester.backtest_portfolio(
+                        dict(zip(tickers, pesos[linha['candidate']])), historico, datas,
+                        rebalance=rebalance, rebalance_every=10
+                    )
+                    assert linha['metrics'] == individual['metrics']
+                    assert linha['final_capital'] == individual['capital']['final']
+                    valores.append(linha['metrics'][rank_by])
+
+                assert valores == sorted(valores, reverse=(rank_by == 'sharpe_ratio'))
+                assert sorted(l['candidate'] for l in varredura['results']) == list(range(37))
+    finally:
+        modulo_backtester.SWEEP_CHUNK_SIZE = original
+
+    # Carteira concentrada só lista o ativo com peso
+    linha = next(l for l in varredura['results'] if l['candidate'] == 3)
+    assert linha['weights'] == {'A': 100.0}
+
+    top = backtester.backtest_allocations(pesos, tickers, historico, top_n=5)
+    assert [l['rank'] for l in top['results']] == [1, 2, 3, 4, 5]
+
+    for argumentos in ((pesos[:, :4], tickers), (pesos * 2, tickers)):
+        try:
+            backtester.backtest_allocations(*argumentos, historico)
+            assert False
+        except ValueError:
+            pass
+    try:
+        backtester.backtest_allocations(pesos, tickers, historico, rebalance='threshold')
+        assert False
+    except ValueError:
+        pass
+
+
+def test_varredura_de_milhares_de_carteiras_em_milissegundos():
+    backtester = Backtester(initial_capital=10000, results_dir=tempfile.mkdtemp())
+    precos = gerar_precos(20, 252, seed=7)
+    tickers = [f'ATIVO{j:02d}' for j in range(20)]
+    historico = {t: list(precos[:, j]) for j, t in enumerate(tickers)}
+
+    # Pontos da fronteira eficiente mais uma amostra de Dirichlet
+    fronteira = PortfolioOptimizer().frontier_weights(historico, n_points=100, method='qp')
+    pesos = np.vstack([fronteira, np.random.default_rng(8).dirichlet(np.ones(20), size=5000)])
+
+    inicio = time.perf_counter()
+    varredura = backtester.backtest_allocations(pesos, tickers, historico, rebalance='periodic', top_n=20)
+    decorrido = time.perf_counter() - inicio
+
+    assert varredura['n_candidates'] == 5100
+    assert len(varredura['results']) == 20
+    sharpes = [linha['metrics']['sharpe_ratio'] for linha in varredura['results']]
+    assert sharpes == sorted(sharpes, reverse=True)
+    for linha in varredura['results'][:3]:
+        individual = backtester.backtest_portfolio(
+            dict(zip(tickers, pesos[linha['candidate']])), historico, rebalance='periodic'
+        )
+        assert linha['metrics'] == individual['metrics']
+    if BENCHMARK:
+        assert decorrido < 0.5
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("TESTE: Backtester de portfólio vetorizado")
+    print("=" * 60)
+
+    test_buy_and_hold_igual_ao_laco_original()
+    print("✓ Buy and hold igual ao laço original por dia e ticker")
+
+    test_rebalanceamentos_iguais_a_simulacao_dia_a_dia()
+    print("✓ Rebalanceamento periódico e por desvio iguais à simulação dia a dia")
+
+    test_precos_alinhados_pela_data()
+    print("✓ Preços alinhados pela data com o último preço conhecido")
+
+    test_validacoes()
+    print("✓ Alocações e modos inválidos rejeitados")
+
+    test_dez_anos_cinquenta_ativos_em_milissegundos()
+    print("✓ 10 anos x 50 ativos em milissegundos")
+
+    test_varredura_igual_aos_backtests_individuais()
+    print("✓ Varredura de alocações igual aos backtests individuais")
+
+    test_varredura_de_milhares_de_carteiras_em_milissegundos()
+    print("✓ Milhares de carteiras avaliadas em milissegundos")
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do Walk-Forward com Matriz de Tendência Pré-calculada
+Magnus Wealth - Versão 9.1.0
+
+As métricas vetorizadas devem ser as do backtest_simples original com
+pandas, e cada janela do walk-forward deve escolher o mesmo período que a
+otimização recalculando o CHiLo de cada período sobre o histórico.
+"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting_avancado import BacktestingAvancado, gerar_janelas
+from indicador_chilo import calcular_chilo_tendencia, calcular_tendencia_arrays
+
+# Limite de tempo do walk-forward longo só com MAGNUS_BENCHMARK=1
+BENCHMARK = os.environ.get('MAGNUS_BENCHMARK') == '1'
+
+PERIODOS = [3, 7, 10, 15, 20, 25, 30, 40, 50]
+
+
+def gerar_diario(n, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0.0005, 0.03, n))
+    high = close * (1 + rng.uniform(0, 0.03, n))
+    low = close * (1 - rng.uniform(0, 0.03, n))
+    index = pd.date_range('2017-01-01', periods=n, freq='D')
+    return pd.DataFrame({'open': close, 'high': high, 'low': low, 'close': close,
+                         'volume': rng.uniform(1e5, 1e6, n)}, index=index)
+
+
+def metricas_referencia(df, taxa=0.0005):
+    """Corpo original de backtest_simples sobre um DataFrame com 'trend'"""
+    df = df.copy()
+    df['returns'] = df['close'].pct_change()
+    df['strategy_returns'] = df['returns'] * df['trend'].shift(1)
+    df['signal_change'] = df['trend'].diff()
+    num_trades = (df['signal_change'] != 0).sum()
+    retorno_total = (1 + df['strategy_returns']).prod() - 1
+    custo_total = num_trades * taxa
+    retorno_liquido = retorno_total - custo_total
+    cumulative = (1 + df['strategy_returns']).cumprod()
+    drawdown = (cumulative / cumulative.cummax()) - 1
+    max_drawdown = drawdown.min()
+    volatilidade = df['strategy_returns'].std() * np.sqrt(252)
+    sharpe = (retorno_liquido * (252/len(df))) / volatilidade if volatilidade > 0 else 0
+    trades_df = df[df['signal_change'] != 0].copy()
+    if len(trades_df) > 0:
+        trades_df['price_exit'] = trades_df['close'].shift(-1)
+        trades_df['trade_return'] = (trades_df['price_exit'] - trades_df['close']) / trades_df['close']
+        win_rate = (trades_df['trade_return'] > 0).sum() / len(trades_df) * 100
+    else:
+        win_rate = 0
+    return {
+        'retorno_bruto': retorno_total * 100,
+        'retorno_liquido': retorno_liquido * 100,
+        'num_trades': num_trades,
+        'custo_total': custo_total * 100,
+        'max_drawdown': max_drawdown * 100,
+        'sharpe': sharpe,
+        'win_rate': win_rate,
+        'volatilidade': volatilidade * 100
+    }
+
+
+def assert_metricas_iguais(obtido, esperado):
+    assert obtido.keys() == esperado.keys()
+    for chave, valor in esperado.items():
+        assert np.isclose(obtido[chave], valor, rtol=1e-9, atol=1e-9, equal_nan=True), chave
+
+
+def test_backtest_simples_igual_ao_pandas():
+    backtest = BacktestingAvancado()
+    df = gerar_diario(400)
+    for period in PERIODOS + [1, 397, 398, 399]:
+        esperado = metricas_referencia(calcular_chilo_tendencia(df.copy(), period).iloc[period:])
+        assert_metricas_iguais(backtest.backtest_simples(df, period), esperado)
+
+    # Trechos laterais: trocas que não mudam de preço não contam como vitória
+    lateral = df.copy()
+    lateral.iloc[100:160, :4] = lateral['close'].iloc[100]
+    for period in (3, 25):
+        esperado = metricas_referencia(calcular_chilo_tendencia(lateral.copy(), period).iloc[period:])
+        assert_metricas_iguais(backtest.backtest_simples(lateral, period), esperado)
+
+
+def walk_forward_referencia(df, janelas):
+    """Otimização janela a janela recalculando o CHiLo de cada período no histórico"""
+    tendencias = {p: calcular_tendencia_arrays(df['high'], df['low'], df['close'], p)[2] for p in PERIODOS}
+    escolhidos = []
+    for train_start, train_end, test_start, test_end in janelas:
+        melhor_periodo, melhor_score = None, -999999
+        for periodo in PERIODOS:
+            treino = df.iloc[train_start:train_end].assign(trend=tendencias[periodo][train_start:train_end])
+            resultado = metricas_referencia(treino)
+            score = (resultado['retorno_liquido'] / abs(resultado['max_drawdown'])
+                     if resultado['max_drawdown'] != 0 else resultado['retorno_liquido'])
+            if score > melhor_score:
+                melhor_score, melhor_periodo = score, periodo
+        teste = df.iloc[test_start:test_end].assign(trend=tendencias[melhor_periodo][test_start:test_end])
+        escolhidos.append((melhor_periodo, metricas_referencia(teste)))
+    return escolhidos
+
+
+def test_janelas_dos_tres_esquemas():
+    assert gerar_janelas(100, 40, 20, 'rolling') == [(0, 40, 40, 60), (20, 60, 60, 80), (40, 80, 80, 100)]
+    assert gerar_janelas(100, 40, 20, 'anchored') == [(0, 40, 40, 60), (0, 60, 60, 80), (0, 80, 80, 100)]
+    assert gerar_janelas(100, 40, 20, 'purged', purga=10) == [(0, 40, 50, 70), (20, 60, 70, 90)]
+    assert gerar_janelas(100, 40, 20, 'rolling', num_windows=2) == gerar_janelas(100, 40, 20)[:2]
+
+    with pytest.raises(ValueError):
+        gerar_janelas(100, 40, 20, 'expanding')
+    with pytest.raises(ValueError):
+        gerar_janelas(100, 40, 0)
+
+
+def test_walk_forward_igual_a_recalcular_por_janela():
+    backtest = BacktestingAvancado()
+    df = gerar_diario(1500)
+
+    for esquema in ('rolling', 'anchored', 'purged'):
+        resultado = backtest.walk_forward_historico(df, PERIODOS, 250, 60, num_windows=None,
+                                                    esquema=esquema, workers=1)
+        janelas = gerar_janelas(len(df), 250, 60, esquema, purga=max(PERIODOS))
+        assert resultado['num_windows'] == len(janelas) > 10
+        assert resultado['purga'] == (50 if esquema == 'purged' else 0)
+
+        for obtida, (periodo, teste), janela in zip(resultado['resultados_windows'],
+                                                    walk_forward_referencia(df, janelas), janelas):
+            assert obtida['periodo_otimo'] == periodo
+            assert_metricas_iguais(obtida['resultado_test'], teste)
+            assert obtida['treino']['inicio'] == str(df.index[janela[0]])
+            assert obtida['teste']['fim'] == str(df.index[janela[3] - 1])
+
+        assert resultado['periodos_escolhidos'] == [r['periodo_otimo'] for r in resultado['resultados_windows']]
+
+
+def test_janelas_em_paralelo_iguais_ao_sequencial():
+    backtest = BacktestingAvancado()
+    df = gerar_diario(1200, seed=8)
+    sequencial = backtest.walk_forward_historico(df, PERIODOS, 200, 30, None, 'anchored', workers=1)
+    paralelo = backtest.walk_forward_historico(df, PERIODOS, 200, 30, None, 'anchored', workers=4)
+    assert paralelo == sequencial
+
+
+def test_walk_forward_de_8_anos_com_dezenas_de_janelas():
+    backtest = BacktestingAvancado()
+    df = gerar_diario(8 * 365, seed=11)
+    periodos = list(range(2, 101))
+
+    inicio = time.perf_counter()
+    resultado = backtest.walk_forward_historico(df, periodos, 365, 30, num_windows=None, esquema='purged')
+    duracao = time.perf_counter() - inicio
+
+    assert resultado['num_windows'] >= 50
+    assert all(janela['periodo_otimo'] in periodos for janela in resultado['resultados_windows'])
+    if BENCHMARK:
+        assert duracao < 5
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("TESTE: Walk-forward com matriz de tendência pré-calculada")
+    print("=" * 60)
+
+    test_backtest_simples_igual_ao_pandas()
+    print("✓ backtest_simples vetorizado igual ao cálculo com pandas")
+
+    test_janelas_dos_tres_esquemas()
+    print("✓ Janelas rolling, anchored e purged")
+
+    test_walk_forward_igual_a_recalcular_por_janela()
+    print("✓ Walk-forward igual a recalcular o CHiLo de cada período por janela")
+
+    test_janelas_em_paralelo_iguais_ao_sequencial()
+    print("✓ Janelas em paralelo iguais ao sequencial")
+
+    test_walk_forward_de_8_anos_com_dezenas_de_janelas()
+    print("✓ 8 anos com dezenas de janelas em poucos segundos")
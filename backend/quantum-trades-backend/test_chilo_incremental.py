@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do CHiLo Incremental
+Magnus Wealth - Versão 9.1.0
+
+Valida que a atualização candle a candle reproduz o cálculo completo e que
+o snapshot em disco permite retomar sem reconstruir o histórico.
+"""
+
+import tempfile
+
+import numpy as np
+
+from chilo_incremental import ChiloIncremental, GerenciadorChiloIncremental
+from indicador_chilo import calcular_chilo_arrays
+from test_indicador_chilo import gerar_ohlc
+
+
+def contar_virados_referencia(estados):
+    """Contagem de MonitorMultiTimeframe.contar_candles_virados (último candle)"""
+    atual = estados[-1]
+    if atual == 0 or atual != atual:
+        return 0
+    count = 1
+    for i in range(len(estados) - 2, -1, -1):
+        if estados[i] == atual:
+            count += 1
+        else:
+            break
+    return count
+
+
+def test_incremental_igual_ao_calculo_completo():
+    for com_nan in (False, True):
+        df = gerar_ohlc(n=500, com_nan=com_nan)
+        for period in (3, 20, 70):
+            hilo, estados = calcular_chilo_arrays(df['high'], df['low'], df['close'], period)
+
+            chilo = ChiloIncremental('BTC-USD', '15m', period)
+            for i, (ts, linha) in enumerate(df.iterrows()):
+                estado = chilo.atualizar(ts, linha['high'], linha['low'], linha['close'])
+
+                if np.isnan(estados[i]):
+                    assert np.isnan(estado)
+                else:
+                    assert estado == estados[i]
+                    assert np.isclose(chilo.hilo, hilo[i], rtol=1e-12, equal_nan=True)
+                    assert chilo.candles_virados == contar_virados_referencia(estados[:i + 1])
+
+
+def test_snapshot_retoma_sem_reconstruir():
+    df = gerar_ohlc(n=400)
+    with tempfile.TemporaryDirectory() as diretorio:
+        continuo = ChiloIncremental('ETH-USD', '1h', 25)
+        continuo.ingerir_df(df)
+
+        gerenciador = GerenciadorChiloIncremental(diretorio)
+        gerenciador.obter('ETH-USD', '1h', 25).ingerir_df(df.iloc[:300])
+        gerenciador.salvar()
+
+        # Novo processo: carrega o snapshot e recebe dados sobrepostos
+        retomado = GerenciadorChiloIncremental(diretorio).obter('ETH-USD', '1h', 25)
+        assert retomado.candles == 300
+        assert retomado.ingerir_df(df.iloc[290:])
+
+        assert retomado.candles == continuo.candles
+        assert retomado.hilo_state == continuo.hilo_state
+        assert retomado.candles_virados == continuo.candles_virados
+        assert np.isclose(retomado.hilo, continuo.hilo, rtol=1e-12)
+
+
+def test_ao_vivo_nao_registra_candle_em_formacao():
+    df = gerar_ohlc(n=200)
+    _, estados = calcular_chilo_arrays(df['high'], df['low'], df['close'], 10)
+
+    chilo = ChiloIncremental('SOL-USD', '15m', 10)
+    estado, virados = chilo.processar_ao_vivo(df)
+
+    assert chilo.candles == len(df) - 1
+    assert estado == estados[-1]
+    assert virados == contar_virados_referencia(estados)
+
+    # Dados que começam depois do último candle registrado indicam buraco
+    assert chilo.processar_ao_vivo(df.iloc[-1:]) is None
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("TESTE: CHiLo incremental")
+    print("=" * 60)
+
+    test_incremental_igual_ao_calculo_completo()
+    print("✓ Atualização O(1) idêntica ao cálculo completo")
+
+    test_snapshot_retoma_sem_reconstruir()
+    print("✓ Snapshot em disco retoma o estado")
+
+    test_ao_vivo_nao_registra_candle_em_formacao()
+    print("✓ Candle em formação avaliado sem ser registrado")
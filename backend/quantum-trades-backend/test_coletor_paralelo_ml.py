@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da Coleta Paralela e Retomável do Coletor ML de 8 Anos
+Magnus Wealth - Versão 9.1.0
+
+Cada par (cripto, timeframe) deve ser baixado uma única vez, a coleta em
+paralelo deve gerar os mesmos arquivos da sequencial e uma execução
+interrompida deve retomar apenas os pares que faltaram.
+"""
+
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+import coletor_dados_ml_8anos
+from coletor_dados_ml_8anos import TIMEFRAMES, coletar_portfolio
+
+CRIPTOS = [{'name': 'Alfa', 'yahoo': 'ALFA-USD'}, {'name': 'Beta', 'yahoo': 'BETA-USD'}]
+
+
+class DownloadsFalsos:
+    """Substitui buscar_dados_timeframe e conta os downloads por par"""
+
+    def __init__(self, falhar=None):
+        self.falhar = falhar
+        self.chamadas = []
+        self._lock = threading.Lock()
+
+    def __call__(self, yahoo_symbol, interval):
+        with self._lock:
+            self.chamadas.append((yahoo_symbol, interval))
+        if (yahoo_symbol, interval) == self.falhar:
+            raise ConnectionError('queda no meio da coleta')
+
+        seed = sum(ord(c) for c in yahoo_symbol + interval)
+        rng = np.random.default_rng(seed)
+        n = 400
+        close = 100 * np.cumprod(1 + rng.normal(0.001, 0.02, n))
+        index = pd.date_range('2024-01-01', periods=n, freq='h', tz='UTC')
+        return pd.DataFrame({
+            'open': close, 'high': close * 1.01, 'low': close * 0.99,
+            'close': close, 'volume': rng.uniform(1e5, 1e6, n)
+        }, index=index)
+
+
+class ArmazemFalso:
+    def append_new_bars(self, symbol, interval):
+        return 0
+
+
+def executar(data_dir, fonte, workers, retomar=True):
+    """Roda a coleta com downloads falsos em `data_dir`"""
+    originais = (coletor_dados_ml_8anos.DATA_DIR, coletor_dados_ml_8anos.buscar_dados_timeframe,
+                 coletor_dados_ml_8anos.obter_armazem)
+    coletor_dados_ml_8anos.DATA_DIR = data_dir
+    coletor_dados_ml_8anos.buscar_dados_timeframe = fonte
+    coletor_dados_ml_8anos.obter_armazem = ArmazemFalso
+    try:
+        return coletar_portfolio(CRIPTOS, workers=workers, retomar=retomar)
+    finally:
+        (coletor_dados_ml_8anos.DATA_DIR, coletor_dados_ml_8anos.buscar_dados_timeframe,
+         coletor_dados_ml_8anos.obter_armazem) = originais
+
+
+def ler_csvs(data_dir):
+    return {nome: open(os.path.join(data_dir, nome)).read()
+            for nome in sorted(os.listdir(data_dir)) if nome.endswith('.csv')}
+
+
+def sem_timestamp(resultados):
+    return [{k: v for k, v in r.items() if k != 'timestamp'} for r in resultados]
+
+
+def test_paralelo_igual_ao_sequencial_com_um_download_por_par():
+    with tempfile.TemporaryDirectory() as seq_dir, tempfile.TemporaryDirectory() as par_dir:
+        fonte_seq, fonte_par = DownloadsFalsos(), DownloadsFalsos()
+        sequencial = executar(seq_dir, fonte_seq, 1)
+        paralelo = executar(par_dir, fonte_par, 4)
+
+        pares = [(c['yahoo'], tf) for c in CRIPTOS for tf in TIMEFRAMES.values()]
+        assert sorted(fonte_par.chamadas) == sorted(pares)
+        assert fonte_seq.chamadas == pares
+
+        assert sem_timestamp(paralelo) == sem_timestamp(sequencial)
+        assert [list(r['timeframes']) for r in paralelo] == [list(TIMEFRAMES)] * len(CRIPTOS)
+        assert ler_csvs(par_dir) == ler_csvs(seq_dir)
+
+
+def test_execucao_interrompida_retoma_pares_faltantes():
+    with tempfile.TemporaryDirectory() as data_dir:
+        interrompida = executar(data_dir, DownloadsFalsos(falhar=('BETA-USD', '6h')), 3)
+        assert '6h' not in interrompida[1]['timeframes']
+
+        fonte = DownloadsFalsos()
+        retomada = executar(data_dir, fonte, 3)
+        assert fonte.chamadas == [('BETA-USD', '6h')]
+        assert list(retomada[1]['timeframes']) == list(TIMEFRAMES)
+
+        with tempfile.TemporaryDirectory() as completo_dir:
+            completa = executar(completo_dir, DownloadsFalsos(), 3)
+            assert sem_timestamp(retomada) == sem_timestamp(completa)
+            assert ler_csvs(data_dir) == ler_csvs(completo_dir)
+
+        # Sem retomar, tudo é baixado de novo
+        fonte = DownloadsFalsos()
+        executar(data_dir, fonte, 3, retomar=False)
+        assert len(fonte.chamadas) == len(CRIPTOS) * len(TIMEFRAMES)
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("TESTE: Coletor ML paralelo e retomável")
+    print("=" * 60)
+
+    test_paralelo_igual_ao_sequencial_com_um_download_por_par()
+    print("✓ Paralelo idêntico ao sequencial, um download por par")
+
+    test_execucao_interrompida_retoma_pares_faltantes()
+    print("✓ Execução interrompida retoma apenas os pares faltantes")
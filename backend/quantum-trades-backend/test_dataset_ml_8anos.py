@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da Montagem do Dataset ML de 8 Anos
+Magnus Wealth - Versão 9.1.0
+
+A montagem com merge as-of deve gerar exatamente o mesmo
+dataset_ml_inversao_8anos.csv da versão que relia os CSVs a cada dia.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import coletor_dados_ml_8anos
+import indicador_chilo
+from coletor_dados_ml_8anos import gerar_dataset_ml
+
+FREQUENCIAS = {'15m': '15min', '30m': '30min', '1h': '1h', '6h': '6h', '8h': '8h', '12h': '12h', '1d': '24h'}
+
+
+def dataset_referencia(data_dir, criptos):
+    """Montagem original: relê cada CSV de timeframe para cada dia"""
+    dataset = []
+    for cripto in criptos:
+        try:
+            df_diario = pd.read_csv(f"{data_dir}/{cripto['name']}_1d.csv", index_col=0, parse_dates=True)
+        except:
+            continue
+
+        for i in range(1, len(df_diario)):
+            data_atual = df_diario.index[i]
+            estado_anterior = df_diario['hilo_state'].iloc[i-1]
+            estado_atual = df_diario['hilo_state'].iloc[i]
+            if estado_anterior == 0 or estado_atual == 0:
+                continue
+
+            features = {
+                'cripto': cripto['name'],
+                'data': data_atual.isoformat(),
+                'virou_diario': (estado_anterior != estado_atual)
+            }
+            for tf_name in ['15m', '30m', '1h', '6h', '8h', '12h']:
+                try:
+                    df_tf = pd.read_csv(f"{data_dir}/{cripto['name']}_{tf_name}.csv", index_col=0, parse_dates=True)
+                    df_tf_ate_data = df_tf[df_tf.index <= data_atual]
+                    if len(df_tf_ate_data) == 0:
+                        continue
+                    ultima = df_tf_ate_data.iloc[-1]
+                    features[f'{tf_name}_estado'] = int(ultima['hilo_state'])
+                    features[f'{tf_name}_candles_virados'] = int(ultima['candles_virados'])
+                except:
+                    features[f'{tf_name}_estado'] = 0
+                    features[f'{tf_name}_candles_virados'] = 0
+            dataset.append(features)
+
+    return pd.DataFrame(dataset)
+
+
+def salvar_timeframe(data_dir, nome, tf_name, dias, fim, seed):
+    """CSV sintético no formato gravado por coletar_dados_cripto"""
+    freq = FREQUENCIAS[tf_name]
+    n = int(pd.Timedelta(days=dias) / pd.Timedelta(freq))
+    index = pd.date_range(end=fim, periods=n, freq=freq, tz='UTC')
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.02, n))
+    df = pd.DataFrame({
+        'open': close, 'high': close * 1.01, 'low': close * 0.99,
+        'close': close, 'volume': rng.uniform(1e5, 1e6, n)
+    }, index=index)
+    df = indicador_chilo.calcular_chilo(df, 5)
+    df['candles_virados'] = indicador_chilo.contar_candles_virados_array(df['hilo_state'])
+    df.to_csv(f"{data_dir}/{nome}_{tf_name}.csv")
+
+
+def gerar_arquivos(data_dir):
+    """Duas criptos com históricos de tamanhos diferentes por timeframe"""
+    fim = pd.Timestamp('2024-06-30 12:00')
+    # 15m começa depois de 1h/6h/8h/12h, como no Yahoo
+    historicos = {'15m': 8, '30m': 8, '1h': 40, '6h': 40, '8h': 40, '12h': 40, '1d': 120}
+    for seed, nome in enumerate(['Alfa', 'Beta']):
+        for tf_name, dias in historicos.items():
+            # Beta não tem o CSV de 8h
+            if nome == 'Beta' and tf_name == '8h':
+                continue
+            salvar_timeframe(data_dir, nome, tf_name, dias, fim, seed * 10 + len(tf_name))
+
+    # Cripto sem dados diários é ignorada
+    salvar_timeframe(data_dir, 'Gama', '1h', 30, fim, 99)
+
+
+def test_dataset_igual_ao_da_montagem_linha_a_linha():
+    criptos = [{'name': 'Alfa'}, {'name': 'Gama'}, {'name': 'Beta'}]
+    originais = coletor_dados_ml_8anos.DATA_DIR, coletor_dados_ml_8anos.CRIPTOS
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        gerar_arquivos(data_dir)
+        coletor_dados_ml_8anos.DATA_DIR, coletor_dados_ml_8anos.CRIPTOS = data_dir, criptos
+        try:
+            dataset = gerar_dataset_ml()
+        finally:
+            coletor_dados_ml_8anos.DATA_DIR, coletor_dados_ml_8anos.CRIPTOS = originais
+
+        esperado = dataset_referencia(data_dir, criptos)
+        esperado_csv = os.path.join(data_dir, 'esperado.csv')
+        esperado.to_csv(esperado_csv, index=False)
+
+        with open(esperado_csv) as f1, open(f"{data_dir}/dataset_ml_inversao_8anos.csv") as f2:
+            assert f2.read() == f1.read()
+
+    assert list(dataset.columns) == list(esperado.columns)
+    assert dataset['virou_diario'].sum() == esperado['virou_diario'].sum()
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("TESTE: Dataset ML de 8 anos com merge as-of")
+    print("=" * 60)
+
+    test_dataset_igual_ao_da_montagem_linha_a_linha()
+    print("✓ CSV idêntico ao da montagem linha a linha")
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste de Equivalência - Motor Vetorizado do CHiLo
+Magnus Wealth - Versão 9.1.0
+
+Compara indicador_chilo com as implementações em loop (.iloc/.loc) que
+existiam nos scripts antes da unificação. Os resultados devem ser idênticos.
+"""
+
+import numpy as np
+import pandas as pd
+
+import analisador_cripto_hilo
+import analisador_cripto_hilo_bot
+import analisador_cripto_hilo_bot_v9
+from indicador_chilo import (
+    calcular_chilo,
+    calcular_chilo_arrays,
+    calcular_chilo_tendencia,
+    calcular_tendencia_arrays,
+    calcular_tendencia_matriz,
+    contar_candles_virados_array,
+    contar_sequencias,
+    propagar_ultimo,
+)
+
+
+# ============================================================================
+# Implementações de referência (loops originais)
+# ============================================================================
+
+def chilo_activator_loop(df, period, ma_type='SMA'):
+    """Loop original de otimizador_quinzenal / monitor_multitimeframe / bot v9"""
+    if ma_type == 'SMA':
+        hima = df['high'].rolling(window=period).mean()
+        loma = df['low'].rolling(window=period).mean()
+    else:
+        hima = df['high'].ewm(span=period, adjust=False).mean()
+        loma = df['low'].ewm(span=period, adjust=False).mean()
+
+    hilo = pd.Series(index=df.index, dtype=float)
+    hilo_state = pd.Series(index=df.index, dtype=int)
+
+    for i in range(period, len(df)):
+        close = df['close'].iloc[i]
+        hi = hima.iloc[i-1]
+        lo = loma.iloc[i-1]
+
+        if close > hi:
+            state = 1
+            hilo.iloc[i] = lo
+        elif close < lo:
+            state = -1
+            hilo.iloc[i] = hi
+        else:
+            state = 0
+            hilo.iloc[i] = hilo.iloc[i-1] if i > period else lo
+
+        hilo_state.iloc[i] = state
+
+    df['hilo'] = hilo
+    df['hilo_state'] = hilo_state
+    return df
+
+
+def gann_hilo_activator_loop(df, period, ma_type='SMA'):
+    """Loop original de analisador_cripto_hilo (GHLA com estado neutro mantido)"""
+    if ma_type == 'SMA':
+        hima = df['high'].rolling(window=period).mean()
+        loma = df['low'].rolling(window=period).mean()
+    else:
+        hima = df['high'].ewm(span=period, adjust=False).mean()
+        loma = df['low'].ewm(span=period, adjust=False).mean()
+
+    hilo_state = pd.Series(0, index=df.index, dtype=int)
+    ghla = pd.Series(np.nan, index=df.index, dtype=float)
+
+    for i in range(period, len(df)):
+        close = df['close'].iloc[i]
+        hima_prev = hima.iloc[i-1]
+        loma_prev = loma.iloc[i-1]
+
+        if close > hima_prev:
+            hilo_state.iloc[i] = 1
+        elif close < loma_prev:
+            hilo_state.iloc[i] = -1
+        else:
+            hilo_state.iloc[i] = 0
+
+        if hilo_state.iloc[i] == 1:
+            ghla.iloc[i] = loma_prev
+        elif hilo_state.iloc[i] == -1:
+            ghla.iloc[i] = hima_prev
+        else:
+            ghla.iloc[i] = ghla.iloc[i-1]
+
+    df['hilo_state'] = hilo_state
+    df['ghla'] = ghla
+    df['trend'] = df['hilo_state'].map({1: 'verde', -1: 'vermelho', 0: None})
+    df['trend'] = df['trend'].ffill()
+    return df
+
+
+def chilo_tendencia_loop(df, period, coluna='trend'):
+    """Loop original de backtesting_avancado / monitor_performance / multi_indicadores"""
+    df['hilo_high'] = df['high'].rolling(window=period).mean()
+    df['hilo_low'] = df['low'].rolling(window=period).mean()
+
+    df[coluna] = 0
+    for i in range(period, len(df)):
+        if df['close'].iloc[i] > df['hilo_high'].iloc[i]:
+            df.loc[df.index[i], coluna] = 1
+        elif df['close'].iloc[i] < df['hilo_low'].iloc[i]:
+            df.loc[df.index[i], coluna] = -1
+        else:
+            df.loc[df.index[i], coluna] = df[coluna].iloc[i-1]
+
+    return df
+
+
+def candles_virados_loop(estados):
+    """Laço original de coletor_dados_ml_8anos.contar_candles_virados"""
+    contagem = []
+    for i in range(len(estados)):
+        estado_atual = estados[i]
+        if estado_atual == 0:
+            contagem.append(0)
+            continue
+        count = 1
+        for j in range(i-1, -1, -1):
+            if estados[j] == estado_atual:
+                count += 1
+            else:
+                break
+        contagem.append(count)
+    return contagem
+
+
+def gerar_ohlc(n=400, seed=7, com_nan=False):
+    """Gera candles sintéticos com trechos laterais (zona neutra)"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.02, n))
+    # Repetir preços em alguns trechos força empates e candles neutros
+    close[50:70] = close[50]
+    high = close * (1 + rng.uniform(0, 0.03, n))
+    low = close * (1 - rng.uniform(0, 0.03, n))
+
+    if com_nan:
+        high[120] = np.nan
+        low[200:203] = np.nan
+        close[300] = np.nan
+
+    index = pd.date_range('2018-01-01', periods=n, freq='15min')
+    return pd.DataFrame({'open': close, 'high': high, 'low': low, 'close': close}, index=index)
+
+
+# ============================================================================
+# Testes
+# ============================================================================
+
+def test_activator_equivalente_ao_loop():
+    for com_nan in (False, True):
+        base = gerar_ohlc(com_nan=com_nan)
+        for period in (1, 3, 7, 25, 70, 399, 400, 500):
+            for ma_type in ('SMA', 'EMA'):
+                esperado = chilo_activator_loop(base.copy(), period, ma_type)
+                obtido = calcular_chilo(base.copy(), period, ma_type)
+
+                pd.testing.assert_series_equal(obtido['hilo'], esperado['hilo'])
+                pd.testing.assert_series_equal(obtido['hilo_state'], esperado['hilo_state'])
+
+
+def test_analisadores_ghla_equivalentes_ao_loop():
+    for com_nan in (False, True):
+        base = gerar_ohlc(com_nan=com_nan)
+        for period in (1, 3, 7, 25, 70, 399, 400, 500):
+            for ma_type in ('SMA', 'EMA'):
+                esperado = gann_hilo_activator_loop(base.copy(), period, ma_type)
+                obtido = analisador_cripto_hilo.calcular_gann_hilo_activator(base.copy(), period, ma_type)
+                pd.testing.assert_frame_equal(obtido, esperado)
+
+                esperado = chilo_activator_loop(base.copy(), period, ma_type)
+                for modulo in (analisador_cripto_hilo_bot, analisador_cripto_hilo_bot_v9):
+                    obtido = modulo.calcular_gann_hilo_activator(base.copy(), period, ma_type)
+                    pd.testing.assert_frame_equal(obtido, esperado)
+
+
+def test_tendencia_equivalente_ao_loop():
+    for com_nan in (False, True):
+        base = gerar_ohlc(com_nan=com_nan)
+        for period in (1, 3, 7, 25, 70, 400, 500):
+            esperado = chilo_tendencia_loop(base.copy(), period, 'chilo_trend')
+            obtido = calcular_chilo_tendencia(base.copy(), period, 'chilo_trend')
+
+            pd.testing.assert_frame_equal(obtido, esperado)
+
+
+def test_tendencia_matriz_igual_por_periodo():
+    for com_nan in (False, True):
+        base = gerar_ohlc(com_nan=com_nan)
+        periodos = [1, 3, 7, 25, 70, 400, 500]
+        matriz = calcular_tendencia_matriz(base['high'], base['low'], base['close'], periodos)
+
+        assert matriz.shape == (len(periodos), len(base))
+        for linha, period in zip(matriz, periodos):
+            _, _, trend = calcular_tendencia_arrays(base['high'], base['low'], base['close'], period)
+            assert np.array_equal(linha, trend)
+
+
+def test_arrays_aceitam_ndarray():
+    base = gerar_ohlc()
+    hilo, estado = calcular_chilo_arrays(
+        base['high'].to_numpy(), base['low'].to_numpy(), base['close'].to_numpy(), 10
+    )
+    assert np.isnan(estado[:10]).all()
+    assert set(np.unique(estado[10:])) <= {-1.0, 0.0, 1.0}
+    assert not np.isnan(hilo[10:]).any()
+
+
+def test_propagar_ultimo_mantem_nan_marcado():
+    valores = np.array([1.0, 2.0, np.nan, 4.0, 5.0])
+    mascara = np.array([False, True, True, False, True])
+    resultado = propagar_ultimo(valores, mascara)
+
+    assert np.isnan(resultado[0])
+    assert resultado[1] == 2.0
+    assert np.isnan(resultado[2]) and np.isnan(resultado[3])
+    assert resultado[4] == 5.0
+
+
+def test_candles_virados_equivalente_ao_loop():
+    for com_nan in (False, True):
+        base = gerar_ohlc(com_nan=com_nan)
+        for period in (1, 7, 25):
+            _, estado = calcular_chilo_arrays(base['high'], base['low'], base['close'], period)
+            assert contar_candles_virados_array(estado).tolist() == candles_virados_loop(estado)
+
+    assert len(contar_sequencias([])) == 0
+    assert contar_sequencias([1.0, 1.0, np.nan, np.nan, 0.0, 0.0, 0.0]).tolist() == [1, 2, 1, 1, 1, 2, 3]
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("TESTE: Equivalência do motor vetorizado do CHiLo")
+    print("=" * 60)
+
+    test_activator_equivalente_ao_loop()
+    print("✓ Modo Activator (hilo/hilo_state) idêntico ao loop")
+
+    test_analisadores_ghla_equivalentes_ao_loop()
+    print("✓ GHLA dos analisadores (script e bots) idêntico aos loops originais")
+
+    test_tendencia_equivalente_ao_loop()
+    print("✓ Modo Tendência (hilo_high/hilo_low/trend) idêntico ao loop")
+
+    test_tendencia_matriz_igual_por_periodo()
+    print("✓ Matriz de tendência idêntica ao cálculo por período")
+
+    test_candles_virados_equivalente_ao_loop()
+    print("✓ Candles virados (run-length) idêntico ao loop")
+
+    test_arrays_aceitam_ndarray()
+    test_propagar_ultimo_mantem_nan_marcado()
+    print("✓ Funções auxiliares validadas")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste das Métricas em Lote do CHiLo
+Magnus Wealth - Versão 9.1.0
+
+Valida a varredura de períodos (matriz de estados + tabela de métricas)
+contra o cálculo período a período com DataFrames usado anteriormente.
+"""
+
+import numpy as np
+
+from indicador_chilo import calcular_chilo, calcular_chilo_matriz, medias_moveis_matriz
+from metricas_chilo import (
+    calcular_metricas_matriz,
+    calcular_metricas_vetor,
+    calcular_taxa_acerto_matriz,
+    varrer_periodos,
+)
+from test_indicador_chilo import gerar_ohlc
+
+PERIODOS = [3, 5, 7, 10, 12, 15, 18, 20, 22, 25, 28, 30, 33, 35, 38, 40, 45, 50, 55, 60]
+
+
+def metricas_referencia(df):
+    """calcular_metricas original de otimizador_quinzenal (versão pandas)"""
+    TAXA_TAKER = 0.0005
+    if len(df) < 10:
+        return None
+
+    df = df.dropna(subset=['hilo_state']).copy()
+    if len(df) < 10:
+        return None
+
+    df.loc[:, 'retorno_diario'] = df['close'].pct_change()
+    df.loc[:, 'sinal'] = df['hilo_state'].shift(1)
+    df.loc[:, 'estrategia_retorno'] = df['sinal'] * df['retorno_diario']
+    df = df.dropna(subset=['estrategia_retorno'])
+    if len(df) < 10:
+        return None
+
+    acertos = (df['estrategia_retorno'] > 0).sum()
+    total_trades = len(df[df['estrategia_retorno'] != 0])
+    taxa_acerto = (acertos / total_trades * 100) if total_trades > 0 else 0
+
+    retorno_medio = df['estrategia_retorno'].mean()
+    std_retorno = df['estrategia_retorno'].std()
+    sharpe = (retorno_medio / std_retorno * np.sqrt(252)) if std_retorno > 0 else 0
+
+    retorno_total = (1 + df['estrategia_retorno']).prod() - 1
+    retorno_pct = retorno_total * 100
+    retorno_bh = (df['close'].iloc[-1] / df['close'].iloc[0] - 1) * 100
+
+    df.loc[:, 'mudanca_sinal'] = df['hilo_state'].diff().abs()
+    num_trades = (df['mudanca_sinal'] > 0).sum()
+    custo_total = num_trades * TAXA_TAKER
+    retorno_liquido = retorno_total - custo_total
+    custo_anual = (num_trades / len(df)) * 365 * TAXA_TAKER * 100
+
+    return {
+        'taxa_acerto': taxa_acerto,
+        'sharpe': sharpe,
+        'retorno': retorno_pct,
+        'retorno_bh': retorno_bh,
+        'superacao_bh': retorno_pct - retorno_bh,
+        'num_trades': num_trades,
+        'custo_total': custo_total * 100,
+        'retorno_liquido': retorno_liquido * 100,
+        'custo_anual': custo_anual
+    }
+
+
+def test_medias_matriz_igual_rolling():
+    base = gerar_ohlc(com_nan=True)
+    medias = medias_moveis_matriz(base['high'], PERIODOS)
+    for k, periodo in enumerate(PERIODOS):
+        esperado = base['high'].rolling(window=periodo).mean().to_numpy()
+        np.testing.assert_allclose(medias[k], esperado, rtol=1e-10, equal_nan=True)
+
+
+def test_matriz_de_estados_igual_ao_periodo_unico():
+    base = gerar_ohlc(n=600)
+    estados = calcular_chilo_matriz(base['high'], base['low'], base['close'], PERIODOS + [600, 700])
+    for k, periodo in enumerate(PERIODOS + [600, 700]):
+        esperado = calcular_chilo(base.copy(), periodo)['hilo_state'].to_numpy()
+        np.testing.assert_array_equal(estados[k], esperado)
+
+
+def test_tabela_de_metricas_igual_ao_calculo_individual():
+    for com_nan in (False, True):
+        base = gerar_ohlc(n=400, seed=3, com_nan=com_nan)
+        _, tabela = varrer_periodos(base, PERIODOS + [395])
+
+        for periodo in PERIODOS + [395]:
+            esperado = metricas_referencia(calcular_chilo(base.copy(), periodo))
+            if esperado is None:
+                assert periodo not in tabela.index
+                continue
+
+            obtido = tabela.loc[periodo]
+            for chave, valor in esperado.items():
+                assert np.isclose(obtido[chave], valor, rtol=1e-9, atol=1e-12), (periodo, chave)
+
+
+def test_metricas_vetor_iguais_ao_dataframe():
+    for com_nan in (False, True):
+        for seed in (3, 11):
+            base = gerar_ohlc(n=400, seed=seed, com_nan=com_nan)
+            for periodo in PERIODOS + [385, 395, 500]:
+                df = calcular_chilo(base.copy(), periodo)
+                esperado = metricas_referencia(df)
+                obtido = calcular_metricas_vetor(df['close'], df['hilo_state'])
+
+                if esperado is None:
+                    assert obtido is None
+                    continue
+
+                assert obtido.keys() == esperado.keys()
+                assert obtido['num_trades'] == esperado['num_trades']
+                for chave, valor in esperado.items():
+                    assert np.isclose(obtido[chave], valor, rtol=1e-12, atol=1e-14), (periodo, chave)
+
+
+def test_taxa_acerto_direcional():
+    close = np.array([10.0, 11.0, 10.5, 10.5, 12.0])
+    estados = np.array([[np.nan, 1.0, -1.0, 0.0, 1.0]])
+    # Verde em 11 -> 10.5 erra; vermelho em 10.5 -> 10.5 erra; neutro ignorado
+    assert calcular_taxa_acerto_matriz(close, estados)[0] == 0.0
+
+    estados = np.array([[1.0, -1.0, 0.0, 1.0, 1.0]])
+    assert calcular_taxa_acerto_matriz(close, estados)[0] == 1.0
+
+
+def test_periodos_sem_dados_sao_omitidos():
+    base = gerar_ohlc(n=100)
+    estados = calcular_chilo_matriz(base['high'], base['low'], base['close'], [3, 95])
+    tabela = calcular_metricas_matriz(base['close'], estados, [3, 95])
+    assert list(tabela.index) == [3]
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("TESTE: Varredura de períodos do CHiLo em lote")
+    print("=" * 60)
+
+    test_medias_matriz_igual_rolling()
+    test_matriz_de_estados_igual_ao_periodo_unico()
+    print("✓ Matriz de estados idêntica ao cálculo por período")
+
+    test_tabela_de_metricas_igual_ao_calculo_individual()
+    test_metricas_vetor_iguais_ao_dataframe()
+    test_taxa_acerto_direcional()
+    test_periodos_sem_dados_sao_omitidos()
+    print("✓ Tabela de métricas idêntica a calcular_metricas")
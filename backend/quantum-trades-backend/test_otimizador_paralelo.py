@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do Modo Paralelo do Otimizador Quinzenal
+Magnus Wealth - Versão 9.1.0
+
+Downloads em thread pool e varreduras em process pool devem produzir os
+mesmos resultados, na mesma ordem, que a execução sequencial.
+"""
+
+import numpy as np
+import pandas as pd
+
+import otimizador_quinzenal
+from otimizador_quinzenal import avaliar_candidatas, otimizar_portfolio
+
+SEM_DADOS = 'FALHA-USD'
+
+
+def dados_sinteticos(yahoo_symbol, period='1y'):
+    """Substitui buscar_dados_yahoo: série determinística por símbolo"""
+    if yahoo_symbol == SEM_DADOS:
+        return None
+
+    seed = sum(ord(c) for c in yahoo_symbol)
+    rng = np.random.default_rng(seed)
+    n = 500
+    close = 100 * np.cumprod(1 + rng.normal(0.001, 0.03, n))
+    index = pd.date_range('2023-01-01', periods=n, freq='D', tz='UTC')
+    return pd.DataFrame({
+        'open': close,
+        'high': close * (1 + rng.uniform(0, 0.04, n)),
+        'low': close * (1 - rng.uniform(0, 0.04, n)),
+        'close': close,
+        'volume': rng.uniform(2e5, 1e6, n)
+    }, index=index)
+
+
+def executar(funcao, itens, workers):
+    """Roda o lote com dados sintéticos no lugar do Yahoo"""
+    original = otimizador_quinzenal.buscar_dados_yahoo
+    otimizador_quinzenal.buscar_dados_yahoo = dados_sinteticos
+    try:
+        return funcao(itens, workers=workers, workers_download=workers)
+    finally:
+        otimizador_quinzenal.buscar_dados_yahoo = original
+
+
+def test_portfolio_paralelo_igual_ao_sequencial():
+    criptos = [dict(c) for c in otimizador_quinzenal.PORTFOLIO_ATUAL[:4]]
+    criptos.insert(2, {'name': 'Falha', 'yahoo': SEM_DADOS, 'period': 10, 'emoji': '❌'})
+
+    sequencial = executar(otimizar_portfolio, criptos, 1)
+    paralelo = executar(otimizar_portfolio, criptos, 3)
+
+    assert [r and r['cripto'] for r in paralelo] == ['Bitcoin', 'Ethereum', None, 'Binance Coin', 'Solana']
+    assert repr(paralelo) == repr(sequencial)
+
+
+def test_candidatas_paralelo_igual_ao_sequencial():
+    candidatas = otimizador_quinzenal.CANDIDATAS[:6]
+
+    sequencial = executar(avaliar_candidatas, candidatas, 1)
+    paralelo = executar(avaliar_candidatas, candidatas, 3)
+
+    assert len(paralelo) == len(candidatas)
+    assert repr(paralelo) == repr(sequencial)
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("TESTE: Otimizador quinzenal em paralelo")
+    print("=" * 60)
+
+    test_portfolio_paralelo_igual_ao_sequencial()
+    print("✓ Portfólio: paralelo idêntico ao sequencial")
+
+    test_candidatas_paralelo_igual_ao_sequencial()
+    print("✓ Candidatas: paralelo idêntico ao sequencial")
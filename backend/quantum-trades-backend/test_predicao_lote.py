@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da Predição de Inversão em Lote
+Magnus Wealth - Versão 9.1.0
+
+prever_todas deve dar o mesmo resultado da predição cripto a cripto, com
+uma única chamada a predict_proba por modelo.
+"""
+
+import os
+import tempfile
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from analisador_criterios import AnalisadorCriterios
+from monitor_multitimeframe import MonitorMultiTimeframe
+from predicao_inversao import FEATURE_COLS, PreditorInversao
+from registro_modelos import RegistroModelos
+
+CRIPTOS = ['Bitcoin', 'Ethereum', 'Solana', 'Chainlink']
+
+
+def gerar_features(rng):
+    features = {}
+    for col in FEATURE_COLS:
+        features[col] = int(rng.choice([-1, 1])) if col.endswith('estado') else int(rng.integers(0, 25))
+    return features
+
+
+def criar_preditor(diretorio):
+    for seed, cripto in enumerate(CRIPTOS):
+        rng = np.random.default_rng(seed)
+        X = pd.DataFrame([gerar_features(rng) for _ in range(300)])
+        y = (X['1h_candles_virados'] + X['6h_candles_virados'] + rng.normal(0, 5, 300) > 25).astype(int)
+        modelo = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=seed).fit(X, y)
+        joblib.dump(modelo, os.path.join(diretorio, cripto.lower() + '_inversao.pkl'))
+    return PreditorInversao(model_dir=diretorio, registro=RegistroModelos())
+
+
+def prever_referencia(modelo, cripto, features):
+    """prever original: DataFrame de uma linha, predict e predict_proba"""
+    X = pd.DataFrame([{col: features[col] for col in FEATURE_COLS}])
+    predicao = modelo.predict(X)[0]
+    probabilidade = modelo.predict_proba(X)[0]
+    return {
+        'cripto': cripto,
+        'vai_virar': bool(predicao),
+        'probabilidade_nao_virar': float(probabilidade[0]),
+        'probabilidade_virar': float(probabilidade[1]),
+        'sinal_execucao': probabilidade[1] > 0.70,
+        'features': features
+    }
+
+
+def test_lote_igual_a_predicao_individual():
+    with tempfile.TemporaryDirectory() as diretorio:
+        preditor = criar_preditor(diretorio)
+        rng = np.random.default_rng(42)
+
+        for _ in range(20):
+            entrada = {cripto: gerar_features(rng) for cripto in reversed(CRIPTOS)}
+            entrada['Dogecoin'] = gerar_features(rng)  # sem modelo
+            incompleta = gerar_features(rng)
+            del incompleta['8h_estado']
+            entrada['Solana'] = incompleta
+
+            resultados = preditor.prever_todas(entrada)
+            assert list(resultados) == ['Chainlink', 'Ethereum', 'Bitcoin']
+            for cripto, resultado in resultados.items():
+                esperado = prever_referencia(preditor.modelos[cripto], cripto, entrada[cripto])
+                assert resultado == esperado
+                assert preditor.prever(cripto, entrada[cripto]) == esperado
+
+        assert preditor.prever('Solana', incompleta) is None
+        assert preditor.prever_todas({}) == {}
+
+
+def test_uma_chamada_por_modelo():
+    with tempfile.TemporaryDirectory() as diretorio:
+        preditor = criar_preditor(diretorio)
+        # Ethereum e Solana usam o mesmo arquivo de modelo
+        preditor.arquivos['Solana'] = preditor.arquivos['Ethereum']
+
+        chamadas = []
+        for cripto in CRIPTOS:
+            modelo = preditor.obter_modelo(cripto)
+            if 'predict_proba' in vars(modelo):
+                continue
+            original = modelo.predict_proba
+
+            def contar(X, original=original, cripto=cripto):
+                chamadas.append((cripto, len(X)))
+                return original(X)
+            modelo.predict_proba = contar
+
+        rng = np.random.default_rng(7)
+        resultados = preditor.prever_todas({cripto: gerar_features(rng) for cripto in CRIPTOS})
+
+        assert list(resultados) == CRIPTOS
+        assert sorted(chamadas) == [('Bitcoin', 1), ('Chainlink', 1), ('Ethereum', 2)]
+
+
+def test_criterio_2_usa_predicoes_do_ciclo():
+    with tempfile.TemporaryDirectory() as diretorio:
+        analisador = AnalisadorCriterios(config_file=os.path.join(diretorio, 'config.json'),
+                                         monitor=MonitorMultiTimeframe(diretorio))
+        analisador.preditor = criar_preditor(diretorio)
+        features = {col: (1 if col.endswith('estado') else 20) for col in FEATURE_COLS}
+        predicoes = analisador.preditor.prever_todas({'Bitcoin': features})
+        individual = analisador.verificar_criterio_2('Bitcoin', features)
+
+        def nao_chamar(*args):
+            raise AssertionError('prever chamado apesar do lote')
+        analisador.preditor.prever = nao_chamar
+
+        assert analisador.verificar_criterio_2('Bitcoin', features, predicoes) == individual
+        assert analisador.verificar_criterio_2('Dogecoin', features, predicoes) == (
+            False, "Modelo ML não disponível", 0.0)
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("TESTE: Predição de inversão em lote")
+    print("=" * 60)
+
+    test_lote_igual_a_predicao_individual()
+    print("✓ prever_todas idêntico à predição cripto a cripto")
+
+    test_uma_chamada_por_modelo()
+    print("✓ Uma chamada a predict_proba por modelo")
+
+    test_criterio_2_usa_predicoes_do_ciclo()
+    print("✓ Critério 2 usa as predições do ciclo")
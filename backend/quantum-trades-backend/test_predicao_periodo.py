@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do Preditor de Período ML
+Magnus Wealth - Versão 9.1.0
+
+As features devem ser extraídas uma vez por (símbolo, último candle) e a
+confiança e os períodos sugeridos devem vir de todas as árvores do ensemble.
+"""
+
+import os
+import tempfile
+from collections import Counter
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+from predicao_ml import PreditorPeriodo
+
+FEATURE_COLS = [
+    'atr_14', 'std_20', 'volatility_ratio',
+    'ma_slope', 'trend_strength', 'volume_ratio',
+    'roc_10', 'rsi_14', 'autocorr_5', 'autocorr_10'
+]
+
+
+def gerar_ohlcv(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0.001, 0.03, n))
+    index = pd.date_range('2023-01-01', periods=n, freq='D')
+    return pd.DataFrame({
+        'open': close, 'high': close * 1.02, 'low': close * 0.98,
+        'close': close, 'volume': rng.uniform(1e5, 1e6, n)
+    }, index=index)
+
+
+def criar_preditor(diretorio):
+    """Modelo pequeno treinado sobre features de séries sintéticas"""
+    base = PreditorPeriodo(modelo_path=os.path.join(diretorio, 'inexistente.pkl'))
+    rng = np.random.default_rng(0)
+    linhas = [base.extrair_features(gerar_ohlcv(int(rng.integers(60, 200)), seed)) for seed in range(60)]
+    X = np.array([[f[col] for col in FEATURE_COLS] for f in linhas])
+    y = rng.choice([3, 5, 7, 10, 15, 20, 30, 45], size=len(X))
+
+    scaler = StandardScaler().fit(X)
+    modelo = RandomForestRegressor(n_estimators=40, max_depth=4, random_state=0).fit(scaler.transform(X), y)
+    joblib.dump(modelo, os.path.join(diretorio, 'modelo.pkl'))
+    joblib.dump(scaler, os.path.join(diretorio, 'scaler.pkl'))
+    return PreditorPeriodo(modelo_path=os.path.join(diretorio, 'modelo.pkl'),
+                           scaler_path=os.path.join(diretorio, 'scaler.pkl'),
+                           metadata_path=os.path.join(diretorio, 'metadata.json'))
+
+
+def previsao_referencia(preditor, df, top_n=3):
+    """Previsão árvore a árvore, sobre todas as árvores"""
+    features = preditor._calcular_features(df)
+    X = preditor.scaler.transform(np.array([[features[col] for col in preditor.feature_cols]]))
+    periodo = int(preditor.modelo.predict(X)[0])
+    arvores = [tree.predict(X)[0] for tree in preditor.modelo.estimators_]
+    confianca = max(0, min(1, 1 - (np.std(arvores) / max(np.mean(arvores), 1))))
+    votos = Counter(int(p) for p in arvores)
+    top = sorted(votos, key=lambda p: (-votos[p], p))[:top_n]
+    if periodo not in top:
+        top = [periodo] + top[:top_n - 1]
+    return periodo, confianca, top
+
+
+def test_features_em_cache_por_simbolo_e_candle():
+    with tempfile.TemporaryDirectory() as diretorio:
+        preditor = criar_preditor(diretorio)
+        calculos = []
+        original = preditor._calcular_features
+
+        def contar(df):
+            calculos.append(len(df))
+            return original(df)
+        preditor._calcular_features = contar
+
+        df = gerar_ohlcv(120, 1)
+        features = preditor.extrair_features(df, 'BTC-USD')
+        preditor.prever_periodo(df, 'BTC-USD')
+        preditor.classificar_padrao(df, 'BTC-USD')
+        assert calculos == [120]
+        assert features == original(df)
+
+        # Novo candle ou outro símbolo: recalcula
+        preditor.prever_periodo(gerar_ohlcv(121, 1), 'BTC-USD')
+        preditor.prever_periodo(df, 'ETH-USD')
+        assert calculos == [120, 121, 120]
+
+        # Sem símbolo, nada vai para o cache
+        preditor.extrair_features(df)
+        preditor.extrair_features(df)
+        assert calculos == [120, 121, 120, 120, 120]
+
+        # Alterar o dicionário retornado não afeta o cache
+        features['rsi_14'] = -1
+        assert preditor.extrair_features(df, 'BTC-USD')['rsi_14'] != -1
+        assert preditor.extrair_features(gerar_ohlcv(30, 1), 'CURTO') is None
+
+
+def test_previsao_usa_todas_as_arvores():
+    with tempfile.TemporaryDirectory() as diretorio:
+        preditor = criar_preditor(diretorio)
+        for seed in range(20):
+            df = gerar_ohlcv(90 + seed, 100 + seed)
+            periodo, confianca, top = preditor.prever_periodo(df)
+            esperado = previsao_referencia(preditor, df)
+
+            assert periodo == esperado[0]
+            assert np.isclose(confianca, esperado[1], rtol=1e-12)
+            assert top == esperado[2]
+
+        df = gerar_ohlcv(150, 7)
+        assert preditor.prever_periodo(df, top_n=5)[2] == previsao_referencia(preditor, df, 5)[2]
+        assert preditor.prever_periodo(gerar_ohlcv(30, 7)) == (None, 0, [])
+
+
+def test_lote_igual_ao_individual():
+    with tempfile.TemporaryDirectory() as diretorio:
+        preditor = criar_preditor(diretorio)
+        dados = {f'ATIVO{k}': gerar_ohlcv(70 + 9 * k, 200 + k) for k in range(8)}
+        dados['CURTO'] = gerar_ohlcv(20, 1)
+
+        lote = preditor.prever_periodos(dados, top_n=4)
+        assert list(lote) == list(dados)
+        assert lote['CURTO'] == (None, 0, [])
+        for simbolo, df in dados.items():
+            individual = PreditorPeriodo.prever_periodo(preditor, df, top_n=4)
+            assert lote[simbolo][0] == individual[0] and lote[simbolo][2] == individual[2]
+            assert np.isclose(lote[simbolo][1], individual[1], rtol=1e-12)
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("TESTE: Preditor de período ML")
+    print("=" * 60)
+
+    test_features_em_cache_por_simbolo_e_candle()
+    print("✓ Features extraídas uma vez por (símbolo, último candle)")
+
+    test_previsao_usa_todas_as_arvores()
+    print("✓ Confiança e períodos mais votados de todas as árvores")
+
+    test_lote_igual_ao_individual()
+    print("✓ Previsão em lote igual à individual")
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do Preditor de Preços Vetorizado
+Magnus Wealth - Versão 9.1.0
+
+As features técnicas, as janelas de prepare_data e as previsões recursivas
+devem ser as mesmas da implementação original com laços por índice.
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from ml_models.price_predictor import BUNDLE_FILE, PricePredictor
+
+
+def features_referencia(prices):
+    """calculate_technical_features original (laço por índice)"""
+    prices_array = np.array(prices)
+    features = []
+    for i in range(len(prices_array)):
+        current_price = prices_array[i]
+        ma5 = np.mean(prices_array[i-5:i+1]) if i >= 5 else current_price
+        ma10 = np.mean(prices_array[i-10:i+1]) if i >= 10 else current_price
+        ma20 = np.mean(prices_array[i-20:i+1]) if i >= 20 else current_price
+        returns = (current_price - prices_array[i-1]) / prices_array[i-1] if i > 0 else 0
+        volatility = np.std(prices_array[i-5:i+1]) if i >= 5 else 0
+        momentum = ma5 - ma20
+        if i >= 14:
+            gains, losses = [], []
+            for j in range(i-13, i+1):
+                change = prices_array[j] - prices_array[j-1]
+                if change > 0:
+                    gains.append(change)
+                else:
+                    losses.append(abs(change))
+            avg_gain = np.mean(gains) if gains else 0
+            avg_loss = np.mean(losses) if losses else 0
+            rsi = 100 if avg_loss == 0 else 100 - (100 / (1 + avg_gain / avg_loss))
+        else:
+            rsi = 50
+        features.append([current_price, ma5, ma10, ma20, returns, volatility, momentum, rsi, i])
+    return np.array(features)
+
+
+def janelas_referencia(features, prices, lookback):
+    """Laço original de prepare_data"""
+    X = [features[i-lookback:i].flatten() for i in range(lookback, len(features))]
+    y = [prices[i] for i in range(lookback, len(features))]
+    return np.array(X), np.array(y)
+
+
+def gerar_precos(n, seed=42):
+    rng = np.random.default_rng(seed)
+    precos = list(30 + np.cumsum(rng.normal(0.05, 0.5, n)))
+    # Trechos parados e só de alta exercitam os casos-limite do RSI
+    precos[40:60] = [precos[40]] * 20
+    precos[80:100] = [precos[80] + 0.1 * k for k in range(20)]
+    return precos
+
+
+def test_features_iguais_ao_laco():
+    predictor = PricePredictor(models_dir=tempfile.mkdtemp())
+    for n in (1, 5, 6, 14, 15, 21, 30, 300):
+        precos = gerar_precos(300)[:n]
+        obtido = predictor.calculate_technical_features(precos)
+        esperado = features_referencia(precos)
+
+        assert obtido.shape == esperado.shape == (n, 9)
+        # Médias, volatilidade e retorno saem bit a bit iguais
+        assert np.array_equal(obtido[:, :7], esperado[:, :7])
+        assert np.array_equal(obtido[:, 8], esperado[:, 8])
+        assert np.allclose(obtido[:, 7], esperado[:, 7], rtol=1e-12, atol=1e-10)
+
+    assert len(predictor.calculate_technical_features([])) == 0
+
+
+def test_prepare_data_igual_ao_laco():
+    predictor = PricePredictor(models_dir=tempfile.mkdtemp())
+    precos = gerar_precos(300)
+    features = predictor.calculate_technical_features(precos)
+
+    for lookback in (1, 5, 10):
+        X, y = predictor.prepare_data(precos, lookback=lookback)
+        X_ref, y_ref = janelas_referencia(features, precos, lookback)
+        assert X.shape == X_ref.shape == (300 - lookback, lookback * 9)
+        assert np.array_equal(X, X_ref)
+        assert np.array_equal(y, y_ref)
+
+    X, y = predictor.prepare_data(precos[:5], lookback=5)
+    assert len(X) == 0 and len(y) == 0
+
+
+def previsao_referencia(predictor, ticker, prices, days):
+    """predict_next_days original: recalcula as features da janela a cada dia"""
+    carregado = predictor._get_model(ticker)
+    model, scaler = carregado['model'], carregado['scaler']
+    lookback = carregado['metadata']['lookback']
+    current_prices = list(prices[-30:])
+    previsoes = []
+    for _ in range(days):
+        features = features_referencia(current_prices)
+        X = features[-lookback:].flatten().reshape(1, -1)
+        predicted_price = model.predict(scaler.transform(X))[0]
+        previsoes.append(predicted_price)
+        current_prices.append(predicted_price)
+    return previsoes
+
+
+def test_previsao_incremental_igual_a_recalcular_a_janela():
+    predictor = PricePredictor(models_dir=tempfile.mkdtemp())
+    historicos = {
+        'PETR4': gerar_precos(300, seed=1)[:200],
+        'VALE3': gerar_precos(300, seed=2)[:120],
+        'ITUB4': gerar_precos(300, seed=3)[:35],
+    }
+    for ticker, precos in historicos.items():
+        predictor.train_model(ticker, precos)
+
+    # Históricos curtos (< 30 dias) eram a lista do chamador modificada
+    curtos = {'PETR4': historicos['PETR4'][-25:], 'VALE3': historicos['VALE3'], 'ITUB4': historicos['ITUB4']}
+    copias = {ticker: list(precos) for ticker, precos in curtos.items()}
+
+    lote = predictor.predict_next_days_batch(curtos, days=40)
+    assert curtos == copias
+
+    for ticker, precos in curtos.items():
+        esperado = previsao_referencia(predictor, ticker, precos, 40)
+        obtido = [p['predicted_price'] for p in lote[ticker]['predictions']]
+        assert np.allclose(obtido, np.round(esperado, 2), atol=0.011)
+
+        individual = predictor.predict_next_days(ticker, precos, days=40)
+        assert individual == lote[ticker]
+        assert curtos == copias
+
+
+def sem_data(resultado):
+    return {k: v for k, v in resultado.items() if k != 'model_metadata'}
+
+
+def test_treino_em_lote_igual_ao_individual():
+    historicos = {f'TICK{k}': gerar_precos(300, seed=k)[:150 + 10 * k] for k in range(5)}
+    historicos['CURTO3'] = gerar_precos(300)[:20]
+
+    individual = PricePredictor(models_dir=tempfile.mkdtemp())
+    esperado = {t: individual.train_model(t, p) for t, p in historicos.items() if len(p) >= 30}
+
+    models_dir = tempfile.mkdtemp()
+    lote = PricePredictor(models_dir=models_dir)
+    resultados = list(lote.train_batch_iter(historicos, workers=3))
+
+    assert sorted(r['ticker'] for r in resultados) == sorted(historicos)
+    por_ticker = {r['ticker']: r for r in resultados}
+    assert por_ticker['CURTO3']['status'] == 'error'
+    for ticker, metricas in esperado.items():
+        assert por_ticker[ticker] == metricas
+
+    # Um único artefato consolidado, sem pickles por ticker
+    assert os.listdir(models_dir) == [BUNDLE_FILE]
+
+    novo = PricePredictor(models_dir=models_dir)
+    assert novo.list_trained_models() == sorted(esperado)
+    for ticker in esperado:
+        previsto = novo.predict_next_days(ticker, historicos[ticker], days=5)
+        assert sem_data(previsto) == sem_data(individual.predict_next_days(ticker, historicos[ticker], days=5))
+
+    # Sequencial produz as mesmas métricas
+    sequencial = PricePredictor(models_dir=tempfile.mkdtemp()).train_batch(historicos, workers=1)
+    assert list(sequencial) == list(historicos)
+    assert all(sequencial[t] == esperado[t] for t in esperado)
+
+
+def test_modelo_mais_recente_prevalece():
+    models_dir = tempfile.mkdtemp()
+    precos = gerar_precos(300, seed=7)
+
+    predictor = PricePredictor(models_dir=models_dir)
+    predictor.train_batch({'PETR4': precos[:200]}, workers=1)
+    time.sleep(0.01)
+    predictor.train_model('PETR4', precos)
+
+    assert PricePredictor(models_dir=models_dir).get_model_info('PETR4')['n_samples'] == 300
+
+    time.sleep(0.01)
+    predictor.train_batch({'PETR4': precos[:250], 'VALE3': precos[:100]}, workers=1)
+
+    recarregado = PricePredictor(models_dir=models_dir)
+    assert recarregado.get_model_info('PETR4')['n_samples'] == 250
+    assert recarregado.get_model_info('VALE3')['n_samples'] == 100
+    assert recarregado.list_trained_models() == ['PETR4', 'VALE3']
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("TESTE: Preditor de preços vetorizado")
+    print("=" * 60)
+
+    test_features_iguais_ao_laco()
+    print("✓ Features técnicas idênticas ao laço original")
+
+    test_prepare_data_igual_ao_laco()
+    print("✓ Janelas de prepare_data idênticas ao laço original")
+
+    test_previsao_incremental_igual_a_recalcular_a_janela()
+    print("✓ Previsão incremental em lote igual à recalculada, sem alterar os preços")
+
+    test_treino_em_lote_igual_ao_individual()
+    print("✓ Treino em lote (processos) igual ao individual, em um único artefato")
+
+    test_modelo_mais_recente_prevalece()
+    print("✓ Modelo treinado mais recentemente prevalece ao carregar")
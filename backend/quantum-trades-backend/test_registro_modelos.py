@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do Registro de Modelos
+Magnus Wealth - Versão 9.1.0
+
+O registro deve carregar modelos só no primeiro uso, mapear os arrays em
+memória, manter um LRU limitado e recarregar arquivos alterados.
+"""
+
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from ml_models.price_predictor import PricePredictor
+from predicao_inversao import PreditorInversao
+from registro_modelos import RegistroModelos
+
+FEATURES = [f'{tf}_{campo}' for tf in ['15m', '30m', '1h', '6h', '8h', '12h']
+            for campo in ('estado', 'candles_virados')]
+
+
+def treinar_rf(seed):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.integers(-1, 20, size=(200, len(FEATURES))), columns=FEATURES)
+    y = (X['1h_candles_virados'] + rng.normal(0, 3, 200) > 10).astype(int)
+    return RandomForestClassifier(n_estimators=10, random_state=seed).fit(X, y)
+
+
+def test_lru_e_recarga_por_mtime():
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminhos = []
+        for k in range(4):
+            caminho = os.path.join(diretorio, f'm{k}.pkl')
+            joblib.dump({'versao': k, 'pesos': np.arange(1000.0)}, caminho)
+            caminhos.append(caminho)
+
+        registro = RegistroModelos(capacidade=2)
+        assert registro.obter(caminhos[0])['versao'] == 0
+        assert isinstance(registro.obter(caminhos[0])['pesos'], np.memmap)
+        assert registro.obter(caminhos[1])['versao'] == 1
+        registro.obter(caminhos[0])  # 0 fica mais recente que 1
+        registro.obter(caminhos[2])
+
+        assert len(registro) == 2
+        assert caminhos[0] in registro and caminhos[2] in registro
+        assert caminhos[1] not in registro
+
+        # Acesso em cache não relê o arquivo
+        cargas = registro.cargas
+        registro.obter(caminhos[0])
+        assert registro.cargas == cargas
+
+        # Arquivo regravado é recarregado
+        time.sleep(0.01)
+        joblib.dump({'versao': 10}, caminhos[0])
+        assert registro.obter(caminhos[0])['versao'] == 10
+        assert registro.cargas == cargas + 1
+
+        os.remove(caminhos[2])
+        try:
+            registro.obter(caminhos[2])
+            assert False, 'arquivo removido deveria falhar'
+        except FileNotFoundError:
+            assert caminhos[2] not in registro
+
+
+def test_preditor_inversao_carrega_sob_demanda():
+    with tempfile.TemporaryDirectory() as diretorio:
+        for seed, nome in enumerate(['bitcoin', 'binance_coin', 'solana']):
+            joblib.dump(treinar_rf(seed), os.path.join(diretorio, f'{nome}_inversao.pkl'))
+
+        registro = RegistroModelos(capacidade=2)
+        preditor = PreditorInversao(model_dir=diretorio, registro=registro)
+
+        # Inicialização só indexa os arquivos
+        assert sorted(preditor.modelos) == ['Binance Coin', 'Bitcoin', 'Solana']
+        assert registro.cargas == 0
+
+        features = {col: 1 for col in FEATURES}
+        resultado = preditor.prever('Binance Coin', features)
+        assert resultado is not None and registro.cargas == 1
+
+        assert preditor.modelos['Binance Coin'] is registro.obter(preditor.arquivos['Binance Coin'])
+
+        for cripto in ['Bitcoin', 'Solana', 'Bitcoin']:
+            preditor.prever(cripto, features)
+        assert len(registro) == 2
+
+        # Modelo treinado depois da inicialização é encontrado
+        joblib.dump(treinar_rf(9), os.path.join(diretorio, 'chainlink_inversao.pkl'))
+        assert preditor.prever('Chainlink', features) is not None
+        assert preditor.prever('Dogecoin', features) is None
+
+
+def test_price_predictor_usa_registro():
+    with tempfile.TemporaryDirectory() as diretorio:
+        rng = np.random.default_rng(1)
+        precos = list(30 + np.cumsum(rng.normal(0, 0.5, 120)))
+
+        PricePredictor(models_dir=diretorio).train_model('PETR4', precos)
+
+        registro = RegistroModelos(capacidade=8)
+        predictor = PricePredictor(models_dir=diretorio, registry=registro)
+        assert registro.cargas == 0
+
+        primeira = predictor.predict_next_days('PETR4', precos, days=3)
+        cargas = registro.cargas
+        assert cargas == 3  # modelo, scaler e metadata
+        assert predictor.predict_next_days('PETR4', precos, days=3) == primeira
+        assert registro.cargas == cargas
+
+        # Retreino por outro processo: arquivos novos são relidos
+        time.sleep(0.01)
+        PricePredictor(models_dir=diretorio, registry=RegistroModelos()).train_model('PETR4', precos[:80])
+        assert predictor.get_model_info('PETR4')['n_samples'] == 80
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("TESTE: Registro de modelos")
+    print("=" * 60)
+
+    test_lru_e_recarga_por_mtime()
+    print("✓ LRU limitado, arrays mapeados e recarga quando o arquivo muda")
+
+    test_preditor_inversao_carrega_sob_demanda()
+    print("✓ PreditorInversao carrega os modelos sob demanda")
+
+    test_price_predictor_usa_registro()
+    print("✓ PricePredictor lê modelos pelo registro")
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do Replay Histórico do Sistema de Ordens
+Magnus Wealth - Versão 9.1.0
+
+Em cada passo do relógio simulado o monitor do replay deve ver o mesmo que
+o monitor ao vivo veria naquele instante, e o replay deve passar pelo fluxo
+de critérios e execução sem acessar a rede.
+"""
+
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from armazem_ohlcv import COLUNAS, REGRAS, ArmazemOHLCV
+from monitor_multitimeframe import TIMEFRAMES, MonitorMultiTimeframe
+from predicao_inversao import FEATURE_COLS
+import notificador_usuario
+from replay_ordens import MonitorReplay, RelogioSimulado, ReplayOrdensMagnus, sem_rede
+
+# Limite de tempo do replay longo só com MAGNUS_BENCHMARK=1
+BENCHMARK = os.environ.get('MAGNUS_BENCHMARK') == '1'
+
+CRIPTOS = [
+    {'name': 'Alfa', 'yahoo': 'ALFA-USD', 'period': 3},
+    {'name': 'Beta', 'yahoo': 'BETA-USD', 'period': 5},
+]
+
+PERIODOS = {'Alfa': {'15m': 8, '30m': 6, '1h': 5, '6h': 4, '8h': 3, '12h': 3, '1d': 3}}
+
+SEM_CONFIG = '/nao/existe/config_ordens.json'
+
+
+def gerar_candles(seed, inicio, fim, freq):
+    """Caminhada aleatória de candles OHLC"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(inicio, fim, freq=freq, tz='UTC', inclusive='left', name='timestamp')
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, len(index)))
+    abertura = np.concatenate([[100.0], close[:-1]])
+    return pd.DataFrame({
+        'open': abertura,
+        'high': np.maximum(abertura, close) * (1 + rng.uniform(0, 0.005, len(index))),
+        'low': np.minimum(abertura, close) * (1 - rng.uniform(0, 0.005, len(index))),
+        'close': close,
+        'volume': rng.uniform(1e5, 1e6, len(index))
+    }, index=index)[COLUNAS]
+
+
+def criar_armazem(diretorio, dias=20, inicio='2024-01-01'):
+    """Partições de 15m e 1h sintéticas, sem função de download"""
+    armazem = ArmazemOHLCV(diretorio, buscar=sem_rede)
+    fim = pd.Timestamp(inicio) + pd.Timedelta(days=dias)
+    for seed, cripto in enumerate(CRIPTOS):
+        armazem._salvar(cripto['yahoo'], '15m', gerar_candles(seed, inicio, fim, '15min'))
+        # Beta começa depois: o replay precisa lidar com criptos sem dados
+        inicio_1h = pd.Timestamp(inicio) + pd.Timedelta(days=2 * seed)
+        armazem._salvar(cripto['yahoo'], '1h', gerar_candles(seed + 10, inicio_1h, fim, '1h'))
+    return ArmazemOHLCV(diretorio, buscar=sem_rede)
+
+
+def criar_modelos(diretorio):
+    for seed, cripto in enumerate(CRIPTOS):
+        rng = np.random.default_rng(seed)
+        X = pd.DataFrame({
+            col: rng.choice([-1, 0, 1], 400) if col.endswith('estado') else rng.integers(0, 12, 400)
+            for col in FEATURE_COLS
+        })
+        y = (X['15m_candles_virados'] + X['1h_candles_virados'] + rng.normal(0, 3, 400) > 8).astype(int)
+        modelo = RandomForestClassifier(n_estimators=10, max_depth=5, random_state=seed).fit(X, y)
+        joblib.dump(modelo, os.path.join(diretorio, cripto['name'].lower() + '_inversao.pkl'))
+
+
+def visivel_ao_vivo(armazem, yahoo, tf_name, instante, preco):
+    """
+    Candles que o Yahoo devolveria no instante: os fechados e o em formação,
+    com o último preço como fechamento
+    """
+    df = armazem.obter_timeframe(yahoo, tf_name, atualizar=False)
+    df = df[df.index <= instante].copy()
+    ultimo = df.index[-1]
+    if ultimo + pd.Timedelta(REGRAS[tf_name]) > instante:
+        df.loc[ultimo, 'close'] = preco
+    return df
+
+
+def test_monitor_do_replay_igual_ao_monitor_ao_vivo():
+    with tempfile.TemporaryDirectory() as diretorio:
+        armazem = criar_armazem(os.path.join(diretorio, 'mercado'))
+        replay = MonitorReplay(CRIPTOS, RelogioSimulado(), armazem, periodos=PERIODOS)
+        passos = replay.preparar('2024-01-03', '2024-01-19 23:45')
+        assert passos[0] == pd.Timestamp('2024-01-03', tz='UTC')
+        assert (np.diff(passos.asi8) == pd.Timedelta('15min').value).all()
+
+        ao_vivo = MonitorMultiTimeframe(diretorio_estado=os.path.join(diretorio, 'estado'))
+        ao_vivo.periodos_otimizados = PERIODOS
+
+        rng = np.random.default_rng(0)
+        amostra = np.sort(rng.choice(len(passos), 60, replace=False))
+        amostra[:3] = [0, 1, 96]  # inclui a virada do dia (00:00 UTC)
+        for k in np.sort(amostra):
+            replay.posicionar(k)
+            instante = passos[k]
+
+            for cripto in CRIPTOS:
+                preco = replay.preco(cripto['name'])
+
+                def buscar(yahoo, interval, period='7d', inicio=None):
+                    df = visivel_ao_vivo(armazem, yahoo, interval, instante, preco)
+                    return df[df.index >= inicio] if inicio is not None else df
+
+                ao_vivo.buscar_dados_timeframe = buscar
+                esperado = ao_vivo.monitorar_cripto(cripto)
+                obtido = replay.monitorar_cripto(cripto)
+
+                assert obtido['timeframes'] == esperado['timeframes']
+                assert obtido['timestamp'] == instante.isoformat()
+
+        # Beta só tem 1h a partir do dia 3: apenas 15m e 30m no primeiro passo
+        replay.posicionar(0)
+        assert set(replay.monitorar_cripto(CRIPTOS[1])['timeframes']) == {'15m', '30m'}
+        assert set(replay.monitorar_cripto(CRIPTOS[0])['timeframes']) == set(TIMEFRAMES) - {'1d'}
+        # Terceiro candle diário fechado: período 3 atingido
+        replay.posicionar(96)
+        assert set(replay.monitorar_cripto(CRIPTOS[0])['timeframes']) == set(TIMEFRAMES)
+
+
+def executar_replay(diretorio, config, dias=20, **kwargs):
+    armazem = criar_armazem(os.path.join(diretorio, 'mercado'), dias=dias)
+    modelos = os.path.join(diretorio, 'modelos')
+    os.makedirs(modelos, exist_ok=True)
+    criar_modelos(modelos)
+
+    replay = ReplayOrdensMagnus(criptos=CRIPTOS, config=config, armazem=armazem,
+                                model_dir=modelos, periodos=PERIODOS, config_file=SEM_CONFIG)
+    # Qualquer envio de notificação falha o teste
+    post_original = notificador_usuario.requests.post
+    notificador_usuario.requests.post = sem_rede
+    try:
+        return replay, replay.executar(**kwargs)
+    finally:
+        notificador_usuario.requests.post = post_original
+
+
+def test_replay_executa_o_fluxo_de_ordens_sem_rede():
+    config = {'ml': {'threshold_probabilidade': 0.55}, 'stop_loss': {'percentual': 0.03}}
+    with tempfile.TemporaryDirectory() as diretorio:
+        replay, resultado = executar_replay(diretorio, config, inicio='2024-01-03')
+
+    assert replay.sistema.analisador.config['ml'] == {'threshold_probabilidade': 0.55,
+                                                        'min_timeframes_alinhados': 5}
+    assert resultado['config']['capital_inicial'] == 1000.0
+    assert replay.sistema.executador.persistir is False
+
+    ordens = resultado['ordens']
+    assert any(o['tipo'] == 'COMPRA' for o in ordens)
+    assert any(o['tipo'] == 'VENDA' for o in ordens)
+
+    # Compras e vendas alternam por cripto, sempre em passos do relógio
+    passos = set(resultado['curva_capital'].index)
+    for cripto in ('Alfa', 'Beta'):
+        tipos = [o['tipo'] for o in ordens if o['cripto'] == cripto]
+        assert tipos[::2] == ['COMPRA'] * len(tipos[::2])
+        assert tipos[1::2] == ['VENDA'] * len(tipos[1::2])
+    for ordem in ordens:
+        assert pd.Timestamp(ordem['timestamp']) in passos
+        assert ordem['quantidade'] * ordem['preco'] == ordem['valor_total']
+        if ordem['tipo'] == 'VENDA':
+            assert ordem['percentual_pl'] <= -3 + 1e-9 or 'Stop Loss' not in ordem['motivo']
+
+    # Patrimônio final = caixa pelas ordens + posições a mercado
+    curva = resultado['curva_capital']
+    assert len(curva) == resultado['passos'] == len(replay.monitor.passos)
+    caixa = 1000.0 + sum(o['valor_total'] if o['tipo'] == 'VENDA' else -o['valor_total'] for o in ordens)
+    abertas = sum(p['quantidade'] * replay.monitor.precos[c][-1] for c, p in resultado['posicoes_abertas'].items())
+    assert np.isclose(curva.iloc[-1], caixa + abertas)
+    assert np.isclose(resultado['capital_final'], curva.iloc[-1])
+    assert resultado['performance']['total_operacoes'] == len(ordens)
+
+
+def test_criterio_diario_usa_o_relogio_simulado():
+    # Só o critério 1: compras apenas às 21:00 de Brasília (00:00 UTC)
+    config = {'criterios': {'criterio_2_ativo': False}, 'stop_loss': {'percentual': 0.02}}
+    with tempfile.TemporaryDirectory() as diretorio:
+        _, resultado = executar_replay(diretorio, config)
+
+    compras = [o for o in resultado['ordens'] if o['tipo'] == 'COMPRA']
+    assert compras
+    for ordem in compras:
+        instante = pd.Timestamp(ordem['timestamp'])
+        assert (instante.hour, instante.minute) == (0, 0)
+        assert ordem['motivo'] == 'CRITÉRIO 1: Inversão candle diário'
+
+
+def test_replay_de_meses_de_15m_em_segundos():
+    config = {'ml': {'threshold_probabilidade': 0.6}, 'stop_loss': {'percentual': 0.05}}
+    with tempfile.TemporaryDirectory() as diretorio:
+        inicio = time.perf_counter()
+        _, resultado = executar_replay(diretorio, config, dias=90)
+        duracao = time.perf_counter() - inicio
+
+    # 2 criptos x 90 dias de 15m (8640 passos)
+    assert resultado['passos'] == 90 * 96
+    assert len(resultado['curva_capital']) == resultado['passos']
+    if BENCHMARK:
+        assert duracao < 30
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("TESTE: Replay histórico do sistema de ordens")
+    print("=" * 60)
+
+    test_monitor_do_replay_igual_ao_monitor_ao_vivo()
+    print("✓ Monitor do replay vê o mesmo que o monitor ao vivo em cada passo")
+
+    test_replay_executa_o_fluxo_de_ordens_sem_rede()
+    print("✓ Replay executa critérios, stop loss e ordens sem rede")
+
+    test_criterio_diario_usa_o_relogio_simulado()
+    print("✓ Critério diário segue o relógio simulado")
+
+    test_replay_de_meses_de_15m_em_segundos()
+    print("✓ Meses de candles de 15m reexecutados em segundos")
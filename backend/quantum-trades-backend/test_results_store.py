@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do Armazenamento de Resultados de Backtest
+Magnus Wealth - Versão 9.1.0
+
+Os resultados devem ser consultados pelas métricas indexadas (ex.: top N
+por Sharpe de um ticker no último mês) sem ler as curvas, e as curvas,
+gravadas em float32 comprimido, devem voltar sob demanda.
+"""
+
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from ml_models.backtester import Backtester
+from ml_models.results_store import ResultsStore, decode_curve, encode_curve
+
+# Limite de tempo da consulta só com MAGNUS_BENCHMARK=1
+BENCHMARK = os.environ.get('MAGNUS_BENCHMARK') == '1'
+
+
+def gerar_precos(n_dias, seed):
+    rng = np.random.default_rng(seed)
+    return (40 * np.cumprod(1 + rng.normal(0.0004, 0.015, n_dias))).tolist()
+
+
+def executado_ha(dias):
+    return (datetime.now() - timedelta(days=dias)).isoformat()
+
+
+def test_curva_float32_comprimida():
+    curva = np.round(10000 * np.cumprod(1 + np.random.default_rng(0).normal(0, 0.01, 2520)), 2)
+    dados = encode_curve(curva)
+    recuperada = decode_curve(dados)
+
+    assert recuperada.dtype == np.float32
+    assert np.allclose(recuperada, curva, rtol=1e-6)
+    # Menor que os próprios float32 crus (e muito menor que o JSON indentado)
+    assert len(dados) < 4 * len(curva) < len(json.dumps(curva.tolist(), indent=2))
+
+
+def test_top_n_por_sharpe_de_um_ticker_no_ultimo_mes():
+    backtester = Backtester(initial_capital=10000, results_dir=tempfile.mkdtemp())
+    store = backtester.store
+
+    esperados = []
+    for seed in range(30):
+        resultado = backtester.backtest_buy_and_hold(['PETR4', 'VALE3'][seed % 2], gerar_precos(252, seed))
+        resultado['executed_at'] = executado_ha(seed * 2)
+        store.save(resultado)
+        if resultado['ticker'] == 'PETR4' and seed * 2 <= 30:
+            esperados.append(resultado['metrics']['sharpe_ratio'])
+
+    # PETR4 também em carteira, fora do último mês
+    carteira = backtester.backtest_portfolio(
+        {'PETR4': 0.5, 'ITUB4': 0.5},
+        {'PETR4': gerar_precos(252, 100), 'ITUB4': gerar_precos(252, 101)}
+    )
+    carteira['executed_at'] = executado_ha(45)
+    carteira_id = store.save(carteira)
+
+    top = store.query(ticker='PETR4', days=30, order_by='sharpe_ratio', limit=3)
+    assert [r['metrics']['sharpe_ratio'] for r in top] == sorted(esperados, reverse=True)[:3]
+    assert all(r['ticker'] == 'PETR4' and 'equity_curve' not in r for r in top)
+    assert top[0]['curve_length'] == 252
+
+    # Carteiras são encontradas por qualquer um dos seus tickers
+    assert [r['id'] for r in store.query(ticker='ITUB4')] == [carteira_id]
+    assert store.count(ticker='PETR4') == len(store.query(ticker='PETR4', limit=500)) == 16
+    assert store.count(strategy='portfolio') == 1
+
+    salva = store.query(strategy='portfolio')[0]
+    assert salva['allocations'] == {'PETR4': 0.5, 'ITUB4': 0.5}
+    assert salva['tickers'] == ['PETR4', 'ITUB4']
+    assert salva['rebalance'] == carteira['rebalance']
+    assert salva['metrics'] == carteira['metrics']
+
+    recentes = store.query(order_by='executed_at', limit=5)
+    assert [r['executed_at'] for r in recentes] == sorted((r['executed_at'] for r in recentes), reverse=True)
+
+    with pytest.raises(ValueError):
+        store.query(order_by='sharpe_ratio; DROP TABLE results')
+
+
+def test_save_result_grava_no_store_e_carrega_curva_sob_demanda():
+    diretorio = tempfile.mkdtemp()
+    backtester = Backtester(initial_capital=10000, results_dir=diretorio)
+    resultado = backtester.backtest_buy_and_hold('PETR4', gerar_precos(500, 1))
+
+    caminho = backtester.save_result(resultado)
+    assert os.path.exists(caminho)
+    assert os.path.basename(caminho) == 'results.db'
+    assert not [f for f in os.listdir(diretorio) if f.endswith('.json')]
+
+    completo = backtester.store.get(resultado['result_id'], include_curve=True)
+    assert np.allclose(completo['equity_curve'], resultado['equity_curve'], atol=0.01)
+    assert np.allclose(backtester.store.load_curve(resultado['result_id']), resultado['equity_curve'], rtol=1e-6)
+    assert backtester.store.get(resultado['result_id'])['period'] == resultado['period']
+
+    # Exportação explícita em JSON continua disponível
+    arquivo = backtester.save_result(resultado, 'exportado.json')
+    with open(arquivo) as f:
+        assert json.load(f)['equity_curve'] == resultado['equity_curve']
+
+    assert backtester.store.delete(resultado['result_id'])
+    assert backtester.store.get(resultado['result_id']) is None
+    assert backtester.store.load_curve(resultado['result_id']) is None
+
+
+def test_importa_json_antigos_uma_vez():
+    diretorio = tempfile.mkdtemp()
+    backtester = Backtester(initial_capital=10000, results_dir=diretorio)
+    for seed in range(5):
+        resultado = backtester.backtest_buy_and_hold('VALE3', gerar_precos(100, seed))
+        backtester.save_result(resultado, f'buy_and_hold_{seed}.json')
+    with open(os.path.join(diretorio, 'corrompido.json'), 'w') as f:
+        f.write('{')
+
+    store = ResultsStore(os.path.join(diretorio, 'historico.db'))
+    assert store.import_json_dir(diretorio) == 5
+    assert store.import_json_dir(diretorio) == 0
+    assert store.count(ticker='VALE3') == 5
+
+
+def test_historico_de_milhares_de_resultados_sem_ler_curvas():
+    store = ResultsStore(os.path.join(tempfile.mkdtemp(), 'results.db'))
+    rng = np.random.default_rng(5)
+    curva = np.round(10000 * np.cumprod(1 + rng.normal(0, 0.01, 1260)), 2)
+    for i in range(1000):
+        store.save({
+            'strategy': 'buy_and_hold',
+            'ticker': f'T{i % 50}',
+            'period': {'start': '2020-01-01', 'end': '2024-12-31', 'days': len(curva)},
+            'capital': {'initial': 10000, 'final': float(curva[-1]), 'peak': float(curva.max())},
+            'metrics': {'total_return': 0.0, 'sharpe_ratio': float(rng.normal()),
+                        'max_drawdown': -10.0, 'volatility': 20.0},
+            'equity_curve': curva,
+            'executed_at': executado_ha(float(rng.uniform(0, 90)))
+        })
+
+    # Registra o SQL executado para conferir que a consulta não lê as curvas
+    comandos = []
+    conectar = store._connect
+
+    def conectar_com_registro():
+        conn = conectar()
+        conn.set_trace_callback(comandos.append)
+        return conn
+
+    store._connect = conectar_com_registro
+    inicio = time.perf_counter()
+    top = store.query(ticker='T7', days=30, order_by='sharpe_ratio', limit=10)
+    duracao = time.perf_counter() - inicio
+
+    assert 0 < len(top) <= 10
+    assert comandos and not any('curves' in comando for comando in comandos)
+    if BENCHMARK:
+        assert duracao < 0.1
+    # Base inteira menor que as curvas em float32 cru
+    assert os.path.getsize(store.db_path) < 1000 * 1260 * 4
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("TESTE: Armazenamento de resultados de backtest")
+    print("=" * 60)
+
+    test_curva_float32_comprimida()
+    print("✓ Curva em float32 comprimido")
+
+    test_top_n_por_sharpe_de_um_ticker_no_ultimo_mes()
+    print("✓ Top N por Sharpe de um ticker no último mês")
+
+    test_save_result_grava_no_store_e_carrega_curva_sob_demanda()
+    print("✓ save_result grava no store e a curva é carregada sob demanda")
+
+    test_importa_json_antigos_uma_vez()
+    print("✓ JSONs antigos importados uma única vez")
+
+    test_historico_de_milhares_de_resultados_sem_ler_curvas()
+    print("✓ Milhares de resultados consultados sem ler as curvas")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do Treinamento Walk-Forward dos Modelos de Inversão
+Magnus Wealth - Versão 9.1.0
+
+O treino em paralelo deve salvar os mesmos modelos do sequencial, validar
+só com dados passados e registrar tempos por fold e latência por modelo.
+"""
+
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from predicao_inversao import FEATURE_COLS, PreditorInversao
+from registro_modelos import RegistroModelos
+from treinar_modelo_inversao import escolher_candidato, selecionar_criptos, treinar_todos_modelos
+
+CANDIDATOS = ['RandomForest', 'GradientBoosting', 'HistGradientBoosting']
+
+
+def gerar_dataset():
+    """Dataset no formato de coletor_dados_ml_8anos, com datas embaralhadas"""
+    linhas = []
+    for seed, (cripto, n) in enumerate([('Bitcoin', 300), ('Ethereum', 250), ('Uniswap', 60)]):
+        rng = np.random.default_rng(seed)
+        datas = pd.date_range('2020-01-01', periods=n, freq='D')
+        for data in rng.permutation(datas):
+            linha = {'cripto': cripto, 'data': pd.Timestamp(data).isoformat()}
+            for col in FEATURE_COLS:
+                linha[col] = int(rng.choice([-1, 1])) if col.endswith('estado') else int(rng.integers(0, 30))
+            linha['virou_diario'] = bool(linha['1h_candles_virados'] + rng.normal(0, 6) > 22)
+            linhas.append(linha)
+    return pd.DataFrame(linhas)
+
+
+def test_paralelo_igual_ao_sequencial_com_tempos():
+    df = gerar_dataset()
+    assert list(selecionar_criptos(df, ['Bitcoin', 'Uniswap', 'Dogecoin'])) == ['Bitcoin']
+
+    with tempfile.TemporaryDirectory() as seq_dir, tempfile.TemporaryDirectory() as par_dir:
+        sequencial = treinar_todos_modelos(workers=1, n_folds=3, model_dir=seq_dir, df=df)
+        paralelo = treinar_todos_modelos(workers=2, n_folds=3, model_dir=par_dir, df=df)
+
+        assert list(paralelo['modelos']) == list(sequencial['modelos'])
+        assert set(paralelo['modelos']) <= {'Bitcoin', 'Ethereum'}
+        assert len(paralelo['modelos']) > 0
+
+        for cripto, info in paralelo['modelos'].items():
+            ref = sequencial['modelos'][cripto]
+            assert info['tipo_modelo'] == ref['tipo_modelo']
+            assert info['f1_score'] == ref['f1_score']
+            assert os.path.exists(info['arquivo'])
+
+            assert list(info['validacao']) == CANDIDATOS
+            for nome, validacao in info['validacao'].items():
+                assert validacao['tempo_fit_s'] > 0 and validacao['latencia_predicao_ms'] > 0
+                assert [f['f1_score'] for f in validacao['folds']] == \
+                    [f['f1_score'] for f in ref['validacao'][nome]['folds']]
+
+                # Walk-forward: o treino cresce e o teste vem depois dele
+                folds = validacao['folds']
+                assert len(folds) == 3
+                for anterior, fold in zip(folds, folds[1:]):
+                    assert fold['amostras_treino'] == anterior['amostras_treino'] + anterior['amostras_teste']
+                assert all(f['tempo_fit_s'] > 0 and f['tempo_predicao_s'] > 0 for f in folds)
+
+            melhor = info['validacao'][info['tipo_modelo']]['f1_score']
+            assert melhor == max(v['f1_score'] for v in info['validacao'].values())
+            assert info['tipo_modelo'] == escolher_candidato(ref['validacao'])
+
+        with open(os.path.join(par_dir, 'resumo_treinamento_inversao.json')) as f:
+            resumo = json.load(f)
+        assert resumo['folds_validacao'] == 3
+        assert resumo['modelos']['Bitcoin']['validacao']['HistGradientBoosting']['folds'][0]['tempo_fit_s'] > 0
+
+        # Modelos salvos são usados pelo preditor
+        preditor = PreditorInversao(model_dir=par_dir, registro=RegistroModelos())
+        features = {col: 1 for col in FEATURE_COLS}
+        assert set(preditor.prever_todas({c: features for c in paralelo['modelos']})) == set(paralelo['modelos'])
+
+
+def test_empate_decidido_por_auc_e_ordem_dos_candidatos():
+    def validacao(*metricas):
+        # Latências invertidas: não podem influenciar a escolha
+        return {nome: {'f1_score': f1, 'auc': auc, 'latencia_predicao_ms': 10.0 - k}
+                for k, (nome, (f1, auc)) in enumerate(zip(CANDIDATOS, metricas))}
+
+    assert escolher_candidato(validacao((0.5, 0.7), (0.6, 0.6), (0.6, 0.6))) == 'GradientBoosting'
+    assert escolher_candidato(validacao((0.6, 0.6), (0.6, 0.8), (0.6, 0.7))) == 'GradientBoosting'
+    assert escolher_candidato(validacao((0.6, 0.7), (0.6, 0.7), (0.6, 0.7))) == 'RandomForest'
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("TESTE: Treinamento walk-forward dos modelos de inversão")
+    print("=" * 60)
+
+    test_paralelo_igual_ao_sequencial_com_tempos()
+    print("✓ Treino paralelo igual ao sequencial, com tempos por fold e latência")
+
+    test_empate_decidido_por_auc_e_ordem_dos_candidatos()
+    print("✓ Empate de F1 decidido por AUC e pela ordem dos candidatos")
@@ -9,12 +9,14 @@ baseado em padrões multi-timeframe
 
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score, confusion_matrix
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, HistGradientBoostingClassifier
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import joblib
 import json
 import os
+import time
 from datetime import datetime
 
 # Diretório de dados e modelos
@@ -22,6 +24,13 @@ DATA_DIR = 'ml_data_8anos'
 MODEL_DIR = 'ml_models'
 os.makedirs(MODEL_DIR, exist_ok=True)
 
+# Validação walk-forward e paralelismo (1 = execução sequencial)
+FOLDS_VALIDACAO = int(os.getenv('TREINO_FOLDS', '5'))
+WORKERS_TREINO = int(os.getenv('TREINO_WORKERS', str(os.cpu_count() or 1)))
+
+# Repetições da medição de latência de predição de uma amostra
+REPETICOES_LATENCIA = 20
+
 # Carregar criptomoedas do portfolio_config.json
 from portfolio_manager import PortfolioManager
 
@@ -84,99 +93,217 @@ def preparar_features(df):
     
     return X, y, feature_cols
 
-def treinar_modelo_por_cripto(cripto, X_train, X_test, y_train, y_test, feature_cols):
-    """
-    Treina modelo específico para uma criptomoeda
+def criar_candidatos(n_jobs=1):
     """
-    print(f"\n{'='*80}")
-    print(f"🤖 TREINANDO MODELO: {cripto}")
-    print(f"{'='*80}")
+    Modelos candidatos por cripto
     
-    # Tentar Random Forest e Gradient Boosting
-    modelos = {
+    Args:
+        n_jobs: Threads do RandomForest (1 quando as criptos já rodam em
+            processos paralelos)
+    """
+    return {
         'RandomForest': RandomForestClassifier(
             n_estimators=100,
             max_depth=10,
             min_samples_split=20,
             min_samples_leaf=10,
             random_state=42,
-            n_jobs=-1
+            n_jobs=n_jobs
         ),
         'GradientBoosting': GradientBoostingClassifier(
             n_estimators=100,
             max_depth=5,
             learning_rate=0.1,
             random_state=42
+        ),
+        # Histogramas: muito mais rápido nas features inteiras e pequenas
+        'HistGradientBoosting': HistGradientBoostingClassifier(
+            max_iter=100,
+            max_depth=5,
+            learning_rate=0.1,
+            random_state=42
         )
     }
+
+def medir_latencia_predicao(modelo, X, repeticoes=REPETICOES_LATENCIA):
+    """
+    Latência mediana (ms) de predict_proba para uma amostra, como no
+    monitor em tempo real
+    """
+    amostra = X.iloc[[-1]]
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        modelo.predict_proba(amostra)
+        tempos.append(time.perf_counter() - inicio)
+    return float(np.median(tempos) * 1000)
+
+def validar_walk_forward(modelo, X, y, n_folds=FOLDS_VALIDACAO):
+    """
+    Valida um modelo em folds walk-forward (TimeSeriesSplit)
     
-    melhor_modelo = None
-    melhor_score = 0
-    melhor_nome = None
+    Cada fold treina só com o passado e testa no período seguinte.
+    Folds cujo treino tem uma única classe são ignorados.
     
-    for nome, modelo in modelos.items():
-        print(f"\n📊 Testando {nome}...")
-        
-        # Treinar
-        modelo.fit(X_train, y_train)
+    Returns:
+        Lista com métricas e tempos de cada fold
+    """
+    folds = []
+    for fold, (idx_treino, idx_teste) in enumerate(TimeSeriesSplit(n_splits=n_folds).split(X)):
+        y_treino, y_teste = y.iloc[idx_treino], y.iloc[idx_teste]
+        if y_treino.nunique() < 2:
+            continue
         
-        # Predizer
-        y_pred = modelo.predict(X_test)
-        y_pred_proba = modelo.predict_proba(X_test)[:, 1]
+        inicio = time.perf_counter()
+        modelo.fit(X.iloc[idx_treino], y_treino)
+        tempo_fit = time.perf_counter() - inicio
         
-        # Métricas
-        accuracy = accuracy_score(y_test, y_pred)
-        precision = precision_score(y_test, y_pred, zero_division=0)
-        recall = recall_score(y_test, y_pred, zero_division=0)
-        f1 = f1_score(y_test, y_pred, zero_division=0)
+        inicio = time.perf_counter()
+        y_pred_proba = modelo.predict_proba(X.iloc[idx_teste])[:, 1]
+        tempo_predicao = time.perf_counter() - inicio
+        y_pred = (y_pred_proba > 0.5).astype(int)
         
         try:
-            auc = roc_auc_score(y_test, y_pred_proba)
-        except:
+            auc = roc_auc_score(y_teste, y_pred_proba)
+        except ValueError:
             auc = 0
         
-        print(f"   Acurácia: {accuracy:.4f}")
-        print(f"   Precisão: {precision:.4f}")
-        print(f"   Recall: {recall:.4f}")
-        print(f"   F1-Score: {f1:.4f}")
-        print(f"   AUC-ROC: {auc:.4f}")
+        folds.append({
+            'fold': fold,
+            'amostras_treino': len(idx_treino),
+            'amostras_teste': len(idx_teste),
+            'accuracy': float(accuracy_score(y_teste, y_pred)),
+            'precision': float(precision_score(y_teste, y_pred, zero_division=0)),
+            'recall': float(recall_score(y_teste, y_pred, zero_division=0)),
+            'f1_score': float(f1_score(y_teste, y_pred, zero_division=0)),
+            'auc': float(auc),
+            'tempo_fit_s': tempo_fit,
+            'tempo_predicao_s': tempo_predicao
+        })
+    
+    return folds
+
+def escolher_candidato(validacao):
+    """
+    Candidato de maior F1 médio; em empate, o de maior AUC médio e, por fim,
+    o primeiro na ordem de criar_candidatos
+    
+    Só usa métricas determinísticas: a latência medida varia entre execuções
+    e faria o mesmo dataset gerar modelos diferentes.
+    """
+    ordem = list(validacao)
+    return min(ordem, key=lambda n: (-validacao[n]['f1_score'], -validacao[n]['auc'], ordem.index(n)))
+
+def treinar_cripto(cripto, df_cripto, feature_cols, n_folds=FOLDS_VALIDACAO,
+                   model_dir=MODEL_DIR, n_jobs=1):
+    """
+    Valida os candidatos de uma cripto, re-treina o melhor com todo o
+    histórico e salva o modelo
+    
+    O melhor candidato é escolhido por escolher_candidato; a latência de
+    predição é só reportada.
+    
+    Args:
+        cripto: Nome da criptomoeda
+        df_cripto: Amostras da cripto (colunas 'data', features e 'virou_diario')
+        feature_cols: Colunas de features
+        n_folds: Folds do TimeSeriesSplit
+        model_dir: Diretório onde salvar o modelo
+        n_jobs: Threads do RandomForest
+    
+    Returns:
+        Metadados do modelo salvo, com a validação de todos os candidatos
+    """
+    # Walk-forward exige ordem cronológica
+    df_cripto = df_cripto.sort_values('data', kind='stable')
+    X = df_cripto[feature_cols]
+    y = df_cripto['virou_diario'].astype(int)
+    
+    validacao = {}
+    modelos = criar_candidatos(n_jobs)
+    for nome, modelo in modelos.items():
+        folds = validar_walk_forward(modelo, X, y, n_folds)
         
-        # Matriz de confusão
-        cm = confusion_matrix(y_test, y_pred)
-        print(f"\n   Matriz de Confusão:")
-        print(f"   {cm}")
+        # Modelo final: todo o histórico
+        inicio = time.perf_counter()
+        modelo.fit(X, y)
+        tempo_fit = time.perf_counter() - inicio
         
-        # Escolher melhor modelo baseado em F1-Score
-        if f1 > melhor_score:
-            melhor_score = f1
-            melhor_modelo = modelo
-            melhor_nome = nome
-    
-    print(f"\n✅ Melhor modelo: {melhor_nome} (F1: {melhor_score:.4f})")
-    
-    # Importância das features (se disponível)
-    if hasattr(melhor_modelo, 'feature_importances_'):
-        importancias = pd.DataFrame({
-            'feature': feature_cols,
-            'importance': melhor_modelo.feature_importances_
-        }).sort_values('importance', ascending=False)
+        # Predição de uma amostra por vez é mais rápida sem pool de threads
+        if 'n_jobs' in modelo.get_params():
+            modelo.set_params(n_jobs=1)
         
-        print(f"\n📊 Top 5 Features mais importantes:")
-        for idx, row in importancias.head(5).iterrows():
-            print(f"   {row['feature']}: {row['importance']:.4f}")
+        validacao[nome] = {
+            'f1_score': float(np.mean([f['f1_score'] for f in folds])) if folds else 0.0,
+            'auc': float(np.mean([f['auc'] for f in folds])) if folds else 0.0,
+            'tempo_fit_s': tempo_fit,
+            'latencia_predicao_ms': medir_latencia_predicao(modelo, X),
+            'folds': folds
+        }
     
-    return melhor_modelo, melhor_nome, melhor_score
+    melhor_nome = escolher_candidato(validacao)
+    
+    # Salvar modelo
+    model_file = f"{model_dir}/{cripto.replace(' ', '_').lower()}_inversao.pkl"
+    joblib.dump(modelos[melhor_nome], model_file)
+    
+    inversoes = int(y.sum())
+    return {
+        'tipo_modelo': melhor_nome,
+        'f1_score': validacao[melhor_nome]['f1_score'],
+        'total_amostras': len(df_cripto),
+        'inversoes': inversoes,
+        'taxa_inversao': float(inversoes / len(y) * 100),
+        'arquivo': model_file,
+        'features': feature_cols,
+        'validacao': validacao
+    }
 
-def treinar_todos_modelos():
+def selecionar_criptos(df, criptos=None):
+    """
+    Amostras de cada cripto com dados e inversões suficientes para treinar
+    
+    Returns:
+        {cripto: DataFrame}
+    """
+    selecionadas = {}
+    for cripto in criptos or CRIPTOS:
+        df_cripto = df[df['cripto'] == cripto]
+        inversoes = int(df_cripto['virou_diario'].astype(int).sum()) if len(df_cripto) else 0
+        
+        if len(df_cripto) < 100:
+            print(f"⚠️ Dados insuficientes para {cripto}: {len(df_cripto)} amostras")
+        elif inversoes < 10:
+            print(f"⚠️ Inversões insuficientes para treinar modelo de {cripto}: {inversoes}")
+        else:
+            selecionadas[cripto] = df_cripto
+    
+    return selecionadas
+
+def treinar_todos_modelos(workers=None, n_folds=FOLDS_VALIDACAO, model_dir=MODEL_DIR, df=None):
     """
     Treina modelos para todas as criptomoedas
+    
+    As criptos são treinadas em paralelo (um processo por cripto) com
+    validação walk-forward; o resumo guarda métricas e tempos por fold e
+    a latência de fit/predição de cada candidato.
+    
+    Args:
+        workers: Processos simultâneos (padrão WORKERS_TREINO)
+        n_folds: Folds do TimeSeriesSplit
+        model_dir: Diretório dos modelos e do resumo
+        df: Dataset já carregado (padrão: carregar_dataset())
+    
+    Returns:
+        Resumo do treinamento
     """
     print("=" * 80)
     print("TREINAMENTO DE MODELOS ML - MAGNUS WEALTH v9.0.0")
     print("=" * 80)
     
     # Carregar dataset
-    df = carregar_dataset()
+    if df is None:
+        df = carregar_dataset()
     if df is None:
         return
     
@@ -189,75 +316,46 @@ def treinar_todos_modelos():
     resultados = {
         'timestamp': datetime.now().isoformat(),
         'total_amostras': len(df),
+        'folds_validacao': n_folds,
         'modelos': {}
     }
     
-    # Treinar modelo para cada cripto
-    for cripto in CRIPTOS:
-        print(f"\n{'='*80}")
-        print(f"🪙 CRIPTO: {cripto}")
-        print(f"{'='*80}")
-        
-        # Filtrar dados da cripto
-        df_cripto = df[df['cripto'] == cripto].copy()
-        
-        if len(df_cripto) < 100:
-            print(f"⚠️ Dados insuficientes para {cripto}: {len(df_cripto)} amostras")
-            continue
-        
-        print(f"✓ Amostras disponíveis: {len(df_cripto)}")
-        
-        # Preparar features da cripto
-        X_cripto = df_cripto[feature_cols]
-        y_cripto = df_cripto['virou_diario'].astype(int)
-        
-        # Verificar se há inversões suficientes
-        inversoes = y_cripto.sum()
-        taxa_inversao = inversoes / len(y_cripto) * 100
-        
-        print(f"✓ Inversões: {inversoes} ({taxa_inversao:.2f}%)")
-        
-        if inversoes < 10:
-            print(f"⚠️ Inversões insuficientes para treinar modelo")
-            continue
-        
-        # Split treino/teste
-        X_train, X_test, y_train, y_test = train_test_split(
-            X_cripto, y_cripto, 
-            test_size=0.2, 
-            random_state=42,
-            stratify=y_cripto if inversoes > 20 else None
-        )
-        
-        print(f"✓ Treino: {len(X_train)} amostras")
-        print(f"✓ Teste: {len(X_test)} amostras")
-        
-        # Treinar modelo
-        modelo, nome_modelo, score = treinar_modelo_por_cripto(
-            cripto, X_train, X_test, y_train, y_test, feature_cols
-        )
-        
-        if modelo is None:
-            continue
-        
-        # Salvar modelo
-        model_file = f"{MODEL_DIR}/{cripto.replace(' ', '_').lower()}_inversao.pkl"
-        joblib.dump(modelo, model_file)
-        print(f"\n💾 Modelo salvo: {model_file}")
-        
-        # Salvar metadados
-        resultados['modelos'][cripto] = {
-            'tipo_modelo': nome_modelo,
-            'f1_score': float(score),
-            'total_amostras': len(df_cripto),
-            'inversoes': int(inversoes),
-            'taxa_inversao': float(taxa_inversao),
-            'arquivo': model_file,
-            'features': feature_cols
-        }
+    selecionadas = selecionar_criptos(df)
+    workers = WORKERS_TREINO if workers is None else workers
+    print(f"\n🤖 Treinando {len(selecionadas)} criptos ({workers} processos, {n_folds} folds walk-forward)")
+    
+    def registrar(cripto, info):
+        resultados['modelos'][cripto] = info
+        print(f"✓ {cripto}: {info['tipo_modelo']} (F1 {info['f1_score']:.4f}, "
+              f"{info['validacao'][info['tipo_modelo']]['latencia_predicao_ms']:.2f} ms/predição)")
+    
+    inicio = time.perf_counter()
+    if workers > 1 and len(selecionadas) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(selecionadas))) as executor:
+            futures = {
+                executor.submit(treinar_cripto, cripto, df_cripto, feature_cols, n_folds, model_dir): cripto
+                for cripto, df_cripto in selecionadas.items()
+            }
+            for future in as_completed(futures):
+                cripto = futures[future]
+                try:
+                    registrar(cripto, future.result())
+                except Exception as e:
+                    print(f"❌ Erro ao treinar {cripto}: {e}")
+    else:
+        for cripto, df_cripto in selecionadas.items():
+            try:
+                registrar(cripto, treinar_cripto(cripto, df_cripto, feature_cols, n_folds, model_dir, n_jobs=-1))
+            except Exception as e:
+                print(f"❌ Erro ao treinar {cripto}: {e}")
+    
+    resultados['tempo_total_s'] = time.perf_counter() - inicio
+    
+    # Resumo na ordem das criptos
+    resultados['modelos'] = {c: resultados['modelos'][c] for c in selecionadas if c in resultados['modelos']}
     
     # Salvar resumo
-    resumo_file = f"{MODEL_DIR}/resumo_treinamento_inversao.json"
+    resumo_file = f"{model_dir}/resumo_treinamento_inversao.json"
     with open(resumo_file, 'w') as f:
         json.dump(resultados, f, indent=2)
     
@@ -266,6 +364,7 @@ def treinar_todos_modelos():
     print(f"{'='*80}")
     print(f"\n📊 Resumo:")
     print(f"   Modelos treinados: {len(resultados['modelos'])}")
+    print(f"   Tempo total: {resultados['tempo_total_s']:.1f}s")
     print(f"   Resumo salvo: {resumo_file}")
     
     # Estatísticas gerais
@@ -285,6 +384,8 @@ def treinar_todos_modelos():
         
         for cripto, info in top_modelos:
             print(f"   {cripto}: F1={info['f1_score']:.4f} ({info['tipo_modelo']})")
+    
+    return resultados
 
 def testar_predicao(cripto='Bitcoin'):
     """
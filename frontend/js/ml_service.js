@@ -277,6 +277,80 @@ function renderOptimizedPortfolio(portfolio) {
     });
 }
 
+/**
+ * Gera a fronteira eficiente (pontos densos para o gráfico)
+ */
+async function loadEfficientFrontier(pricesHistory, nPoints = 100) {
+    try {
+        const response = await fetch(`${API_BASE_URL}/ml/portfolio/frontier`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                prices_history: pricesHistory,
+                n_points: nPoints,
+                method: 'qp'
+            })
+        });
+        
+        const data = await response.json();
+        return data;
+    } catch (error) {
+        console.error('Erro ao gerar fronteira eficiente:', error);
+        throw error;
+    }
+}
+
+/**
+ * Renderiza fronteira eficiente (risco x retorno)
+ */
+function renderEfficientFrontier(frontier) {
+    const container = document.getElementById('efficient-frontier');
+    
+    container.innerHTML = `
+        <div class="allocation-chart">
+            <canvas id="frontier-chart"></canvas>
+        </div>
+    `;
+    
+    const ctx = document.getElementById('frontier-chart').getContext('2d');
+    new Chart(ctx, {
+        type: 'scatter',
+        data: {
+            datasets: [{
+                label: 'Fronteira Eficiente',
+                data: frontier.map(p => ({ x: p.volatility, y: p.return })),
+                borderColor: '#FFD700',
+                backgroundColor: '#FFD700',
+                showLine: true,
+                pointRadius: 0
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: true,
+            scales: {
+                x: {
+                    title: { display: true, text: 'Volatilidade (%)', color: '#ffffff' },
+                    ticks: { color: '#ffffff' }
+                },
+                y: {
+                    title: { display: true, text: 'Retorno Esperado (%)', color: '#ffffff' },
+                    ticks: { color: '#ffffff' }
+                }
+            },
+            plugins: {
+                legend: {
+                    labels: {
+                        color: '#ffffff'
+                    }
+                }
+            }
+        }
+    });
+}
+
 // ============================================================================
 // FUNÇÕES AUXILIARES
 // ============================================================================
@@ -315,4 +389,6 @@ window.trainPriceModel = trainPriceModel;
 window.predictPrices = predictPrices;
 window.optimizePortfolio = optimizePortfolio;
 window.renderOptimizedPortfolio = renderOptimizedPortfolio;
+window.loadEfficientFrontier = loadEfficientFrontier;
+window.renderEfficientFrontier = renderEfficientFrontier;
 